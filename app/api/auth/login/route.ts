@@ -1,6 +1,6 @@
 import { NextResponse } from "next/server";
 import { cookies } from "next/headers";
-import { createServerClient } from "@supabase/ssr";
+import { getRequestSupabase, getPendingAuthCookies } from "@/lib/supabase/clients";
 
 function routeSupabase() {
   const url = process.env.NEXT_PUBLIC_SUPABASE_URL;
@@ -11,18 +11,9 @@ function routeSupabase() {
   }
 
   const cookieStore = cookies();
-  const pendingCookies: any[] = [];
+  const pendingCookies: any[] = getPendingAuthCookies();
 
-  const sb = createServerClient(url, anon, {
-    cookies: {
-      getAll() {
-        return cookieStore.getAll();
-      },
-      setAll(cookiesToSet) {
-        pendingCookies.push(...cookiesToSet);
-      },
-    },
-  });
+  const sb = getRequestSupabase()!;
 
   const getOrCreateDeviceHash = () => {
     const existing = cookieStore.get("ta_device_hash")?.value ?? null;
@@ -1,7 +1,6 @@
 import { NextResponse } from "next/server";
 import { cookies } from "next/headers";
-import { createServerClient } from "@supabase/ssr";
-import { createClient } from "@supabase/supabase-js";
+import { getSupabaseAdminOrNull, getRequestSupabase, getPendingAuthCookies } from "@/lib/supabase/clients";
 
 function routeSupabase() {
   const url = process.env.NEXT_PUBLIC_SUPABASE_URL;
@@ -12,18 +11,9 @@ function routeSupabase() {
   }
 
   const cookieStore = cookies();
-  const pendingCookies: any[] = [];
+  const pendingCookies: any[] = getPendingAuthCookies();
 
-  const sb = createServerClient(url, anon, {
-    cookies: {
-      getAll() {
-        return cookieStore.getAll();
-      },
-      setAll(cookiesToSet) {
-        pendingCookies.push(...cookiesToSet);
-      },
-    },
-  });
+  const sb = getRequestSupabase()!;
 
   const getOrCreateDeviceHash = () => {
     const existing = cookieStore.get("ta_device_hash")?.value ?? null;
@@ -53,16 +43,6 @@ function routeSupabase() {
   return { sb, json, getOrCreateDeviceHash };
 }
 
-function supabaseAdminOrNull() {
-  const url = process.env.NEXT_PUBLIC_SUPABASE_URL;
-  const service = process.env.SUPABASE_SERVICE_ROLE_KEY;
-  if (!url || !service) return null;
-
-  return createClient(url, service, {
-    auth: { persistSession: false, autoRefreshToken: false },
-  });
-}
-
 async function upsertProfile(sb: any, user: any, fullName: string | null) {
   const now = new Date().toISOString();
   const row = {
@@ -153,7 +133,7 @@ export async function POST(req: Request) {
 
   // Если Supabase требует подтверждение email, session будет null
   if (!signUpData.session) {
-    const admin = supabaseAdminOrNull();
+    const admin = getSupabaseAdminOrNull();
     if (!admin) {
       return json(
         {
@@ -1,33 +1,14 @@
 import { NextRequest, NextResponse } from "next/server"
-import { createClient } from "@supabase/supabase-js"
-import { createHmac } from "crypto"
+import { getSupabaseAdmin } from "@/lib/supabase/clients"
+import { notifyOrderChanged } from "@/lib/billing/order-events"
+import { wfpCheckStatus } from "@/lib/billing/wayforpay-check"
+import { GRANTING, UNSETTLED_FILTER, transitionToPaid } from "@/lib/billing/paid-transition"
 
 export const runtime = "nodejs"
 export const dynamic = "force-dynamic"
 
-const WFP_API = "https://api.wayforpay.com/api"
 const DEVICE_COOKIE = "ta_device_hash"
 
-function env(name: string) {
-  return String(process.env[name] || "").trim()
-}
-
-function mustEnv(name: string) {
-  const v = env(name)
-  if (!v) throw new Error("Missing env " + name)
-  return v
-}
-
-function hmacMd5(secret: string, msg: string) {
-  return createHmac("md5", secret).update(msg).digest("hex")
-}
-
-function sbAdmin() {
-  const url = mustEnv("NEXT_PUBLIC_SUPABASE_URL")
-  const key = mustEnv("SUPABASE_SERVICE_ROLE_KEY")
-  return createClient(url, key, { auth: { persistSession: false, autoRefreshToken: false } })
-}
-
 function noStore() {
   return { "cache-control": "no-store, max-age=0" }
 }
@@ -67,35 +48,6 @@ function addDaysISO(fromISO: string, days: number) {
   return d.toISOString()
 }
 
-async function wfpCheckStatus(orderReference: string) {
-  const merchantAccount =
-    env("WAYFORPAY_MERCHANT_ACCOUNT") || env("WFP_MERCHANT_ACCOUNT")
-  const secret =
-    env("WAYFORPAY_SECRET_KEY") || env("WFP_SECRET_KEY") ||
-    env("WAYFORPAY_MERCHANT_SECRET_KEY") || env("WFP_MERCHANT_SECRET_KEY")
-
-  if (!merchantAccount || !secret) return { ok: false, error: "WAYFORPAY_NOT_CONFIGURED" }
-
-  const signString = [merchantAccount, orderReference].join(";")
-  const merchantSignature = hmacMd5(secret, signString)
-
-  const r = await fetch(WFP_API, {
-    method: "POST",
-    headers: { "content-type": "application/json" },
-    body: JSON.stringify({
-      transactionType: "CHECK_STATUS",
-      merchantAccount,
-      orderReference,
-      merchantSignature,
-      apiVersion: 1,
-    }),
-    cache: "no-store",
-  })
-
-  const data = await r.json().catch(() => null as any)
-  return { ok: r.ok, httpStatus: r.status, data }
-}
-
 async function ensureGrantForDevice(admin: any, deviceHash: string, planId: string) {
   if (!deviceHash) return null
 
@@ -109,6 +61,7 @@ async function ensureGrantForDevice(admin: any, deviceHash: string, planId: stri
     .order("updated_at", { ascending: false })
     .limit(1)
     .maybeSingle()
+  if (cur.error) throw new Error("access_grants read failed: " + cur.error.message)
 
   const base =
     cur.data?.paid_until && new Date(cur.data.paid_until).getTime() > Date.now()
@@ -117,7 +70,7 @@ async function ensureGrantForDevice(admin: any, deviceHash: string, planId: stri
 
   const next = addDaysISO(base, days)
 
-  await admin
+  const up = await admin
     .from("access_grants")
     .upsert(
       {
@@ -129,10 +82,53 @@ async function ensureGrantForDevice(admin: any, deviceHash: string, planId: stri
       } as any,
       { onConflict: "device_hash" }
     )
+  if (up.error) throw new Error("access_grants upsert failed: " + up.error.message)
 
   return next
 }
 
+// Paid by this check: extend access grants once (a webhook-paid order was extended by the webhook;
+// repeated status polls must not add another period each time)
+async function grantPaidOrder(admin: any, data: any) {
+  const planId = String(data.plan_id || "monthly")
+  const dh = String(data.device_hash || "")
+  const uid = String(data.user_id || "").trim() || null
+
+  let ensuredPaidUntil: string | null = null
+  if (dh) {
+    ensuredPaidUntil = await ensureGrantForDevice(admin, dh, planId)
+  }
+
+  if (uid) {
+    const accountKey = `account:${uid}`
+    const pu2 = await ensureGrantForDevice(admin, accountKey, planId)
+    if (pu2) {
+      const a = toDateOrNull(ensuredPaidUntil)
+      const b = toDateOrNull(pu2)
+      ensuredPaidUntil = a && b && b.getTime() > a.getTime() ? pu2 : (ensuredPaidUntil || pu2)
+    }
+
+    // Sync profiles metadata
+    if (ensuredPaidUntil) {
+      try {
+        await admin
+          .from("profiles")
+          .update({
+            paid_until: ensuredPaidUntil,
+            subscription_status: "active",
+            auto_renew: true,
+            cancel_at_period_end: false,
+            canceled_at: null,
+            updated_at: new Date().toISOString(),
+          } as any)
+          .eq("id", uid)
+      } catch {}
+    }
+  }
+
+  return ensuredPaidUntil
+}
+
 async function handle(req: NextRequest) {
   const sp = req.nextUrl.searchParams
   const orderReference =
@@ -143,7 +139,7 @@ async function handle(req: NextRequest) {
   }
 
   try {
-    const admin = sbAdmin()
+    const admin = getSupabaseAdmin()
     const { data, error } = await admin
       .from("billing_orders")
       .select("order_reference,status,plan_id,amount,currency,device_hash,user_id,updated_at,raw")
@@ -163,8 +159,15 @@ async function handle(req: NextRequest) {
 
     let status = normalizeStatus((data as any).status)
     let wfp: any = null
+    let becamePaid = false
+    let ensuredPaidUntil: string | null = null
 
-    // Self-healing: if order is pending/created, check WFP for real status
+    // заказ захвачен под продление доступа — для клиента это ещё processing
+    if (status === GRANTING) status = "processing"
+
+    // Self-healing: if order is pending/created, check WFP for real status.
+    // Страница результата сначала ждёт вебхук через /api/billing/orders/watch и приходит сюда
+    // один раз, если вебхука нет; уже оплаченный заказ в WayForPay не перепроверяем.
     if (status === "created" || status === "invoice_created" || status === "pending" || status === "processing") {
       wfp = await wfpCheckStatus(orderReference)
 
@@ -186,18 +189,23 @@ async function handle(req: NextRequest) {
         txStatus === "refunded"
 
       if (isPaid) {
-        status = "paid"
-        await admin
-          .from("billing_orders")
-          .update({
-            status: "paid",
-            raw: { __event: "check_status_paid", wfp: wfp.data, prev: (data as any).status },
-            updated_at: new Date().toISOString(),
-          } as any)
-          .eq("order_reference", orderReference)
+        // вебхук мог перевести заказ в paid параллельно — доступ продлевает тот, кто захватил заказ;
+        // ошибка БД — исключение и 500, а не "paid" без продления
+        const tr = await transitionToPaid(
+          admin,
+          orderReference,
+          { raw: { __event: "check_status_paid", wfp: wfp.data, prev: (data as any).status } },
+          () => grantPaidOrder(admin, data)
+        )
+        if (tr.state === "granted") {
+          becamePaid = true
+          ensuredPaidUntil = tr.paidUntil
+        }
+        // busy — продлевает другой запрос, клиент опросит ещё раз (not_found — заказ удалили между чтениями)
+        status = tr.state === "granted" || tr.state === "paid" ? "paid" : "processing"
       } else if (isFailed) {
         status = "failed"
-        await admin
+        const tr = await admin
           .from("billing_orders")
           .update({
             status: "failed",
@@ -205,47 +213,12 @@ async function handle(req: NextRequest) {
             updated_at: new Date().toISOString(),
           } as any)
           .eq("order_reference", orderReference)
+          .or(UNSETTLED_FILTER)
+        if (tr.error) throw new Error("billing_orders update failed: " + tr.error.message)
       }
     }
 
-    // If paid, ensure access grants are extended
-    let ensuredPaidUntil: string | null = null
-    if (status === "paid") {
-      const planId = String((data as any).plan_id || "monthly")
-      const dh = String((data as any).device_hash || "")
-      const uid = String((data as any).user_id || "").trim() || null
-
-      if (dh) {
-        ensuredPaidUntil = await ensureGrantForDevice(admin, dh, planId)
-      }
-
-      if (uid) {
-        const accountKey = `account:${uid}`
-        const pu2 = await ensureGrantForDevice(admin, accountKey, planId)
-        if (pu2) {
-          const a = toDateOrNull(ensuredPaidUntil)
-          const b = toDateOrNull(pu2)
-          ensuredPaidUntil = a && b && b.getTime() > a.getTime() ? pu2 : (ensuredPaidUntil || pu2)
-        }
-
-        // Sync profiles metadata
-        if (ensuredPaidUntil) {
-          try {
-            await admin
-              .from("profiles")
-              .update({
-                paid_until: ensuredPaidUntil,
-                subscription_status: "active",
-                auto_renew: true,
-                cancel_at_period_end: false,
-                canceled_at: null,
-                updated_at: new Date().toISOString(),
-              } as any)
-              .eq("id", uid)
-          } catch {}
-        }
-      }
-    }
+    if (becamePaid || (wfp && status === "failed")) notifyOrderChanged(orderReference)
 
     const rawObj = parseRaw((data as any).raw)
     const transactionStatus = rawObj?.transactionStatus ?? rawObj?.transaction_status ?? null
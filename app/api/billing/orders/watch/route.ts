@@ -0,0 +1,110 @@
+import { NextRequest, NextResponse } from "next/server"
+import { getSupabaseAdmin } from "@/lib/supabase/clients"
+import { GRANTING } from "@/lib/billing/paid-transition"
+import { waitForOrderChange } from "@/lib/billing/order-events"
+
+export const runtime = "nodejs"
+export const dynamic = "force-dynamic"
+
+/**
+ * Long-poll статуса заказа для страницы результата оплаты.
+ *
+ * GET /api/billing/orders/watch?orderReference=...&wait=25
+ *
+ * Отвечает сразу, если заказ уже в конечном статусе; иначе держит запрос, пока вебхук/callback
+ * WayForPay не закоммитит заказ (сигнал из lib/billing/order-events.ts в этом процессе или
+ * перечитывание billing_orders раз в DB_RECHECK_MS — если вебхук попал в другой инстанс),
+ * но не дольше wait секунд. В WayForPay отсюда не ходим: после timedOut страница один раз
+ * спрашивает /api/billing/orders/status (там CHECK_STATUS).
+ */
+
+const WAIT_DEFAULT_S = 25
+const WAIT_MAX_S = 30
+const DB_RECHECK_MS = 3000
+// "granting" — заказ оплачен, доступ продлевается прямо сейчас (lib/billing/paid-transition)
+const OPEN_STATUSES = new Set(["", "created", "invoice_created", "pending", "processing", "unknown", GRANTING])
+
+function noStore() {
+  return { "cache-control": "no-store, max-age=0" }
+}
+
+function normalizeStatus(v: any) {
+  return String(v || "").trim().toLowerCase()
+}
+
+function parseRaw(raw: any): any {
+  if (!raw) return null
+  try {
+    let v: any = raw
+    if (typeof v === "string") v = JSON.parse(v)
+    if (typeof v === "string") v = JSON.parse(v)
+    return v
+  } catch {
+    return null
+  }
+}
+
+async function readOrder(admin: any, orderReference: string) {
+  const { data, error } = await admin
+    .from("billing_orders")
+    .select("order_reference,status,plan_id,raw,updated_at")
+    .eq("order_reference", orderReference)
+    .maybeSingle()
+  if (error) throw new Error(error.message)
+  return data as any
+}
+
+export async function GET(req: NextRequest) {
+  const sp = req.nextUrl.searchParams
+  const orderReference = (sp.get("orderReference") || sp.get("order_reference") || "").trim()
+  if (!orderReference) {
+    return NextResponse.json({ ok: false, error: "Missing orderReference" }, { status: 400, headers: noStore() })
+  }
+
+  const waitS = Math.min(WAIT_MAX_S, Math.max(0, Number(sp.get("wait") ?? WAIT_DEFAULT_S) || 0))
+  const deadline = Date.now() + waitS * 1000
+
+  try {
+    const admin = getSupabaseAdmin()
+    let order = await readOrder(admin, orderReference)
+
+    while (order && OPEN_STATUSES.has(normalizeStatus(order.status))) {
+      const left = deadline - Date.now()
+      if (left <= 0) break
+      await waitForOrderChange(orderReference, Math.min(DB_RECHECK_MS, left), req.signal)
+      if (req.signal.aborted) break
+      order = await readOrder(admin, orderReference)
+    }
+
+    if (!order) {
+      return NextResponse.json(
+        { ok: true, found: false, orderReference, status: "not_found" },
+        { status: 200, headers: noStore() }
+      )
+    }
+
+    const status = normalizeStatus(order.status)
+    const rawObj = parseRaw(order.raw)
+
+    return NextResponse.json(
+      {
+        ok: true,
+        found: true,
+        orderReference: order.order_reference,
+        planId: order.plan_id ?? null,
+        status,
+        transactionStatus: rawObj?.transactionStatus ?? rawObj?.transaction_status ?? null,
+        reason: rawObj?.reason ?? rawObj?.message ?? null,
+        reasonCode: rawObj?.reasonCode ?? rawObj?.reason_code ?? null,
+        timedOut: OPEN_STATUSES.has(status),
+        updatedAt: order.updated_at ?? null,
+      },
+      { status: 200, headers: noStore() }
+    )
+  } catch (e: any) {
+    return NextResponse.json(
+      { ok: false, error: "watch failed", details: String(e?.message || e) },
+      { status: 500, headers: noStore() }
+    )
+  }
+}
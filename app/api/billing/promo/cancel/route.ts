@@ -1,9 +1,7 @@
 import { NextRequest, NextResponse } from "next/server"
 import crypto from "crypto"
 import { cookies } from "next/headers"
-import { createServerClient } from "@supabase/ssr"
-import { createClient } from "@supabase/supabase-js"
-import { getSupabaseAdmin } from "@/lib/supabase-admin"
+import { getSupabaseAdmin, getRequestSupabase, getRequestUser, getPendingAuthCookies } from "@/lib/supabase/clients"
 
 export const runtime = "nodejs"
 export const dynamic = "force-dynamic"
@@ -37,19 +35,9 @@ function routeSessionSupabase() {
   const anon = process.env.NEXT_PUBLIC_SUPABASE_ANON_KEY
   if (!url || !anon) throw new Error("Missing NEXT_PUBLIC_SUPABASE_URL or NEXT_PUBLIC_SUPABASE_ANON_KEY")
 
-  const cookieStore = cookies()
-  const pendingCookies: any[] = []
+  const pendingCookies: any[] = getPendingAuthCookies()
 
-  const sb = createServerClient(url, anon, {
-    cookies: {
-      getAll() {
-        return cookieStore.getAll()
-      },
-      setAll(cookiesToSet) {
-        pendingCookies.push(...cookiesToSet)
-      },
-    },
-  })
+  const sb = getRequestSupabase()!
 
   const applyPendingCookies = (res: NextResponse) => {
     for (const c of pendingCookies) res.cookies.set(c.name, c.value, c.options)
@@ -58,24 +46,6 @@ function routeSessionSupabase() {
   return { sb, applyPendingCookies }
 }
 
-function routeAdminSupabase() {
-  const url = process.env.NEXT_PUBLIC_SUPABASE_URL
-  const service = process.env.SUPABASE_SERVICE_ROLE_KEY
-  if (!url || !service) {
-    throw new Error("Missing Supabase admin env: NEXT_PUBLIC_SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY")
-  }
-
-  const sb = createClient(url, service, {
-    auth: {
-      persistSession: false,
-      autoRefreshToken: false,
-      detectSessionInUrl: false,
-    },
-  })
-
-  return sb
-}
-
 async function findGrantByDevice(sb: any, deviceHash: string): Promise<GrantRow | null> {
   const { data } = await sb
     .from("access_grants")
@@ -107,9 +77,9 @@ export async function POST(_req: NextRequest) {
     }
 
     const { sb: sessionSb, applyPendingCookies } = routeSessionSupabase()
-    const adminSb = routeAdminSupabase()
+    const adminSb = getSupabaseAdmin()
 
-    const { data: userData } = await sessionSb.auth.getUser()
+    const { data: userData } = await getRequestUser()
     const user = userData?.user ?? null
     const userId = user?.id ?? null
     const isLoggedIn = Boolean(userId)
@@ -1,8 +1,7 @@
 import { NextRequest, NextResponse } from "next/server"
 import { cookies } from "next/headers"
-import { createServerClient } from "@supabase/ssr"
 import { randomUUID } from "crypto"
-import { getSupabaseAdmin } from "@/lib/supabase-admin"
+import { getSupabaseAdmin, getRequestSupabase, getRequestUser, getPendingAuthCookies } from "@/lib/supabase/clients"
 
 export const runtime = "nodejs"
 export const dynamic = "force-dynamic"
@@ -82,18 +81,9 @@ function routeSessionSupabase() {
   if (!url || !anon) throw new Error("Missing NEXT_PUBLIC_SUPABASE_URL or NEXT_PUBLIC_SUPABASE_ANON_KEY")
 
   const cookieStore = cookies()
-  const pendingCookies: any[] = []
+  const pendingCookies: any[] = getPendingAuthCookies()
 
-  const sb = createServerClient(url, anon, {
-    cookies: {
-      getAll() {
-        return cookieStore.getAll()
-      },
-      setAll(cookiesToSet) {
-        pendingCookies.push(...cookiesToSet)
-      },
-    },
-  })
+  const sb = getRequestSupabase()!
 
   const applyPendingCookies = (res: NextResponse) => {
     for (const c of pendingCookies) res.cookies.set(c.name, c.value, c.options)
@@ -188,7 +178,7 @@ export async function POST(req: NextRequest) {
       needSetDeviceCookie = true
     }
 
-    const { data: userData } = await sessionSb.auth.getUser()
+    const { data: userData } = await getRequestUser()
     const userId = userData?.user?.id ?? null
 
     const admin = getSupabaseAdmin()
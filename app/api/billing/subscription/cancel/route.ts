@@ -1,7 +1,5 @@
 import { NextResponse } from "next/server"
-import { cookies } from "next/headers"
-import { createServerClient } from "@supabase/ssr"
-import { getSupabaseAdmin } from "@/lib/supabase-admin"
+import { getSupabaseAdmin, getRequestUser } from "@/lib/supabase/clients"
 
 export const runtime = "nodejs"
 export const dynamic = "force-dynamic"
@@ -13,18 +11,7 @@ async function getUserIdFromSession() {
   const SUPABASE_ANON = process.env.NEXT_PUBLIC_SUPABASE_ANON_KEY
   if (!SUPABASE_URL || !SUPABASE_ANON) return { userId: null, error: "Missing Supabase public env" }
 
-  const cookieStore = cookies()
-  const supabase = createServerClient(SUPABASE_URL, SUPABASE_ANON, {
-    cookies: {
-      get(name: string) {
-        return cookieStore.get(name)?.value
-      },
-      set() {},
-      remove() {},
-    },
-  })
-
-  const { data, error } = await supabase.auth.getUser()
+  const { data, error } = await getRequestUser()
   if (error || !data?.user?.id) return { userId: null, error: error?.message || "Unauthorized" }
   return { userId: data.user.id, error: null }
 }
@@ -1,16 +1,15 @@
 import { NextRequest, NextResponse } from "next/server"
-import crypto from "crypto"
-import { getSupabaseAdmin } from "@/lib/supabase-admin"
+import { getSupabaseAdmin } from "@/lib/supabase/clients"
+import { upstreamErrorStatus } from "@/lib/server/upstream"
+import { notifyOrderChanged } from "@/lib/billing/order-events"
+import { wfpCheckStatus } from "@/lib/billing/wayforpay-check"
+import { UNSETTLED_FILTER, transitionToPaid, type PaidTransition } from "@/lib/billing/paid-transition"
 
 export const runtime = "nodejs"
 export const dynamic = "force-dynamic"
 
 type BillingStatus = "paid" | "failed" | "processing"
 
-function hmacMd5(str: string, key: string) {
-  return crypto.createHmac("md5", key).update(str, "utf8").digest("hex")
-}
-
 function safeLower(v: any) {
   return String(v || "").trim().toLowerCase()
 }
@@ -39,7 +38,8 @@ function normalizeDbStatus(s: any): BillingStatus {
   const v = safeLower(s)
   if (v === "paid") return "paid"
   if (v === "processing") return "processing"
-  if (v === "created" || v === "invoice_created" || v === "pending") return "processing"
+  // granting — вебхук прямо сейчас продлевает доступ (lib/billing/paid-transition)
+  if (v === "created" || v === "invoice_created" || v === "pending" || v === "granting") return "processing"
   return "failed"
 }
 
@@ -95,11 +95,12 @@ async function calcNextPaidUntil(admin: any, opts: { userId?: string | null; dev
   let base = now
 
   if (opts.userId) {
-    const { data: p } = await admin
+    const { data: p, error } = await admin
       .from("profiles")
       .select("paid_until")
       .eq("id", opts.userId)
       .maybeSingle()
+    if (error) throw new Error("profiles read failed: " + error.message)
 
     if (p?.paid_until && isFutureIso(p.paid_until)) {
       const d = toDateOrNull(p.paid_until)
@@ -108,13 +109,14 @@ async function calcNextPaidUntil(admin: any, opts: { userId?: string | null; dev
   }
 
   if (opts.deviceHash) {
-    const { data: g } = await admin
+    const { data: g, error } = await admin
       .from("access_grants")
       .select("paid_until")
       .eq("device_hash", opts.deviceHash)
       .order("updated_at", { ascending: false })
       .limit(1)
       .maybeSingle()
+    if (error) throw new Error("access_grants read failed: " + error.message)
 
     if (g?.paid_until && isFutureIso(g.paid_until)) {
       const d = toDateOrNull(g.paid_until)
@@ -132,7 +134,7 @@ async function activatePaid(admin: any, opts: { userId?: string | null; deviceHa
   if (opts.userId) {
     const accountKey = `account:${opts.userId}`
 
-    await admin
+    const up = await admin
       .from("access_grants")
       .upsert(
         {
@@ -145,8 +147,9 @@ async function activatePaid(admin: any, opts: { userId?: string | null; deviceHa
         } as any,
         { onConflict: "device_hash" }
       )
+    if (up.error) throw new Error("access_grants upsert failed: " + up.error.message)
 
-    await admin
+    const prof = await admin
       .from("profiles")
       .update({
         paid_until: nextIso,
@@ -155,10 +158,11 @@ async function activatePaid(admin: any, opts: { userId?: string | null; deviceHa
         updated_at: nowIso,
       } as any)
       .eq("id", opts.userId)
+    if (prof.error) throw new Error("profiles update failed: " + prof.error.message)
   }
 
   if (opts.deviceHash) {
-    await admin
+    const up = await admin
       .from("access_grants")
       .upsert(
         {
@@ -171,6 +175,7 @@ async function activatePaid(admin: any, opts: { userId?: string | null; deviceHa
         } as any,
         { onConflict: "device_hash" }
       )
+    if (up.error) throw new Error("access_grants upsert failed: " + up.error.message)
   }
 
   return nextIso
@@ -184,55 +189,6 @@ export async function GET(req: NextRequest) {
     return NextResponse.json({ ok: false, error: "missing_orderReference" }, { status: 400 })
   }
 
-  const merchantAccount =
-    process.env.WAYFORPAY_MERCHANT_ACCOUNT ||
-    process.env.WFP_MERCHANT_ACCOUNT ||
-    ""
-
-  const secretKey =
-    process.env.WAYFORPAY_SECRET_KEY ||
-    process.env.WFP_SECRET_KEY ||
-    ""
-
-  if (!merchantAccount || !secretKey) {
-    return NextResponse.json({ ok: false, error: "missing_wayforpay_env" }, { status: 500 })
-  }
-
-  const signStr = `${merchantAccount};${orderReference}`
-  const merchantSignature = hmacMd5(signStr, secretKey)
-
-  const requestBody = {
-    transactionType: "CHECK_STATUS",
-    merchantAccount,
-    orderReference,
-    apiVersion: 1,
-    merchantSignature,
-  }
-
-  let wfpJson: any = null
-  try {
-    const r = await fetch("https://api.wayforpay.com/api", {
-      method: "POST",
-      headers: { "Content-Type": "application/json" },
-      body: JSON.stringify(requestBody),
-      cache: "no-store",
-    })
-
-    wfpJson = await r.json().catch(() => null)
-
-    if (!r.ok || !wfpJson) {
-      return NextResponse.json({ ok: false, error: "wayforpay_check_failed", httpStatus: r.status }, { status: 502 })
-    }
-  } catch (e: any) {
-    return NextResponse.json({ ok: false, error: "wayforpay_fetch_error", details: String(e?.message || e) }, { status: 502 })
-  }
-
-  const txStatus: string | null = wfpJson.transactionStatus || wfpJson.status || null
-  if (!txStatus) {
-    return NextResponse.json({ ok: false, error: "missing_transactionStatus" }, { status: 502 })
-  }
-
-  const nextStatus = mapWayforpayStatus(txStatus)
   const admin = getSupabaseAdmin()
 
   const existing = await admin
@@ -248,26 +204,82 @@ export async function GET(req: NextRequest) {
 
   const existingStatuses = (existing.data || []).map((r: any) => String(r.status || ""))
   const bestExisting = pickBestStatus(existingStatuses)
+  const latest = (existing.data?.[0] as any) || null
+  const latestRaw = parseMaybeJson(latest?.raw) || {}
 
-  if (bestExisting === "paid" && nextStatus !== "paid") {
+  // оплаченный заказ уже не изменится — в WayForPay не ходим
+  if (bestExisting === "paid") {
     return NextResponse.json({
       ok: true,
       orderReference,
       status: "paid",
       protected: true,
-      transactionStatus: txStatus,
+      transactionStatus: latestRaw?.check?.transactionStatus ?? latestRaw?.transactionStatus ?? null,
     })
   }
 
-  const latest = (existing.data?.[0] as any) || null
-  const latestRaw = parseMaybeJson(latest?.raw) || {}
+  let wfpJson: any = null
+  try {
+    const w = await wfpCheckStatus(orderReference)
+    if (w.error === "WAYFORPAY_NOT_CONFIGURED") {
+      return NextResponse.json({ ok: false, error: "missing_wayforpay_env" }, { status: 500 })
+    }
+    if (!w.ok) {
+      return NextResponse.json({ ok: false, error: "wayforpay_check_failed", httpStatus: w.httpStatus }, { status: 502 })
+    }
+    wfpJson = w.data
+  } catch (e: any) {
+    return NextResponse.json(
+      { ok: false, error: "wayforpay_fetch_error", details: String(e?.message || e) },
+      { status: upstreamErrorStatus(e) ?? 502 }
+    )
+  }
+
+  const txStatus: string | null = wfpJson.transactionStatus || wfpJson.status || null
+  if (!txStatus) {
+    return NextResponse.json({ ok: false, error: "missing_transactionStatus" }, { status: 502 })
+  }
+
+  const nextStatus = mapWayforpayStatus(txStatus)
+
   const mergedRaw = {
     ...latestRaw,
     check: wfpJson,
     check_received_at: new Date().toISOString(),
   }
 
-  await admin
+  // оплачен в WayForPay: claim -> продление -> paid (lib/billing/paid-transition), как у вебхука —
+  // доступ продлевает только захвативший заказ, упавшее продление снимает claim и отдаёт 5xx
+  if (nextStatus === "paid" && latest) {
+    const userId = String(latest.user_id || "").trim() || null
+    const deviceHash = String(latest.device_hash || "").trim() || null
+    const planId = String(latest.plan_id || "monthly").trim() || "monthly"
+    const days = planDays(planId)
+
+    let paid: PaidTransition
+    try {
+      paid = await transitionToPaid(admin, orderReference, { raw: mergedRaw }, () =>
+        activatePaid(admin, { userId, deviceHash, days })
+      )
+    } catch (e: any) {
+      return NextResponse.json({ ok: false, error: "activation_failed", details: String(e?.message || e) }, { status: 500 })
+    }
+
+    if (paid.state === "granted") notifyOrderChanged(orderReference)
+    const settled = paid.state === "granted" || paid.state === "paid"
+    return NextResponse.json({
+      ok: true,
+      orderReference,
+      // busy — доступ продлевает другой запрос, клиент спросит ещё раз
+      status: settled ? "paid" : "processing",
+      ...(paid.state === "paid" ? { protected: true } : {}),
+      transactionStatus: txStatus,
+      activatedPaidUntil: paid.state === "granted" ? paid.paidUntil : null,
+    })
+  }
+
+  // не-paid: оплаченный или захваченный под продление заказ назад не откатываем
+  const tr = await admin
     .from("billing_orders")
     .update({
       status: nextStatus,
@@ -275,24 +287,36 @@ export async function GET(req: NextRequest) {
       updated_at: new Date().toISOString(),
     })
     .eq("order_reference", orderReference)
+    .or(UNSETTLED_FILTER)
+    .select("order_reference")
 
-  let activatedPaidUntil: string | null = null
-  if (nextStatus === "paid") {
-    const userId = String(latest?.user_id || "").trim() || null
-    const deviceHash = String(latest?.device_hash || "").trim() || null
-    const planId = String(latest?.plan_id || "monthly").trim() || "monthly"
-    const days = planDays(planId)
+  if (tr.error) {
+    return NextResponse.json({ ok: false, error: "db_update_failed" }, { status: 500 })
+  }
 
-    try {
-      activatedPaidUntil = await activatePaid(admin, { userId, deviceHash, days })
-    } catch {}
+  const changed = (tr.data?.length ?? 0) > 0
+  if (latest && !changed) {
+    // заказ успел сменить статус (вебхук, другая проверка) — отдаём тот, что в строке
+    const cur = await admin.from("billing_orders").select("status").eq("order_reference", orderReference).maybeSingle()
+    if (cur.error) {
+      return NextResponse.json({ ok: false, error: "db_read_failed" }, { status: 500 })
+    }
+    const status = normalizeDbStatus((cur.data as any)?.status)
+    return NextResponse.json({
+      ok: true,
+      orderReference,
+      status,
+      ...(status === "paid" ? { protected: true } : {}),
+      transactionStatus: txStatus,
+    })
   }
+  if (changed && nextStatus !== "processing") notifyOrderChanged(orderReference)
 
   return NextResponse.json({
     ok: true,
     orderReference,
     status: nextStatus,
     transactionStatus: txStatus,
-    activatedPaidUntil,
+    activatedPaidUntil: null,
   })
 }
@@ -1,7 +1,7 @@
 import { NextRequest, NextResponse } from "next/server"
-import { createClient } from "@supabase/supabase-js"
 import { createHmac, randomUUID } from "crypto"
 import { buildAccessSummary } from "@/lib/server/access-summary"
+import { getSupabaseAdmin } from "@/lib/supabase/clients"
 
 export const runtime = "nodejs"
 export const dynamic = "force-dynamic"
@@ -72,12 +72,6 @@ function pickPriceFromEnv(planId: string): string | null {
   return fallback || null
 }
 
-function sbAdmin() {
-  const url = mustEnv("NEXT_PUBLIC_SUPABASE_URL")
-  const key = mustEnv("SUPABASE_SERVICE_ROLE_KEY")
-  return createClient(url, key, { auth: { persistSession: false, autoRefreshToken: false } })
-}
-
 export async function POST(req: NextRequest) {
   try {
     const body = await req.json().catch(() => ({} as any))
@@ -149,7 +143,7 @@ export async function POST(req: NextRequest) {
     const returnUrl = `${origin}/payment/return?orderReference=${encodeURIComponent(orderReference)}`
     const serviceUrl = `${origin}/api/billing/wayforpay/callback`
 
-    const admin = sbAdmin()
+    const admin = getSupabaseAdmin()
 
     await admin.from("billing_orders").insert({
       order_reference: orderReference,
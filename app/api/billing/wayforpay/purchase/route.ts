@@ -1,6 +1,6 @@
 import { NextResponse } from "next/server"
 import crypto from "crypto"
-import { createClient } from "@supabase/supabase-js"
+import { getSupabaseAdminOrNull } from "@/lib/supabase/clients"
 
 export const dynamic = "force-dynamic"
 export const runtime = "nodejs"
@@ -11,21 +11,6 @@ function hmacMd5HexLower(message: string, secret: string) {
   return crypto.createHmac("md5", secret).update(message, "utf8").digest("hex")
 }
 
-function getSupabaseAdmin() {
-  const url =
-    process.env.NEXT_PUBLIC_SUPABASE_URL ||
-    process.env.SUPABASE_URL ||
-    process.env.SUPABASE_PROJECT_URL
-
-  const key =
-    process.env.SUPABASE_SERVICE_ROLE_KEY ||
-    process.env.SUPABASE_SERVICE_ROLE ||
-    process.env.SUPABASE_SERVICE_KEY
-
-  if (!url || !key) return null
-  return createClient(url, key, { auth: { persistSession: false } })
-}
-
 function getCookie(req: Request, name: string) {
   const raw = req.headers.get("cookie") || ""
   const m = raw.match(new RegExp(`(?:^|; )${name}=([^;]+)`))
@@ -116,7 +101,7 @@ async function handler(req: Request) {
   const deviceHash = existingDeviceHash || crypto.randomUUID()
 
   try {
-    const sb = getSupabaseAdmin()
+    const sb = getSupabaseAdminOrNull()
     if (sb) {
       await Promise.race([
         sb.from("billing_orders").upsert([
@@ -1,39 +1,16 @@
 import { NextResponse } from "next/server"
 import crypto from "crypto"
-import { cookies } from "next/headers"
-import { createServerClient } from "@supabase/ssr"
-import { createClient } from "@supabase/supabase-js"
+import { getSupabaseAdmin, getRequestUser } from "@/lib/supabase/clients"
 
 export const runtime = "nodejs"
 export const dynamic = "force-dynamic"
 
-function getSupabaseAdmin() {
-  const url = process.env.NEXT_PUBLIC_SUPABASE_URL
-  const key =
-    process.env.SUPABASE_SERVICE_ROLE_KEY ||
-    process.env.SUPABASE_SERVICE_ROLE ||
-    process.env.SUPABASE_SERVICE_KEY
-  if (!url || !key) throw new Error("Missing Supabase admin env")
-  return createClient(url, key, { auth: { persistSession: false, autoRefreshToken: false } })
-}
-
 async function getUserIdFromSession() {
   const url = process.env.NEXT_PUBLIC_SUPABASE_URL
   const anon = process.env.NEXT_PUBLIC_SUPABASE_ANON_KEY
   if (!url || !anon) return { userId: null as string | null, error: "Missing Supabase public env" }
 
-  const cookieStore = cookies()
-  const supabase = createServerClient(url, anon, {
-    cookies: {
-      get(name: string) {
-        return cookieStore.get(name)?.value
-      },
-      set() {},
-      remove() {},
-    },
-  })
-
-  const { data, error } = await supabase.auth.getUser()
+  const { data, error } = await getRequestUser()
   if (error || !data?.user?.id) return { userId: null, error: error?.message || "Unauthorized" }
   return { userId: data.user.id, error: null }
 }
@@ -1,16 +1,19 @@
 import { NextRequest, NextResponse } from "next/server"
 import { cookies } from "next/headers"
-import { createServerClient } from "@supabase/ssr"
-import { createClient } from "@supabase/supabase-js"
-import crypto, { randomUUID } from "crypto"
+import { randomUUID } from "crypto"
+import { getSupabaseAdminOrNull, getRequestUser, getPendingAuthCookies } from "@/lib/supabase/clients"
+import { notifyOrderChanged } from "@/lib/billing/order-events"
+import { verifyCheckSignature, wfpCheckStatus } from "@/lib/billing/wayforpay-check"
+import { GRANTING, UNSETTLED_FILTER, transitionToPaid } from "@/lib/billing/paid-transition"
 
 export const runtime = "nodejs"
 export const dynamic = "force-dynamic"
 
-const WFP_URL = "https://api.wayforpay.com/api"
 const DEVICE_COOKIE = "ta_device_hash"
 const LAST_ORDER_COOKIE = "ta_last_order"
 const ACCOUNT_PREFIX = "account:"
+const CHECK_CONCURRENCY = 8
+const MAX_BATCH = 1000
 
 function env(name: string) {
   return String(process.env[name] || "").trim()
@@ -22,10 +25,6 @@ function cookieDomainFromHost(host: string | null) {
   return undefined
 }
 
-function hmacMd5HexLower(str: string, key: string) {
-  return crypto.createHmac("md5", key).update(str, "utf8").digest("hex")
-}
-
 function mapTxStatus(txStatus: string) {
   const s = String(txStatus || "").toLowerCase()
   if (s === "approved" || s === "paid") return "paid"
@@ -54,118 +53,258 @@ function addDays(base: Date, days: number) {
   return d
 }
 
-function makeAdmin() {
-  const url = env("NEXT_PUBLIC_SUPABASE_URL") || env("SUPABASE_URL")
-  const key = env("SUPABASE_SERVICE_ROLE_KEY") || env("SUPABASE_SERVICE_KEY")
-  if (!url || !key) return null
-  return createClient(url, key, { auth: { persistSession: false, autoRefreshToken: false, detectSessionInUrl: false } })
-}
-
 async function getUserIdFromCookies(): Promise<{ userId: string | null; pending: any[] }> {
   const url = env("NEXT_PUBLIC_SUPABASE_URL")
   const anon = env("NEXT_PUBLIC_SUPABASE_ANON_KEY")
-  const pending: any[] = []
+  const pending: any[] = getPendingAuthCookies()
   if (!url || !anon) return { userId: null, pending }
 
-  const jar = cookies()
-  const sb = createServerClient(url, anon, {
-    cookies: {
-      getAll() {
-        return jar.getAll()
-      },
-      setAll(list) {
-        pending.push(...list)
-      },
-    },
-  })
-
   try {
-    const { data } = await sb.auth.getUser()
+    const { data } = await getRequestUser()
     return { userId: data?.user?.id ?? null, pending }
   } catch {
     return { userId: null, pending }
   }
 }
 
-async function wfpCheckStatus(orderReference: string) {
-  const merchantAccount = env("WAYFORPAY_MERCHANT_ACCOUNT")
-  const secret = env("WAYFORPAY_SECRET_KEY") || env("WAYFORPAY_MERCHANT_SECRET_KEY")
-  if (!merchantAccount || !secret) throw new Error("Missing WAYFORPAY_MERCHANT_ACCOUNT / WAYFORPAY_SECRET_KEY")
-
-  const signStr = `${merchantAccount};${orderReference}`
-  const merchantSignature = hmacMd5HexLower(signStr, secret)
-
-  const payload = {
-    transactionType: "CHECK_STATUS",
-    merchantAccount,
-    orderReference,
-    merchantSignature,
-    apiVersion: 1,
-  }
-
-  const r = await fetch(WFP_URL, {
-    method: "POST",
-    headers: { "content-type": "application/json" },
-    body: JSON.stringify(payload),
-    cache: "no-store",
+async function mapLimit<T, R>(items: T[], limit: number, fn: (item: T) => Promise<R>): Promise<R[]> {
+  const out: R[] = new Array(items.length)
+  let next = 0
+  const workers = Array.from({ length: Math.min(limit, items.length) }, async () => {
+    for (;;) {
+      const i = next++
+      if (i >= items.length) return
+      out[i] = await fn(items[i])
+    }
   })
-
-  const j = await r.json().catch(() => ({} as any))
-  return { ok: r.ok, status: r.status, body: j, merchantAccount, secret }
+  await Promise.all(workers)
+  return out
 }
 
-async function extendPaidUntil(admin: any, key: string, days: number, userId: string | null) {
+type GrantExtension = { key: string; days: number; userId: string | null }
+
+/**
+ * Продление paid_until для ключей одного заказа (устройство, cookie устройства, аккаунт):
+ * один select по всем ключам и один bulk upsert. Ключи уже дедуплицированы.
+ */
+async function extendPaidUntilBulk(admin: any, extensions: GrantExtension[]) {
+  const result = new Map<string, string>()
+  if (!extensions.length) return result
+
   const now = new Date()
   const nowIso = now.toISOString()
 
-  // ВАЖНО: берём самую свежую запись по key
   const { data: rows, error } = await admin
     .from("access_grants")
-    .select("id,paid_until,device_hash,created_at,updated_at")
-    .eq("device_hash", key)
+    .select("id,user_id,device_hash,trial_questions_left,paid_until,promo_until,auto_renew,created_at,updated_at")
+    .in(
+      "device_hash",
+      extensions.map((e) => e.key)
+    )
     .order("updated_at", { ascending: false })
     .order("created_at", { ascending: false })
-    .limit(1)
 
   if (error) throw new Error("access_grants select failed: " + error.message)
 
-  const existing = Array.isArray(rows) ? rows[0] : null
-
-  const current = toDateOrNull((existing as any)?.paid_until)
-  const base = current && current.getTime() > now.getTime() ? current : now
-  const nextPaid = addDays(base, days).toISOString()
-
-  if ((existing as any)?.id) {
-    const up = await admin
-      .from("access_grants")
-      .update({
-        paid_until: nextPaid,
-        trial_questions_left: 0,
-        cancelled_at: null,
-        updated_at: nowIso,
-        ...(userId ? { user_id: userId } : {}),
-      } as any)
-      .eq("id", (existing as any).id)
-
-    if (up.error) throw new Error("access_grants update failed: " + up.error.message)
-    return nextPaid
+  // ВАЖНО: берём самую свежую запись по key
+  const latest = new Map<string, any>()
+  for (const r of rows ?? []) {
+    const k = String((r as any).device_hash || "")
+    if (k && !latest.has(k)) latest.set(k, r)
+  }
+
+  const upserts = extensions.map((e) => {
+    const existing = latest.get(e.key)
+    const current = toDateOrNull(existing?.paid_until)
+    const base = current && current.getTime() > now.getTime() ? current : now
+    const nextPaid = addDays(base, e.days).toISOString()
+    result.set(e.key, nextPaid)
+
+    return {
+      id: existing?.id ?? randomUUID(),
+      user_id: e.userId ?? existing?.user_id ?? null,
+      device_hash: e.key,
+      trial_questions_left: 0,
+      paid_until: nextPaid,
+      promo_until: existing?.promo_until ?? null,
+      auto_renew: existing?.auto_renew ?? false,
+      cancelled_at: null,
+      created_at: existing?.created_at ?? nowIso,
+      updated_at: nowIso,
+    }
+  })
+
+  const up = await admin.from("access_grants").upsert(upserts as any, { onConflict: "id" })
+  if (up.error) throw new Error("access_grants upsert failed: " + up.error.message)
+
+  return result
+}
+
+type OrderResult = {
+  orderReference: string
+  planId: string
+  status: string
+  previousStatus: string | null
+  paidUntil: string | null
+  keysUpdated: string[]
+  sigOk: boolean | null
+  error?: string
+}
+
+/**
+ * Сверка пачки заказов: один select заказов, checkStatus в WFP с ограниченной
+ * параллельностью, апдейт не-paid статусов. Оплаченные в WFP заказы идут через transitionToPaid
+ * (claim -> продление -> paid, как вебхук): доступ продлевает только захвативший заказ, упавшее
+ * продление снимает claim, и следующая сверка (или ретрай вебхука) повторит его.
+ * Продления идут по одному заказу за раз — у заказов одной пачки бывают общие ключи.
+ * Уже оплаченные заказы в WFP не проверяем; захваченный другим запросом — "processing".
+ */
+async function reconcileOrders(
+  admin: any,
+  orderReferences: string[],
+  opts: { deviceHash?: string | null; sessionUserId?: string | null } = {}
+): Promise<OrderResult[]> {
+  const refs = Array.from(new Set(orderReferences.map((r) => String(r || "").trim()).filter(Boolean)))
+  if (!refs.length) return []
+
+  const { data: ordRows, error: ordErr } = await admin
+    .from("billing_orders")
+    .select("order_reference,status,plan_id,amount,currency,user_id,device_hash,updated_at,created_at")
+    .in("order_reference", refs)
+    .order("updated_at", { ascending: false })
+
+  if (ordErr) throw new Error("billing_orders read failed: " + ordErr.message)
+
+  const orders = new Map<string, any>()
+  for (const o of ordRows ?? []) {
+    const ref = String((o as any).order_reference || "")
+    if (ref && !orders.has(ref)) orders.set(ref, o)
+  }
+
+  // заказ -> raw ответа WFP для заказов, которые WFP считает оплаченными
+  const toPay = new Map<string, any>()
+
+  const checked = await mapLimit(refs, CHECK_CONCURRENCY, async (orderReference): Promise<OrderResult> => {
+    const ord = orders.get(orderReference)
+    const planId = String(ord?.plan_id || "monthly")
+    const previousStatus = ord?.status ? String(ord.status) : null
+
+    if (previousStatus === "paid") {
+      return { orderReference, planId, status: "paid", previousStatus, paidUntil: null, keysUpdated: [], sigOk: null }
+    }
+
+    try {
+      const w = await wfpCheckStatus(orderReference)
+      if (w.error) throw new Error("Missing WAYFORPAY_MERCHANT_ACCOUNT / WAYFORPAY_SECRET_KEY")
+      const body: any = w.data || {}
+      const normalized = mapTxStatus(w.transactionStatus)
+      const sigOk = verifyCheckSignature(body, orderReference)
+      const raw = { ...body, __event: "wayforpay_check_status", _sigOk: sigOk }
+
+      if (normalized === "paid" && ord) {
+        toPay.set(orderReference, raw)
+        return { orderReference, planId, status: "paid", previousStatus, paidUntil: null, keysUpdated: [], sigOk }
+      }
+
+      const up = await admin
+        .from("billing_orders")
+        .update({ status: normalized, raw, updated_at: new Date().toISOString() } as any)
+        .eq("order_reference", orderReference)
+        .or(UNSETTLED_FILTER)
+        .select("order_reference")
+
+      if (up.error) throw new Error("billing_orders update failed: " + up.error.message)
+      // строки не обновились — заказ параллельно оплатили или как раз продлевают доступ
+      if (ord && !(up.data?.length ?? 0)) {
+        const cur = await admin.from("billing_orders").select("status").eq("order_reference", orderReference).maybeSingle()
+        if (cur.error) throw new Error("billing_orders read failed: " + cur.error.message)
+        const st = String(cur.data?.status || "")
+        const status = st === GRANTING ? "processing" : st || "unknown"
+        return { orderReference, planId, status, previousStatus, paidUntil: null, keysUpdated: [], sigOk }
+      }
+      if (normalized !== "pending") notifyOrderChanged(orderReference)
+
+      return { orderReference, planId, status: normalized, previousStatus, paidUntil: null, keysUpdated: [], sigOk }
+    } catch (e: any) {
+      return {
+        orderReference,
+        planId,
+        status: previousStatus || "unknown",
+        previousStatus,
+        paidUntil: null,
+        keysUpdated: [],
+        sigOk: null,
+        error: String(e?.message || e),
+      }
+    }
+  })
+
+  const paidByUser = new Map<string, string>()
+
+  for (const r of checked) {
+    const raw = toPay.get(r.orderReference)
+    if (!raw) continue
+
+    const ord = orders.get(r.orderReference)
+    const orderDeviceHash = String(ord?.device_hash || "").trim() || null
+    const orderUserId = String(ord?.user_id || "").trim() || null
+    const effectiveUserId = opts.sessionUserId || orderUserId
+    const days = planDays(r.planId)
+
+    // ключи дедуплицируем до записи: cookie устройства может совпасть с устройством заказа
+    const extensions = new Map<string, GrantExtension>()
+    if (orderDeviceHash) extensions.set(orderDeviceHash, { key: orderDeviceHash, days, userId: null })
+    if (opts.deviceHash && !extensions.has(opts.deviceHash)) {
+      extensions.set(opts.deviceHash, { key: opts.deviceHash, days, userId: null })
+    }
+    if (effectiveUserId) {
+      const key = `${ACCOUNT_PREFIX}${effectiveUserId}`
+      extensions.set(key, { key, days, userId: effectiveUserId })
+    }
+
+    try {
+      const tr = await transitionToPaid(admin, r.orderReference, { raw }, async () => {
+        const paidByKey = await extendPaidUntilBulk(admin, Array.from(extensions.values()))
+        let best: string | null = null
+        for (const pu of paidByKey.values()) {
+          const a = toDateOrNull(best)
+          const b = toDateOrNull(pu)
+          if (!best || (a && b && b.getTime() > a.getTime())) best = pu
+        }
+        return best
+      })
+
+      if (tr.state === "granted") {
+        r.paidUntil = tr.paidUntil
+        r.keysUpdated = Array.from(extensions.keys())
+        notifyOrderChanged(r.orderReference)
+        if (effectiveUserId && r.paidUntil) {
+          const prev = toDateOrNull(paidByUser.get(effectiveUserId))
+          const cur = toDateOrNull(r.paidUntil)
+          if (!prev || (cur && cur.getTime() > prev.getTime())) paidByUser.set(effectiveUserId, r.paidUntil)
+        }
+      } else if (tr.state !== "paid") {
+        // busy — доступ продлевает другой запрос; not_found — заказ удалили после чтения
+        r.status = "processing"
+      }
+    } catch (e: any) {
+      // claim снят (или истечёт) — заказ остался неоплаченным, следующая сверка повторит
+      r.status = r.previousStatus || "unknown"
+      r.error = String(e?.message || e)
+    }
   }
 
-  const ins = await admin.from("access_grants").insert({
-    id: randomUUID(),
-    user_id: userId,
-    device_hash: key,
-    trial_questions_left: 0,
-    paid_until: nextPaid,
-    promo_until: null,
-    created_at: nowIso,
-    updated_at: nowIso,
-    cancelled_at: null,
-    auto_renew: false,
-  } as any)
-
-  if (ins.error) throw new Error("access_grants insert failed: " + ins.error.message)
-  return nextPaid
+  // profile best-effort (только по id), по одному апдейту на пользователя
+  await mapLimit(Array.from(paidByUser.entries()), CHECK_CONCURRENCY, async ([uid, paidUntil]) => {
+    try {
+      await admin
+        .from("profiles")
+        .update({ paid_until: paidUntil, subscription_status: "active", updated_at: new Date().toISOString() } as any)
+        .eq("id", uid)
+    } catch {}
+  })
+
+  return checked
 }
 
 export async function GET(req: NextRequest) {
@@ -191,100 +330,24 @@ export async function GET(req: NextRequest) {
   }
 
   const { userId: sessionUserId, pending } = await getUserIdFromCookies()
-  const admin = makeAdmin()
+  const admin = getSupabaseAdminOrNull()
   if (!admin) {
     return NextResponse.json({ ok: false, error: "Missing SUPABASE_SERVICE_ROLE_KEY" }, { status: 500 })
   }
 
-  // read order
-  const { data: ord, error: ordErr } = await admin
-    .from("billing_orders")
-    .select("order_reference,status,plan_id,amount,currency,user_id,device_hash,updated_at,created_at")
-    .eq("order_reference", orderReference)
-    .order("updated_at", { ascending: false })
-    .limit(1)
-    .maybeSingle()
-
-  if (ordErr) {
-    return NextResponse.json({ ok: false, error: "billing_orders read failed", details: ordErr.message }, { status: 500 })
-  }
-
-  const planId = String((ord as any)?.plan_id || "monthly")
-  const orderDeviceHash = String((ord as any)?.device_hash || "").trim() || null
-  const orderUserId = String((ord as any)?.user_id || "").trim() || null
-  const effectiveUserId = sessionUserId || orderUserId
-
-  // check status at WFP
-  const w = await wfpCheckStatus(orderReference)
-  const body: any = w.body || {}
-  const tx = String(body.transactionStatus || body.transaction_status || body.status || "").trim()
-  const normalized = mapTxStatus(tx)
-
-  // optional: verify response signature if all fields exist
-  const respSig = String(body.merchantSignature || body.merchant_signature || "").trim()
-  let sigOk: boolean | null = null
-  if (respSig) {
-    const signString = [
-      w.merchantAccount,
-      String(body.orderReference || orderReference),
-      String(body.amount || ""),
-      String(body.currency || ""),
-      String(body.authCode || ""),
-      String(body.cardPan || ""),
-      String(body.transactionStatus || ""),
-      String(body.reasonCode || ""),
-    ].join(";")
-
-    const our = hmacMd5HexLower(signString, w.secret)
-    sigOk = our.toUpperCase() === respSig.toUpperCase()
+  let result: OrderResult
+  try {
+    const [r] = await reconcileOrders(admin, [orderReference], { deviceHash, sessionUserId })
+    result = r
+  } catch (e: any) {
+    return NextResponse.json({ ok: false, error: String(e?.message || e) }, { status: 500 })
   }
 
-  // update order status + raw
-  const up = await admin
-    .from("billing_orders")
-    .update({
-      status: normalized,
-      raw: { ...body, __event: "wayforpay_check_status", _sigOk: sigOk },
-      updated_at: new Date().toISOString(),
-    } as any)
-    .eq("order_reference", orderReference)
-
-  if (up.error) {
-    return NextResponse.json({ ok: false, error: "billing_orders update failed", details: up.error.message }, { status: 500 })
+  if (result.error) {
+    return NextResponse.json({ ok: false, error: result.error }, { status: 500 })
   }
 
-  let paidUntil: string | null = null
-  let keysUpdated: string[] = []
-
-  if (normalized === "paid") {
-    const days = planDays(planId)
-
-    const keys: Array<{ key: string; userId: string | null }> = []
-    if (orderDeviceHash) keys.push({ key: orderDeviceHash, userId: null })
-    if (deviceHash && deviceHash !== orderDeviceHash) keys.push({ key: deviceHash, userId: null })
-    if (effectiveUserId) keys.push({ key: `${ACCOUNT_PREFIX}${effectiveUserId}`, userId: effectiveUserId })
-
-    for (const k of keys) {
-      const pu = await extendPaidUntil(admin, k.key, days, k.userId)
-      keysUpdated.push(k.key)
-      if (!paidUntil) paidUntil = pu
-      else {
-        const a = toDateOrNull(paidUntil)
-        const b = toDateOrNull(pu)
-        if (a && b && b.getTime() > a.getTime()) paidUntil = pu
-      }
-    }
-
-    // profile best-effort (только по id)
-    if (effectiveUserId && paidUntil) {
-      try {
-        await admin
-          .from("profiles")
-          .update({ paid_until: paidUntil, subscription_status: "active", updated_at: new Date().toISOString() } as any)
-          .eq("id", effectiveUserId)
-      } catch {}
-    }
-  }
+  const { planId, status: normalized, paidUntil, keysUpdated, sigOk } = result
 
   const res = NextResponse.json(
     {
@@ -324,3 +387,53 @@ export async function GET(req: NextRequest) {
   res.headers.set("cache-control", "no-store, max-age=0")
   return res
 }
+
+/**
+ * Пакетная сверка (cron / ручной разбор хвоста заказов).
+ * POST { orderReferences?: string[], limit?: number } с заголовком x-sync-key = BILLING_SYNC_KEY.
+ * Без списка берём незавершённые заказы из billing_orders.
+ */
+export async function POST(req: NextRequest) {
+  const syncKey = env("BILLING_SYNC_KEY")
+  const given = req.headers.get("x-sync-key") || ""
+  if (!syncKey || given !== syncKey) {
+    return NextResponse.json({ ok: false, error: "BAD_KEY" }, { status: 401 })
+  }
+
+  const admin = getSupabaseAdminOrNull()
+  if (!admin) {
+    return NextResponse.json({ ok: false, error: "Missing SUPABASE_SERVICE_ROLE_KEY" }, { status: 500 })
+  }
+
+  const body = await req.json().catch(() => ({} as any))
+  const limit = Math.max(1, Math.min(MAX_BATCH, Number(body?.limit) || MAX_BATCH))
+
+  let refs: string[] = Array.isArray(body?.orderReferences) ? body.orderReferences.map(String).slice(0, limit) : []
+
+  if (!refs.length) {
+    const { data, error } = await admin
+      .from("billing_orders")
+      .select("order_reference")
+      // granting — claim с истёкшей арендой (продление упало и claim не снялся): сверка его подберёт
+      .in("status", ["created", "invoice_created", "pending", "unknown", GRANTING])
+      .order("created_at", { ascending: true })
+      .limit(limit)
+    if (error) {
+      return NextResponse.json({ ok: false, error: "billing_orders read failed", details: error.message }, { status: 500 })
+    }
+    refs = (data ?? []).map((r: any) => String(r.order_reference || "")).filter(Boolean)
+  }
+
+  const startedAt = Date.now()
+  try {
+    const results = await reconcileOrders(admin, refs)
+    const counts: Record<string, number> = {}
+    for (const r of results) counts[r.error ? "error" : r.status] = (counts[r.error ? "error" : r.status] || 0) + 1
+
+    const res = NextResponse.json({ ok: true, total: results.length, counts, ms: Date.now() - startedAt, results })
+    res.headers.set("cache-control", "no-store, max-age=0")
+    return res
+  } catch (e: any) {
+    return NextResponse.json({ ok: false, error: String(e?.message || e) }, { status: 500 })
+  }
+}
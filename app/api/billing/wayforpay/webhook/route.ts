@@ -1,6 +1,8 @@
 import { NextResponse } from "next/server"
-import { createClient } from "@supabase/supabase-js"
 import { createHmac } from "crypto"
+import { getSupabaseAdmin } from "@/lib/supabase/clients"
+import { notifyOrderChanged } from "@/lib/billing/order-events"
+import { UNSETTLED_FILTER, transitionToPaid } from "@/lib/billing/paid-transition"
 
 export const runtime = "nodejs"
 export const dynamic = "force-dynamic"
@@ -45,6 +47,7 @@ async function extendPaidUntil(sb: any, key: string, days: number, userId: strin
   let base = now
 
   const existing = await sb.from("access_grants").select("paid_until").eq("device_hash", key).maybeSingle()
+  if (existing.error) throw new Error("access_grants read failed: " + existing.error.message)
   const cur = toDateOrNull(existing?.data?.paid_until)
   if (cur && cur.getTime() > base.getTime()) base = cur
 
@@ -66,7 +69,8 @@ async function extendPaidUntil(sb: any, key: string, days: number, userId: strin
   }
   if (userId) payload.user_id = userId
 
-  await sb.from("access_grants").upsert(payload, { onConflict: "device_hash" })
+  const up = await sb.from("access_grants").upsert(payload, { onConflict: "device_hash" })
+  if (up.error) throw new Error("access_grants upsert failed: " + up.error.message)
   return paid_until
 }
 
@@ -133,59 +137,74 @@ export async function POST(req: Request) {
       return NextResponse.json({ ok: false, error: "invalid_signature" }, { status: 400 })
     }
 
-    const sb = createClient(mustEnv("NEXT_PUBLIC_SUPABASE_URL"), mustEnv("SUPABASE_SERVICE_ROLE_KEY"), {
-      auth: { persistSession: false, autoRefreshToken: false },
-    })
+    const sb = getSupabaseAdmin()
 
     const ord = await sb
       .from("billing_orders")
       .select("plan_id, device_hash, user_id")
       .eq("order_reference", orderReference)
       .maybeSingle()
+    if (ord.error) throw new Error("billing_orders read failed: " + ord.error.message)
 
     const planId = String((ord.data as any)?.plan_id || "monthly")
     const deviceHash = String((ord.data as any)?.device_hash || "")
     const userId = String((ord.data as any)?.user_id || "").trim() || null
 
     const status = mapTxToStatus(transactionStatus)
+    const orderPatch = {
+      status,
+      raw: { ...body, __event: "wayforpay_webhook" },
+      updated_at: new Date().toISOString(),
+    }
 
-    await sb
-      .from("billing_orders")
-      .update({
-        status,
-        raw: { ...body, __event: "wayforpay_webhook" },
-        updated_at: new Date().toISOString(),
-      } as any)
-      .eq("order_reference", orderReference)
-
+    // WayForPay ретраит пачками: доступ продлевает только тот запрос, который захватил заказ
+    // (lib/billing/paid-transition), повторы уже оплаченного заказа ничего не продлевают.
+    // Сбой на любом шаге — 5xx без accept: WayForPay повторит, и продление не потеряется
     let paidUntil: string | null = null
     if (status === "paid") {
-      const days = planDays(planId)
-
-      if (deviceHash) paidUntil = await extendPaidUntil(sb, deviceHash, days, null)
-
-      if (userId) {
-        const accountKey = `account:${userId}`
-        const pu2 = await extendPaidUntil(sb, accountKey, days, userId)
-
-        const a = toDateOrNull(paidUntil)
-        const b = toDateOrNull(pu2)
-        paidUntil = a && b && b.getTime() > a.getTime() ? pu2 : (paidUntil || pu2)
-
-        try {
-          await sb
-            .from("profiles")
-            .update({
-              paid_until: paidUntil,
-              subscription_status: "active",
-              auto_renew: true,
-              updated_at: new Date().toISOString(),
-            } as any)
-            .eq("id", userId)
-        } catch {}
+      const tr = await transitionToPaid(sb, orderReference, orderPatch, async () => {
+        const days = planDays(planId)
+
+        if (deviceHash) paidUntil = await extendPaidUntil(sb, deviceHash, days, null)
+
+        if (userId) {
+          const accountKey = `account:${userId}`
+          const pu2 = await extendPaidUntil(sb, accountKey, days, userId)
+
+          const a = toDateOrNull(paidUntil)
+          const b = toDateOrNull(pu2)
+          paidUntil = a && b && b.getTime() > a.getTime() ? pu2 : (paidUntil || pu2)
+
+          try {
+            await sb
+              .from("profiles")
+              .update({
+                paid_until: paidUntil,
+                subscription_status: "active",
+                auto_renew: true,
+                updated_at: new Date().toISOString(),
+              } as any)
+              .eq("id", userId)
+          } catch {}
+        }
+        return paidUntil
+      })
+      if (tr.state === "busy") {
+        return NextResponse.json({ ok: false, error: "order_being_granted", orderReference }, { status: 503 })
       }
+      // неизвестный заказ: ретраи WayForPay его не создадут — принимаем и оставляем след в логе
+      if (tr.state === "not_found") console.error("WayForPay webhook: paid order not found:", orderReference)
+    } else {
+      let q = sb.from("billing_orders").update(orderPatch as any).eq("order_reference", orderReference)
+      // запоздалый pending/declined-ретрай не откатывает уже оплаченный (или оплачиваемый) заказ
+      if (status !== "refunded") q = q.or(UNSETTLED_FILTER)
+      const tr = await q
+      if (tr.error) throw new Error("billing_orders update failed: " + tr.error.message)
     }
 
+    // заказ и доступ закоммичены — будим страницу результата (/api/billing/orders/watch)
+    notifyOrderChanged(orderReference)
+
     const respStatus = "accept"
     const time = Math.floor(Date.now() / 1000)
     const respSignString = [orderReference, respStatus, String(time)].join(";")
@@ -1,6 +1,10 @@
 import { type NextRequest, NextResponse } from "next/server"
 import { requireAccess } from "@/lib/access/access-control"
-import { getOrCreateConversationId, appendMessage } from "@/lib/history/history-store"
+import { getOrCreateConversationId, appendMessages } from "@/lib/history/history-store"
+import { upstreamErrorStatus, upstreamFetch } from "@/lib/server/upstream"
+
+// upstreamFetch ходит через node:http пулы
+export const runtime = "nodejs"
 
 const FALLBACK_WEBHOOK_URL = "https://vladkuzmenko.com/webhook/turbotaai-agent"
 
@@ -89,14 +93,13 @@ export async function POST(request: NextRequest) {
       channel: "web",
     }
 
-    const response = await fetch(WEBHOOK_URL, {
+    const response = await upstreamFetch("agent", WEBHOOK_URL, {
       method: "POST",
       headers: {
         "Content-Type": "application/json",
         Accept: "application/json",
       },
       body: JSON.stringify(payload),
-      cache: "no-store",
     })
 
     const rawText = await response.text()
@@ -129,10 +132,14 @@ export async function POST(request: NextRequest) {
       })
 
       if (convId) {
-        await appendMessage({ conversationId: convId, role: "user", text: userMessage.trim() })
-
         const answer = extractAnswer(data) || rawText
-        await appendMessage({ conversationId: convId, role: "assistant", text: String(answer || "").trim() })
+        await appendMessages({
+          conversationId: convId,
+          messages: [
+            { role: "user", text: userMessage.trim() },
+            { role: "assistant", text: String(answer || "").trim() },
+          ],
+        })
       }
     } catch (e) {
       console.warn("History save failed:", e)
@@ -145,7 +152,7 @@ export async function POST(request: NextRequest) {
         error: "Failed to process request",
         details: error instanceof Error ? error.message : String(error),
       },
-      { status: 500 },
+      { status: upstreamErrorStatus(error) ?? 500 },
     )
   }
 }
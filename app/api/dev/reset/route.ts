@@ -1,5 +1,5 @@
 import { NextRequest, NextResponse } from "next/server"
-import { createClient } from "@supabase/supabase-js"
+import { getSupabaseAdmin } from "@/lib/supabase/clients"
 
 export const runtime = "nodejs"
 export const dynamic = "force-dynamic"
@@ -66,7 +66,7 @@ export async function POST(req: NextRequest) {
 
   const scope = (req.nextUrl.searchParams.get("scope") || "grants").toLowerCase()
 
-  const sb = createClient(url, serviceKey, { auth: { persistSession: false } })
+  const sb = getSupabaseAdmin()
 
   try {
     const tables =
@@ -0,0 +1,21 @@
+import { NextResponse } from "next/server"
+import { getUpstreamStats } from "@/lib/server/upstream"
+import { getWfpCheckStats } from "@/lib/billing/wayforpay-check"
+
+export const runtime = "nodejs"
+export const dynamic = "force-dynamic"
+
+/**
+ * GET /api/dev/upstreams — счётчики пулов lib/server/upstream.ts этого процесса
+ * (запросы, переиспользованные сокеты, повторы, отказы по очереди, таймауты)
+ * и кэша CHECK_STATUS WayForPay (lib/billing/wayforpay-check.ts).
+ */
+export async function GET() {
+  if (process.env.NODE_ENV === "production") {
+    return NextResponse.json({ ok: false, error: "FORBIDDEN_IN_PROD" }, { status: 403 })
+  }
+  return NextResponse.json(
+    { ok: true, upstreams: getUpstreamStats(), wfpCheck: getWfpCheckStats() },
+    { headers: { "cache-control": "no-store" } }
+  )
+}
@@ -1,6 +1,10 @@
 import { NextResponse } from "next/server";
 import { cookies } from "next/headers";
-import { createServerClient } from "@supabase/ssr";
+import { getRequestSupabase, getRequestUser, getPendingAuthCookies } from "@/lib/supabase/clients";
+import { afterCursorFilter, decodeCursor, isTimestamp, pageLimit, splitPage } from "@/lib/history/keyset";
+
+const PAGE_SIZE = 100;
+const MAX_PAGE_SIZE = 500;
 
 function routeSupabase() {
   const url = process.env.NEXT_PUBLIC_SUPABASE_URL;
@@ -11,18 +15,9 @@ function routeSupabase() {
   }
 
   const cookieStore = cookies();
-  const pendingCookies: any[] = [];
+  const pendingCookies: any[] = getPendingAuthCookies();
 
-  const sb = createServerClient(url, anon, {
-    cookies: {
-      getAll() {
-        return cookieStore.getAll();
-      },
-      setAll(cookiesToSet) {
-        pendingCookies.push(...cookiesToSet);
-      },
-    },
-  });
+  const sb = getRequestSupabase()!;
 
   const getOrCreateDeviceHash = () => {
     const existing = cookieStore.get("ta_device_hash")?.value ?? null;
@@ -52,17 +47,35 @@ function routeSupabase() {
   return { sb, json, getOrCreateDeviceHash };
 }
 
-export async function GET(_: Request, ctx: any) {
+/**
+ * GET /api/history/[id] — беседа и её сообщения по страницам (created_at asc, id asc).
+ *   ?limit=100      размер страницы (до 500)
+ *   ?after=...      следующая страница (nextCursor) или дочитка новых (lastCursor)
+ *   ?since=<updated_at беседы>  дельта: если беседа с тех пор не менялась — messages: [] и
+ *                   unchanged: true без запроса сообщений; иначе — сообщения после ?after
+ */
+export async function GET(req: Request, ctx: any) {
   const { sb, json, getOrCreateDeviceHash } = routeSupabase();
   const id = String(ctx?.params?.id ?? "").trim();
   if (!id) return json({ ok: false, error: "Missing id" }, 400);
 
+  const sp = new URL(req.url).searchParams;
+  const limit = pageLimit(sp.get("limit"), PAGE_SIZE, MAX_PAGE_SIZE);
+  const after = decodeCursor(sp.get("after"));
+  const since = sp.get("since");
+  if (sp.get("after") && !after) return json({ ok: false, error: "Bad cursor" }, 400);
+  if (since && !isTimestamp(since)) return json({ ok: false, error: "Bad since" }, 400);
+
   const deviceHash = getOrCreateDeviceHash();
 
-  const { data: userData } = await sb.auth.getUser();
+  const { data: userData } = await getRequestUser();
   const user = userData?.user ?? null;
 
-  const { data: conv } = await sb.from("conversations").select("*").eq("id", id).maybeSingle();
+  const { data: conv } = await sb
+    .from("conversations")
+    .select("id,title,mode,user_id,device_hash,created_at,updated_at")
+    .eq("id", id)
+    .maybeSingle();
   if (!conv) return json({ ok: false, error: "Not found" }, 404);
 
   const allowed =
@@ -72,22 +85,56 @@ export async function GET(_: Request, ctx: any) {
 
   if (!allowed) return json({ ok: false, error: "Forbidden" }, 403);
 
+  // владельца (user_id / device_hash) клиенту не отдаём
+  const conversation = {
+    id: conv.id,
+    title: conv.title,
+    mode: conv.mode,
+    created_at: conv.created_at,
+    updated_at: conv.updated_at,
+  };
+
+  if (since && conv.updated_at && Date.parse(conv.updated_at) <= Date.parse(since)) {
+    return json({
+      ok: true,
+      conversation,
+      messages: [],
+      nextCursor: null,
+      lastCursor: sp.get("after"),
+      unchanged: true,
+    });
+  }
+
   // ВАЖНО: в твоей БД колонка называется text, НЕ content
-  const { data: msgs, error } = await sb
+  let q = sb
     .from("messages")
     .select("id,role,text,created_at")
     .eq("conversation_id", id)
-    .order("created_at", { ascending: true });
+    .order("created_at", { ascending: true })
+    .order("id", { ascending: true })
+    .limit(limit + 1);
+  if (after) q = q.or(afterCursorFilter("created_at", after, "asc"));
+
+  const { data: msgs, error } = await q;
 
   if (error) return json({ ok: false, error: error.message }, 400);
 
+  const { page, nextCursor, lastCursor } = splitPage((msgs ?? []) as any[], limit, "created_at");
+
   // фронт ожидает content -> отдаем совместимо
-  const mapped = (msgs ?? []).map((m: any) => ({
+  const mapped = page.map((m: any) => ({
     id: m.id,
     role: m.role,
     content: m.text,
     created_at: m.created_at,
   }));
 
-  return json({ ok: true, conversation: conv, messages: mapped });
+  return json({
+    ok: true,
+    conversation,
+    messages: mapped,
+    nextCursor,
+    // пустая дочитка — курсор остаётся прежним
+    lastCursor: lastCursor ?? sp.get("after"),
+  });
 }
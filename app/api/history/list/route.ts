@@ -1,56 +1,61 @@
-import { NextResponse } from "next/server"
+import { NextRequest, NextResponse } from "next/server"
 import { cookies } from "next/headers"
-import { createServerClient } from "@supabase/ssr"
-import { supabaseAdmin } from "@/lib/supabase/admin"
+import { getSupabaseAdmin, getRequestUser, getPendingAuthCookies } from "@/lib/supabase/clients"
+import { afterCursorFilter, decodeCursor, isTimestamp, pageLimit, splitPage } from "@/lib/history/keyset"
 
 const DEVICE_COOKIE = "device_hash"
-
-export async function GET() {
+const PAGE_SIZE = 50
+const MAX_PAGE_SIZE = 200
+
+/**
+ * GET /api/history/list — беседы, новые сверху (updated_at desc, id desc).
+ *   ?limit=50          размер страницы (до 200)
+ *   ?cursor=...        следующая страница (nextCursor из прошлого ответа)
+ *   ?since=<updated_at> только беседы, изменённые после этого момента (дельта для клиента,
+ *                      у которого список уже есть; since = максимальный updated_at из него)
+ */
+export async function GET(req: NextRequest) {
   const cookieStore = cookies()
-  const res = new NextResponse(null, { status: 200 })
+  const sp = req.nextUrl.searchParams
 
   const deviceHash = cookieStore.get(DEVICE_COOKIE)?.value || null
+  const limit = pageLimit(sp.get("limit"), PAGE_SIZE, MAX_PAGE_SIZE)
+  const cursor = decodeCursor(sp.get("cursor"))
+  const since = sp.get("since")
+
+  const reply = (body: any, status = 200) => {
+    const out = NextResponse.json(body, { status })
+    for (const c of getPendingAuthCookies()) out.cookies.set(c.name, c.value, c.options)
+    return out
+  }
 
-  const supabase = createServerClient(
-    process.env.NEXT_PUBLIC_SUPABASE_URL!,
-    process.env.NEXT_PUBLIC_SUPABASE_ANON_KEY!,
-    {
-      cookies: {
-        get(name: string) {
-          return cookieStore.get(name)?.value
-        },
-        set(name: string, value: string, options: any) {
-          res.cookies.set({ name, value, ...options })
-        },
-        remove(name: string, options: any) {
-          res.cookies.set({ name, value: "", ...options, maxAge: 0 })
-        },
-      },
-    }
-  )
-
-  const { data: userData } = await supabase.auth.getUser()
+  if (sp.get("cursor") && !cursor) return reply({ conversations: [], error: "Bad cursor" }, 400)
+  if (since && !isTimestamp(since)) return reply({ conversations: [], error: "Bad since" }, 400)
+
+  const { data: userData } = await getRequestUser()
   const user = userData?.user ?? null
 
-  let q = supabaseAdmin
+  let q = getSupabaseAdmin()
     .from("conversations")
     .select("id,title,mode,created_at,updated_at")
     .order("updated_at", { ascending: false })
-    .limit(50)
+    .order("id", { ascending: false })
+    .limit(limit + 1)
 
   if (user?.id) {
     q = q.eq("user_id", user.id)
   } else if (deviceHash) {
     q = q.eq("device_hash", deviceHash).is("user_id", null)
   } else {
-    const out = NextResponse.json({ conversations: [] })
-    for (const c of res.cookies.getAll()) out.cookies.set(c)
-    return out
+    return reply({ conversations: [], nextCursor: null })
   }
 
-  const { data } = await q
+  if (since) q = q.gt("updated_at", since)
+  if (cursor) q = q.or(afterCursorFilter("updated_at", cursor, "desc"))
+
+  const { data, error } = await q
+  if (error) return reply({ conversations: [], error: error.message }, 500)
 
-  const out = NextResponse.json({ conversations: data ?? [] })
-  for (const c of res.cookies.getAll()) out.cookies.set(c)
-  return out
+  const { page, nextCursor } = splitPage((data ?? []) as any[], limit, "updated_at")
+  return reply({ conversations: page, nextCursor })
 }
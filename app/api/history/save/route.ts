@@ -1,6 +1,7 @@
 import { NextResponse } from "next/server";
 import { cookies } from "next/headers";
-import { createServerClient } from "@supabase/ssr";
+import { getRequestSupabase, getRequestUser, getPendingAuthCookies } from "@/lib/supabase/clients";
+import { MAX_SAVE_BATCH } from "@/lib/history/save-limits";
 
 type IncomingMsg = {
   role?: string;
@@ -18,18 +19,9 @@ function routeSupabase() {
   }
 
   const cookieStore = cookies();
-  const pendingCookies: any[] = [];
+  const pendingCookies: any[] = getPendingAuthCookies();
 
-  const sb = createServerClient(url, anon, {
-    cookies: {
-      getAll() {
-        return cookieStore.getAll();
-      },
-      setAll(cookiesToSet) {
-        pendingCookies.push(...cookiesToSet);
-      },
-    },
-  });
+  const sb = getRequestSupabase()!;
 
   const getOrCreateDeviceHash = () => {
     const existing = cookieStore.get("ta_device_hash")?.value ?? null;
@@ -112,101 +104,160 @@ function buildTitle(messages: IncomingMsg[]) {
   return raw.length > 64 ? raw.slice(0, 64) + "…" : raw;
 }
 
+type SaveEntry = {
+  convId: string;
+  mode: string;
+  title: string | null;
+  incoming: IncomingMsg[];
+};
+
+function readConversationId(body: any) {
+  const raw = body?.conversationId ?? body?.conversation_id ?? body?.id ?? body?.conversation?.id ?? null;
+  return raw ? String(raw).trim() : null;
+}
+
+// одиночное сохранение { conversationId, messages } или пачка { batch: [{ conversationId, messages }, ...] }
+function normalizeEntries(body: any): { entries: SaveEntry[]; isBatch: boolean } {
+  const isBatch = Array.isArray(body?.batch);
+  const items: any[] = isBatch ? body.batch : [body];
+  const byId = new Map<string, SaveEntry>();
+
+  for (const item of items) {
+    const convId = readConversationId(item) || crypto.randomUUID();
+    const mode = String(item?.mode ?? body?.mode ?? "chat").trim() || "chat";
+    const title = typeof item?.title === "string" ? item.title.trim() || null : null;
+    const incoming = normalizeMessages(item);
+
+    const prev = byId.get(convId);
+    if (prev) {
+      prev.incoming.push(...incoming);
+      prev.title = prev.title || title;
+    } else {
+      byId.set(convId, { convId, mode, title, incoming });
+    }
+  }
+
+  return { entries: Array.from(byId.values()), isBatch };
+}
+
 export async function POST(req: Request) {
   const { sb, json, getOrCreateDeviceHash } = routeSupabase();
 
   const body = await req.json().catch(() => ({} as any));
-  const mode = String(body?.mode ?? "chat").trim() || "chat";
-
-  const incoming = normalizeMessages(body);
+  // очередь (lib/history/save-queue) сама режет пачки по MAX_SAVE_BATCH — молча обрезать не будем
+  if (Array.isArray(body?.batch) && body.batch.length > MAX_SAVE_BATCH) {
+    return json({ ok: false, error: "Batch too large", max: MAX_SAVE_BATCH }, 413);
+  }
+  const { entries, isBatch } = normalizeEntries(body);
 
-  const requestedIdRaw =
-    body?.conversationId ?? body?.conversation_id ?? body?.id ?? body?.conversation?.id ?? null;
-  const requestedId = requestedIdRaw ? String(requestedIdRaw).trim() : null;
+  if (!entries.length) {
+    return json({ ok: true, conversations: [] });
+  }
 
   const now = new Date().toISOString();
   const deviceHash = getOrCreateDeviceHash();
 
-  const { data: userData } = await sb.auth.getUser();
+  const { data: userData } = await getRequestUser();
   const user = userData?.user ?? null;
 
   const principalUserId = user?.id ?? null;
   const principalDeviceHash = principalUserId ? null : deviceHash;
 
-  let convId = requestedId || crypto.randomUUID();
-
-  // проверяем доступ к беседе если она уже есть
-  const { data: existingConv } = await sb
+  // одним запросом проверяем доступ ко всем беседам, которые уже есть
+  const { data: existingRows } = await sb
     .from("conversations")
-    .select("id,user_id,device_hash,title")
-    .eq("id", convId)
-    .maybeSingle();
-
-  if (existingConv) {
-    const allowed =
-      (principalUserId && existingConv.user_id === principalUserId) ||
-      (!principalUserId &&
-        existingConv.user_id == null &&
-        existingConv.device_hash &&
-        existingConv.device_hash === deviceHash) ||
-      (principalUserId &&
-        existingConv.user_id == null &&
-        existingConv.device_hash &&
-        existingConv.device_hash === deviceHash);
-
-    if (!allowed) {
-      return json({ ok: false, error: "Forbidden" }, 403);
+    .select("id,user_id,device_hash,title,created_at")
+    .in(
+      "id",
+      entries.map((e) => e.convId)
+    );
+
+  const existingById = new Map<string, any>();
+  for (const row of existingRows ?? []) existingById.set(String(row.id), row);
+
+  const allowedEntries: SaveEntry[] = [];
+  const forbidden: string[] = [];
+
+  for (const entry of entries) {
+    const existingConv = existingById.get(entry.convId);
+    if (existingConv) {
+      const allowed =
+        (principalUserId && existingConv.user_id === principalUserId) ||
+        (!principalUserId &&
+          existingConv.user_id == null &&
+          existingConv.device_hash &&
+          existingConv.device_hash === deviceHash) ||
+        (principalUserId &&
+          existingConv.user_id == null &&
+          existingConv.device_hash &&
+          existingConv.device_hash === deviceHash);
+
+      if (!allowed) {
+        forbidden.push(entry.convId);
+        continue;
+      }
     }
+    allowedEntries.push(entry);
   }
 
-  // title ставим только если его еще нет
-  const titleAuto = buildTitle(incoming);
-  const titleFromBody = typeof body?.title === "string" ? body.title.trim() : null;
-  const titleToSet = titleFromBody || (existingConv?.title ? null : titleAuto) || null;
-
-  const convRow: any = {
-    id: convId,
-    user_id: principalUserId,
-    device_hash: principalDeviceHash,
-    mode,
-    title: titleToSet,
-    created_at: existingConv ? undefined : now,
-    updated_at: now,
-  };
+  if (!allowedEntries.length) {
+    return json({ ok: false, error: "Forbidden" }, 403);
+  }
 
-  Object.keys(convRow).forEach((k) => convRow[k] === undefined && delete convRow[k]);
-  if (!convRow.title) delete convRow.title;
+  // все строки с одинаковым набором колонок — иначе bulk upsert затрёт отсутствующие поля
+  const convRows = allowedEntries.map((entry) => {
+    const existingConv = existingById.get(entry.convId);
+
+    // title ставим только если его еще нет
+    const titleAuto = buildTitle(entry.incoming);
+    const title = entry.title || existingConv?.title || titleAuto || null;
+
+    return {
+      id: entry.convId,
+      user_id: principalUserId,
+      device_hash: principalDeviceHash,
+      mode: entry.mode,
+      title,
+      created_at: existingConv?.created_at ?? now,
+      updated_at: now,
+    };
+  });
 
-  const { error: convErr } = await sb.from("conversations").upsert(convRow, { onConflict: "id" });
+  const { error: convErr } = await sb.from("conversations").upsert(convRows, { onConflict: "id" });
   if (convErr) return json({ ok: false, error: convErr.message }, 400);
 
-  if (!incoming.length) {
-    return json({ ok: true, id: convId, conversationId: convId });
+  // ВАЖНО: НЕ удаляем старые сообщения, а ДОБАВЛЯЕМ новые (иначе история исчезает)
+  const rows = allowedEntries.flatMap((entry) =>
+    entry.incoming
+      .map((m) => {
+        const role = String(m?.role ?? "").trim() || "assistant";
+        const text = cleanText(m?.content ?? m?.text ?? "");
+        if (!text) return null;
+
+        return {
+          conversation_id: entry.convId,
+          user_id: principalUserId,
+          role,
+          text,
+          created_at: m?.created_at ? String(m.created_at) : now,
+        };
+      })
+      .filter(Boolean)
+  ) as any[];
+
+  if (rows.length) {
+    const { error: msgErr } = await sb.from("messages").insert(rows);
+    if (msgErr) return json({ ok: false, error: msgErr.message }, 400);
   }
 
-  // ВАЖНО: НЕ удаляем старые сообщения, а ДОБАВЛЯЕМ новые (иначе история исчезает)
-  const rows = incoming
-    .map((m) => {
-      const role = String(m?.role ?? "").trim() || "assistant";
-      const text = cleanText(m?.content ?? m?.text ?? "");
-      if (!text) return null;
-
-      return {
-        conversation_id: convId,
-        user_id: principalUserId,
-        role,
-        text,
-        created_at: m?.created_at ? String(m.created_at) : now,
-      };
-    })
-    .filter(Boolean) as any[];
-
-  if (!rows.length) {
+  if (!isBatch) {
+    const convId = allowedEntries[0].convId;
     return json({ ok: true, id: convId, conversationId: convId });
   }
 
-  const { error: msgErr } = await sb.from("messages").insert(rows);
-  if (msgErr) return json({ ok: false, error: msgErr.message }, 400);
-
-  return json({ ok: true, id: convId, conversationId: convId });
+  return json({
+    ok: true,
+    conversations: allowedEntries.map((e) => e.convId),
+    forbidden,
+  });
 }
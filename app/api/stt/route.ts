@@ -1,4 +1,6 @@
 import { NextResponse } from "next/server"
+import { appendSttChunk, dropSttSession, isValidSttSessionId, takeSttSession } from "@/lib/server/stt-sessions"
+import { upstreamErrorStatus, upstreamFetch } from "@/lib/server/upstream"
 
 export const dynamic = "force-dynamic"
 export const runtime = "nodejs"
@@ -7,6 +9,7 @@ type Lang3 = "uk" | "ru" | "en"
 
 const OPENAI_API_KEY = process.env.OPENAI_API_KEY
 const OPENAI_STT_MODEL = process.env.OPENAI_STT_MODEL || "whisper-1"
+const OPENAI_BASE_URL = (process.env.OPENAI_BASE_URL || "https://api.openai.com/v1").replace(/\/+$/, "")
 
 function asLang3(v: string | null | undefined): Lang3 {
   const s = (v || "").toLowerCase().trim()
@@ -120,7 +123,7 @@ async function whisperTranscribe(args: { bytes: Uint8Array; mime: string; lang:
   form.append("temperature", "0")
   form.append("prompt", "Transcribe speech verbatim. If there is no clear speech, return an empty transcription.")
 
-  const resp = await fetch("https://api.openai.com/v1/audio/transcriptions", {
+  const resp = await upstreamFetch("openai", `${OPENAI_BASE_URL}/audio/transcriptions`, {
     method: "POST",
     headers: { Authorization: `Bearer ${OPENAI_API_KEY}` },
     body: form,
@@ -141,6 +144,73 @@ async function whisperTranscribe(args: { bytes: Uint8Array; mime: string; lang:
   return json as any
 }
 
+async function transcribeResponse(bytes: Uint8Array, mime: string, lang: Lang3) {
+  if (!bytes || bytes.byteLength < 900) {
+    return NextResponse.json({
+      success: true,
+      text: "",
+      lang,
+      debug: { dropped: "too_small", bytes: bytes?.byteLength || 0 },
+    })
+  }
+
+  const result = await whisperTranscribe({ bytes, mime, lang })
+
+  // no-speech / confidence фильтр по verbose_json сегментам
+  if (confidenceLooksLikeNoSpeech(result)) {
+    return NextResponse.json({
+      success: true,
+      text: "",
+      lang,
+      debug: { dropped: true, reason: "no_speech_prob" },
+    })
+  }
+
+  const text = (result?.text || "").toString().trim()
+
+  if (!text || shouldDropAsGarbage(text)) {
+    return NextResponse.json({
+      success: true,
+      text: "",
+      lang,
+      debug: { dropped: true, reason: "garbage_or_empty" },
+    })
+  }
+
+  return NextResponse.json({ success: true, text, lang })
+}
+
+/**
+ * Инкрементальный режим: X-STT-Session + X-STT-Seq на каждом куске,
+ * X-STT-Final: 1 на последнем — тогда склеиваем и транскрибируем.
+ */
+async function handleChunk(request: Request, sessionId: string, lang: Lang3) {
+  const seq = Number(request.headers.get("x-stt-seq"))
+  if (!Number.isInteger(seq) || seq < 0 || seq > 10000) {
+    return NextResponse.json({ success: false, error: "Invalid X-STT-Seq" }, { status: 400 })
+  }
+
+  const mime = baseMime(request.headers.get("content-type") || "") || "audio/webm"
+  const chunk = new Uint8Array(await request.arrayBuffer())
+
+  if (chunk.byteLength > 0 && !appendSttChunk(sessionId, seq, chunk, mime)) {
+    return NextResponse.json({ success: false, error: "Session too large" }, { status: 413 })
+  }
+
+  if (request.headers.get("x-stt-final") !== "1") {
+    return NextResponse.json({ success: true, received: seq })
+  }
+
+  const assembled = takeSttSession(sessionId, seq)
+  if (!assembled) {
+    dropSttSession(sessionId)
+    // клиент повторит запрос целым блобом
+    return NextResponse.json({ success: false, error: "incomplete_session" }, { status: 409 })
+  }
+
+  return await transcribeResponse(assembled.bytes, assembled.mime, lang)
+}
+
 export async function POST(request: Request) {
   try {
     if (!OPENAI_API_KEY) {
@@ -154,6 +224,11 @@ export async function POST(request: Request) {
         "uk",
     )
 
+    const sessionId = request.headers.get("x-stt-session")
+    if (isValidSttSessionId(sessionId)) {
+      return await handleChunk(request, sessionId, lang)
+    }
+
     const contentType = request.headers.get("content-type") || ""
     const isMultipart = contentType.toLowerCase().includes("multipart/form-data")
 
@@ -177,41 +252,9 @@ export async function POST(request: Request) {
       mime = baseMime(contentType) || "audio/webm"
     }
 
-    if (!bytes || bytes.byteLength < 900) {
-      return NextResponse.json({
-        success: true,
-        text: "",
-        lang,
-        debug: { dropped: "too_small", bytes: bytes?.byteLength || 0 },
-      })
-    }
-
-    const result = await whisperTranscribe({ bytes, mime, lang })
-
-    // no-speech / confidence фильтр по verbose_json сегментам
-    if (confidenceLooksLikeNoSpeech(result)) {
-      return NextResponse.json({
-        success: true,
-        text: "",
-        lang,
-        debug: { dropped: true, reason: "no_speech_prob" },
-      })
-    }
-
-    const text = (result?.text || "").toString().trim()
-
-    if (!text || shouldDropAsGarbage(text)) {
-      return NextResponse.json({
-        success: true,
-        text: "",
-        lang,
-        debug: { dropped: true, reason: "garbage_or_empty" },
-      })
-    }
-
-    return NextResponse.json({ success: true, text, lang })
+    return await transcribeResponse(bytes, mime, lang)
   } catch (err: any) {
     const message = (err && (err.message || String(err))) || "Unknown error in /api/stt"
-    return NextResponse.json({ success: false, error: message }, { status: 500 })
+    return NextResponse.json({ success: false, error: message }, { status: upstreamErrorStatus(err) ?? 500 })
   }
 }
@@ -6,6 +6,7 @@ import {
   normalizeGender,
   selectOpenAIVoice,
 } from "@/lib/google-tts"
+import { getCachedTts, putCachedTts, ttsCacheKey } from "@/lib/server/tts-cache"
 
 export const runtime = "nodejs"
 
@@ -13,6 +14,42 @@ const openai = new OpenAI({
   apiKey: process.env.OPENAI_API_KEY,
 })
 
+type TtsFormat = "wav" | "mp3" | "opus" | "aac"
+
+const CONTENT_TYPES: Record<TtsFormat, string> = {
+  wav: "audio/wav",
+  mp3: "audio/mpeg",
+  opus: "audio/ogg",
+  aac: "audio/aac",
+}
+
+function normalizeFormat(raw: unknown, fallback: TtsFormat): TtsFormat {
+  const f = String(raw || "").toLowerCase().trim()
+  return f in CONTENT_TYPES ? (f as TtsFormat) : fallback
+}
+
+/**
+ * Бинарный режим: тело — само аудио, метаданные — в заголовках.
+ * Включается через { binary: true } в теле или Accept: audio/*.
+ * Старый JSON-ответ с base64 остаётся по умолчанию для совместимости.
+ */
+function wantsBinary(req: NextRequest, body: any) {
+  if (body?.binary === true) return true
+  const accept = req.headers.get("accept") || ""
+  return /\baudio\//i.test(accept)
+}
+
+function audioHeaders(meta: { contentType: string; language: string; gender: string; voice: string; cache: string }) {
+  return {
+    "Content-Type": meta.contentType,
+    "Cache-Control": "no-store",
+    "X-TTS-Language": meta.language,
+    "X-TTS-Gender": meta.gender,
+    "X-TTS-Voice": meta.voice,
+    "X-TTS-Cache": meta.cache,
+  }
+}
+
 export async function POST(req: NextRequest) {
   try {
     const body = await req.json()
@@ -28,19 +65,75 @@ export async function POST(req: NextRequest) {
       return NextResponse.json({ success: false, error: "Server TTS is not configured" }, { status: 500 })
     }
 
+    const binary = wantsBinary(req, body)
+    const format = normalizeFormat(body.format, binary ? "mp3" : "wav")
     const langCode = normalizeLanguage(body.language)
     const gender = normalizeGender(body.gender)
     const voice = selectOpenAIVoice(langCode, gender)
 
-    const response = await openai.audio.speech.create({
-      model: OPENAI_TTS_MODEL,
-      voice,
-      input: text,
-      response_format: "wav",
-    })
+    const cacheKey = ttsCacheKey({ text, language: langCode, gender, voice, format })
+    let cached = await getCachedTts(cacheKey)
+
+    if (binary && cached) {
+      return new Response(new Uint8Array(cached.audio), {
+        status: 200,
+        headers: {
+          ...audioHeaders({ contentType: cached.contentType, language: langCode, gender, voice, cache: "HIT" }),
+          "Content-Length": String(cached.audio.byteLength),
+        },
+      })
+    }
+
+    if (!cached) {
+      const response = await openai.audio.speech.create({
+        model: OPENAI_TTS_MODEL,
+        voice,
+        input: text,
+        response_format: format,
+      })
+
+      const contentType = CONTENT_TYPES[format]
+
+      // бинарный промах: отдаём аудио потоком сразу, параллельно собираем копию для кэша
+      if (binary && response.body) {
+        const [toClient, toCache] = response.body.tee()
+
+        void (async () => {
+          const parts: Uint8Array[] = []
+          const reader = toCache.getReader()
+          try {
+            for (;;) {
+              const { done, value } = await reader.read()
+              if (done) break
+              if (value) parts.push(value)
+            }
+            await putCachedTts(cacheKey, { audio: Buffer.concat(parts), contentType })
+          } catch {
+            // клиент ушёл или апстрим оборвался — просто не кэшируем
+          }
+        })()
+
+        return new Response(toClient, {
+          status: 200,
+          headers: audioHeaders({ contentType, language: langCode, gender, voice, cache: "MISS" }),
+        })
+      }
+
+      cached = { audio: Buffer.from(await response.arrayBuffer()), contentType }
+      await putCachedTts(cacheKey, cached)
+    }
+
+    if (binary) {
+      return new Response(new Uint8Array(cached.audio), {
+        status: 200,
+        headers: {
+          ...audioHeaders({ contentType: cached.contentType, language: langCode, gender, voice, cache: "MISS" }),
+          "Content-Length": String(cached.audio.byteLength),
+        },
+      })
+    }
 
-    const buffer = Buffer.from(await response.arrayBuffer())
-    const audioContent = buffer.toString("base64")
+    const audioContent = cached.audio.toString("base64")
 
     return NextResponse.json({
       success: true,
@@ -48,7 +141,7 @@ export async function POST(req: NextRequest) {
       language: langCode,
       gender,
       voice,
-      contentType: "audio/wav",
+      contentType: cached.contentType,
     })
   } catch {
     return NextResponse.json({ success: false, error: "TTS generation failed" }, { status: 500 })
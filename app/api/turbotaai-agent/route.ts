@@ -1,5 +1,7 @@
 import { type NextRequest, NextResponse } from "next/server"
 import { requireAccess } from "@/lib/access/access-control"
+import { AGENT_STREAM_CONTENT_TYPE, sentenceStream } from "@/lib/agent-stream"
+import { upstreamErrorStatus, upstreamFetch } from "@/lib/server/upstream"
 
 export const dynamic = "force-dynamic"
 export const runtime = "nodejs"
@@ -60,13 +62,30 @@ export async function POST(request: NextRequest) {
       user: userEmail,
     }
 
-    const r = await fetch(WEBHOOK_URL, {
+    // stream: true — ответ по предложениям (lib/agent-stream.ts), доступ уже проверен выше
+    const wantStream = body?.stream === true
+
+    const r = await upstreamFetch("agent", WEBHOOK_URL, {
       method: "POST",
-      headers: { "content-type": "application/json", accept: "application/json" },
+      headers: {
+        "content-type": "application/json",
+        accept: wantStream ? "application/x-ndjson, text/event-stream, application/json" : "application/json",
+      },
       body: JSON.stringify(payload),
-      cache: "no-store",
     })
 
+    if (wantStream && r.ok) {
+      return new Response(sentenceStream(r), {
+        status: 200,
+        headers: {
+          "content-type": `${AGENT_STREAM_CONTENT_TYPE}; charset=utf-8`,
+          "cache-control": "no-store",
+          // nginx/прокси не должны копить ответ целиком
+          "x-accel-buffering": "no",
+        },
+      })
+    }
+
     const raw = await r.text()
 
     if (!r.ok) {
@@ -85,7 +104,7 @@ export async function POST(request: NextRequest) {
   } catch (e: any) {
     return NextResponse.json(
       { ok: false, error: "Agent route failed", details: String(e?.message || e) },
-      { status: 500, headers: { "cache-control": "no-store" } }
+      { status: upstreamErrorStatus(e) ?? 500, headers: { "cache-control": "no-store" } }
     )
   }
 }
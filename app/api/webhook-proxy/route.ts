@@ -1,4 +1,8 @@
 import { type NextRequest, NextResponse } from "next/server"
+import { upstreamErrorStatus, upstreamFetch } from "@/lib/server/upstream"
+
+// upstreamFetch ходит через node:http пулы
+export const runtime = "nodejs"
 
 export async function POST(request: NextRequest) {
   try {
@@ -30,7 +34,7 @@ export async function POST(request: NextRequest) {
       const urlWithParams = `${webhookUrl}${webhookUrl.includes("?") ? "&" : "?"}${queryParams.toString()}`
 
       // Send GET request
-      response = await fetch(urlWithParams, {
+      response = await upstreamFetch("webhook", urlWithParams, {
         method: "GET",
         headers: {
           Accept: "application/json",
@@ -38,7 +42,7 @@ export async function POST(request: NextRequest) {
       })
     } else {
       // Send POST request as before
-      response = await fetch(webhookUrl, {
+      response = await upstreamFetch("webhook", webhookUrl, {
         method: "POST",
         headers: {
           "Content-Type": "application/json",
@@ -100,7 +104,7 @@ export async function POST(request: NextRequest) {
     console.error("Webhook proxy error:", error)
     return NextResponse.json(
       { error: "Internal server error", details: error instanceof Error ? error.message : String(error) },
-      { status: 500 },
+      { status: upstreamErrorStatus(error) ?? 500 },
     )
   }
 }
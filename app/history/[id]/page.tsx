@@ -14,6 +14,36 @@ type Msg = {
   created_at?: string;
 };
 
+// сообщения приходят страницами (keyset, /api/history/[id]?after=...) и рисуются по мере прихода;
+// загруженная беседа лежит в sessionStorage, при повторном открытии дочитывается только новое
+const PAGE_SIZE = 100;
+const CACHE_PREFIX = "ta_history_thread:";
+
+type ThreadCache = {
+  title: string;
+  updatedAt: string | null;
+  cursor: string | null;
+  messages: Msg[];
+};
+
+function readThreadCache(id: string): ThreadCache | null {
+  try {
+    const raw = sessionStorage.getItem(CACHE_PREFIX + id);
+    const v = raw ? JSON.parse(raw) : null;
+    return v && Array.isArray(v.messages) ? v : null;
+  } catch {
+    return null;
+  }
+}
+
+function writeThreadCache(id: string, v: ThreadCache) {
+  try {
+    sessionStorage.setItem(CACHE_PREFIX + id, JSON.stringify(v));
+  } catch {
+    // квота sessionStorage — просто без кэша
+  }
+}
+
 export default function HistoryItemPage() {
   const params = useParams<{ id: string }>();
   const router = useRouter();
@@ -23,34 +53,73 @@ export default function HistoryItemPage() {
   const [errorText, setErrorText] = useState<string | null>(null);
   const [messages, setMessages] = useState<Msg[]>([]);
   const [title, setTitle] = useState<string>("Session");
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     let alive = true;
 
     const run = async () => {
-      setLoading(true);
       setErrorText(null);
 
-      try {
-        const r = await fetch(`/api/history/${id}`, { cache: "no-store", credentials: "include" });
-        const data = await r.json().catch(() => ({} as any));
+      const cached = readThreadCache(id);
+      let all: Msg[] = cached?.messages ?? [];
+      let cursor = cached?.cursor ?? null;
+      let updatedAt = cached?.updatedAt ?? null;
+      let threadTitle = cached?.title ?? "Session";
 
-        if (!alive) return;
+      if (cached) {
+        setTitle(threadTitle);
+        setMessages(all);
+        setLoading(false);
+      } else {
+        setMessages([]);
+        setLoading(true);
+      }
 
-        if (!r.ok || data?.ok === false) {
-          setErrorText(data?.error || "Failed to load session");
-          setMessages([]);
-          return;
+      try {
+        for (let first = true; ; first = false) {
+          const qs = new URLSearchParams({ limit: String(PAGE_SIZE) });
+          if (cursor) qs.set("after", cursor);
+          if (first && cached && updatedAt) qs.set("since", updatedAt);
+
+          const r = await fetch(`/api/history/${id}?${qs}`, { cache: "no-store", credentials: "include" });
+          const data = await r.json().catch(() => ({} as any));
+
+          if (!alive) return;
+
+          if (!r.ok || data?.ok === false) {
+            // есть что показать из кэша — ошибку дочитки не показываем
+            if (!all.length) setErrorText(data?.error || "Failed to load session");
+            return;
+          }
+
+          threadTitle = String(data?.conversation?.title || "Session");
+          updatedAt = data?.conversation?.updated_at ?? updatedAt;
+          setTitle(threadTitle);
+          if (data?.unchanged) break;
+
+          const page: Msg[] = Array.isArray(data?.messages) ? data.messages : [];
+          if (page.length) {
+            const seen = new Set(all.map((m) => m.id));
+            all = [...all, ...page.filter((m) => !seen.has(m.id))];
+            setMessages(all);
+          }
+          cursor = data?.lastCursor ?? cursor;
+
+          // первая страница уже на экране, остальные догружаются следом
+          setLoading(false);
+          if (!data?.nextCursor) break;
+          setLoadingMore(true);
         }
 
-        setTitle(String(data?.conversation?.title || "Session"));
-        setMessages(Array.isArray(data?.messages) ? data.messages : []);
+        writeThreadCache(id, { title: threadTitle, updatedAt, cursor, messages: all });
       } catch (e: any) {
         if (!alive) return;
-        setErrorText("Failed to load session");
+        if (!all.length) setErrorText("Failed to load session");
       } finally {
         if (!alive) return;
         setLoading(false);
+        setLoadingMore(false);
       }
     };
 
@@ -98,6 +167,7 @@ export default function HistoryItemPage() {
                   <div className="whitespace-pre-wrap text-slate-900">{m.content}</div>
                 </div>
               ))}
+              {loadingMore ? <div className="text-slate-500">Loading more...</div> : null}
             </div>
           )}
         </CardContent>
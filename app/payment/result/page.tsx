@@ -12,10 +12,14 @@ type StatusResp = {
   transactionStatus?: string | null
   reason?: string | null
   details?: string | null
+  timedOut?: boolean
 }
 
 const PAY_FAIL_PUBLIC_TEXT = "Оплату не підтверджено. Перевірте дані картки, ліміт або спробуйте іншу."
-const MAX_TRIES = 10
+// ожидание подтверждения: long-poll /api/billing/orders/watch (отвечает, как только вебхук
+// WayForPay закоммитит заказ); в сам WayForPay (orders/status) — один раз, после первого таймаута
+const MAX_TRIES = 4
+const WATCH_S = 20
 const RETRY_MS = 2500
 
 function normalizeStatus(v: any): OrderStatus {
@@ -37,6 +41,22 @@ async function fetchStatus(orderReference: string): Promise<{ st: OrderStatus; d
   return { st, details: d ? String(d) : null }
 }
 
+async function watchStatus(
+  orderReference: string,
+  signal: AbortSignal
+): Promise<{ st: OrderStatus; details: string | null; timedOut: boolean }> {
+  const r = await fetch(
+    `/api/billing/orders/watch?orderReference=${encodeURIComponent(orderReference)}&wait=${WATCH_S}`,
+    { method: "GET", cache: "no-store", signal }
+  )
+  const j: StatusResp = await r.json().catch(() => ({} as any))
+  if (!r.ok || j?.ok === false) throw new Error(String(j?.details || j?.status || `HTTP ${r.status}`))
+
+  const st = normalizeStatus(j?.status)
+  const d = j?.reason ?? j?.transactionStatus ?? null
+  return { st, details: d ? String(d) : null, timedOut: Boolean(j?.timedOut) }
+}
+
 export default function PaymentResultPage() {
   const sp = useSearchParams()
   const orderReference = (sp.get("orderReference") || "").trim()
@@ -75,18 +95,30 @@ export default function PaymentResultPage() {
     if (!orderReference) return
 
     let cancelled = false
+    let checkedWfp = false
+    const ac = new AbortController()
 
     const loop = async (n: number) => {
       if (cancelled) return
       setTries(n)
       try {
-        const res = await fetchStatus(orderReference)
+        let res = await watchStatus(orderReference, ac.signal)
         if (cancelled) return
+
+        // вебхука нет — один раз спрашиваем WayForPay напрямую (orders/status сам обновит заказ)
+        if (res.timedOut && !checkedWfp) {
+          checkedWfp = true
+          const direct = await fetchStatus(orderReference)
+          if (cancelled) return
+          res = { ...direct, timedOut: direct.st === "pending" }
+        }
+
         setStatus(res.st)
         setDetails(res.details)
 
+        // watch отвечает сразу только на конечный статус; pending без таймаута (заказ ещё не создан) — с паузой
         if (res.st === "pending" && n < MAX_TRIES) {
-          timerRef.current = setTimeout(() => loop(n + 1), RETRY_MS)
+          timerRef.current = setTimeout(() => loop(n + 1), res.timedOut ? 0 : RETRY_MS)
         }
       } catch (e: any) {
         if (cancelled) return
@@ -100,6 +132,7 @@ export default function PaymentResultPage() {
 
     return () => {
       cancelled = true
+      ac.abort()
       if (timerRef.current) clearTimeout(timerRef.current)
     }
     // eslint-disable-next-line react-hooks/exhaustive-deps
@@ -5,6 +5,7 @@ import { useLanguage } from "@/lib/i18n/language-context"
 import { useAuth } from "@/lib/auth/auth-context"
 import { Button } from "@/components/ui/button"
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card"
+import { loadAccountSnapshot, invalidateAccountSnapshot } from "@/lib/account-snapshot"
 
 type Summary = {
   ok?: boolean
@@ -215,29 +216,20 @@ export default function SubscriptionClient() {
   const [msg, setMsg] = useState<string>("")
   const [loading, setLoading] = useState(false)
 
-  async function loadSummary() {
-    const r = await fetch("/api/subscription/summary", {
-      method: "GET",
-      cache: "no-store",
-      credentials: "include",
-    })
-    const data = await r.json().catch(() => ({} as any))
+  // доступ, подписка и промокод — одним снимком, общим с шапкой
+  async function loadSnapshot() {
+    const data = await loadAccountSnapshot()
     setSummary(data || {})
-  }
-
-  async function loadSubStatus() {
-    const r = await fetch("/api/billing/subscription/status", {
-      method: "GET",
-      cache: "no-store",
-      credentials: "include",
-    })
-    const data = await r.json().catch(() => ({} as any))
-    setSubStatus(data || {})
+    // поля как у /api/billing/subscription/status: normalizeAuto их не разбирает, autoState остаётся
+    // "unknown", и кнопки отмены/возобновления автосписания скрыты — как было до снимка
+    setSubStatus(data?.subscription || {})
   }
 
   useEffect(() => {
-    loadSummary().catch(() => setSummary({ ok: false, errorCode: "SUMMARY_FAILED" }))
-    loadSubStatus().catch(() => setSubStatus({ ok: false, errorCode: "STATUS_FAILED" }))
+    loadSnapshot().catch(() => {
+      setSummary({ ok: false, errorCode: "SUMMARY_FAILED" })
+      setSubStatus({ ok: false, errorCode: "STATUS_FAILED" })
+    })
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [user?.id])
 
@@ -329,7 +321,8 @@ export default function SubscriptionClient() {
       if (data?.ok) {
         setMsg(copy.msgOkApply)
         setPromoCode("")
-        await loadSummary()
+        invalidateAccountSnapshot()
+        await loadSnapshot()
         // важное: чтобы Header/Profile точно обновились
         window.location.reload()
       } else {
@@ -355,7 +348,8 @@ export default function SubscriptionClient() {
 
       if (data?.ok) {
         setMsg(copy.msgOkCancel)
-        await loadSummary()
+        invalidateAccountSnapshot()
+        await loadSnapshot()
         window.location.reload()
       } else {
         setMsg(errorText(data?.errorCode))
@@ -380,8 +374,8 @@ export default function SubscriptionClient() {
 
       if (data?.ok) {
         setMsg(copy.msgOkSubCancel)
-        await loadSummary()
-        await loadSubStatus()
+        invalidateAccountSnapshot()
+        await loadSnapshot()
         window.location.reload()
       } else {
         setMsg(errorText(data?.errorCode) || copy.err_SUB_FAILED)
@@ -406,8 +400,8 @@ export default function SubscriptionClient() {
 
       if (data?.ok) {
         setMsg(copy.msgOkSubResume)
-        await loadSummary()
-        await loadSubStatus()
+        invalidateAccountSnapshot()
+        await loadSnapshot()
         window.location.reload()
       } else {
         setMsg(errorText(data?.errorCode) || copy.err_SUB_FAILED)
@@ -15,6 +15,7 @@ import { Textarea } from "@/components/ui/textarea"
 import { ScrollArea } from "@/components/ui/scroll-area"
 import { useLanguage } from "@/lib/i18n/language-context"
 import { useAuth } from "@/lib/auth/auth-context"
+import { readAgentReply } from "@/lib/agent-stream"
 
 type Props = {
   isOpen: boolean
@@ -160,6 +161,7 @@ export default function AIChatDialog({ isOpen, onClose, webhookUrl }: Props) {
           "Content-Type": "application/json",
         },
         body: JSON.stringify({
+          stream: true,
           query: text,
           language: langCode,
           email: user?.email ?? null,
@@ -176,14 +178,14 @@ if (res.status === 402) {
         throw new Error(`Request failed with status ${res.status}`)
       }
 
-      const raw = await res.text()
-      let data: any = raw
-
-      try {
-        data = JSON.parse(raw)
-      } catch {
-        // строка
-      }
+      const draftId = `${Date.now()}-assistant`
+      let draft = ""
+      const data: any = await readAgentReply(res, (sentence) => {
+        // поток: ответ растёт в ленте по предложениям, ниже его заменит готовое сообщение
+        draft = draft ? `${draft} ${sentence}` : sentence
+        const text = draft
+        setMessages((prev) => [...prev.filter((m) => m.id !== draftId), { id: draftId, role: "assistant", text }])
+      })
 
       console.log("Chat raw response:", data)
 
@@ -194,12 +196,12 @@ if (res.status === 402) {
       }
 
       const assistantMessage: ChatMessage = {
-        id: `${Date.now()}-assistant`,
+        id: draftId,
         role: "assistant",
         text: answer,
       }
 
-      setMessages((prev) => [...prev, assistantMessage])
+      setMessages((prev) => [...prev.filter((m) => m.id !== draftId), assistantMessage])
     } catch (err) {
       console.error("Chat error:", err)
       setError(
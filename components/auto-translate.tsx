@@ -6,7 +6,7 @@ import type React from "react"
 import { useEffect, useRef } from "react"
 import { usePathname } from "next/navigation"
 import { useLanguage } from "@/lib/i18n/language-context"
-import { translateElement } from "@/lib/i18n/translation-utils"
+import { translateElement } from "@/lib/i18n/dom-translation"
 
 interface AutoTranslateProps {
   children: React.ReactNode
@@ -13,8 +13,11 @@ import { LanguageSelector } from "@/components/language-selector"
 
 import { useLanguage } from "@/lib/i18n/language-context"
 import { useAuth } from "@/lib/auth/auth-context"
+import { enqueueHistoryTurn } from "@/lib/history/save-queue"
 import Logo from "@/components/logo"
 import { APP_NAME } from "@/lib/app-config"
+import { agentReplyText } from "@/lib/agent-stream"
+import { loadAccountSnapshot, invalidateAccountSnapshot } from "@/lib/account-snapshot"
 
 type MainLink = { href: string; label: string }
 
@@ -97,8 +100,7 @@ export default function Header() {
     [t]
   )
 
-  const loadSummary = () =>
-    fetch("/api/account/summary", { cache: "no-store", credentials: "include" })
+  const loadSummary = () => loadAccountSnapshot()
 
   const inFlightRef = useRef<Promise<void> | null>(null)
   const lastRunRef = useRef<number>(0)
@@ -114,8 +116,7 @@ export default function Header() {
 
     inFlightRef.current = (async () => {
       try {
-        const r = await loadSummary()
-        const d = await r.json().catch(() => ({}))
+        const d: any = await loadSummary()
 
         setIsLoggedIn(Boolean(d?.isLoggedIn))
 
@@ -153,6 +154,8 @@ export default function Header() {
 
     const onRefresh = () => {
       if (!alive) return
+      // что-то поменялось (ответ агента, оплата) — снимок из памяти уже не годится
+      invalidateAccountSnapshot()
       runSummary(false)
     }
 
@@ -274,7 +277,7 @@ export default function Header() {
                   })() || null
 
                 const cloned = res.clone()
-                const raw = await cloned.text().catch(() => "")
+                const raw = agentReplyText(await cloned.text().catch(() => ""), res.headers.get("content-type"))
                 let parsed: any = null
                 try {
                   parsed = raw ? JSON.parse(raw) : null
@@ -284,25 +287,12 @@ export default function Header() {
                   tryExtractAssistantText(parsed) || (raw ? clipText(raw) : null)
 
                 if (userText || assistantText) {
-                  const rr = await fetch("/api/history/save", {
-                    method: "POST",
-                    headers: { "content-type": "application/json" },
-                    body: JSON.stringify({
-                      conversationId: convId,
-                      userText,
-                      assistantText,
-                    }),
-                  }).catch(() => null)
-
-                  const dd = await rr?.json().catch(() => null)
-                  const newId =
-                    typeof dd?.conversationId === "string" ? dd.conversationId : null
-
-                  if (newId) {
-                    try {
-                      sessionStorage.setItem("turbota_conv_id", newId)
-                    } catch {}
-                  }
+                  // write-behind: реплики копятся и уходят пачкой (idle / pagehide / N сообщений)
+                  enqueueHistoryTurn({
+                    conversationId: convId,
+                    userText,
+                    assistantText,
+                  })
                 }
               } catch {}
             })()
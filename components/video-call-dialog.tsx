@@ -18,11 +18,11 @@ import {
 } from "lucide-react"
 import { useLanguage } from "@/lib/i18n/language-context"
 import { useAuth } from "@/lib/auth/auth-context"
-import {
-  getLocaleForLanguage,
-  getNativeSpeechParameters,
-  getNativeVoicePreferences,
-} from "@/lib/i18n/translation-utils"
+import { fetchTtsBlob } from "@/lib/google-tts"
+import { SttChunkUploader } from "@/lib/stt-upload"
+import { getLocaleForLanguage, getNativeSpeechParameters } from "@/lib/i18n/speech-utils"
+import { findPreferredVoice, getIndexedVoices } from "@/lib/i18n/voice-index"
+import { createSentenceSpeaker, readAgentReply } from "@/lib/agent-stream"
 
 const VIDEO_ASSISTANT_WEBHOOK_URL =
   process.env.NEXT_PUBLIC_TURBOTA_AI_VIDEO_ASSISTANT_WEBHOOK_URL ||
@@ -401,13 +401,7 @@ function extractAnswer(data: any): string {
   return ""
 }
 
-function b64ToBlobUrl(b64: string, mime: string): { url: string; revoke: () => void } {
-  const clean = (b64 || "").trim()
-  const binary = typeof atob === "function" ? atob(clean) : ""
-  const len = binary.length
-  const bytes = new Uint8Array(len)
-  for (let i = 0; i < len; i++) bytes[i] = binary.charCodeAt(i)
-  const blob = new Blob([bytes], { type: mime || "audio/mpeg" })
+function blobToUrl(blob: Blob): { url: string; revoke: () => void } {
   const url = URL.createObjectURL(blob)
   return { url, revoke: () => URL.revokeObjectURL(url) }
 }
@@ -433,7 +427,6 @@ export default function VideoCallDialog({
       : "English")
 
   const currentLocale = getLocaleForLanguage(activeLanguage.code)
-  const nativeVoicePreferences = getNativeVoicePreferences()
 
   const [selectedCharacter, setSelectedCharacter] = useState<AICharacter>(
     AI_CHARACTERS[1] || AI_CHARACTERS[0],
@@ -493,6 +486,7 @@ export default function VideoCallDialog({
   const pendingSttTimerRef = useRef<number | null>(null)
 
   const isSttBusyRef = useRef(false)
+  const sttUploader = useMemo(() => new SttChunkUploader(), [])
   const lastTranscriptRef = useRef("") // ВАЖНО: не сбрасывать на TTS
   const lastUserSentNormRef = useRef("")
   const lastUserSentTsRef = useRef(0)
@@ -584,7 +578,9 @@ export default function VideoCallDialog({
   useEffect(() => {
     if (typeof window === "undefined" || !window.speechSynthesis) return
     const load = () => {
-      const voices = window.speechSynthesis!.getVoices()
+      // список голосов сменился — выбор пересчитываем
+      voiceCacheRef.current.clear()
+      const voices = getIndexedVoices()
       if (voices.length) {
         getRefinedVoiceForLanguage(activeLanguage.code, "female")
         getRefinedVoiceForLanguage(activeLanguage.code, "male")
@@ -787,6 +783,7 @@ export default function VideoCallDialog({
     mediaRecorderRef.current = null
     audioChunksRef.current = []
     sentIdxRef.current = 0
+    sttUploader.reset()
     setIsListening(false)
   }
 
@@ -961,6 +958,13 @@ export default function VideoCallDialog({
       if (size > 0) {
         if (!isAiSpeakingRef.current && !isMicMutedRef.current) {
           audioChunksRef.current.push(b)
+
+          // пока человек говорит — заранее грузим куски фразы на сервер
+          const chunks = audioChunksRef.current
+          if (vad.current.voice && chunks[0] && !isSttBusyRef.current) {
+            const startIdx = Math.max(1, sentIdxRef.current)
+            sttUploader.sync([chunks[0], ...chunks.slice(startIdx)], computeLangCode())
+          }
         }
       }
 
@@ -1092,15 +1096,18 @@ export default function VideoCallDialog({
       isSttBusyRef.current = true
       setActivityStatus("thinking")
 
-      const res = await fetch("/api/stt", {
-        method: "POST",
-        headers: {
-          "Content-Type": blob.type || "application/octet-stream",
-          "X-STT-Hint": "auto",
-          "X-STT-Lang": computeLangCode(),
-        } as any,
-        body: blob,
-      })
+      // куски фразы уже лежат на сервере — досылаем хвост; иначе целый blob
+      const res =
+        (await sttUploader.finish([header, ...body], computeLangCode())) ??
+        (await fetch("/api/stt", {
+          method: "POST",
+          headers: {
+            "Content-Type": blob.type || "application/octet-stream",
+            "X-STT-Hint": "auto",
+            "X-STT-Lang": computeLangCode(),
+          } as any,
+          body: blob,
+        }))
 
       const raw = await res.text()
       let data: any = null
@@ -1211,17 +1218,13 @@ export default function VideoCallDialog({
     const cache = voiceCacheRef.current
     if (cache.has(cacheKey)) return cache.get(cacheKey)!
 
-    const voices = window.speechSynthesis.getVoices()
+    const voices = getIndexedVoices()
     if (!voices.length) return null
 
-    const nativeList = nativeVoicePreferences[langCode]?.[preferredGender] || []
-
-    for (const name of nativeList) {
-      const v = voices.find((voice) => voice.name === name)
-      if (v) {
-        cache.set(cacheKey, v)
-        return v
-      }
+    const preferred = findPreferredVoice(langCode, preferredGender)
+    if (preferred) {
+      cache.set(cacheKey, preferred)
+      return preferred
     }
 
     const langVoices = voices.filter((v) =>
@@ -1303,22 +1306,8 @@ export default function VideoCallDialog({
     const ttsGender = gender === "male" ? "MALE" : "FEMALE"
     const langCode = computeLangCode()
 
-    const res = await fetch("/api/tts", {
-      method: "POST",
-      headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({
-        text,
-        language: langCode,
-        gender: ttsGender,
-      }),
-    })
-    const json = await res.json().catch(() => null)
-    if (!res.ok || !json?.success || !json?.audioContent) {
-      throw new Error(json?.error || `TTS error: ${res.status}`)
-    }
-
-    const contentType = (json.contentType || "audio/mpeg").toString()
-    const audioB64 = String(json.audioContent || "")
+    // сырое аудио (mp3) вместо base64 в JSON — меньше трафика и без декодирования
+    const audioBlob = await fetchTtsBlob(text, langCode, ttsGender)
 
     await new Promise<void>((resolve) => {
       const audio = ttsAudioRef.current ?? new Audio()
@@ -1376,7 +1365,7 @@ export default function VideoCallDialog({
           } catch {}
           ttsObjectUrlRef.current = null
         }
-        const { url, revoke } = b64ToBlobUrl(audioB64, contentType)
+        const { url, revoke } = blobToUrl(audioBlob)
         ttsObjectUrlRef.current = url
         audio.src = url
 
@@ -1557,6 +1546,7 @@ export default function VideoCallDialog({
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify({
+          stream: true,
           query: trimmed,
           language: langForBackend,
           email: user?.email || "guest@example.com",
@@ -1573,11 +1563,9 @@ if (res.status === 402) {
 
       if (!res.ok) throw new Error(`Webhook error: ${res.status}`)
 
-      const raw = await res.text()
-      let data: any = raw
-      try {
-        data = JSON.parse(raw)
-      } catch {}
+      // первое предложение озвучиваем сразу, остальное — следом, пока идёт поток
+      const speaker = createSentenceSpeaker((sentence) => speakText(sentence))
+      const data: any = await readAgentReply(res, (sentence) => speaker.push(sentence))
 
       let aiRaw = extractAnswer(data)
       aiRaw = cleanResponseText(aiRaw)
@@ -1600,7 +1588,8 @@ if (res.status === 402) {
         { id: prev.length + 1, role: "assistant", text: aiRaw },
       ])
 
-      await speakText(aiRaw)
+      if (speaker.started) await speaker.drain()
+      else await speakText(aiRaw)
     } catch (error: any) {
       console.error("Video assistant error:", error)
       const errorMessage =
@@ -13,6 +13,9 @@ import { ScrollArea } from "@/components/ui/scroll-area"
 import { Phone, Brain, Mic, MicOff, Loader2, Sparkles } from "lucide-react"
 import { useLanguage } from "@/lib/i18n/language-context"
 import { useAuth } from "@/lib/auth/auth-context"
+import { fetchTtsBlob } from "@/lib/google-tts"
+import { SttChunkUploader } from "@/lib/stt-upload"
+import { createSentenceSpeaker, readAgentReply } from "@/lib/agent-stream"
 
 interface VoiceCallDialogProps {
   isOpen: boolean
@@ -265,15 +268,6 @@ function isMostlyGarbage(text: string): boolean {
   return false
 }
 
-function base64ToObjectUrl(b64: string, mime = "audio/mpeg"): string {
-  const bin = atob(b64)
-  const len = bin.length
-  const bytes = new Uint8Array(len)
-  for (let i = 0; i < len; i++) bytes[i] = bin.charCodeAt(i)
-  const blob = new Blob([bytes], { type: mime })
-  return URL.createObjectURL(blob)
-}
-
 export default function VoiceCallDialog({
   isOpen,
   onClose,
@@ -319,6 +313,7 @@ export default function VoiceCallDialog({
 
   const MIN_UTTERANCE_MS = 520
   const isSttBusyRef = useRef(false)
+  const sttUploader = useMemo(() => new SttChunkUploader(), [])
 
   const lastUserSentNormRef = useRef("")
   const lastUserSentTsRef = useRef(0)
@@ -333,6 +328,8 @@ export default function VoiceCallDialog({
 
   // важно: только последний TTS имеет право проигрываться (иначе может “двоить”)
   const ttsSeqRef = useRef(0)
+  // резолвер промиса текущей озвучки: остановили аудио — ждущий (очередь предложений) идёт дальше
+  const ttsDoneRef = useRef<(() => void) | null>(null)
 
   // защита от параллельных запросов к агенту
   const isAgentBusyRef = useRef(false)
@@ -506,6 +503,10 @@ export default function VoiceCallDialog({
   }
 
   function stopTtsAudio() {
+    const stopped = ttsDoneRef.current
+    ttsDoneRef.current = null
+    stopped?.()
+
     const a = ttsAudioRef.current
     if (!a) return
     try {
@@ -577,15 +578,18 @@ export default function VoiceCallDialog({
 
       const sttLang = getSessionVoiceLang()
 
-      const res = await fetch("/api/stt", {
-        method: "POST",
-        headers: {
-          "Content-Type": blob.type || "application/octet-stream",
-          "X-STT-Hint": "auto",
-          "X-STT-Lang": sttLang,
-        } as any,
-        body: blob,
-      })
+      // куски фразы уже лежат на сервере — досылаем хвост; иначе целый blob
+      const res =
+        (await sttUploader.finish([header, ...body], sttLang)) ??
+        (await fetch("/api/stt", {
+          method: "POST",
+          headers: {
+            "Content-Type": blob.type || "application/octet-stream",
+            "X-STT-Hint": "auto",
+            "X-STT-Lang": sttLang,
+          } as any,
+          body: blob,
+        }))
 
       const raw = await res.text()
       let data: any = null
@@ -747,9 +751,9 @@ export default function VoiceCallDialog({
     rafRef.current = requestAnimationFrame(tick)
   }
 
-  function speakText(text: string, langCodeOverride?: string) {
+  function speakText(text: string, langCodeOverride?: string): Promise<void> {
     const cleanText = sanitizeAssistantText(text || "")
-    if (!cleanText) return
+    if (!cleanText) return Promise.resolve()
 
     const langCode = langCodeOverride || getSessionVoiceLang()
     const gender = getCurrentGender()
@@ -760,6 +764,11 @@ export default function VoiceCallDialog({
     let watchdogId: number | null = null
     let objectUrl: string | null = null
 
+    let resolveDone: () => void = () => {}
+    const spoken = new Promise<void>((resolve) => {
+      resolveDone = resolve
+    })
+
     const clearWatchdog = () => {
       if (watchdogId) {
         try {
@@ -781,6 +790,7 @@ export default function VoiceCallDialog({
     const finishOnce = () => {
       if (done) return
       done = true
+      resolveDone()
 
       clearWatchdog()
       revokeUrl()
@@ -845,23 +855,13 @@ export default function VoiceCallDialog({
 
     ;(async () => {
       begin()
+      ttsDoneRef.current = resolveDone
 
       try {
-        const res = await fetch("/api/tts", {
-          method: "POST",
-          headers: { "Content-Type": "application/json" },
-          body: JSON.stringify({ text: cleanText, language: langCode, gender }),
-        })
-
-        const raw = await res.text()
-        let data: any = null
+        let audioBlob: Blob
         try {
-          data = raw ? JSON.parse(raw) : null
+          audioBlob = await fetchTtsBlob(cleanText, langCode, gender)
         } catch {
-          data = null
-        }
-
-        if (!res.ok || !data || data.success === false || !data.audioContent) {
           finishOnce()
           return
         }
@@ -874,8 +874,7 @@ export default function VoiceCallDialog({
         ;(a as any).preload = "auto"
         ttsAudioRef.current = a
 
-        const ct = (data.contentType || "audio/mpeg") as string
-        objectUrl = base64ToObjectUrl(data.audioContent, ct)
+        objectUrl = URL.createObjectURL(audioBlob)
         a.src = objectUrl
 
         a.onended = () => finishOnce()
@@ -907,6 +906,8 @@ export default function VoiceCallDialog({
         finishOnce()
       }
     })()
+
+    return spoken
   }
 
   async function handleUserText(text: string, langCodeOverride?: string) {
@@ -931,6 +932,7 @@ export default function VoiceCallDialog({
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify({
+          stream: true,
           query: text,
           language: agentLang,
           email: effectiveEmail,
@@ -947,11 +949,15 @@ if (res.status === 402) {
 
       if (!res.ok) throw new Error(`Chat API error: ${res.status}`)
 
-      const raw = await res.text()
-      let data: any = raw
-      try {
-        data = JSON.parse(raw)
-      } catch {}
+      // первое предложение озвучиваем сразу; звонок закончен или между кусками заговорила новая реплика — хвост молчит
+      let lastSeq = ttsSeqRef.current
+      const speaker = createSentenceSpeaker(async (sentence) => {
+        if (!isCallActiveRef.current || ttsSeqRef.current !== lastSeq) return
+        const spoken = speakText(sentence, voiceLangCode)
+        lastSeq = ttsSeqRef.current
+        await spoken
+      })
+      const data: any = await readAgentReply(res, (sentence) => speaker.push(sentence))
 
       let answer = extractAnswer(data)
       if (!answer) answer = t("I'm sorry, I couldn't process your message. Please try again.")
@@ -972,7 +978,7 @@ if (res.status === 402) {
       }
 
       setMessages((prev) => [...prev, assistantMsg])
-      speakText(answer, voiceLangCode)
+      if (!speaker.started) speakText(answer, voiceLangCode)
     } catch (e: any) {
       console.error(e)
       setNetworkError(t("Connection error. Please try again."))
@@ -1094,6 +1100,13 @@ if (res.status === 402) {
         if (size > 0) {
           if (!isAiSpeakingRef.current && !isMicMutedRef.current) {
             audioChunksRef.current.push(b)
+
+            // пока человек говорит — заранее грузим куски фразы на сервер
+            const chunks = audioChunksRef.current
+            if (vad.current.voice && chunks[0] && !isSttBusyRef.current) {
+              const startIdx = Math.max(1, utterStartIdxRef.current)
+              sttUploader.sync([chunks[0], ...chunks.slice(startIdx)], getSessionVoiceLang())
+            }
           }
         }
 
@@ -1176,6 +1189,7 @@ if (res.status === 402) {
 
     audioChunksRef.current = []
     utterStartIdxRef.current = 1
+    sttUploader.reset()
 
     lastUserSentNormRef.current = ""
     lastUserSentTsRef.current = 0
@@ -3,12 +3,9 @@
 
 import { useCallback, useRef, useState, useEffect } from "react"
 import { useLanguage } from "@/lib/i18n/language-context"
-import {
-  getLocaleForLanguage,
-  getNativeVoicePreferences,
-  getNativeSpeechParameters,
-  formatTextForSpeech,
-} from "@/lib/i18n/translation-utils"
+import { getLocaleForLanguage, getNativeSpeechParameters } from "@/lib/i18n/speech-utils"
+import { formatTextForSpeech } from "@/lib/i18n/text-utils"
+import { selectNativeVoice } from "@/lib/i18n/voice-index"
 import { generateGoogleTTS, shouldUseGoogleTTS } from "@/lib/google-tts"
 
 interface VoiceConfig {
@@ -73,13 +70,10 @@ export function useEnhancedSpeechSynthesis({
   const currentAudioRef = useRef<HTMLAudioElement | null>(null)
   const speechQueueRef = useRef<string[]>([])
   const isProcessingRef = useRef(false)
-  const voiceCacheRef = useRef<Map<string, SpeechSynthesisVoice>>(new Map())
   const lastSpokenTextRef = useRef<string>("")
 
-  // Get native voice preferences
-  const nativeVoicePreferences = getNativeVoicePreferences()
-
-  // Enhanced voice selection with comprehensive native accent support
+  // Voice selection: the preference tables are compiled once in voice-index,
+  // the chosen voice per (language, gender) is cached until "voiceschanged"
   const getRefinedVoiceForLanguage = useCallback(
     (langCode: string, preferredGender: "female" | "male" = "female"): SpeechSynthesisVoice | null => {
       if (!window.speechSynthesis) {
@@ -87,241 +81,11 @@ export function useEnhancedSpeechSynthesis({
         return null
       }
 
-      const cacheKey = `${langCode}-${preferredGender}`
-
-      // Return cached voice if available
-      if (voiceCacheRef.current.has(cacheKey)) {
-        const cachedVoice = voiceCacheRef.current.get(cacheKey)!
-        console.log(`✓ Using cached native voice: ${cachedVoice.name} for ${langCode} ${preferredGender}`)
-        return cachedVoice
-      }
-
-      const voices = window.speechSynthesis.getVoices()
-      if (voices.length === 0) {
-        console.warn("No voices available yet, will retry when voices load")
-        return null
-      }
-
-      console.log(`🎯 Finding native voice for ${langCode} ${preferredGender} from ${voices.length} voices`)
-
-      // Get native voice preferences for this language and gender
-      const nativeVoices = nativeVoicePreferences[langCode]?.[preferredGender] || []
-
-      // Phase 1: Try exact matches from native preferences (HIGHEST PRIORITY)
-      for (const voiceName of nativeVoices) {
-        const exactMatch = voices.find((v) => v.name === voiceName)
-        if (exactMatch) {
-          console.log(`✅ NATIVE exact match: ${exactMatch.name} for ${langCode} ${preferredGender}`)
-          voiceCacheRef.current.set(cacheKey, exactMatch)
-          return exactMatch
-        }
-      }
-
-      // Phase 2: Try partial matches from native preferences
-      for (const voiceName of nativeVoices) {
-        const partialMatch = voices.find(
-          (v) =>
-            v.name.includes(voiceName) ||
-            voiceName.includes(v.name) ||
-            v.name.toLowerCase().includes(voiceName.toLowerCase()) ||
-            voiceName.toLowerCase().includes(v.name.toLowerCase()),
-        )
-        if (partialMatch) {
-          console.log(
-            `✅ NATIVE partial match: ${partialMatch.name} (target: ${voiceName}) for ${langCode} ${preferredGender}`,
-          )
-          voiceCacheRef.current.set(cacheKey, partialMatch)
-          return partialMatch
-        }
-      }
-
-      // Phase 3: Enhanced language-based search with native accent scoring
-      const getLanguageVoices = (lang: string) => {
-        const langLower = lang.toLowerCase()
-        return voices.filter((v) => {
-          const voiceLang = v.lang.toLowerCase()
-          const voiceName = v.name.toLowerCase()
-
-          // Direct language code match
-          if (voiceLang.startsWith(langLower)) return true
-          if (voiceLang.includes(`${langLower}-`)) return true
-
-          // Specific language matching with native name recognition
-          if (lang === "ru") {
-            return (
-              voiceLang.includes("ru-") ||
-              voiceName.includes("русский") ||
-              voiceName.includes("russian") ||
-              voiceName.includes("irina") ||
-              voiceName.includes("pavel") ||
-              voiceName.includes("dmitry") ||
-              voiceName.includes("aleksandr") ||
-              voiceName.includes("svetlana") ||
-              voiceName.includes("dariya") ||
-              voiceName.includes("ekaterina") ||
-              voiceName.includes("boris")
-            )
-          }
-          if (lang === "uk") {
-            return voiceLang.includes("uk-") || voiceName.includes("українська") || voiceName.includes("ukrainian")
-          }
-          if (lang === "en") {
-            return (
-              voiceLang.includes("en-") ||
-              voiceName.includes("english") ||
-              voiceName.includes("zira") ||
-              voiceName.includes("david") ||
-              voiceName.includes("samantha") ||
-              voiceName.includes("alex")
-            )
-          }
-
-          return false
-        })
-      }
-
-      const langVoices = getLanguageVoices(langCode)
-
-      if (langVoices.length > 0) {
-        // Advanced scoring system for native accent authenticity
-        const scoredVoices = langVoices.map((voice) => {
-          let score = 10 // Base score
-
-          const lowerName = voice.name.toLowerCase()
-          const lowerLang = voice.lang.toLowerCase()
-
-          // Gender matching (high priority for native accent)
-          const genderHints =
-            preferredGender === "female"
-              ? [
-                  "female",
-                  "woman",
-                  "girl",
-                  "f)",
-                  "женский",
-                  "жіночий",
-                  "zira",
-                  "irina",
-                  "samantha",
-                  "svetlana",
-                  "dariya",
-                  "ekaterina",
-                  "elena",
-                  "katya",
-                  "oksana",
-                  "milena",
-                ]
-              : [
-                  "male",
-                  "man",
-                  "boy",
-                  "m)",
-                  "мужской",
-                  "чоловічий",
-                  "david",
-                  "alex",
-                  "pavel",
-                  "dmitry",
-                  "aleksandr",
-                  "boris",
-                  "maxim",
-                  "sergey",
-                ]
-
-          if (genderHints.some((hint) => lowerName.includes(hint))) {
-            score += 40 // Higher bonus for gender match in native voices
-          }
-
-          // Native voice technology bonuses
-          if (lowerName.includes("neural")) score += 30 // Neural voices for native accent
-          if (lowerName.includes("wavenet")) score += 25 // Wavenet for natural speech
-          if (lowerName.includes("premium")) score += 22
-          if (lowerName.includes("enhanced")) score += 20
-          if (lowerName.includes("professional")) score += 18
-          if (lowerName.includes("therapeutic")) score += 18
-          if (lowerName.includes("natural")) score += 15
-
-          // Provider quality bonuses for native accent
-          if (lowerName.includes("google")) score += 20
-          if (lowerName.includes("microsoft")) score += 18
-          if (lowerName.includes("yandex") && langCode === "ru") score += 25 // Yandex excels at Russian
-
-          // Specific native voice bonuses
-          const nativeVoiceNames = [
-            "svetlana",
-            "dariya",
-            "ekaterina",
-            "dmitry",
-            "aleksandr",
-            "boris",
-            "irina",
-            "pavel",
-            "русский",
-            "russian",
-            "українська",
-            "ukrainian",
-          ]
-          if (nativeVoiceNames.some((nv) => lowerName.includes(nv))) {
-            score += 45 // Very high bonus for native voices
-          }
-
-          // Language match bonus
-          if (lowerLang.startsWith(langCode.toLowerCase())) {
-            score += 20
-          }
-
-          // Voice service quality indicators
-          if (!voice.default) score += 12
-          if (voice.localService) score += 10
-
-          return { voice, score }
-        })
-
-        scoredVoices.sort((a, b) => b.score - a.score)
-        const bestVoice = scoredVoices[0].voice
-
-        console.log(
-          `✅ NATIVE language fallback: ${bestVoice.name} (score: ${scoredVoices[0].score}) for ${langCode} ${preferredGender}`,
-        )
-        voiceCacheRef.current.set(cacheKey, bestVoice)
-        return bestVoice
-      }
-
-      // Phase 4: Cross-language fallbacks with native preference
-      console.warn(`⚠️ No ${langCode} voices found, using cross-language native fallbacks`)
-
-      if (langCode === "uk") {
-        // Ukrainian fallback to Russian (similar accent)
-        const russianVoice = getRefinedVoiceForLanguage("ru", preferredGender)
-        if (russianVoice) {
-          console.log(`✅ Using NATIVE Russian voice for Ukrainian ${preferredGender}: ${russianVoice.name}`)
-          voiceCacheRef.current.set(cacheKey, russianVoice)
-          return russianVoice
-        }
-      }
-
-      // Ultimate fallback to English
-      if (langCode !== "en") {
-        const englishVoice = getRefinedVoiceForLanguage("en", preferredGender)
-        if (englishVoice) {
-          console.log(`✅ Using NATIVE English voice for ${langCode} ${preferredGender}: ${englishVoice.name}`)
-          voiceCacheRef.current.set(cacheKey, englishVoice)
-          return englishVoice
-        }
-      }
-
-      // Last resort - any available voice
-      if (voices.length > 0) {
-        const lastResortVoice = voices[0]
-        console.log(`⚠️ Last resort voice for ${langCode} ${preferredGender}: ${lastResortVoice.name}`)
-        voiceCacheRef.current.set(cacheKey, lastResortVoice)
-        return lastResortVoice
-      }
-
-      console.error(`❌ No voices available at all for ${langCode} ${preferredGender}`)
-      return null
+      const voice = selectNativeVoice(langCode, preferredGender)
+      if (!voice) console.warn("No voices available yet, will retry when voices load")
+      return voice
     },
-    [nativeVoicePreferences],
+    [],
   )
 
   // Enhanced speak function with Google TTS for Ukrainian/Russian
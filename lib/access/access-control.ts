@@ -1,6 +1,6 @@
 import type { NextRequest } from "next/server"
-import { createServerClient } from "@supabase/ssr"
-import { getSupabaseServerClient, isSupabaseServerConfigured } from "@/lib/supabase-server"
+import { resolveGrants } from "@/lib/access/grants"
+import { getSupabaseServerClient, isSupabaseServerConfigured, getRequestUser } from "@/lib/supabase/clients"
 
 export type AccessGrant = {
   id: string
@@ -11,6 +11,8 @@ export type AccessGrant = {
 }
 
 const TABLE = "access_grants"
+const GRANT_COLUMNS = "id,device_hash,trial_questions_left,paid_until,promo_until"
+const CAS_ATTEMPTS = 8
 
 function num(v: any, fallback: number) {
   const n = Number(v)
@@ -47,24 +49,48 @@ async function getUserIdFromReq(req: NextRequest): Promise<string | null> {
   const anon = process.env.NEXT_PUBLIC_SUPABASE_ANON_KEY
   if (!url || !anon) return null
 
-  const supabase = createServerClient(url, anon, {
-    cookies: {
-      get(name: string) {
-        return req.cookies.get(name)?.value
-      },
-      set() {},
-      remove() {},
-    },
-  })
-
   try {
-    const { data } = await supabase.auth.getUser()
+    const { data } = await getRequestUser()
     return data?.user?.id || null
   } catch {
     return null
   }
 }
 
+/**
+ * Списывает один пробный вопрос атомарно. null — списывать нечего (счётчик уже 0).
+ * Основной путь — consume_trial_device в БД (один UPDATE ... WHERE trial_questions_left > 0);
+ * если функции нет, compare-and-swap по прочитанному значению с повтором.
+ */
+async function consumeTrialQuestion(supabase: any, grant: AccessGrant): Promise<AccessGrant | null> {
+  const rpc = await supabase.rpc("consume_trial_device", { p_device_hash: grant.device_hash })
+  if (!rpc.error) {
+    const row = Array.isArray(rpc.data) ? rpc.data[0] : rpc.data
+    if (!row?.allowed) return null
+    return { ...grant, trial_questions_left: Math.max(0, num(row?.trial_left, 0)) }
+  }
+
+  let left = Number(grant.trial_questions_left ?? 0)
+  for (let attempt = 0; attempt < CAS_ATTEMPTS && left > 0; attempt++) {
+    const { data: updated, error: updErr } = await supabase
+      .from(TABLE)
+      .update({ trial_questions_left: left - 1, updated_at: new Date().toISOString() })
+      .eq("id", grant.id)
+      .eq("trial_questions_left", left)
+      .select(GRANT_COLUMNS)
+
+    if (updErr) throw updErr
+    const row = Array.isArray(updated) ? updated[0] : null
+    if (row) return row as AccessGrant
+
+    // кто-то списал раньше нас — перечитываем и пробуем снова
+    const { data: cur, error: selErr } = await supabase.from(TABLE).select(GRANT_COLUMNS).eq("id", grant.id).maybeSingle()
+    if (selErr) throw selErr
+    left = Number((cur as any)?.trial_questions_left ?? 0)
+  }
+  return null
+}
+
 export async function getOrCreateGrant(deviceHash: string, trialOverride?: number): Promise<AccessGrant | null> {
   if (!deviceHash) return null
   if (!isSupabaseServerConfigured()) return null
@@ -72,32 +98,8 @@ export async function getOrCreateGrant(deviceHash: string, trialOverride?: numbe
   const supabase = getSupabaseServerClient()
   const trialDefault = typeof trialOverride === "number" ? Math.max(0, Math.floor(trialOverride)) : getTrialLimit()
 
-  // ВАЖНО: если в таблице вдруг есть дубли, берём самую свежую запись
-  const { data: existingArr, error: selErr } = await supabase
-    .from(TABLE)
-    .select("id,device_hash,trial_questions_left,paid_until,promo_until,updated_at,created_at")
-    .eq("device_hash", deviceHash)
-    .order("updated_at", { ascending: false })
-    .order("created_at", { ascending: false })
-    .limit(1)
-
-  if (selErr) throw selErr
-  const existing = Array.isArray(existingArr) ? existingArr[0] : null
-  if (existing) return existing as AccessGrant
-
-  const { data: created, error: insErr } = await supabase
-    .from(TABLE)
-    .insert({
-      device_hash: deviceHash,
-      trial_questions_left: trialDefault,
-      paid_until: null,
-      promo_until: null,
-    })
-    .select("id,device_hash,trial_questions_left,paid_until,promo_until")
-    .single()
-
-  if (insErr) throw insErr
-  return created as AccessGrant
+  const { device } = await resolveGrants(supabase, { deviceHash, deviceTrial: trialDefault })
+  return device as AccessGrant | null
 }
 
 export async function requireAccessByDeviceHash(args: {
@@ -115,19 +117,21 @@ export async function requireAccessByDeviceHash(args: {
   if (!isSupabaseServerConfigured()) {
     return { ok: true, status: 200, grant: null }
   }
+  if (!deviceHash) return { ok: true, status: 200, grant: null }
 
-  const grant = await getOrCreateGrant(deviceHash)
+  const supabase = getSupabaseServerClient()
+  const { device } = await resolveGrants(supabase, { deviceHash, deviceTrial: getTrialLimit() })
+  const grant = device as AccessGrant | null
   if (!grant) return { ok: true, status: 200, grant: null }
 
+  // оплаченному (или промо) устройству сессия не нужна — без похода в auth
   if (hasUnlimited(grant)) return { ok: true, status: 200, grant }
 
-  // если пользователь вошёл, проверяем также account:<userId>
-  if (req) {
-    const userId = await getUserIdFromReq(req)
-    if (userId) {
-      const acc = await getOrCreateGrant(`account:${userId}`, 0)
-      if (hasUnlimited(acc)) return { ok: true, status: 200, grant: acc }
-    }
+  // устройство доступ не решает — смотрим account:<userId>, если пользователь вошёл
+  const userId = req ? await getUserIdFromReq(req) : null
+  if (userId) {
+    const { account } = await resolveGrants(supabase, { deviceHash: null, userId, deviceTrial: 0 })
+    if (hasUnlimited(account as AccessGrant | null)) return { ok: true, status: 200, grant: account as AccessGrant }
   }
 
   const left = Number(grant.trial_questions_left ?? 0)
@@ -135,18 +139,11 @@ export async function requireAccessByDeviceHash(args: {
   if (left > 0) {
     if (!consumeTrial) return { ok: true, status: 200, grant }
 
-    const supabase = getSupabaseServerClient()
-    const next = Math.max(0, left - 1)
+    const updated = await consumeTrialQuestion(supabase, grant)
+    if (updated) return { ok: true, status: 200, grant: updated }
 
-    const { data: updated, error: updErr } = await supabase
-      .from(TABLE)
-      .update({ trial_questions_left: next, updated_at: new Date().toISOString() })
-      .eq("id", grant.id)
-      .select("id,device_hash,trial_questions_left,paid_until,promo_until")
-      .single()
-
-    if (updErr) throw updErr
-    return { ok: true, status: 200, grant: (updated as AccessGrant) ?? grant }
+    // параллельные запросы с того же устройства успели выбрать остаток
+    return { ok: false, status: 402, grant: { ...grant, trial_questions_left: 0 }, reason: "payment_required" }
   }
 
   return { ok: false, status: 402, grant, reason: "payment_required" }
@@ -0,0 +1,143 @@
+import { randomUUID } from "crypto"
+
+export const ACCOUNT_PREFIX = "account:"
+
+const TABLE = "access_grants"
+const GRANT_COLUMNS = "id,user_id,device_hash,trial_questions_left,paid_until,promo_until,updated_at,created_at"
+
+export type GrantRecord = {
+  id: string
+  user_id?: string | null
+  device_hash: string
+  trial_questions_left: number | null
+  paid_until: string | null
+  promo_until: string | null
+  updated_at?: string | null
+  created_at?: string | null
+}
+
+export type ProfileFlags = {
+  paid_until?: string | null
+  promo_until?: string | null
+  auto_renew?: boolean | null
+  /** старое имя колонки auto_renew — читаем как fallback, как читал /api/billing/subscription/status */
+  autorenew?: boolean | null
+  subscription_status?: string | null
+}
+
+export type ResolvedGrants = {
+  device: GrantRecord | null
+  account: GrantRecord | null
+  profile: ProfileFlags | null
+  /** ключи, для которых записи пришлось создать */
+  created: string[]
+}
+
+export function accountKeyFor(userId: string | null | undefined) {
+  return userId ? `${ACCOUNT_PREFIX}${userId}` : null
+}
+
+export async function readProfileFlags(sb: any, userId: string): Promise<ProfileFlags | null> {
+  // В Вашей схеме profiles нет user_id. Используем только id.
+  // paid_until добавили миграцией, но делаем fallback на случай старой схемы.
+  // autorenew есть не во всех схемах — без него следующий вариант
+  const cols0 = "paid_until,promo_until,auto_renew,autorenew,subscription_status"
+  const r0 = await sb.from("profiles").select(cols0).eq("id", userId).maybeSingle()
+  if (!r0?.error && r0?.data) return r0.data
+
+  const cols1 = "paid_until,promo_until,auto_renew,subscription_status"
+  const r1 = await sb.from("profiles").select(cols1).eq("id", userId).maybeSingle()
+  if (!r1?.error && r1?.data) return r1.data
+
+  const cols2 = "promo_until,auto_renew,subscription_status"
+  const r2 = await sb.from("profiles").select(cols2).eq("id", userId).maybeSingle()
+  if (!r2?.error && r2?.data) return r2.data
+
+  return null
+}
+
+async function selectLatest(sb: any, keys: string[]): Promise<Map<string, GrantRecord>> {
+  // ВАЖНО: даже если в БД есть дубли, берём самую свежую запись по каждому ключу
+  const { data, error } = await sb
+    .from(TABLE)
+    .select(GRANT_COLUMNS)
+    .in("device_hash", keys)
+    .order("updated_at", { ascending: false })
+    .order("created_at", { ascending: false })
+
+  if (error) throw error
+
+  const out = new Map<string, GrantRecord>()
+  for (const row of (Array.isArray(data) ? data : []) as GrantRecord[]) {
+    if (!out.has(row.device_hash)) out.set(row.device_hash, row)
+  }
+  return out
+}
+
+/**
+ * Гранты устройства и аккаунта одним select по обоим ключам; профиль читается параллельно.
+ * Недостающие записи создаются одним upsert (ignoreDuplicates): если параллельный запрос
+ * успел вставить строку первым, она не перезаписывается и дочитывается отдельно.
+ */
+export async function resolveGrants(
+  sb: any,
+  args: {
+    deviceHash: string | null
+    userId?: string | null
+    deviceTrial: number
+    create?: boolean
+    withProfile?: boolean
+  }
+): Promise<ResolvedGrants> {
+  const deviceHash = String(args.deviceHash || "").trim() || null
+  const userId = args.userId || null
+  const accountKey = accountKeyFor(userId)
+  const keys = [deviceHash, accountKey].filter(Boolean) as string[]
+
+  const profilePromise: Promise<ProfileFlags | null> =
+    args.withProfile && userId ? readProfileFlags(sb, userId).catch(() => null) : Promise.resolve(null)
+
+  if (!keys.length) return { device: null, account: null, profile: await profilePromise, created: [] }
+
+  const found = await selectLatest(sb, keys)
+  const created: string[] = []
+
+  const missing = keys.filter((k) => !found.has(k))
+  if (missing.length && args.create !== false) {
+    const nowIso = new Date().toISOString()
+    const rows = missing.map((key) => ({
+      id: randomUUID(),
+      user_id: key === accountKey ? userId : null,
+      device_hash: key,
+      trial_questions_left: key === accountKey ? 0 : Math.max(0, Math.floor(args.deviceTrial)),
+      paid_until: null,
+      promo_until: null,
+      created_at: nowIso,
+      updated_at: nowIso,
+    }))
+
+    const { data, error } = await sb
+      .from(TABLE)
+      .upsert(rows as any, { onConflict: "device_hash", ignoreDuplicates: true })
+      .select(GRANT_COLUMNS)
+
+    if (error) throw error
+    for (const row of (Array.isArray(data) ? data : []) as GrantRecord[]) {
+      found.set(row.device_hash, row)
+      created.push(row.device_hash)
+    }
+
+    // гонка: строку вставил соседний запрос — берём её, а не наш дефолт
+    const raced = missing.filter((k) => !found.has(k))
+    if (raced.length) {
+      for (const [k, row] of await selectLatest(sb, raced)) found.set(k, row)
+    }
+  }
+
+  return {
+    device: deviceHash ? found.get(deviceHash) ?? null : null,
+    account: accountKey ? found.get(accountKey) ?? null : null,
+    profile: await profilePromise,
+    created,
+  }
+}
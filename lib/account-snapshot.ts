@@ -0,0 +1,47 @@
+import type { AccountSnapshot } from "@/lib/server/account-snapshot"
+
+/**
+ * Клиентская сторона /api/account/snapshot.
+ *
+ * Шапка и страница подписки монтируются одновременно — оба вызова loadAccountSnapshot()
+ * получают один запрос (single-flight), а ответ ещё FRESH_MS отдаётся из памяти: на загрузку
+ * страницы сервер один раз проверяет сессию и читает гранты. Заодно гость без cookie устройства
+ * не получает два разных device hash из двух параллельных ответов.
+ *
+ * После действий, меняющих доступ (оплата, промокод, автосписание), — invalidateAccountSnapshot():
+ * следующий вызов идёт в сеть, даже если старый запрос ещё не вернулся.
+ */
+
+export type { AccountSnapshot }
+
+const SNAPSHOT_URL = "/api/account/snapshot"
+const FRESH_MS = 1500
+
+let inflight: Promise<AccountSnapshot> | null = null
+let last: { at: number; data: AccountSnapshot } | null = null
+let generation = 0
+
+export function invalidateAccountSnapshot() {
+  generation++
+  inflight = null
+  last = null
+}
+
+export function loadAccountSnapshot(): Promise<AccountSnapshot> {
+  if (last && Date.now() - last.at < FRESH_MS) return Promise.resolve(last.data)
+  if (inflight) return inflight
+
+  const gen = generation
+  const p = fetch(SNAPSHOT_URL, { method: "GET", cache: "no-store", credentials: "include" })
+    .then((r) => r.json().catch(() => ({} as any)))
+    .then((data: AccountSnapshot) => {
+      // ответ на запрос до invalidate — устаревший, в кэш его не кладём
+      if (gen === generation) last = { at: Date.now(), data }
+      return data
+    })
+    .finally(() => {
+      if (inflight === p) inflight = null
+    })
+  inflight = p
+  return p
+}
@@ -0,0 +1,267 @@
+/**
+ * Потоковый ответ /api/turbotaai-agent.
+ *
+ * Клиент просит поток полем `stream: true` в теле запроса. Роут проверяет доступ как раньше
+ * (402 — обычным JSON до начала потока), а тело вебхука отдаёт по предложениям:
+ *
+ *   application/x-ndjson
+ *   {"delta":"Я поруч. "}
+ *   {"delta":"Розкажіть, що відбувається?"}
+ *   {"done":true}
+ *
+ * Склейка всех delta — ровно полный ответ. Диалоги начинают TTS на первом предложении,
+ * а не после всего ответа. Ответ без потока (старый вебхук, ошибка) читается как раньше.
+ */
+
+export const AGENT_STREAM_CONTENT_TYPE = "application/x-ndjson"
+
+// короче этого "предложения" ("1.", "Ок.") приклеиваем к следующему — лишний TTS-запрос не нужен
+const MIN_SENTENCE_CHARS = 12
+
+// конец предложения: .!?… (+ закрывающие кавычки/скобки) и пробел, либо перевод строки
+const SENTENCE_END = /[.!?…]+["'»)\]]*\s+|\n+/g
+
+export type AgentStreamEvent = { delta?: string; done?: boolean; error?: string }
+
+/**
+ * Делит накопленный текст на законченные предложения (с хвостовыми пробелами) и остаток.
+ */
+export function splitSentences(text: string): { sentences: string[]; rest: string } {
+  const sentences: string[] = []
+  let start = 0
+  SENTENCE_END.lastIndex = 0
+  for (let m = SENTENCE_END.exec(text); m; m = SENTENCE_END.exec(text)) {
+    const end = m.index + m[0].length
+    if (end - start >= MIN_SENTENCE_CHARS) {
+      sentences.push(text.slice(start, end))
+      start = end
+    }
+  }
+  return { sentences, rest: text.slice(start) }
+}
+
+// ---------- сервер ----------
+
+function answerFromJson(data: any): string {
+  if (!data) return ""
+  if (typeof data === "string") return data
+  const first = Array.isArray(data) ? data[0] ?? {} : data
+  const v = first.output ?? first.response ?? first.text ?? first.answer ?? first.message ?? first.content ?? first.result
+  return typeof v === "string" ? v : v == null ? "" : JSON.stringify(v)
+}
+
+// строка потока вебхука: n8n ({"type":"item","content":"..."}), SSE ("data: ..."), просто JSON
+function deltaFromLine(line: string): string {
+  if (!line.trim()) return ""
+  const sse = line.startsWith("data:")
+  // в SSE пробел после "data:" — разделитель, остальные пробелы — часть токена
+  const s = sse ? line.slice(5).replace(/^ /, "") : line.trim()
+  if (s.trim() === "[DONE]") return ""
+  try {
+    const obj = JSON.parse(s)
+    if (obj && typeof obj === "object" && "type" in obj) {
+      return obj.type === "item" && typeof obj.content === "string" ? obj.content : ""
+    }
+    if (typeof obj?.delta === "string") return obj.delta
+    return answerFromJson(obj)
+  } catch {
+    return sse ? s : line + "\n"
+  }
+}
+
+async function* upstreamDeltas(r: Response, signal?: AbortSignal): AsyncGenerator<string> {
+  const type = String(r.headers.get("content-type") || "").toLowerCase()
+
+  // обычный JSON-ответ вебхука: ждём целиком, дальше режем так же
+  if (!r.body || (type.includes("json") && !type.includes("ndjson"))) {
+    const raw = await r.text()
+    try {
+      yield answerFromJson(JSON.parse(raw))
+    } catch {
+      yield raw
+    }
+    return
+  }
+
+  const lined = type.includes("ndjson") || type.includes("event-stream")
+  // abort signal рвёт pipe сразу: r.body отменяется, висящий read() падает, не дожидаясь чанка
+  const reader = r.body.pipeThrough(new TextDecoderStream(), { signal }).getReader()
+  let buf = ""
+  try {
+    while (true) {
+      const { value, done } = await reader.read()
+      if (done) break
+      if (!lined) {
+        yield value
+        continue
+      }
+      buf += value
+      const lines = buf.split("\n")
+      buf = lines.pop() ?? ""
+      for (const line of lines) {
+        const d = deltaFromLine(line)
+        if (d) yield d
+      }
+    }
+    if (lined && buf) {
+      const d = deltaFromLine(buf)
+      if (d) yield d
+    }
+  } finally {
+    // выход из for-await раньше конца (клиент ушёл) — вебхук дальше не читаем
+    reader.cancel().catch(() => {})
+  }
+}
+
+/**
+ * Тело ответа вебхука -> NDJSON по предложениям (см. формат выше).
+ * Вебхук читается по мере того, как клиент забирает поток (pull); клиент ушёл — тело вебхука
+ * отменяется сразу, сокет не держит слот пула агента до конца ответа.
+ */
+export function sentenceStream(r: Response): ReadableStream<Uint8Array> {
+  const enc = new TextEncoder()
+  const line = (e: AgentStreamEvent) => enc.encode(JSON.stringify(e) + "\n")
+
+  const abort = new AbortController()
+  const deltas = upstreamDeltas(r, abort.signal)
+  let pending = ""
+
+  return new ReadableStream<Uint8Array>({
+    async pull(controller) {
+      try {
+        // читаем вебхук, пока не наберётся хоть одно предложение
+        while (true) {
+          const { value, done } = await deltas.next()
+          if (abort.signal.aborted) return
+          if (done) {
+            if (pending) controller.enqueue(line({ delta: pending }))
+            controller.enqueue(line({ done: true }))
+            controller.close()
+            return
+          }
+          const { sentences, rest } = splitSentences(pending + value)
+          pending = rest
+          if (!sentences.length) continue
+          for (const s of sentences) controller.enqueue(line({ delta: s }))
+          return
+        }
+      } catch (e: any) {
+        if (abort.signal.aborted) return
+        if (pending) controller.enqueue(line({ delta: pending }))
+        controller.enqueue(line({ error: String(e?.message || e) }))
+        controller.close()
+      }
+    },
+    async cancel() {
+      // клиент ушёл (закрыл диалог): рвём чтение вебхука и закрываем генератор
+      abort.abort()
+      if (!r.bodyUsed) await r.body?.cancel().catch(() => {})
+      await deltas.return(undefined).catch(() => {})
+    },
+  })
+}
+
+// ---------- клиент ----------
+
+export function isAgentStream(res: Response): boolean {
+  return String(res.headers.get("content-type") || "").includes(AGENT_STREAM_CONTENT_TYPE)
+}
+
+function textFromEvents(raw: string): string {
+  let text = ""
+  for (const l of raw.split("\n")) {
+    if (!l.trim()) continue
+    try {
+      const e = JSON.parse(l) as AgentStreamEvent
+      if (typeof e.delta === "string") text += e.delta
+    } catch {}
+  }
+  return text
+}
+
+/**
+ * Тело ответа агента так, как диалоги его разбирали раньше: распарсенный JSON или строка.
+ * Для потока onSentence вызывается на каждом предложении по мере прихода,
+ * результат — полный текст ответа (строка).
+ */
+export async function readAgentReply(res: Response, onSentence?: (sentence: string) => void): Promise<any> {
+  if (!isAgentStream(res) || !res.body) {
+    const raw = await res.text()
+    try {
+      return JSON.parse(raw)
+    } catch {
+      return raw
+    }
+  }
+
+  const reader = res.body.pipeThrough(new TextDecoderStream()).getReader()
+  let buf = ""
+  let text = ""
+  let failed = ""
+  while (true) {
+    const { value, done } = await reader.read()
+    if (done) break
+    buf += value
+    const lines = buf.split("\n")
+    buf = lines.pop() ?? ""
+    for (const l of lines) {
+      if (!l.trim()) continue
+      let e: AgentStreamEvent
+      try {
+        e = JSON.parse(l)
+      } catch {
+        continue
+      }
+      if (typeof e.delta === "string" && e.delta) {
+        text += e.delta
+        if (onSentence && e.delta.trim()) onSentence(e.delta.trim())
+      }
+      if (e.error) failed = e.error
+    }
+  }
+  if (failed && !text) throw new Error(`Agent stream failed: ${failed}`)
+  return text
+}
+
+/**
+ * Текст ответа из уже прочитанного тела (перехватчик fetch в шапке читает клон ответа).
+ */
+export function agentReplyText(raw: string, contentType: string | null): string {
+  return String(contentType || "").includes(AGENT_STREAM_CONTENT_TYPE) ? textFromEvents(raw) : raw
+}
+
+/**
+ * Очередь озвучки: первое предложение говорится сразу, всё, что пришло пока оно звучит,
+ * уходит следующим куском одним TTS-запросом.
+ */
+export function createSentenceSpeaker(speak: (text: string) => Promise<void> | void) {
+  let queued: string[] = []
+  let running: Promise<void> | null = null
+  let started = false
+
+  const pump = async () => {
+    while (queued.length) {
+      const text = queued.join(" ")
+      queued = []
+      try {
+        await speak(text)
+      } catch {}
+    }
+    running = null
+  }
+
+  return {
+    push(sentence: string) {
+      started = true
+      queued.push(sentence)
+      if (!running) running = pump()
+    },
+    /** хоть одно предложение ушло в озвучку — полный ответ повторно не говорим */
+    get started() {
+      return started
+    },
+    async drain() {
+      while (running) await running
+    },
+  }
+}
@@ -0,0 +1,49 @@
+/**
+ * Сигнал "заказ изменился" внутри процесса: вебхук/callback WayForPay после коммита заказа
+ * будят всех, кто ждёт этот orderReference в /api/billing/orders/watch.
+ *
+ * Только подсказка, а не источник истины: ожидающий после пробуждения перечитывает заказ
+ * из billing_orders. Вебхук мог прийти в другой инстанс — поэтому watch дополнительно
+ * перечитывает заказ раз в несколько секунд.
+ */
+
+const waiters = new Map<string, Set<() => void>>()
+
+export function notifyOrderChanged(orderReference: string) {
+  const set = waiters.get(orderReference)
+  if (!set) return
+  waiters.delete(orderReference)
+  for (const wake of set) wake()
+}
+
+/**
+ * true — пришёл сигнал по заказу, false — истёк ms или запрос отменён (signal).
+ */
+export function waitForOrderChange(orderReference: string, ms: number, signal?: AbortSignal): Promise<boolean> {
+  return new Promise((resolve) => {
+    if (signal?.aborted || ms <= 0) return resolve(false)
+
+    let set = waiters.get(orderReference)
+    if (!set) {
+      set = new Set()
+      waiters.set(orderReference, set)
+    }
+
+    const finish = (changed: boolean) => {
+      clearTimeout(timer)
+      signal?.removeEventListener("abort", onAbort)
+      const cur = waiters.get(orderReference)
+      if (cur) {
+        cur.delete(wake)
+        if (!cur.size) waiters.delete(orderReference)
+      }
+      resolve(changed)
+    }
+    const wake = () => finish(true)
+    const onAbort = () => finish(false)
+    const timer = setTimeout(() => finish(false), ms)
+
+    set.add(wake)
+    signal?.addEventListener("abort", onAbort, { once: true })
+  })
+}
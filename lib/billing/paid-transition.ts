@@ -0,0 +1,86 @@
+/**
+ * Перевод заказа в paid вместе с продлением доступа: ровно один раз на заказ и с восстановлением
+ * после сбоя (вебхук и callback WayForPay, orders/status).
+ *
+ *   1) claim — условный update: status -> "granting", если заказ не paid и не захвачен
+ *      живым claim'ом (не старше GRANT_LEASE_MS);
+ *   2) продление доступа (grant);
+ *   3) status -> "paid".
+ *
+ * Ошибка на любом шаге — исключение, роут отвечает 5xx без accept, и WayForPay ретраит.
+ * Упал grant — claim снимается (status -> "pending"), ретрай захватит заказ заново; не снялся
+ * (БД недоступна) — claim истечёт через GRANT_LEASE_MS. Пока заказ "granting", параллельный
+ * запрос не продлевает доступ второй раз — он получает "busy" и тоже отвечает 5xx.
+ * Заказа с таким orderReference нет — "not_found": ретрай тут не поможет, вызывающий его логирует.
+ * Если за время grant claim истёк и заказ перехватили, шаг 3 ничего не обновит — это исключение:
+ * доступ мог быть продлён дважды, и это должно попасть в лог, а не пройти молча.
+ */
+
+export const GRANTING = "granting"
+export const GRANT_LEASE_MS = 2 * 60_000
+
+// не-paid обновления (pending/failed) не трогают ни оплаченный заказ, ни захваченный
+export const UNSETTLED_FILTER = `status.is.null,and(status.neq.paid,status.neq.${GRANTING})`
+
+export function claimableFilter(now = Date.now()) {
+  const expired = new Date(now - GRANT_LEASE_MS).toISOString()
+  return `${UNSETTLED_FILTER},and(status.eq.${GRANTING},updated_at.lt."${expired}")`
+}
+
+export type PaidTransition =
+  | { state: "granted"; paidUntil: string | null }
+  // заказ уже оплачен и доступ продлён раньше
+  | { state: "paid" }
+  // другой запрос прямо сейчас продлевает доступ по этому заказу
+  | { state: "busy" }
+  // заказа нет в billing_orders
+  | { state: "not_found" }
+
+export async function transitionToPaid(
+  sb: any,
+  orderReference: string,
+  patch: Record<string, any>,
+  grant: () => Promise<string | null>
+): Promise<PaidTransition> {
+  const claim = await sb
+    .from("billing_orders")
+    .update({ ...patch, status: GRANTING, updated_at: new Date().toISOString() } as any)
+    .eq("order_reference", orderReference)
+    .or(claimableFilter())
+    .select("order_reference")
+  if (claim.error) throw new Error("billing_orders claim failed: " + claim.error.message)
+
+  if (!(claim.data?.length ?? 0)) {
+    const cur = await sb.from("billing_orders").select("status").eq("order_reference", orderReference).maybeSingle()
+    if (cur.error) throw new Error("billing_orders read failed: " + cur.error.message)
+    if (!cur.data) return { state: "not_found" }
+    return String(cur.data.status || "") === "paid" ? { state: "paid" } : { state: "busy" }
+  }
+
+  let paidUntil: string | null
+  try {
+    paidUntil = await grant()
+  } catch (e) {
+    try {
+      await sb
+        .from("billing_orders")
+        .update({ status: "pending", updated_at: new Date().toISOString() } as any)
+        .eq("order_reference", orderReference)
+        .eq("status", GRANTING)
+    } catch {}
+    throw e
+  }
+
+  const done = await sb
+    .from("billing_orders")
+    .update({ status: "paid", updated_at: new Date().toISOString() } as any)
+    .eq("order_reference", orderReference)
+    .eq("status", GRANTING)
+    .select("order_reference")
+  if (done.error) throw new Error("billing_orders paid update failed: " + done.error.message)
+  if (!(done.data?.length ?? 0)) {
+    throw new Error(`billing_orders ${orderReference}: claim lost during grant (lease expired?), access may be extended twice`)
+  }
+
+  return { state: "granted", paidUntil }
+}
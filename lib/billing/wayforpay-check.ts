@@ -0,0 +1,145 @@
+import crypto from "crypto"
+import { upstreamFetch } from "@/lib/server/upstream"
+
+/**
+ * CHECK_STATUS в WayForPay для orders/status, wayforpay/check и wayforpay/sync.
+ *
+ * Одновременные проверки одного orderReference (страница результата, кнопка "Перевірити знову",
+ * cron-сверка) склеиваются в один запрос к WayForPay (single-flight). Конечный ответ
+ * (Approved / Declined / Expired / Refunded ...) кэшируется на TERMINAL_TTL_MS — статус такой
+ * транзакции уже не изменится, повторно спрашивать незачем. Промежуточные (InProcessing и т.п.)
+ * и ошибки не кэшируются.
+ *
+ * Кэш и склейка — внутри процесса; продление доступа по-прежнему защищено условным
+ * переходом заказа в paid в самих роутах.
+ */
+
+const WFP_API = "https://api.wayforpay.com/api"
+const TERMINAL_TTL_MS = Number(process.env.WFP_CHECK_TTL_MS || 10 * 60_000)
+const MAX_CACHED = 5000
+
+// ответы WayForPay, после которых транзакция больше не меняется
+const TERMINAL_TX = new Set(["approved", "declined", "expired", "refunded", "voided", "refused", "rejected", "chargeback"])
+
+export type WfpCheckResult = {
+  ok: boolean
+  httpStatus: number
+  data: any
+  transactionStatus: string
+  /** "WAYFORPAY_NOT_CONFIGURED" — нет merchant account / secret */
+  error?: string
+  /** ответ из кэша конечных статусов, без запроса в WayForPay */
+  cached?: boolean
+}
+
+function env(name: string) {
+  return String(process.env[name] || "").trim()
+}
+
+function credentials() {
+  const merchantAccount = env("WAYFORPAY_MERCHANT_ACCOUNT") || env("WFP_MERCHANT_ACCOUNT")
+  const secret =
+    env("WAYFORPAY_SECRET_KEY") || env("WFP_SECRET_KEY") ||
+    env("WAYFORPAY_MERCHANT_SECRET_KEY") || env("WFP_MERCHANT_SECRET_KEY")
+  return { merchantAccount, secret }
+}
+
+function hmacMd5(secret: string, msg: string) {
+  return crypto.createHmac("md5", secret).update(msg, "utf8").digest("hex")
+}
+
+export function txStatusOf(data: any): string {
+  return String(data?.transactionStatus || data?.transaction_status || data?.status || "").trim()
+}
+
+export function isTerminalTxStatus(tx: string) {
+  return TERMINAL_TX.has(tx.toLowerCase())
+}
+
+const inflight = new Map<string, Promise<WfpCheckResult>>()
+const settled = new Map<string, { result: WfpCheckResult; expires: number }>()
+const stats = { checks: 0, upstream: 0, joined: 0, cached: 0 }
+
+function remember(orderReference: string, result: WfpCheckResult) {
+  settled.delete(orderReference)
+  settled.set(orderReference, { result, expires: Date.now() + TERMINAL_TTL_MS })
+  // Map хранит порядок вставки — первый ключ самый старый
+  while (settled.size > MAX_CACHED) settled.delete(settled.keys().next().value as string)
+}
+
+async function request(orderReference: string): Promise<WfpCheckResult> {
+  const { merchantAccount, secret } = credentials()
+  if (!merchantAccount || !secret) {
+    return { ok: false, httpStatus: 0, data: null, transactionStatus: "", error: "WAYFORPAY_NOT_CONFIGURED" }
+  }
+
+  stats.upstream++
+  const r = await upstreamFetch("wayforpay", env("WAYFORPAY_API_URL") || WFP_API, {
+    method: "POST",
+    headers: { "content-type": "application/json" },
+    body: JSON.stringify({
+      transactionType: "CHECK_STATUS",
+      merchantAccount,
+      orderReference,
+      merchantSignature: hmacMd5(secret, `${merchantAccount};${orderReference}`),
+      apiVersion: 1,
+    }),
+  })
+
+  const data = await r.json().catch(() => null as any)
+  const result: WfpCheckResult = { ok: r.ok && !!data, httpStatus: r.status, data, transactionStatus: txStatusOf(data) }
+  if (result.ok && isTerminalTxStatus(result.transactionStatus)) remember(orderReference, result)
+  return result
+}
+
+/**
+ * Статус транзакции в WayForPay. Бросает только сетевые ошибки (в т.ч. UpstreamBusyError /
+ * UpstreamTimeoutError); ответ не 2xx — ok: false.
+ */
+export function wfpCheckStatus(orderReference: string): Promise<WfpCheckResult> {
+  stats.checks++
+
+  const hit = settled.get(orderReference)
+  if (hit && hit.expires > Date.now()) {
+    stats.cached++
+    return Promise.resolve({ ...hit.result, cached: true })
+  }
+  if (hit) settled.delete(orderReference)
+
+  const running = inflight.get(orderReference)
+  if (running) {
+    stats.joined++
+    return running
+  }
+
+  const p = request(orderReference).finally(() => inflight.delete(orderReference))
+  inflight.set(orderReference, p)
+  return p
+}
+
+/**
+ * Подпись ответа CHECK_STATUS (те же поля, что у вебхука). null — подписи в ответе нет.
+ */
+export function verifyCheckSignature(data: any, orderReference: string): boolean | null {
+  const respSig = String(data?.merchantSignature || data?.merchant_signature || "").trim()
+  if (!respSig) return null
+
+  const { merchantAccount, secret } = credentials()
+  const signString = [
+    merchantAccount,
+    String(data.orderReference || orderReference),
+    String(data.amount || ""),
+    String(data.currency || ""),
+    String(data.authCode || ""),
+    String(data.cardPan || ""),
+    String(data.transactionStatus || ""),
+    String(data.reasonCode || ""),
+  ].join(";")
+
+  return hmacMd5(secret, signString).toUpperCase() === respSig.toUpperCase()
+}
+
+/** Счётчики (GET /api/dev/upstreams): проверок всего, запросов в WayForPay, склеено, из кэша. */
+export function getWfpCheckStats() {
+  return { ...stats, inflight: inflight.size, settled: settled.size }
+}
@@ -123,3 +123,43 @@ export async function generateGoogleTTS(text: string, language: string, gender?:
   const ct = (data.contentType || "audio/mpeg") as string
   return `data:${ct};base64,${data.audioContent as string}`
 }
+
+/**
+ * Клиентский helper для звонков: просит /api/tts отдать сырое аудио
+ * (без base64/JSON) и возвращает Blob, готовый для URL.createObjectURL.
+ * Если сервер ответил старым JSON-форматом — декодирует base64 сам.
+ */
+export async function fetchTtsBlob(
+  text: string,
+  language: string,
+  gender?: string,
+  format: "mp3" | "wav" | "opus" | "aac" = "mp3",
+): Promise<Blob> {
+  const res = await fetch("/api/tts", {
+    method: "POST",
+    headers: { "Content-Type": "application/json", Accept: "audio/*" },
+    body: JSON.stringify({
+      text,
+      language,
+      gender,
+      format,
+      binary: true,
+    }),
+  })
+
+  const ct = res.headers.get("content-type") || ""
+
+  if (res.ok && ct.startsWith("audio/")) {
+    return await res.blob()
+  }
+
+  const data: any = await res.json().catch(() => null)
+  if (!res.ok || !data?.success || !data.audioContent) {
+    throw new Error(data?.error || `TTS error: ${res.status}`)
+  }
+
+  const bin = atob(String(data.audioContent))
+  const bytes = new Uint8Array(bin.length)
+  for (let i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i)
+  return new Blob([bytes], { type: data.contentType || "audio/mpeg" })
+}
@@ -1,43 +1,118 @@
-import { getSupabaseServerClient, isSupabaseServerConfigured } from "@/lib/supabase-server"
+import { getSupabaseServerClient, isSupabaseServerConfigured } from "@/lib/supabase/clients"
+
+/**
+ * Беседа "по окну": реплики одного устройства в одном режиме попадают в одну беседу,
+ * пока между ними не больше WINDOW_MS.
+ *
+ * Основной путь — функция в БД (один запрос, атомарно: параллельные реплики не создают дублей):
+ *
+ *   create or replace function touch_conversation(
+ *     p_device_hash text, p_mode text, p_window_seconds int, p_title text, p_user_email text
+ *   ) returns uuid language plpgsql as $$
+ *   declare v_id uuid;
+ *   begin
+ *     perform pg_advisory_xact_lock(hashtext(p_device_hash || ':' || p_mode));
+ *     update conversations set updated_at = now()
+ *       where id = (select id from conversations
+ *                   where device_hash = p_device_hash and mode = p_mode
+ *                     and updated_at > now() - make_interval(secs => p_window_seconds)
+ *                   order by updated_at desc limit 1)
+ *       returning id into v_id;
+ *     if v_id is null then
+ *       insert into conversations (device_hash, mode, title, user_email, updated_at)
+ *         values (p_device_hash, p_mode, p_title, p_user_email, now())
+ *         returning id into v_id;
+ *     end if;
+ *     return v_id;
+ *   end $$;
+ *
+ * Без функции — select + условный touch (только если беседа ещё в окне) + insert; дубли
+ * тогда возможны только между разными инстансами.
+ *
+ * Поверх — кэш процесса (deviceHash, mode) -> id, живёт ровно окно от последнего touch в БД:
+ * следующие реплики беседу не ищут вовсе, а updated_at обновляется не чаще TOUCH_EVERY_MS
+ * (вместе со вставкой сообщений).
+ */
 
 const WINDOW_MS = 30 * 60 * 1000
+const TOUCH_EVERY_MS = 60 * 1000
+const MAX_CACHED = 10_000
+
+type WindowEntry = { id: string; touchedAt: number }
+
+const windows = new Map<string, WindowEntry>()
+const byConversation = new Map<string, WindowEntry>()
+const resolving = new Map<string, Promise<string | null>>()
+// функции нет в схеме (PGRST202) — дальше сразу запасной путь, без лишнего запроса
+let rpcMissing = false
 
 function toIsoNow() {
   return new Date().toISOString()
 }
 
-export async function getOrCreateConversationId(args: {
-  deviceHash: string
-  mode: string
-  title?: string | null
-  userEmail?: string | null
-}): Promise<string | null> {
-  if (!isSupabaseServerConfigured()) return null
-  if (!args.deviceHash) return null
+function windowKey(deviceHash: string, mode: string) {
+  return `${deviceHash}\u0000${mode}`
+}
 
-  const supabase = getSupabaseServerClient()
+function remember(key: string, id: string) {
+  const prev = windows.get(key)
+  if (prev) byConversation.delete(prev.id)
+  windows.delete(key)
+
+  const entry = { id, touchedAt: Date.now() }
+  windows.set(key, entry)
+  byConversation.set(id, entry)
+
+  // Map хранит порядок вставки — первый ключ самый старый
+  while (windows.size > MAX_CACHED) {
+    const oldest = windows.keys().next().value as string
+    const e = windows.get(oldest)
+    windows.delete(oldest)
+    if (e) byConversation.delete(e.id)
+  }
+}
+
+async function resolveConversation(
+  supabase: any,
+  args: { deviceHash: string; mode: string; title?: string | null; userEmail?: string | null }
+): Promise<string | null> {
+  if (!rpcMissing) {
+    const rpc = await supabase.rpc("touch_conversation", {
+      p_device_hash: args.deviceHash,
+      p_mode: args.mode,
+      p_window_seconds: Math.round(WINDOW_MS / 1000),
+      p_title: args.title ?? null,
+      p_user_email: args.userEmail ?? null,
+    })
+    if (!rpc.error && rpc.data) return String(Array.isArray(rpc.data) ? rpc.data[0] : rpc.data)
+    if (rpc.error?.code === "PGRST202") rpcMissing = true
+  }
+
+  const cutoff = new Date(Date.now() - WINDOW_MS).toISOString()
 
   const { data: last, error: lastErr } = await supabase
     .from("conversations")
-    .select("id,created_at,updated_at")
+    .select("id")
     .eq("device_hash", args.deviceHash)
     .eq("mode", args.mode)
+    .gt("updated_at", cutoff)
     .order("updated_at", { ascending: false })
     .limit(1)
 
   if (lastErr) throw lastErr
 
   const row = (last && last[0]) as any
-  const ts = row?.updated_at || row?.created_at
-  if (row?.id && ts) {
-    const t = Date.parse(ts)
-    if (Number.isFinite(t) && Date.now() - t <= WINDOW_MS) {
-      await supabase
-        .from("conversations")
-        .update({ updated_at: toIsoNow() })
-        .eq("id", row.id)
-      return row.id as string
-    }
+  if (row?.id) {
+    // touch только если беседа всё ещё в окне — иначе создаём новую, как и без гонки
+    const { data: touched, error: touchErr } = await supabase
+      .from("conversations")
+      .update({ updated_at: toIsoNow() })
+      .eq("id", row.id)
+      .gt("updated_at", cutoff)
+      .select("id")
+
+    if (touchErr) throw touchErr
+    if (touched?.length) return row.id as string
   }
 
   const { data: created, error: insErr } = await supabase
@@ -56,22 +131,71 @@ export async function getOrCreateConversationId(args: {
   return (created as any)?.id ?? null
 }
 
-export async function appendMessage(args: {
+export async function getOrCreateConversationId(args: {
+  deviceHash: string
+  mode: string
+  title?: string | null
+  userEmail?: string | null
+}): Promise<string | null> {
+  if (!isSupabaseServerConfigured()) return null
+  if (!args.deviceHash) return null
+
+  const key = windowKey(args.deviceHash, args.mode)
+  const cached = windows.get(key)
+  if (cached && Date.now() - cached.touchedAt <= WINDOW_MS) return cached.id
+
+  // параллельные реплики одного устройства в этом процессе ждут один запрос
+  const running = resolving.get(key)
+  if (running) return running
+
+  const p = resolveConversation(getSupabaseServerClient(), args)
+    .then((id) => {
+      if (id) remember(key, id)
+      return id
+    })
+    .finally(() => resolving.delete(key))
+  resolving.set(key, p)
+  return p
+}
+
+/**
+ * Сообщения реплики одной вставкой; updated_at беседы — не чаще TOUCH_EVERY_MS
+ * (окно в кэше сдвигается только вместе с БД).
+ */
+export async function appendMessages(args: {
   conversationId: string
-  role: string
-  text: string
+  messages: Array<{ role: string; text: string }>
 }) {
   if (!isSupabaseServerConfigured()) return
+  // одна вставка — один now() в БД; разные created_at, чтобы порядок user → assistant сохранился
+  const now = Date.now()
+  const rows = args.messages
+    .filter((m) => m.text)
+    .map((m, i) => ({
+      conversation_id: args.conversationId,
+      role: m.role,
+      text: m.text,
+      created_at: new Date(now + i).toISOString(),
+    }))
+  if (!rows.length) return
+
   const supabase = getSupabaseServerClient()
+  await supabase.from("messages").insert(rows)
 
-  await supabase.from("messages").insert({
-    conversation_id: args.conversationId,
-    role: args.role,
-    text: args.text,
-  })
+  const entry = byConversation.get(args.conversationId)
+  if (entry && Date.now() - entry.touchedAt < TOUCH_EVERY_MS) return
 
   await supabase
     .from("conversations")
     .update({ updated_at: toIsoNow() })
     .eq("id", args.conversationId)
+  if (entry) entry.touchedAt = Date.now()
+}
+
+export async function appendMessage(args: {
+  conversationId: string
+  role: string
+  text: string
+}) {
+  await appendMessages({ conversationId: args.conversationId, messages: [{ role: args.role, text: args.text }] })
 }
@@ -0,0 +1,61 @@
+/**
+ * Keyset-пагинация истории (/api/history/list, /api/history/[id]).
+ *
+ * Курсор — непрозрачная строка (base64url от JSON [timestamp, id]) последней строки страницы.
+ * Следующая страница — строки строго после неё в порядке (timestamp, id), поэтому вставки
+ * между запросами не дают ни дублей, ни пропусков, а запрос не зависит от номера страницы
+ * (в отличие от offset).
+ *
+ * timestamp из курсора попадает в or-фильтр PostgREST — перед этим он проверяется, а строка
+ * берётся как есть (микросекунды Postgres через Date потерялись бы, и equal по ним не совпал бы).
+ */
+
+export type Cursor = { at: string; id: string }
+
+const TIMESTAMP_RE = /^\d{4}-\d{2}-\d{2}[T ][\d:.]+(Z|[+-]\d{2}(:?\d{2})?)?$/
+const ID_RE = /^[\w-]{1,64}$/
+
+export function isTimestamp(v: unknown): v is string {
+  return typeof v === "string" && TIMESTAMP_RE.test(v) && !Number.isNaN(Date.parse(v))
+}
+
+export function encodeCursor(at: string, id: string): string {
+  return Buffer.from(JSON.stringify([at, id]), "utf8").toString("base64url")
+}
+
+export function decodeCursor(raw: string | null | undefined): Cursor | null {
+  if (!raw) return null
+  try {
+    const [at, id] = JSON.parse(Buffer.from(raw, "base64url").toString("utf8"))
+    if (!isTimestamp(at) || typeof id !== "string" || !ID_RE.test(id)) return null
+    return { at, id }
+  } catch {
+    return null
+  }
+}
+
+/**
+ * or-фильтр "строки после курсора": для asc — (col, id) > (at, id), для desc — меньше.
+ */
+export function afterCursorFilter(col: string, cursor: Cursor, dir: "asc" | "desc"): string {
+  const op = dir === "asc" ? "gt" : "lt"
+  return `${col}.${op}."${cursor.at}",and(${col}.eq."${cursor.at}",id.${op}.${cursor.id})`
+}
+
+export function pageLimit(raw: string | null, fallback: number, max: number): number {
+  const n = Math.floor(Number(raw))
+  if (!Number.isFinite(n) || n <= 0) return fallback
+  return Math.min(n, max)
+}
+
+/**
+ * Запрошено limit + 1 строк: лишняя строка значит, что есть следующая страница.
+ * lastCursor — курсор последней строки даже на последней странице (с него клиент
+ * потом дочитывает только новое).
+ */
+export function splitPage<T extends { id: any }>(rows: T[], limit: number, col: keyof T) {
+  const page = rows.slice(0, limit)
+  const last = page[page.length - 1]
+  const lastCursor = last ? encodeCursor(String(last[col]), String(last.id)) : null
+  return { page, nextCursor: rows.length > limit ? lastCursor : null, lastCursor }
+}
@@ -0,0 +1,4 @@
+// Лимиты /api/history/save — общие для клиентской очереди (lib/history/save-queue) и роута
+
+/** Бесед в одной пачке: больше роут не принимает (413), очередь режет пачки по этому числу. */
+export const MAX_SAVE_BATCH = 50
@@ -0,0 +1,188 @@
+import { MAX_SAVE_BATCH } from "@/lib/history/save-limits"
+
+/**
+ * Клиентская write-behind очередь для /api/history/save.
+ * Реплики копятся по беседам и уходят одной пачкой: когда браузер простаивает,
+ * когда вкладку прячут/закрывают или когда набралось MAX_PENDING сообщений.
+ * Бесед в пачке — не больше MAX_SAVE_BATCH (больше роут не примет, 413); остальные — следующими пачками.
+ * Пачка, которую сервер не принял (сеть, не-2xx), возвращается в очередь перед более новыми
+ * репликами и уходит снова через RETRY_MS; после MAX_ATTEMPTS попыток реплики беседы отбрасываются.
+ *
+ * id беседы генерируется на клиенте (sessionStorage "turbota_conv_id"),
+ * поэтому первая реплика не ждёт ответа сервера.
+ */
+
+type QueuedMessage = {
+  role: "user" | "assistant"
+  content: string
+  created_at: string
+}
+
+type BatchEntry = { conversationId: string; mode: string; messages: QueuedMessage[]; attempts: number }
+
+const CONV_KEY = "turbota_conv_id"
+const MAX_PENDING = 12
+const IDLE_TIMEOUT_MS = 4000
+const MAX_ATTEMPTS = 3
+const RETRY_MS = 5000
+
+const pending = new Map<string, { mode: string; messages: QueuedMessage[]; attempts: number }>()
+let pendingCount = 0
+let scheduled: number | null = null
+let retryTimer: number | null = null
+let listenersInstalled = false
+
+function newId() {
+  if (typeof crypto !== "undefined" && "randomUUID" in crypto) return crypto.randomUUID()
+  return `${Date.now()}-${Math.random().toString(36).slice(2)}`
+}
+
+export function getOrCreateClientConversationId(): string {
+  try {
+    const existing = sessionStorage.getItem(CONV_KEY)
+    if (existing) return existing
+    const created = newId()
+    sessionStorage.setItem(CONV_KEY, created)
+    return created
+  } catch {
+    return newId()
+  }
+}
+
+function takeBatches(): BatchEntry[][] {
+  const entries = Array.from(pending.entries()).map(([conversationId, v]) => ({
+    conversationId,
+    mode: v.mode,
+    messages: v.messages,
+    attempts: v.attempts,
+  }))
+  pending.clear()
+  pendingCount = 0
+  const batches: BatchEntry[][] = []
+  for (let i = 0; i < entries.length; i += MAX_SAVE_BATCH) batches.push(entries.slice(i, i + MAX_SAVE_BATCH))
+  return batches
+}
+
+function batchBody(batch: BatchEntry[]) {
+  return JSON.stringify({ batch: batch.map(({ attempts: _attempts, ...e }) => e) })
+}
+
+// неудачная отправка: реплики — обратно в очередь, впереди тех, что пришли за это время
+function requeue(batch: BatchEntry[]) {
+  let requeued = 0
+  for (const e of batch) {
+    if (e.attempts + 1 >= MAX_ATTEMPTS) continue
+    const newer = pending.get(e.conversationId)
+    pending.set(e.conversationId, {
+      mode: e.mode,
+      messages: newer ? [...e.messages, ...newer.messages] : e.messages,
+      attempts: e.attempts + 1,
+    })
+    pendingCount += e.messages.length
+    requeued++
+  }
+  if (!requeued || retryTimer != null) return
+  retryTimer = window.setTimeout(() => {
+    retryTimer = null
+    scheduleFlush()
+  }, RETRY_MS)
+}
+
+async function send(batch: BatchEntry[]) {
+  try {
+    const r = await fetch("/api/history/save", {
+      method: "POST",
+      headers: { "content-type": "application/json" },
+      credentials: "include",
+      body: batchBody(batch),
+      keepalive: true,
+    })
+    if (!r.ok) requeue(batch)
+  } catch {
+    requeue(batch)
+  }
+}
+
+function cancelScheduled() {
+  if (scheduled == null) return
+  const w = window as any
+  try {
+    if (typeof w.cancelIdleCallback === "function") w.cancelIdleCallback(scheduled)
+    else window.clearTimeout(scheduled)
+  } catch {}
+  scheduled = null
+}
+
+function scheduleFlush() {
+  if (scheduled != null) return
+  const w = window as any
+  if (typeof w.requestIdleCallback === "function") {
+    scheduled = w.requestIdleCallback(() => {
+      scheduled = null
+      void flushHistory()
+    }, { timeout: IDLE_TIMEOUT_MS })
+  } else {
+    scheduled = window.setTimeout(() => {
+      scheduled = null
+      void flushHistory()
+    }, 1500)
+  }
+}
+
+/**
+ * Уход со страницы: fetch может не успеть, поэтому sendBeacon (куки он шлёт).
+ */
+function flushOnHide() {
+  cancelScheduled()
+  if (!pendingCount) return
+  for (const batch of takeBatches()) {
+    try {
+      const blob = new Blob([batchBody(batch)], { type: "application/json" })
+      // ответа у beacon нет: принят в очередь браузера — считаем доставленным
+      if (navigator.sendBeacon && navigator.sendBeacon("/api/history/save", blob)) continue
+    } catch {}
+    void send(batch)
+  }
+}
+
+function installListeners() {
+  if (listenersInstalled || typeof window === "undefined") return
+  listenersInstalled = true
+  window.addEventListener("pagehide", flushOnHide)
+  document.addEventListener("visibilitychange", () => {
+    if (document.visibilityState === "hidden") flushOnHide()
+  })
+}
+
+export async function flushHistory(): Promise<void> {
+  cancelScheduled()
+  if (!pendingCount) return
+  await Promise.all(takeBatches().map(send))
+}
+
+export function enqueueHistoryTurn(args: {
+  conversationId?: string | null
+  mode?: string
+  userText?: string | null
+  assistantText?: string | null
+}) {
+  if (typeof window === "undefined") return
+  installListeners()
+
+  const conversationId = args.conversationId || getOrCreateClientConversationId()
+  const now = Date.now()
+  const messages: QueuedMessage[] = []
+  // разные created_at, чтобы порядок user → assistant сохранился в истории
+  if (args.userText) messages.push({ role: "user", content: args.userText, created_at: new Date(now).toISOString() })
+  if (args.assistantText)
+    messages.push({ role: "assistant", content: args.assistantText, created_at: new Date(now + 1).toISOString() })
+  if (!messages.length) return
+
+  const slot = pending.get(conversationId) ?? { mode: args.mode || "chat", messages: [], attempts: 0 }
+  slot.messages.push(...messages)
+  pending.set(conversationId, slot)
+  pendingCount += messages.length
+
+  if (pendingCount >= MAX_PENDING) void flushHistory()
+  else scheduleFlush()
+}
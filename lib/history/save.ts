@@ -1,4 +1,4 @@
-import { getSupabaseAdmin } from "@/lib/supabase/admin"
+import { getSupabaseAdmin } from "@/lib/supabase/clients"
 
 export async function upsertConversation(args: {
   conversationId: string
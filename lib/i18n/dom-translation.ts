@@ -0,0 +1,289 @@
+// @ts-nocheck
+"use client"
+
+// DOM translation: walks the live document and swaps text/attributes in place.
+
+import { getTextDirection } from "./language-utils"
+
+/**
+ * Extracts all text nodes from an element, including nested elements
+ */
+export function extractTextNodes(element: Element): Text[] {
+  const textNodes: Text[] = []
+  const walker = document.createTreeWalker(element, NodeFilter.SHOW_TEXT, {
+    acceptNode: (node) => {
+      return node.textContent && node.textContent.trim() ? NodeFilter.FILTER_ACCEPT : NodeFilter.FILTER_REJECT
+    },
+  })
+
+  let node: Node | null
+  while ((node = walker.nextNode())) {
+    const textNode = node as Text
+    if (textNode.textContent && textNode.textContent.trim()) {
+      textNodes.push(textNode)
+    }
+  }
+
+  return textNodes
+}
+
+/**
+ * Comprehensive element translation with complete text replacement
+ */
+export function translateElement(element: Element, translations: Record<string, string>): void {
+  try {
+    // Skip elements marked as no-translate
+    if (element.hasAttribute("data-no-translate") || element.closest("[data-no-translate]")) {
+      return
+    }
+
+    // Handle data-i18n attribute first (highest priority)
+    const i18nKey = element.getAttribute("data-i18n")
+    if (i18nKey && translations[i18nKey]) {
+      element.textContent = translations[i18nKey]
+      return
+    }
+
+    // Handle common translatable attributes
+    const translatableAttributes = [
+      "placeholder",
+      "title",
+      "alt",
+      "aria-label",
+      "aria-description",
+      "data-tooltip",
+      "value",
+    ]
+
+    translatableAttributes.forEach((attr) => {
+      const attrValue = element.getAttribute(attr)
+      if (attrValue && translations[attrValue]) {
+        element.setAttribute(attr, translations[attrValue])
+      }
+    })
+
+    // Handle text content for leaf elements (no children)
+    if (element.children.length === 0 && element.textContent) {
+      const text = element.textContent.trim()
+      if (text && translations[text]) {
+        element.textContent = translations[text]
+      }
+    } else {
+      // For elements with children, check direct text nodes
+      const childNodes = Array.from(element.childNodes)
+      childNodes.forEach((node) => {
+        if (node.nodeType === Node.TEXT_NODE && node.textContent) {
+          const text = node.textContent.trim()
+          if (text && translations[text]) {
+            node.textContent = translations[text]
+          }
+        } else if (node.nodeType === Node.ELEMENT_NODE) {
+          // Recursively translate child elements
+          translateElement(node as Element, translations)
+        }
+      })
+    }
+  } catch (error) {
+    console.warn("Error translating element:", error)
+  }
+}
+
+/**
+ * Complete document translation with thorough coverage
+ */
+export function translateDocument(languageCode: string, translations: Record<string, string> = {}): void {
+  try {
+    // Ensure we're in browser environment
+    if (typeof document === "undefined") {
+      console.warn("translateDocument called in non-browser environment")
+      return
+    }
+
+    console.log(`🌐 Starting complete document translation to ${languageCode}`)
+
+    // Update document language and direction
+    document.documentElement.lang = languageCode
+    document.documentElement.dir = getTextDirection(languageCode)
+
+    // Update page title if it has a translation key
+    const titleElement = document.querySelector("title")
+    if (titleElement) {
+      const titleText = titleElement.textContent?.trim()
+      if (titleText && translations[titleText]) {
+        titleElement.textContent = translations[titleText]
+      }
+    }
+
+    // Update meta description
+    const metaDescription = document.querySelector('meta[name="description"]')
+    if (metaDescription) {
+      const content = metaDescription.getAttribute("content")
+      if (content && translations[content]) {
+        metaDescription.setAttribute("content", translations[content])
+      }
+    }
+
+    // Translate all elements with data-i18n attributes (highest priority)
+    const elementsWithI18n = document.querySelectorAll("[data-i18n]")
+    elementsWithI18n.forEach((element) => {
+      const key = element.getAttribute("data-i18n")
+      if (key && translations[key]) {
+        element.textContent = translations[key]
+      }
+    })
+
+    // Comprehensive translation of all text-containing elements
+    const textSelectors = [
+      "h1",
+      "h2",
+      "h3",
+      "h4",
+      "h5",
+      "h6", // Headings
+      "p",
+      "span",
+      "div",
+      "a",
+      "li",
+      "td",
+      "th", // Text containers
+      "button",
+      "label",
+      "legend",
+      "option", // Form elements
+      "[placeholder]",
+      "[title]",
+      "[alt]",
+      "[aria-label]", // Attributes
+    ]
+
+    textSelectors.forEach((selector) => {
+      const elements = document.querySelectorAll(selector)
+      elements.forEach((element) => {
+        translateElement(element, translations)
+      })
+    })
+
+    // Special handling for form elements
+    const formElements = document.querySelectorAll("input, textarea, select")
+    formElements.forEach((element) => {
+      // Translate placeholder
+      const placeholder = element.getAttribute("placeholder")
+      if (placeholder && translations[placeholder]) {
+        element.setAttribute("placeholder", translations[placeholder])
+      }
+
+      // Translate title
+      const title = element.getAttribute("title")
+      if (title && translations[title]) {
+        element.setAttribute("title", translations[title])
+      }
+
+      // Translate aria-label
+      const ariaLabel = element.getAttribute("aria-label")
+      if (ariaLabel && translations[ariaLabel]) {
+        element.setAttribute("aria-label", translations[ariaLabel])
+      }
+
+      // For select options
+      if (element.tagName === "SELECT") {
+        const options = element.querySelectorAll("option")
+        options.forEach((option) => {
+          const optionText = option.textContent?.trim()
+          if (optionText && translations[optionText]) {
+            option.textContent = translations[optionText]
+          }
+        })
+      }
+    })
+
+    // Translate all text nodes in the body
+    if (document.body) {
+      translateAllTextNodes(document.body, translations)
+    }
+
+    console.log(`✅ Document translation to ${languageCode} completed`)
+  } catch (error) {
+    console.warn("Error translating document:", error)
+  }
+}
+
+/**
+ * Translate all text nodes in an element recursively
+ */
+function translateAllTextNodes(element: Element, translations: Record<string, string>): void {
+  const walker = document.createTreeWalker(element, NodeFilter.SHOW_TEXT, {
+    acceptNode: (node) => {
+      // Skip text nodes in script, style, or no-translate elements
+      const parent = node.parentElement
+      if (!parent) return NodeFilter.FILTER_REJECT
+
+      if (parent.tagName === "SCRIPT" || parent.tagName === "STYLE") {
+        return NodeFilter.FILTER_REJECT
+      }
+
+      if (parent.hasAttribute("data-no-translate") || parent.closest("[data-no-translate]")) {
+        return NodeFilter.FILTER_REJECT
+      }
+
+      return node.textContent && node.textContent.trim() ? NodeFilter.FILTER_ACCEPT : NodeFilter.FILTER_REJECT
+    },
+  })
+
+  const textNodes: Text[] = []
+  let node: Node | null
+  while ((node = walker.nextNode())) {
+    textNodes.push(node as Text)
+  }
+
+  textNodes.forEach((textNode) => {
+    const text = textNode.textContent?.trim()
+    if (text && translations[text]) {
+      textNode.textContent = translations[text]
+    }
+  })
+}
+
+/**
+ * Force complete page retranslation - removes all previous language traces
+ */
+export function forceCompleteRetranslation(languageCode: string, translations: Record<string, string>): void {
+  try {
+    if (typeof document === "undefined") return
+
+    console.log(`🔄 Force retranslating entire page to ${languageCode}`)
+
+    // Clear any language-specific classes
+    document.body.classList.forEach((className) => {
+      if (className.startsWith("lang-") || className === "rtl" || className === "ltr") {
+        document.body.classList.remove(className)
+      }
+    })
+
+    // Add new language class
+    document.body.classList.add(`lang-${languageCode}`)
+    if (getTextDirection(languageCode) === "rtl") {
+      document.body.classList.add("rtl")
+    } else {
+      document.body.classList.add("ltr")
+    }
+
+    // Update document properties
+    document.documentElement.lang = languageCode
+    document.documentElement.dir = getTextDirection(languageCode)
+
+    // Force complete retranslation
+    translateDocument(languageCode, translations)
+
+    // Trigger custom event for components to update
+    window.dispatchEvent(
+      new CustomEvent("forceLanguageUpdate", {
+        detail: { languageCode, translations },
+      }),
+    )
+
+    console.log(`✅ Force retranslation to ${languageCode} completed`)
+  } catch (error) {
+    console.error("Error in force retranslation:", error)
+  }
+}
@@ -15,13 +15,13 @@ import {
   defaultLanguage as baseDefaultLanguage,
 } from "./languages"
 import { getTranslations } from "./translations"
+import { translateWithFallback as translateWithFallbackUtil, translateWithParams } from "./language-utils"
+import { forceCompleteRetranslation } from "./dom-translation"
 import {
-  translateDocument,
-  translateElement,
-  translateWithFallback as translateWithFallbackUtil,
-  translateWithParams,
-  forceCompleteRetranslation,
-} from "./translation-utils"
+  retranslateIndexed,
+  translateMutations,
+  translateSubtree,
+} from "./translation-index"
 
 interface LanguageContextType {
   currentLanguage: Language
@@ -89,6 +89,8 @@ export const LanguageProvider = ({ children }: LanguageProviderProps) => {
     new Map(),
   )
   const previousLanguageRef = useRef<string>(resolvedDefaultLanguage.code)
+  const translationsRef = useRef<Record<string, string>>(translations)
+  const indexBuiltRef = useRef(false)
 
   // основной перевод по ключу
   const t = (key: string, params?: Record<string, any>): string => {
@@ -265,12 +267,8 @@ export const LanguageProvider = ({ children }: LanguageProviderProps) => {
         document.documentElement.dir = newLanguage.direction
         document.documentElement.lang = newLanguage.code
 
+        // сам перевод DOM делает эффект ниже — обходом индекса, без полного пересканирования
         setTimeout(() => {
-          forceCompleteRetranslation(
-            newLanguage.code,
-            newTranslations as Record<string, string>,
-          )
-
           window.dispatchEvent(
             new CustomEvent("languageChanged", {
               detail: {
@@ -302,50 +300,51 @@ export const LanguageProvider = ({ children }: LanguageProviderProps) => {
     }
   }
 
-  const translateElementWithCurrentTranslations = (element: Element): void => {
-    try {
-      translateElement(element, translations)
-    } catch (error) {
-      console.warn("Element translation error:", error)
-    }
-  }
+  translationsRef.current = translations
 
+  // переводим только то, что добавили мутации; записи копим и разбираем раз за кадр
   useEffect(() => {
-    if (typeof window !== "undefined" && !observerRef.current && isReady) {
-      observerRef.current = new MutationObserver((mutations) => {
-        mutations.forEach((mutation) => {
-          if (mutation.type === "childList" && mutation.addedNodes.length > 0) {
-            mutation.addedNodes.forEach((node) => {
-              if (node.nodeType === Node.ELEMENT_NODE) {
-                setTimeout(() => {
-                  translateElementWithCurrentTranslations(node as Element)
-                }, 50)
-              }
-            })
-          }
-        })
-      })
+    if (typeof window === "undefined" || !isReady || observerRef.current) return
 
-      observerRef.current.observe(document.body, {
-        childList: true,
-        subtree: true,
-      })
+    let pending: MutationRecord[] = []
+    let frame: number | null = null
+
+    const flush = () => {
+      frame = null
+      const batch = pending
+      pending = []
+      translateMutations(batch, translationsRef.current, getTranslations("en"))
     }
 
+    observerRef.current = new MutationObserver((mutations) => {
+      pending.push(...mutations)
+      if (frame == null) frame = window.requestAnimationFrame(flush)
+    })
+
+    observerRef.current.observe(document.body, {
+      childList: true,
+      subtree: true,
+    })
+
     return () => {
-      if (observerRef.current) {
-        observerRef.current.disconnect()
-      }
+      if (frame != null) window.cancelAnimationFrame(frame)
+      observerRef.current?.disconnect()
+      observerRef.current = null
     }
-  }, [isReady, translations])
+  }, [isReady])
 
+  // первый раз — один полный обход для построения индекса, дальше — только по индексу
   useEffect(() => {
-    if (typeof document !== "undefined" && !isLoading && translations && isReady) {
-      try {
-        translateDocument(currentLanguage.code, translations)
-      } catch (error) {
-        console.warn("Document translation error:", error)
+    if (typeof document === "undefined" || isLoading || !translations || !isReady) return
+    try {
+      if (!indexBuiltRef.current) {
+        indexBuiltRef.current = true
+        translateSubtree(document.documentElement, translations, getTranslations("en"))
+      } else {
+        retranslateIndexed(translations, getTranslations("en"))
       }
+    } catch (error) {
+      console.warn("Document translation error:", error)
     }
   }, [translations, isLoading, currentLanguage.code, isReady])
 
@@ -0,0 +1,122 @@
+// @ts-nocheck
+
+// Language codes, text direction and key lookup with params/fallback. No DOM, safe on the server.
+
+/**
+ * Translates text with parameter replacement
+ */
+export function translateWithParams(
+  key: string,
+  params: Record<string, string>,
+  translations: Record<string, string> = {},
+): string {
+  let text = translations[key] || key
+
+  // Replace parameters
+  Object.entries(params).forEach(([paramKey, paramValue]) => {
+    text = text.replace(new RegExp(`{{${paramKey}}}`, "g"), paramValue)
+  })
+
+  return text
+}
+
+/**
+ * Translates with fallback language support
+ */
+export function translateWithFallback(
+  key: string,
+  primaryTranslations: Record<string, string>,
+  fallbackTranslations: Record<string, string>,
+): string {
+  return primaryTranslations[key] || fallbackTranslations[key] || key
+}
+
+/**
+ * Check if a language uses right-to-left text direction
+ */
+export function isRTLLanguage(languageCode: string): boolean {
+  const rtlLanguages = ["ar", "he", "fa", "ur"]
+  return rtlLanguages.includes(languageCode)
+}
+
+/**
+ * Get text direction for a language
+ */
+export function getTextDirection(languageCode: string): "ltr" | "rtl" {
+  return isRTLLanguage(languageCode) ? "rtl" : "ltr"
+}
+
+/**
+ * Validate language code
+ */
+export function isValidLanguageCode(code: string): boolean {
+  const validCodes = [
+    "en",
+    "ru",
+    "uk",
+    "es",
+    "fr",
+    "de",
+    "it",
+    "pt",
+    "pl",
+    "tr",
+    "ar",
+    "zh",
+    "ja",
+    "ko",
+    "vi",
+    "he",
+    "el",
+    "sv",
+    "da",
+    "et",
+    "lv",
+    "lt",
+    "ro",
+    "az",
+    "kk",
+    "ky",
+    "tg",
+    "uz",
+  ]
+  return validCodes.includes(code)
+}
+
+/**
+ * Get language name in its native script
+ */
+export function getNativeLanguageName(languageCode: string): string {
+  const nativeNames: Record<string, string> = {
+    en: "English",
+    ru: "Русский",
+    uk: "Українська",
+    es: "Español",
+    fr: "Français",
+    de: "Deutsch",
+    it: "Italiano",
+    pt: "Português",
+    pl: "Polski",
+    tr: "Türkçe",
+    ar: "العربية",
+    zh: "中文",
+    ja: "日本語",
+    ko: "한국어",
+    vi: "Tiếng Việt",
+    he: "עברית",
+    el: "Ελληνικά",
+    sv: "Svenska",
+    da: "Dansk",
+    et: "Eesti",
+    lv: "Latviešu",
+    lt: "Lietuvių",
+    ro: "Română",
+    az: "Azərbaycan",
+    kk: "Қазақша",
+    ky: "Кыргызча",
+    tg: "Тоҷикӣ",
+    uz: "O'zbek",
+  }
+
+  return nativeNames[languageCode] || languageCode
+}
@@ -0,0 +1,59 @@
+// @ts-nocheck
+"use client"
+
+// Locale and voice parameters for speech recognition/synthesis.
+
+import { getVoicePreferenceTable, getSpeechParams } from "./voice-index"
+
+/**
+ * Gets the appropriate locale string for speech recognition and synthesis
+ */
+export function getLocaleForLanguage(languageCode: string): string {
+  const localeMap: Record<string, string> = {
+    en: "en-US",
+    ru: "ru-RU",
+    uk: "uk-UA",
+    es: "es-ES",
+    fr: "fr-FR",
+    de: "de-DE",
+    it: "it-IT",
+    pt: "pt-PT",
+    pl: "pl-PL",
+    tr: "tr-TR",
+    ar: "ar-SA",
+    zh: "zh-CN",
+    ja: "ja-JP",
+    ko: "ko-KR",
+    vi: "vi-VN",
+    he: "he-IL",
+    el: "el-GR",
+    sv: "sv-SE",
+    da: "da-DK",
+    et: "et-EE",
+    lv: "lv-LV",
+    lt: "lt-LT",
+    ro: "ro-RO",
+    az: "az-AZ",
+    kk: "kk-KZ",
+    ky: "ky-KG",
+    tg: "tg-TJ",
+    uz: "uz-UZ",
+  }
+
+  return localeMap[languageCode] || "en-US"
+}
+
+/**
+ * Gets native voice preferences for each language with accent authenticity.
+ * Tables live in voice-tables.generated.ts (scripts/gen_voice_tables.py), parsed once.
+ */
+export function getNativeVoicePreferences(): Record<string, Record<string, string[]>> {
+  return getVoicePreferenceTable()
+}
+
+/**
+ * Gets optimal speech parameters for native accent authenticity
+ */
+export function getNativeSpeechParameters(languageCode: string, gender: "male" | "female") {
+  return getSpeechParams(languageCode, gender)
+}
@@ -0,0 +1,126 @@
+// @ts-nocheck
+
+// Plain-text helpers for agent responses and TTS input. No DOM, safe on the server.
+
+/**
+ * Extract plain text from various response formats
+ */
+export function extractPlainText(response: any): string {
+  if (typeof response === "string") {
+    return response
+  }
+
+  if (response && typeof response === "object") {
+    if (response.output !== undefined) return extractPlainText(response.output)
+    if (response.response !== undefined) return extractPlainText(response.response)
+    if (response.message !== undefined) return extractPlainText(response.message)
+    if (response.text !== undefined) return extractPlainText(response.text)
+    if (response.answer !== undefined) return extractPlainText(response.answer)
+    if (response.result !== undefined) return extractPlainText(response.result)
+    if (response.content !== undefined) return extractPlainText(response.content)
+
+    if (Array.isArray(response)) {
+      if (response.length > 0) {
+        return extractPlainText(response[0])
+      }
+      return ""
+    }
+
+    for (const key in response) {
+      if (typeof response[key] === "string") {
+        return response[key]
+      }
+      if (response[key] && typeof response[key] === "object") {
+        const extracted = extractPlainText(response[key])
+        if (extracted) return extracted
+      }
+    }
+
+    return JSON.stringify(response)
+  }
+
+  return String(response || "")
+}
+
+/**
+ * Language detection utility
+ */
+export function detectLanguage(text: string): string {
+  // Check for Turkish characters
+  if (/[çğıöşüÇĞIİÖŞÜ]/.test(text)) {
+    return "tr"
+  }
+
+  // Check for Cyrillic characters (Russian, Ukrainian, etc.)
+  if (/[\u0400-\u04FF]/.test(text)) {
+    // Differentiate between Ukrainian and Russian (very basic)
+    if (/[іїєґ]/i.test(text)) {
+      return "uk" // Ukrainian
+    } else {
+      return "ru" // Russian
+    }
+  }
+
+  // Check for Arabic characters
+  if (/[\u0600-\u06FF]/.test(text)) {
+    return "ar"
+  }
+
+  // Check for Chinese characters
+  if (/[\u4E00-\u9FFF]/.test(text)) {
+    return "zh"
+  }
+
+  // Check for Japanese characters
+  if (/[\u3040-\u309F\u30A0-\u30FF]/.test(text)) {
+    return "ja"
+  }
+
+  // Check for Korean characters
+  if (/[\uAC00-\uD7AF]/.test(text)) {
+    return "ko"
+  }
+
+  // Default to English
+  return "en"
+}
+
+/**
+ * Clean response text utility
+ */
+export function cleanResponseText(text: string): string {
+  if (!text) return ""
+
+  // Handle the specific format [{"output":" text"}]
+  if (text.startsWith('[{"output":')) {
+    try {
+      const parsed = JSON.parse(text)
+      if (Array.isArray(parsed) && parsed.length > 0 && parsed[0].output) {
+        return parsed[0].output.trim()
+      }
+    } catch (e) {
+      console.log("Failed to parse response format:", e)
+    }
+  }
+
+  return text
+    .replace(/\n\n/g, " ") // Replace double newlines with spaces
+    .replace(/\*\*/g, "") // Remove asterisks (markdown bold)
+    .replace(/\n/g, " ") // Replace single newlines with spaces
+    .replace(/```/g, "") // Remove code blocks
+    .replace(/^\s*[{[]|\s*[}\]]$/g, "") // Remove outer braces/brackets
+    .replace(/"output":|"response":|"text":|"message":/g, "") // Remove common JSON keys
+    .replace(/["{}[\],]/g, "") // Remove quotes, braces, brackets, commas
+    .replace(/\s+/g, " ") // Normalize whitespace
+    .trim()
+}
+
+/**
+ * Format text for speech synthesis
+ */
+export function formatTextForSpeech(text: string): string {
+  return cleanResponseText(text)
+    .replace(/([.!?])\s*([A-Z])/g, "$1 $2") // Ensure proper pauses between sentences
+    .replace(/\s+/g, " ") // Normalize whitespace
+    .trim()
+}
@@ -3,7 +3,7 @@
 
 import { useState, useEffect } from "react"
 import { useLanguage } from "./language-context"
-import { extractTranslatableStrings } from "./translation-utils"
+import { extractTranslatableStrings } from "./translation-tooling"
 
 export function TranslationDebug() {
   const { missingTranslations, translations, currentLanguage } = useLanguage()
@@ -3,7 +3,7 @@
 
 import { useState } from "react"
 import { Button } from "@/components/ui/button"
-import { generateTranslationTemplate } from "./translation-utils"
+import { generateTranslationTemplate } from "./translation-tooling"
 
 export function TranslationExtractor() {
   const [isOpen, setIsOpen] = useState(false)
@@ -0,0 +1,247 @@
+"use client"
+
+// Incremental DOM translation: translate only what mutations add, remember the source key per node
+
+const TRANSLATABLE_ATTRIBUTES = ["placeholder", "title", "alt", "aria-label", "aria-description", "data-tooltip", "value"]
+const ATTRIBUTE_SELECTOR = ["[data-i18n]", ...TRANSLATABLE_ATTRIBUTES.map((a) => `[${a}]`)].join(",")
+
+type TextEntry = { key: string; written: string }
+type AttrEntry = Record<string, TextEntry>
+
+/**
+ * Source key per translated text node / element attribute.
+ * `written` is the value we put there last: if the node no longer holds it,
+ * React (or someone else) replaced the text and the key is re-derived.
+ */
+const textKeys = new WeakMap<Text, TextEntry>()
+const attrKeys = new WeakMap<Element, AttrEntry>()
+
+/**
+ * Live nodes that carry a translation. Disconnected nodes are dropped
+ * on the next walk, so the sets stay proportional to what is on screen.
+ */
+const indexedTexts = new Set<Text>()
+const indexedElements = new Set<Element>()
+
+/**
+ * document.title is tracked by value, not by text node: assigning document.title
+ * (ours or Next's metadata) replaces the node inside <title>.
+ */
+let titleEntry: TextEntry | null = null
+
+function isKey(key: string, translations: Record<string, string>, knownKeys?: Record<string, string>) {
+  return key in translations || (!!knownKeys && key in knownKeys)
+}
+
+function isSkippedElement(el: Element | null): boolean {
+  if (!el) return true
+  const tag = el.tagName
+  // TITLE — see applyHead
+  if (tag === "SCRIPT" || tag === "STYLE" || tag === "NOSCRIPT" || tag === "TITLE") return true
+  return el.closest("[data-no-translate]") !== null
+}
+
+/**
+ * Collects non-empty text nodes under root (root itself may be a text node).
+ */
+export function collectTextNodes(root: Node): Text[] {
+  if (root.nodeType === Node.TEXT_NODE) {
+    return root.nodeValue && root.nodeValue.trim() ? [root as Text] : []
+  }
+  if (root.nodeType !== Node.ELEMENT_NODE && root.nodeType !== Node.DOCUMENT_FRAGMENT_NODE) return []
+
+  const out: Text[] = []
+  const walker = document.createTreeWalker(root, NodeFilter.SHOW_TEXT, {
+    acceptNode: (node) => (node.nodeValue && node.nodeValue.trim() ? NodeFilter.FILTER_ACCEPT : NodeFilter.FILTER_REJECT),
+  })
+
+  let node: Node | null
+  while ((node = walker.nextNode())) out.push(node as Text)
+  return out
+}
+
+function applyText(node: Text, translations: Record<string, string>, knownKeys?: Record<string, string>) {
+  const current = node.nodeValue || ""
+  const prev = textKeys.get(node)
+  const key = prev && prev.written === current ? prev.key : current.trim()
+  if (!key || !isKey(key, translations, knownKeys)) return
+  if (isSkippedElement(node.parentElement)) return
+
+  const value = translations[key] ?? key
+  if (current !== value) node.nodeValue = value
+  textKeys.set(node, { key, written: value })
+  indexedTexts.add(node)
+}
+
+function applyAttribute(
+  el: Element,
+  attr: string,
+  translations: Record<string, string>,
+  knownKeys?: Record<string, string>,
+) {
+  const current = el.getAttribute(attr)
+  if (!current) return
+
+  const entry = attrKeys.get(el)
+  const prev = entry?.[attr]
+  const key = prev && prev.written === current ? prev.key : current
+  if (!isKey(key, translations, knownKeys)) return
+
+  const value = translations[key] ?? key
+  if (current !== value) el.setAttribute(attr, value)
+  attrKeys.set(el, { ...entry, [attr]: { key, written: value } })
+  indexedElements.add(el)
+}
+
+function applyAttributes(el: Element, translations: Record<string, string>, knownKeys?: Record<string, string>) {
+  if (isSkippedElement(el)) return
+
+  const i18nKey = el.getAttribute("data-i18n")
+  if (i18nKey && translations[i18nKey]) {
+    const value = translations[i18nKey]
+    if (el.textContent !== value) el.textContent = value
+    indexedElements.add(el)
+  }
+
+  for (const attr of TRANSLATABLE_ATTRIBUTES) applyAttribute(el, attr, translations, knownKeys)
+}
+
+/**
+ * Page title and meta description: outside body, so the mutation observer never reports them.
+ * Runs on the initial document walk and on every language switch.
+ */
+function applyHead(translations: Record<string, string>, knownKeys?: Record<string, string>) {
+  const current = document.title
+  if (current) {
+    const key = titleEntry && titleEntry.written === current ? titleEntry.key : current.trim()
+    if (isKey(key, translations, knownKeys)) {
+      const value = translations[key] ?? key
+      if (current !== value) document.title = value
+      titleEntry = { key, written: value }
+    }
+  }
+
+  const meta = document.querySelector('meta[name="description"]')
+  if (meta) applyAttribute(meta, "content", translations, knownKeys)
+}
+
+/**
+ * Translates a freshly added subtree and records it in the index.
+ * knownKeys (usually the English dictionary) lets a node be indexed even when
+ * the current language has no translation for it yet.
+ */
+export function translateSubtree(
+  root: Node,
+  translations: Record<string, string>,
+  knownKeys?: Record<string, string>,
+): void {
+  try {
+    if (typeof document === "undefined") return
+
+    if (root === document.documentElement) applyHead(translations, knownKeys)
+    for (const text of collectTextNodes(root)) applyText(text, translations, knownKeys)
+
+    if (root.nodeType === Node.ELEMENT_NODE || root.nodeType === Node.DOCUMENT_FRAGMENT_NODE) {
+      const parent = root as Element
+      if (root.nodeType === Node.ELEMENT_NODE && parent.matches(ATTRIBUTE_SELECTOR)) {
+        applyAttributes(parent, translations, knownKeys)
+      }
+      parent.querySelectorAll(ATTRIBUTE_SELECTOR).forEach((el) => applyAttributes(el, translations, knownKeys))
+    }
+  } catch (error) {
+    console.warn("Error translating subtree:", error)
+  }
+}
+
+/**
+ * Translates the roots added by a batch of mutation records.
+ * Roots nested inside another added root are skipped — the outer walk covers them.
+ */
+export function translateMutations(
+  mutations: MutationRecord[],
+  translations: Record<string, string>,
+  knownKeys?: Record<string, string>,
+): void {
+  const roots = new Set<Node>()
+  for (const mutation of mutations) {
+    if (mutation.type !== "childList") continue
+    mutation.addedNodes.forEach((node) => {
+      if (node.isConnected) roots.add(node)
+    })
+  }
+
+  for (const root of roots) {
+    let covered = false
+    for (let p = root.parentNode; p; p = p.parentNode) {
+      if (roots.has(p)) {
+        covered = true
+        break
+      }
+    }
+    if (!covered) translateSubtree(root, translations, knownKeys)
+  }
+}
+
+/**
+ * Language switch: walk the index instead of rescanning the document.
+ */
+export function retranslateIndexed(
+  translations: Record<string, string>,
+  knownKeys?: Record<string, string>,
+): void {
+  try {
+    applyHead(translations, knownKeys)
+
+    for (const node of indexedTexts) {
+      if (!node.isConnected) {
+        indexedTexts.delete(node)
+        continue
+      }
+      const entry = textKeys.get(node)
+      if (!entry) continue
+
+      // text was replaced from outside — the stored key no longer applies
+      if (node.nodeValue !== entry.written) {
+        indexedTexts.delete(node)
+        textKeys.delete(node)
+        applyText(node, translations, knownKeys)
+        continue
+      }
+
+      const value = translations[entry.key] ?? entry.key
+      if (node.nodeValue !== value) node.nodeValue = value
+      entry.written = value
+    }
+
+    for (const el of indexedElements) {
+      if (!el.isConnected) {
+        indexedElements.delete(el)
+        continue
+      }
+
+      const i18nKey = el.getAttribute("data-i18n")
+      if (i18nKey && translations[i18nKey] && el.textContent !== translations[i18nKey]) {
+        el.textContent = translations[i18nKey]
+      }
+
+      const entry = attrKeys.get(el)
+      if (!entry) continue
+      for (const attr of Object.keys(entry)) {
+        const e = entry[attr]
+        if (el.getAttribute(attr) !== e.written) {
+          delete entry[attr]
+          continue
+        }
+        const value = translations[e.key] ?? e.key
+        if (e.written !== value) el.setAttribute(attr, value)
+        e.written = value
+      }
+    }
+  } catch (error) {
+    console.warn("Error retranslating index:", error)
+  }
+}
+
+export function translationIndexSize() {
+  return { texts: indexedTexts.size, elements: indexedElements.size }
+}
@@ -1,7 +1,7 @@
 // @ts-nocheck
 import { getTranslations } from "./translations"
 import { languages } from "./languages"
-import { validateTranslations } from "./translation-utils"
+import { validateTranslations } from "./translation-tooling"
 
 export class TranslationManager {
   private static instance: TranslationManager
@@ -0,0 +1,134 @@
+// @ts-nocheck
+
+// Dev tooling: string extraction, key templates and dictionary validation.
+
+/**
+ * Translation validation result interface
+ */
+interface TranslationValidationResult {
+  isValid: boolean
+  missingKeys: string[]
+  errors: string[]
+}
+
+/**
+ * Extracts translatable strings from text or objects
+ */
+export function extractTranslatableStrings(content: any): string[] {
+  const strings: string[] = []
+
+  if (typeof content === "string") {
+    // Skip URLs, emails, and other non-translatable content
+    if (!isNonTranslatable(content)) {
+      strings.push(content)
+    }
+  } else if (Array.isArray(content)) {
+    content.forEach((item) => {
+      strings.push(...extractTranslatableStrings(item))
+    })
+  } else if (typeof content === "object" && content !== null) {
+    Object.values(content).forEach((value) => {
+      strings.push(...extractTranslatableStrings(value))
+    })
+  }
+
+  return [...new Set(strings)] // Remove duplicates
+}
+
+/**
+ * Generates a translation template from an array of strings
+ */
+export function generateTranslationTemplate(strings: string[]): Record<string, string> {
+  const template: Record<string, string> = {}
+
+  strings.forEach((str) => {
+    if (typeof str === "string" && str.trim()) {
+      // Create a key from the string (simplified version)
+      const key = str
+        .toLowerCase()
+        .replace(/[^a-z0-9\s]/g, "")
+        .replace(/\s+/g, "_")
+        .substring(0, 50)
+
+      template[key] = str
+    }
+  })
+
+  return template
+}
+
+/**
+ * Validates translation objects for completeness and correctness
+ */
+export function validateTranslations(
+  baseTranslation: Record<string, any>,
+  targetTranslation: Record<string, any>,
+): TranslationValidationResult {
+  const result: TranslationValidationResult = {
+    isValid: true,
+    missingKeys: [],
+    errors: [],
+  }
+
+  // Check for missing keys
+  const baseKeys = getAllKeys(baseTranslation)
+  const targetKeys = getAllKeys(targetTranslation)
+
+  baseKeys.forEach((key) => {
+    if (!targetKeys.includes(key)) {
+      result.missingKeys.push(key)
+      result.isValid = false
+    }
+  })
+
+  // Check for invalid values
+  Object.entries(targetTranslation).forEach(([key, value]) => {
+    if (typeof value !== "string" && typeof value !== "object") {
+      result.errors.push(`Invalid value type for key "${key}"`)
+      result.isValid = false
+    }
+  })
+
+  return result
+}
+
+/**
+ * Helper function to check if content should not be translated
+ */
+function isNonTranslatable(content: string): boolean {
+  // URLs
+  if (content.match(/^https?:\/\//)) return true
+
+  // Email addresses
+  if (content.match(/^[^\s@]+@[^\s@]+\.[^\s@]+$/)) return true
+
+  // File paths
+  if (content.match(/^[./].*\.(js|ts|tsx|css|png|jpg|svg)$/)) return true
+
+  // Numbers only
+  if (content.match(/^\d+$/)) return true
+
+  // Very short strings (likely not meaningful for translation)
+  if (content.trim().length < 2) return true
+
+  return false
+}
+
+/**
+ * Helper function to get all keys from nested object
+ */
+function getAllKeys(obj: Record<string, any>, prefix = ""): string[] {
+  const keys: string[] = []
+
+  Object.entries(obj).forEach(([key, value]) => {
+    const fullKey = prefix ? `${prefix}.${key}` : key
+
+    if (typeof value === "object" && value !== null && !Array.isArray(value)) {
+      keys.push(...getAllKeys(value, fullKey))
+    } else {
+      keys.push(fullKey)
+    }
+  })
+
+  return keys
+}
@@ -0,0 +1,223 @@
+"use client"
+
+import { SPEECH_PARAMS, VOICE_NAMES } from "./voice-tables.generated"
+
+// Voice selection over speechSynthesis.getVoices(): the preference tables are parsed once,
+// the chosen voice per (language, gender) is cached until the next "voiceschanged".
+
+export type VoiceGender = "female" | "male"
+
+const DEFAULT_SPEECH_PARAMS = { rate: 0.9, pitch: 1.0, volume: 1.0 }
+
+const prefCache = new Map<string, string[]>()
+let prefTable: Record<string, Record<string, string[]>> | null = null
+
+export function getVoicePreferenceNames(languageCode: string, gender: VoiceGender): string[] {
+  const key = `${languageCode}/${gender}`
+  let names = prefCache.get(key)
+  if (!names) {
+    const packed = VOICE_NAMES[key]
+    names = packed ? packed.split("|") : []
+    prefCache.set(key, names)
+  }
+  return names
+}
+
+/**
+ * Same shape the old getNativeVoicePreferences() literal had, built once.
+ */
+export function getVoicePreferenceTable(): Record<string, Record<string, string[]>> {
+  if (prefTable) return prefTable
+  const table: Record<string, Record<string, string[]>> = {}
+  for (const key of Object.keys(VOICE_NAMES)) {
+    const [lang, gender] = key.split("/")
+    table[lang] = table[lang] || {}
+    table[lang][gender] = getVoicePreferenceNames(lang, gender as VoiceGender)
+  }
+  prefTable = table
+  return table
+}
+
+export function getSpeechParams(languageCode: string, gender: VoiceGender) {
+  const p = SPEECH_PARAMS[`${languageCode}/${gender}`]
+  return p ? { rate: p[0], pitch: p[1], volume: p[2] } : { ...DEFAULT_SPEECH_PARAMS }
+}
+
+// ---------- index over the browser voices ----------
+
+let voices: SpeechSynthesisVoice[] = []
+let byName = new Map<string, SpeechSynthesisVoice>()
+const preferred = new Map<string, SpeechSynthesisVoice | null>()
+const selected = new Map<string, SpeechSynthesisVoice | null>()
+let listening = false
+
+function resetVoiceIndex() {
+  voices = []
+  byName = new Map()
+  preferred.clear()
+  selected.clear()
+}
+
+function synth(): SpeechSynthesis | null {
+  return typeof window !== "undefined" && window.speechSynthesis ? window.speechSynthesis : null
+}
+
+/**
+ * Current voice list, read from the browser once per "voiceschanged".
+ */
+export function getIndexedVoices(): SpeechSynthesisVoice[] {
+  const s = synth()
+  if (!s) return []
+
+  if (!listening) {
+    s.addEventListener("voiceschanged", resetVoiceIndex)
+    listening = true
+  }
+
+  if (!voices.length) {
+    voices = s.getVoices()
+    byName = new Map()
+    for (const v of voices) if (!byName.has(v.name)) byName.set(v.name, v)
+  }
+  return voices
+}
+
+/**
+ * First voice from the preference table that the browser actually has (exact name).
+ */
+export function findPreferredVoice(languageCode: string, gender: VoiceGender): SpeechSynthesisVoice | null {
+  const list = getIndexedVoices()
+  if (!list.length) return null
+
+  const key = `${languageCode}/${gender}`
+  if (preferred.has(key)) return preferred.get(key)!
+
+  let found: SpeechSynthesisVoice | null = null
+  for (const name of getVoicePreferenceNames(languageCode, gender)) {
+    const v = byName.get(name)
+    if (v) {
+      found = v
+      break
+    }
+  }
+  preferred.set(key, found)
+  return found
+}
+
+const RU_NAME_HINTS = ["русский", "russian", "irina", "pavel", "dmitry", "aleksandr", "svetlana", "dariya", "ekaterina", "boris"]
+const EN_NAME_HINTS = ["english", "zira", "david", "samantha", "alex"]
+const FEMALE_HINTS = [
+  "female", "woman", "girl", "f)", "женский", "жіночий", "zira", "irina", "samantha",
+  "svetlana", "dariya", "ekaterina", "elena", "katya", "oksana", "milena",
+]
+const MALE_HINTS = [
+  "male", "man", "boy", "m)", "мужской", "чоловічий", "david", "alex", "pavel",
+  "dmitry", "aleksandr", "boris", "maxim", "sergey",
+]
+const NATIVE_NAME_HINTS = [
+  "svetlana", "dariya", "ekaterina", "dmitry", "aleksandr", "boris", "irina", "pavel",
+  "русский", "russian", "українська", "ukrainian",
+]
+
+function isLanguageVoice(v: SpeechSynthesisVoice, lang: string) {
+  const langLower = lang.toLowerCase()
+  const voiceLang = v.lang.toLowerCase()
+  const voiceName = v.name.toLowerCase()
+
+  if (voiceLang.startsWith(langLower)) return true
+  if (voiceLang.includes(`${langLower}-`)) return true
+
+  if (lang === "ru") return voiceLang.includes("ru-") || RU_NAME_HINTS.some((h) => voiceName.includes(h))
+  if (lang === "uk") {
+    return voiceLang.includes("uk-") || voiceName.includes("українська") || voiceName.includes("ukrainian")
+  }
+  if (lang === "en") return voiceLang.includes("en-") || EN_NAME_HINTS.some((h) => voiceName.includes(h))
+  return false
+}
+
+function scoreVoice(voice: SpeechSynthesisVoice, langCode: string, gender: VoiceGender) {
+  let score = 10
+
+  const lowerName = voice.name.toLowerCase()
+  const lowerLang = voice.lang.toLowerCase()
+
+  const genderHints = gender === "female" ? FEMALE_HINTS : MALE_HINTS
+  if (genderHints.some((hint) => lowerName.includes(hint))) score += 40
+
+  if (lowerName.includes("neural")) score += 30
+  if (lowerName.includes("wavenet")) score += 25
+  if (lowerName.includes("premium")) score += 22
+  if (lowerName.includes("enhanced")) score += 20
+  if (lowerName.includes("professional")) score += 18
+  if (lowerName.includes("therapeutic")) score += 18
+  if (lowerName.includes("natural")) score += 15
+
+  if (lowerName.includes("google")) score += 20
+  if (lowerName.includes("microsoft")) score += 18
+  if (lowerName.includes("yandex") && langCode === "ru") score += 25
+
+  if (NATIVE_NAME_HINTS.some((nv) => lowerName.includes(nv))) score += 45
+  if (lowerLang.startsWith(langCode.toLowerCase())) score += 20
+
+  if (!voice.default) score += 12
+  if (voice.localService) score += 10
+
+  return score
+}
+
+function pickNativeVoice(langCode: string, gender: VoiceGender): SpeechSynthesisVoice | null {
+  const list = voices
+
+  // 1) exact name from the preference table
+  const exact = findPreferredVoice(langCode, gender)
+  if (exact) return exact
+
+  // 2) partial name match, still in preference order
+  for (const name of getVoicePreferenceNames(langCode, gender)) {
+    const nameLower = name.toLowerCase()
+    const partial = list.find((v) => {
+      const vLower = v.name.toLowerCase()
+      return vLower.includes(nameLower) || nameLower.includes(vLower)
+    })
+    if (partial) return partial
+  }
+
+  // 3) any voice of the language, best score wins
+  let best: SpeechSynthesisVoice | null = null
+  let bestScore = -1
+  for (const v of list) {
+    if (!isLanguageVoice(v, langCode)) continue
+    const score = scoreVoice(v, langCode, gender)
+    if (score > bestScore) {
+      best = v
+      bestScore = score
+    }
+  }
+  if (best) return best
+
+  // 4) cross-language fallbacks: uk -> ru -> en -> anything
+  if (langCode === "uk") {
+    const ru = selectNativeVoice("ru", gender)
+    if (ru) return ru
+  }
+  if (langCode !== "en") {
+    const en = selectNativeVoice("en", gender)
+    if (en) return en
+  }
+  return list[0] ?? null
+}
+
+/**
+ * Best browser voice for (language, gender). Computed once per voice list,
+ * so per-utterance selection is a map lookup.
+ */
+export function selectNativeVoice(languageCode: string, gender: VoiceGender = "female"): SpeechSynthesisVoice | null {
+  if (!getIndexedVoices().length) return null
+
+  const key = `${languageCode}/${gender}`
+  if (selected.has(key)) return selected.get(key)!
+
+  const voice = pickNativeVoice(languageCode, gender)
+  selected.set(key, voice)
+  return voice
+}
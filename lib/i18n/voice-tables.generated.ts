@@ -0,0 +1,41 @@
+// Сгенерировано scripts/gen_voice_tables.py из scripts/voice_tables.json — не править руками.
+
+/** "<lang>/<gender>" -> имена голосов по убыванию предпочтения, через "|" */
+export const VOICE_NAMES: Record<string, string> = {
+  "en/female": "Microsoft Hazel Desktop - English (Great Britain)|Google UK English Female|Microsoft Susan Desktop - English (United States)|en-GB-SoniaNeural|en-GB-LibbyNeural|en-US-JennyNeural|en-US-AriaNeural|Microsoft Zira Desktop - English (United States)|Google US English Female|Samantha|Victoria|Karen|Moira|Tessa|Veena|Fiona|Allison|Ava (Enhanced)|Serena",
+  "en/male": "Microsoft George Desktop - English (Great Britain)|Google UK English Male|Microsoft David Desktop - English (United States)|en-GB-RyanNeural|en-GB-ThomasNeural|en-US-GuyNeural|en-US-BrandonNeural|Google US English Male|Microsoft David|Alex|Daniel|Tom|Oliver|Arthur|Thomas|Fred",
+  "tr/female": "tr-TR-EmelNeural|tr-TR-SerapNeural|Microsoft Tolga Desktop - Turkish (Turkey)|Google Türkçe (female)|tr-TR-female|Turkish Female|Ayşe|Fatma|Zeynep|Elif|Selin",
+  "tr/male": "tr-TR-AhmetNeural|tr-TR-BurakNeural|Microsoft Tolga Desktop - Turkish (Turkey)|Google Türkçe (male)|tr-TR-male|Turkish Male|Mehmet|Ali|Mustafa|Emre|Kemal",
+  "ru/female": "ru-RU-Wavenet-A|ru-RU-Wavenet-C|ru-RU-Standard-A|ru-RU-Standard-C|Microsoft Irina Desktop - Russian (Russia)|Google русский женский премиум|Microsoft Irina Enhanced - Russian|Svetlana Professional Voice|Elena Therapeutic Voice|Katya Natural Voice|Oksana Premium Voice|Dariya Enhanced Voice|Milena Therapeutic Voice|Anastasia Premium Voice|Vera Natural Voice|Microsoft Irina - Russian (Russia)|Google русский (female)|Russian Female Premium|Русский женский премиум|Русский женский голос|Russian Female Natural|Русская женщина",
+  "ru/male": "ru-RU-Wavenet-B|ru-RU-Wavenet-D|ru-RU-Standard-B|ru-RU-Standard-D|Microsoft Pavel Desktop - Russian (Russia)|Google русский мужской премиум|Microsoft Pavel Enhanced - Russian|Dmitry Professional Voice|Aleksandr Therapeutic Voice|Pavel Natural Voice|Maxim Premium Voice|Sergey Enhanced Voice|Mikhail Therapeutic Voice|Andrey Premium Voice|Igor Natural Voice|Nikolai Professional Voice|Vladimir Premium Voice|Microsoft Pavel - Russian (Russia)|Google русский (male)|Russian Male Premium|Русский мужской премиум|Русский мужской голос|Russian Male Natural|Русский мужчина",
+  "uk/female": "uk-UA-Standard-A|uk-UA-Wavenet-A|Google Українська (female)|Google Українська|Ukrainian Female|uk-UA-female|ru-RU-Wavenet-A|ru-RU-Wavenet-C|ru-RU-Standard-A|Microsoft Irina Desktop - Russian (Russia)|Google русский (female)|Microsoft Irina (female)|Milena|Katya Premium",
+  "uk/male": "uk-UA-Wavenet-B|uk-UA-Standard-B|Google Українська (male)|Google Українська|Ukrainian Male|uk-UA-male|ru-RU-Wavenet-B|ru-RU-Wavenet-D|ru-RU-Standard-B|Microsoft Pavel Desktop - Russian (Russia)|Google русский (male)|Microsoft Pavel (male)|Maxim|Dmitry Professional",
+  "es/female": "es-ES-ElviraNeural|es-ES-AbrilNeural|Microsoft Helena Desktop - Spanish (Spain)|Google español (female)|es-ES-female|Spanish Female|Mónica|Esperanza|Paloma",
+  "es/male": "es-ES-AlvaroNeural|es-ES-ArnauNeural|Microsoft Pablo Desktop - Spanish (Spain)|Google español (male)|es-ES-male|Spanish Male|Jorge|Diego|Carlos",
+  "fr/female": "fr-FR-DeniseNeural|fr-FR-EloiseNeural|Microsoft Hortense Desktop - French (France)|Google français (female)|fr-FR-female|French Female|Amélie|Céline|Marie",
+  "fr/male": "fr-FR-HenriNeural|fr-FR-ClaudeNeural|Microsoft Paul Desktop - French (France)|Google français (male)|fr-FR-male|French Male|Thomas|Henri|Pierre",
+  "de/female": "de-DE-KatjaNeural|de-DE-AmalaNeural|Microsoft Katja Desktop - German (Germany)|Google Deutsch (female)|de-DE-female|German Female|Anna|Petra|Marlene",
+  "de/male": "de-DE-ConradNeural|de-DE-KillianNeural|Microsoft Stefan Desktop - German (Germany)|Google Deutsch (male)|de-DE-male|German Male|Hans|Ralf|Markus",
+  "it/female": "it-IT-ElsaNeural|it-IT-IsabellaNeural|Microsoft Elsa Desktop - Italian (Italy)|Google italiano (female)|it-IT-female|Italian Female|Alice|Federica|Paola",
+  "it/male": "it-IT-DiegoNeural|it-IT-BenignoNeural|Microsoft Cosimo Desktop - Italian (Italy)|Google italiano (male)|it-IT-male|Italian Male|Luca|Giorgio|Marco",
+}
+
+/** "<lang>/<gender>" -> [rate, pitch, volume] */
+export const SPEECH_PARAMS: Record<string, [number, number, number]> = {
+  "tr/female": [0.85, 1.1, 0.98],
+  "tr/male": [0.82, 0.9, 0.98],
+  "ru/female": [0.82, 1.12, 0.95],
+  "ru/male": [0.78, 0.88, 0.97],
+  "uk/female": [0.88, 1.08, 0.98],
+  "uk/male": [0.82, 0.88, 0.98],
+  "en/female": [0.92, 1.05, 1],
+  "en/male": [0.9, 0.98, 1],
+  "es/female": [0.9, 1.1, 1],
+  "es/male": [0.88, 0.95, 1],
+  "fr/female": [0.87, 1.08, 1],
+  "fr/male": [0.85, 0.96, 1],
+  "de/female": [0.83, 1.06, 1],
+  "de/male": [0.81, 0.94, 1],
+  "it/female": [0.91, 1.12, 1],
+  "it/male": [0.89, 0.97, 1],
+}
@@ -1,11 +1,10 @@
 import { cookies } from "next/headers"
 import type { NextRequest } from "next/server"
-import { createServerClient } from "@supabase/ssr"
-import { createClient } from "@supabase/supabase-js"
 import { randomUUID } from "crypto"
+import { ACCOUNT_PREFIX, resolveGrants } from "@/lib/access/grants"
+import { getSupabaseAdminOrNull, getRequestUser, getPendingAuthCookies } from "@/lib/supabase/clients"
 
 const DEVICE_COOKIE = "ta_device_hash"
-const ACCOUNT_PREFIX = "account:"
 
 export type AccessSummary = {
   ok: true
@@ -92,116 +91,20 @@ function cookieDomainFromHost(host: string | null) {
   return undefined
 }
 
-function makeAdmin() {
-  const url = env("NEXT_PUBLIC_SUPABASE_URL") || env("SUPABASE_URL")
-  const key = env("SUPABASE_SERVICE_ROLE_KEY") || env("SUPABASE_SERVICE_KEY")
-  if (!url || !key) return null
-  return createClient(url, key, {
-    auth: { persistSession: false, autoRefreshToken: false, detectSessionInUrl: false },
-  })
-}
-
 async function getUserFromCookies(): Promise<{ userId: string | null; email: string | null; pending: CookieToSet[] }> {
   const url = env("NEXT_PUBLIC_SUPABASE_URL")
   const anon = env("NEXT_PUBLIC_SUPABASE_ANON_KEY")
-  const pending: CookieToSet[] = []
+  const pending: CookieToSet[] = getPendingAuthCookies()
   if (!url || !anon) return { userId: null, email: null, pending }
 
-  const jar = cookies()
-  const sb = createServerClient(url, anon, {
-    cookies: {
-      getAll() {
-        return jar.getAll()
-      },
-      setAll(list) {
-        pending.push(...(list as any))
-      },
-    },
-  })
-
   try {
-    const { data } = await sb.auth.getUser()
+    const { data } = await getRequestUser()
     return { userId: data?.user?.id ?? null, email: (data?.user?.email as any) ?? null, pending }
   } catch {
     return { userId: null, email: null, pending }
   }
 }
 
-async function findGrant(admin: any, key: string): Promise<GrantRow | null> {
-  // ВАЖНО: даже если в БД есть дубли, берём самую свежую запись
-  const { data, error } = await admin
-    .from("access_grants")
-    .select("*")
-    .eq("device_hash", key)
-    .order("updated_at", { ascending: false })
-    .order("created_at", { ascending: false })
-    .limit(1)
-
-  if (error) return null
-  const row = Array.isArray(data) ? data[0] : null
-  return (row ?? null) as GrantRow | null
-}
-
-async function ensureGrant(admin: any, key: string, userId: string | null, trial: number, nowIso: string): Promise<GrantRow> {
-  let g = await findGrant(admin, key)
-
-  if (!g) {
-    await admin
-      .from("access_grants")
-      .insert({
-        id: randomUUID(),
-        user_id: userId,
-        device_hash: key,
-        trial_questions_left: trial,
-        paid_until: null,
-        promo_until: null,
-        created_at: nowIso,
-        updated_at: nowIso,
-      } as any)
-  }
-
-  g = await findGrant(admin, key)
-
-  if (g && userId && !g.user_id) {
-    const up = await admin
-      .from("access_grants")
-      .update({ user_id: userId, updated_at: nowIso } as any)
-      .eq("device_hash", key)
-      .select("*")
-      .limit(1)
-
-    const row = Array.isArray(up?.data) ? up.data[0] : null
-    g = (row ?? g) as any
-  }
-
-  return (
-    g ?? {
-      id: randomUUID(),
-      user_id: userId,
-      device_hash: key,
-      trial_questions_left: trial,
-      paid_until: null,
-      promo_until: null,
-      created_at: nowIso,
-      updated_at: nowIso,
-    }
-  )
-}
-
-async function readProfile(admin: any, userId: string) {
-  // В Вашей схеме profiles нет user_id. Используем только id.
-  // paid_until добавили миграцией, но делаем fallback на случай старой схемы.
-  const cols1 = "paid_until,promo_until,auto_renew,subscription_status"
-  const r1 = await admin.from("profiles").select(cols1).eq("id", userId).maybeSingle()
-  if (!r1?.error && r1?.data) return r1.data
-
-  const cols2 = "promo_until,auto_renew,subscription_status"
-  const r2 = await admin.from("profiles").select(cols2).eq("id", userId).maybeSingle()
-  if (!r2?.error && r2?.data) return r2.data
-
-  return null
-}
-
 export async function buildAccessSummary(req: NextRequest): Promise<{
   summary: AccessSummary
   pendingCookies: CookieToSet[]
@@ -227,7 +130,7 @@ export async function buildAccessSummary(req: NextRequest): Promise<{
   const isLoggedIn = Boolean(userId)
   const accountKey = isLoggedIn && userId ? `${ACCOUNT_PREFIX}${userId}` : null
 
-  const admin = makeAdmin()
+  const admin = getSupabaseAdminOrNull()
   if (!admin) {
     const s: AccessSummary = {
       ok: true,
@@ -255,11 +158,28 @@ export async function buildAccessSummary(req: NextRequest): Promise<{
     return { summary: s, pendingCookies: pending, needSetDeviceCookie, deviceHash, cookieDomain }
   }
 
-  const guest = await ensureGrant(admin, deviceHash, null, trial, nowIso)
-  let account = accountKey ? await ensureGrant(admin, accountKey, userId!, 0, nowIso) : null
+  const resolved = await resolveGrants(admin, {
+    deviceHash,
+    userId,
+    deviceTrial: trial,
+    withProfile: isLoggedIn,
+  }).catch(() => null)
+
+  const guest: GrantRow = resolved?.device ?? {
+    device_hash: deviceHash,
+    trial_questions_left: trial,
+    paid_until: null,
+    promo_until: null,
+  }
+  let account: GrantRow | null = accountKey
+    ? resolved?.account ?? { device_hash: accountKey, user_id: userId, trial_questions_left: 0, paid_until: null, promo_until: null }
+    : null
+  const prof = resolved?.profile ?? null
+
+  const writes: PromiseLike<any>[] = []
 
   // ── Auto-claim: persist guest dates into account grant ───────────
-  if (userId && account) {
+  if (userId && account && resolved?.account) {
     const gPaid = guest.paid_until || null
     const gPromo = guest.promo_until || null
     const aPaid = account.paid_until || null
@@ -270,20 +190,20 @@ export async function buildAccessSummary(req: NextRequest): Promise<{
 
     const needClaim =
       (bestPaid && bestPaid !== aPaid) ||
-      (bestPromo && bestPromo !== aPromo)
+      (bestPromo && bestPromo !== aPromo) ||
+      !account.user_id
 
     if (needClaim && accountKey) {
       const patch: Record<string, any> = { updated_at: nowIso }
       if (bestPaid && bestPaid !== aPaid) patch.paid_until = bestPaid
       if (bestPromo && bestPromo !== aPromo) patch.promo_until = bestPromo
+      if (!account.user_id) patch.user_id = userId
 
-      await admin
-        .from("access_grants")
-        .update(patch)
-        .eq("device_hash", accountKey)
+      writes.push(admin.from("access_grants").update(patch).eq("device_hash", accountKey))
 
       account = {
         ...account,
+        user_id: account.user_id || userId,
         paid_until: bestPaid || account.paid_until,
         promo_until: bestPromo || account.promo_until,
       }
@@ -304,8 +224,6 @@ export async function buildAccessSummary(req: NextRequest): Promise<{
   const access: AccessSummary["access"] =
     hasPaid ? "paid" : hasPromo ? "promo" : guestTrialLeft > 0 ? "trial" : "none"
 
-  const prof = isLoggedIn && userId ? await readProfile(admin, userId) : null
-
   // Sync profiles metadata from grants if needed
   if (prof && userId) {
     const profPaid = (prof as any)?.paid_until || null
@@ -317,10 +235,13 @@ export async function buildAccessSummary(req: NextRequest): Promise<{
       const sp: Record<string, any> = { updated_at: nowIso }
       if (mergedPaid && mergedPaid !== profPaid) sp.paid_until = mergedPaid
       if (mergedPromo && mergedPromo !== profPromo) sp.promo_until = mergedPromo
-      await admin.from("profiles").update(sp).eq("id", userId)
+      writes.push(admin.from("profiles").update(sp).eq("id", userId))
     }
   }
-  const auto_renew = Boolean((prof as any)?.auto_renew ?? false)
+  // claim и синхронизация профиля друг от друга не зависят — шлём параллельно
+  if (writes.length) await Promise.all(writes)
+
+  const auto_renew = Boolean((prof as any)?.auto_renew ?? (prof as any)?.autorenew ?? false)
   const subscription_status = String((prof as any)?.subscription_status || (hasPaid || hasPromo ? "active" : "inactive"))
 
   const s: AccessSummary = {
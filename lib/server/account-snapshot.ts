@@ -0,0 +1,58 @@
+import type { NextRequest } from "next/server"
+import { buildAccessSummary, type AccessSummary, type CookieToSet } from "@/lib/server/access-summary"
+
+/**
+ * Снимок аккаунта для шапки и страницы подписки: доступ, подписка и промокод одним ответом.
+ *
+ * Раньше страница подписки ходила в /api/subscription/summary и /api/billing/subscription/status,
+ * а шапка — в /api/account/summary; каждый роут заново проверял сессию и читал гранты/профиль.
+ * Здесь — один buildAccessSummary (одна проверка сессии, один resolveGrants вместе с профилем),
+ * всё остальное выводится из него, без отдельных запросов.
+ *
+ * Поля AccessSummary лежат на верхнем уровне как есть — ответ годится везде, где читали
+ * /api/account/summary; subscription — те же поля, что отдавал /api/billing/subscription/status.
+ */
+
+export type AccountSnapshot = AccessSummary & {
+  subscription: {
+    autoRenew: boolean
+    subscriptionStatus: string
+    paidUntil: string | null
+  }
+  promo: {
+    active: boolean
+    promoUntil: string | null
+  }
+}
+
+export async function buildAccountSnapshot(req: NextRequest): Promise<{
+  snapshot: AccountSnapshot
+  pendingCookies: CookieToSet[]
+  needSetDeviceCookie: boolean
+  deviceHash: string
+  cookieDomain: string | undefined
+}> {
+  const built = await buildAccessSummary(req)
+  const { summary } = built
+
+  const snapshot: AccountSnapshot = {
+    ...summary,
+    subscription: {
+      autoRenew: summary.auto_renew,
+      subscriptionStatus: summary.subscription_status,
+      paidUntil: summary.paid_until,
+    },
+    promo: {
+      active: summary.hasPromo,
+      promoUntil: summary.promo_until,
+    },
+  }
+
+  return {
+    snapshot,
+    pendingCookies: built.pendingCookies,
+    needSetDeviceCookie: built.needSetDeviceCookie,
+    deviceHash: built.deviceHash,
+    cookieDomain: built.cookieDomain,
+  }
+}
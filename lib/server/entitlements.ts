@@ -1,5 +1,5 @@
-import { getSupabaseAdmin } from "@/lib/supabase/admin"
 import type { Principal } from "@/lib/server/principal"
+import { getSupabaseAdmin } from "@/lib/supabase/clients"
 
 export type AccessState = {
   hasAccess: boolean
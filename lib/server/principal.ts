@@ -1,6 +1,6 @@
 import crypto from "crypto"
 import { NextRequest } from "next/server"
-import { getSupabaseAdmin } from "@/lib/supabase/admin"
+import { getSupabaseAdmin } from "@/lib/supabase/clients"
 
 export type Principal =
   | { kind: "user"; userId: string; email: string | null }
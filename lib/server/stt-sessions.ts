@@ -0,0 +1,95 @@
+/**
+ * Буфер инкрементальной загрузки аудио для /api/stt.
+ * Клиент шлёт куски записи с session id и порядковым номером, пока человек говорит;
+ * на финальном куске сервер склеивает всё, что накопилось, и сразу отдаёт в Whisper.
+ *
+ * Хранится в памяти процесса: если финал пришёл на другой инстанс или куска не хватает,
+ * роут отвечает 409 и клиент повторяет запрос целым блобом.
+ */
+
+type SttSession = {
+  parts: Array<Uint8Array | undefined>
+  bytes: number
+  mime: string
+  touchedAt: number
+}
+
+const SESSION_TTL_MS = 2 * 60 * 1000
+const MAX_SESSION_BYTES = 25 * 1024 * 1024 // лимит Whisper
+const MAX_SESSIONS = 500
+
+const sessions = new Map<string, SttSession>()
+
+function sweep(now: number) {
+  for (const [id, s] of sessions) {
+    if (now - s.touchedAt > SESSION_TTL_MS) sessions.delete(id)
+  }
+  while (sessions.size > MAX_SESSIONS) {
+    const oldest = sessions.keys().next().value as string
+    sessions.delete(oldest)
+  }
+}
+
+export function isValidSttSessionId(id: string | null | undefined): id is string {
+  return !!id && /^[A-Za-z0-9_-]{8,80}$/.test(id)
+}
+
+/**
+ * Кладёт кусок с номером seq. Возвращает false, если сессия переполнена.
+ */
+export function appendSttChunk(id: string, seq: number, chunk: Uint8Array, mime: string): boolean {
+  const now = Date.now()
+  sweep(now)
+
+  let s = sessions.get(id)
+  if (!s) {
+    s = { parts: [], bytes: 0, mime, touchedAt: now }
+    sessions.set(id, s)
+  }
+
+  const prev = s.parts[seq]
+  if (prev) s.bytes -= prev.byteLength
+
+  if (s.bytes + chunk.byteLength > MAX_SESSION_BYTES) {
+    sessions.delete(id)
+    return false
+  }
+
+  s.parts[seq] = chunk
+  s.bytes += chunk.byteLength
+  s.touchedAt = now
+  if (seq === 0 && mime) s.mime = mime
+  return true
+}
+
+/**
+ * Забирает склеенное аудио (куски 0..lastSeq) и удаляет сессию.
+ * null — если сессии нет или в последовательности есть дыры.
+ */
+export function takeSttSession(id: string, lastSeq: number): { bytes: Uint8Array; mime: string } | null {
+  const s = sessions.get(id)
+  if (!s) return null
+
+  let total = 0
+  for (let i = 0; i <= lastSeq; i++) {
+    const p = s.parts[i]
+    if (!p) return null
+    total += p.byteLength
+  }
+
+  sessions.delete(id)
+
+  const out = new Uint8Array(total)
+  let off = 0
+  for (let i = 0; i <= lastSeq; i++) {
+    const p = s.parts[i] as Uint8Array
+    out.set(p, off)
+    off += p.byteLength
+  }
+
+  return { bytes: out, mime: s.mime }
+}
+
+export function dropSttSession(id: string) {
+  sessions.delete(id)
+}
@@ -0,0 +1,114 @@
+import crypto from "crypto"
+import { promises as fs } from "fs"
+import path from "path"
+
+/**
+ * In-process кэш готового TTS-аудио.
+ * Ключ — sha256 от нормализованного текста + язык + пол + голос + формат,
+ * значение — готовый буфер. LRU по количеству байт; если задан TTS_CACHE_DIR,
+ * записи дополнительно сбрасываются на диск и переживают рестарт процесса.
+ */
+
+export type TtsCacheKeyInput = {
+  text: string
+  language: string
+  gender: string
+  voice: string
+  format: string
+}
+
+export type TtsCacheEntry = {
+  audio: Buffer
+  contentType: string
+}
+
+const MAX_BYTES = Number(process.env.TTS_CACHE_MAX_BYTES || 64 * 1024 * 1024)
+const MAX_ENTRY_BYTES = Number(process.env.TTS_CACHE_MAX_ENTRY_BYTES || 2 * 1024 * 1024)
+const DISK_DIR = (process.env.TTS_CACHE_DIR || "").trim()
+
+const mem = new Map<string, TtsCacheEntry>()
+let memBytes = 0
+
+export function normalizeTtsText(text: string): string {
+  return String(text || "")
+    .normalize("NFC")
+    .replace(/\s+/g, " ")
+    .trim()
+}
+
+export function ttsCacheKey(input: TtsCacheKeyInput): string {
+  const raw = [normalizeTtsText(input.text), input.language, input.gender, input.voice, input.format].join("\u0000")
+  return crypto.createHash("sha256").update(raw, "utf8").digest("hex")
+}
+
+function diskPath(key: string) {
+  return path.join(DISK_DIR, `${key}.bin`)
+}
+
+function remember(key: string, entry: TtsCacheEntry) {
+  const size = entry.audio.byteLength
+  if (size > MAX_ENTRY_BYTES || size > MAX_BYTES) return
+
+  const prev = mem.get(key)
+  if (prev) {
+    memBytes -= prev.audio.byteLength
+    mem.delete(key)
+  }
+
+  mem.set(key, entry)
+  memBytes += size
+
+  // Map хранит порядок вставки — первый ключ самый старый
+  while (memBytes > MAX_BYTES && mem.size) {
+    const oldest = mem.keys().next().value as string
+    const e = mem.get(oldest)
+    mem.delete(oldest)
+    if (e) memBytes -= e.audio.byteLength
+  }
+}
+
+export async function getCachedTts(key: string): Promise<TtsCacheEntry | null> {
+  const hit = mem.get(key)
+  if (hit) {
+    // освежаем позицию в LRU
+    mem.delete(key)
+    mem.set(key, hit)
+    return hit
+  }
+
+  if (!DISK_DIR) return null
+
+  try {
+    const file = await fs.readFile(diskPath(key))
+    // формат файла: <contentType>\n<audio bytes>
+    const nl = file.indexOf(0x0a)
+    if (nl <= 0) return null
+    const entry: TtsCacheEntry = {
+      contentType: file.subarray(0, nl).toString("utf8"),
+      audio: file.subarray(nl + 1),
+    }
+    remember(key, entry)
+    return entry
+  } catch {
+    return null
+  }
+}
+
+export async function putCachedTts(key: string, entry: TtsCacheEntry): Promise<void> {
+  remember(key, entry)
+
+  if (!DISK_DIR || entry.audio.byteLength > MAX_ENTRY_BYTES) return
+
+  try {
+    await fs.mkdir(DISK_DIR, { recursive: true })
+    const tmp = `${diskPath(key)}.${process.pid}.tmp`
+    await fs.writeFile(tmp, Buffer.concat([Buffer.from(entry.contentType + "\n", "utf8"), entry.audio]))
+    await fs.rename(tmp, diskPath(key))
+  } catch {
+    // диск — только оптимизация, ошибки не критичны
+  }
+}
+
+export function ttsCacheStats() {
+  return { entries: mem.size, bytes: memBytes, maxBytes: MAX_BYTES, disk: Boolean(DISK_DIR) }
+}
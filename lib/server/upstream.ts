@@ -0,0 +1,359 @@
+import http from "http"
+import https from "https"
+import { Readable } from "stream"
+
+/**
+ * Исходящие запросы к внешним сервисам (вебхук агента, OpenAI, произвольные вебхуки прокси,
+ * CHECK_STATUS в WayForPay).
+ *
+ * У каждого апстрима свой keep-alive пул (node:http Agent): соединения переиспользуются между
+ * запросами, одновременно к хосту — не больше maxSockets, остальные ждут в очереди агента;
+ * если ответа уже ждут maxSockets + maxQueued запросов — сразу UpstreamBusyError
+ * (роут отвечает 503, а не висит). Запрос занимает место до конца тела ответа (дочитано, ошибка
+ * или отмена потока): потоковый ответ агента держит сокет всё это время.
+ * timeoutMs — до заголовков ответа (включая ожидание в очереди), idleMs — тишина в сокете
+ * во время чтения тела (взводится только после заголовков); оба — в stats.timeouts.
+ *
+ * Повтор — только когда запрос заведомо не дошёл (отказ в соединении; сброс протухшего keep-alive
+ * сокета, пока запрос не ушёл в сокет целиком) или метод идемпотентный (тогда и после сброса,
+ * и на 502/503/504). Ушедший POST не повторяем: апстрим мог его уже принять (вызов модели в n8n).
+ * Повторы тратят бюджет апстрима: каждый запрос добавляет retryRatio токена, повтор стоит
+ * один — при лежащем апстриме повторы не умножают нагрузку на него.
+ *
+ * Возвращает обычный Response, поэтому роуты меняют только сам вызов fetch.
+ */
+
+export type UpstreamName = "agent" | "openai" | "webhook" | "wayforpay"
+
+type UpstreamConfig = {
+  maxSockets: number
+  maxQueued: number
+  timeoutMs: number
+  idleMs: number
+  retries: number
+  retryRatio: number
+}
+
+function envInt(name: string, fallback: number) {
+  const v = Number(process.env[name])
+  return Number.isFinite(v) && v > 0 ? v : fallback
+}
+
+const UPSTREAMS: Record<UpstreamName, UpstreamConfig> = {
+  // n8n: ответ модели может идти десятки секунд (и потоком)
+  agent: {
+    maxSockets: envInt("UPSTREAM_AGENT_MAX_SOCKETS", 64),
+    maxQueued: envInt("UPSTREAM_AGENT_MAX_QUEUED", 256),
+    timeoutMs: envInt("UPSTREAM_AGENT_TIMEOUT_MS", 60_000),
+    idleMs: envInt("UPSTREAM_AGENT_IDLE_MS", 30_000),
+    retries: 1,
+    retryRatio: 0.1,
+  },
+  openai: {
+    maxSockets: envInt("UPSTREAM_OPENAI_MAX_SOCKETS", 32),
+    maxQueued: envInt("UPSTREAM_OPENAI_MAX_QUEUED", 256),
+    timeoutMs: envInt("UPSTREAM_OPENAI_TIMEOUT_MS", 30_000),
+    idleMs: envInt("UPSTREAM_OPENAI_IDLE_MS", 20_000),
+    retries: 2,
+    retryRatio: 0.1,
+  },
+  webhook: {
+    maxSockets: envInt("UPSTREAM_WEBHOOK_MAX_SOCKETS", 16),
+    maxQueued: envInt("UPSTREAM_WEBHOOK_MAX_QUEUED", 128),
+    timeoutMs: envInt("UPSTREAM_WEBHOOK_TIMEOUT_MS", 20_000),
+    idleMs: envInt("UPSTREAM_WEBHOOK_IDLE_MS", 20_000),
+    retries: 1,
+    retryRatio: 0.05,
+  },
+  // CHECK_STATUS: POST, но только чтение — повтор безопасен лишь когда запрос не дошёл (как у всех POST)
+  wayforpay: {
+    maxSockets: envInt("UPSTREAM_WAYFORPAY_MAX_SOCKETS", 16),
+    maxQueued: envInt("UPSTREAM_WAYFORPAY_MAX_QUEUED", 512),
+    timeoutMs: envInt("UPSTREAM_WAYFORPAY_TIMEOUT_MS", 15_000),
+    idleMs: envInt("UPSTREAM_WAYFORPAY_IDLE_MS", 15_000),
+    retries: 1,
+    retryRatio: 0.05,
+  },
+}
+
+const MAX_RETRY_TOKENS = 10
+const MAX_REDIRECTS = 3
+const STALE_SOCKET_CODES = new Set(["ECONNRESET", "EPIPE"])
+const RETRYABLE_STATUS = new Set([502, 503, 504])
+const IDEMPOTENT = new Set(["GET", "HEAD", "PUT", "DELETE", "OPTIONS"])
+const NULL_BODY_STATUS = new Set([101, 204, 205, 304])
+
+export class UpstreamBusyError extends Error {
+  constructor(public upstream: UpstreamName) {
+    super(`Upstream ${upstream} is busy`)
+    this.name = "UpstreamBusyError"
+  }
+}
+
+export class UpstreamTimeoutError extends Error {
+  constructor(public upstream: UpstreamName, public ms: number) {
+    super(`Upstream ${upstream} did not respond in ${ms}ms`)
+    this.name = "UpstreamTimeoutError"
+  }
+}
+
+type Pool = {
+  config: UpstreamConfig
+  http: http.Agent
+  https: https.Agent
+  inflight: number
+  retryTokens: number
+  sockets: WeakSet<object>
+  stats: {
+    requests: number
+    connections: number
+    reused: number
+    retries: number
+    retriesDenied: number
+    busy: number
+    timeouts: number
+    errors: number
+  }
+}
+
+const pools = new Map<UpstreamName, Pool>()
+
+function pool(name: UpstreamName): Pool {
+  let p = pools.get(name)
+  if (!p) {
+    const config = UPSTREAMS[name]
+    const opts = {
+      keepAlive: true,
+      keepAliveMsecs: 15_000,
+      maxSockets: config.maxSockets,
+      maxFreeSockets: config.maxSockets,
+      // свежий сокет реже оказывается закрытым апстримом по keep-alive таймауту
+      scheduling: "lifo" as const,
+    }
+    p = {
+      config,
+      http: new http.Agent(opts),
+      https: new https.Agent(opts),
+      inflight: 0,
+      retryTokens: MAX_RETRY_TOKENS,
+      sockets: new WeakSet(),
+      stats: { requests: 0, connections: 0, reused: 0, retries: 0, retriesDenied: 0, busy: 0, timeouts: 0, errors: 0 },
+    }
+    pools.set(name, p)
+  }
+  return p
+}
+
+/** Счётчики пулов (GET /api/dev/upstreams). */
+export function getUpstreamStats() {
+  const out: Record<string, any> = {}
+  for (const [name, p] of pools) {
+    out[name] = { ...p.stats, inflight: p.inflight, retryTokens: Number(p.retryTokens.toFixed(2)) }
+  }
+  return out
+}
+
+type Prepared = { method: string; headers: Record<string, string>; body: Buffer | null }
+
+// тело читаем один раз в Buffer — его можно отправить повторно
+async function prepare(init: RequestInit): Promise<Prepared> {
+  const method = String(init.method || "GET").toUpperCase()
+  const headers: Record<string, string> = {}
+  new Headers(init.headers).forEach((v, k) => {
+    headers[k] = v
+  })
+
+  let body: Buffer | null = null
+  if (init.body != null) {
+    // FormData / Blob / URLSearchParams / строка — сериализует сам Response (с boundary)
+    const r = new Response(init.body as any)
+    body = Buffer.from(await r.arrayBuffer())
+    const type = r.headers.get("content-type")
+    if (type && !headers["content-type"]) headers["content-type"] = type
+  }
+  if (body) headers["content-length"] = String(body.byteLength)
+  return { method, headers, body }
+}
+
+function toResponse(res: http.IncomingMessage, method: string, release: () => void): Response {
+  const headers = new Headers()
+  for (const [k, v] of Object.entries(res.headers)) {
+    if (Array.isArray(v)) v.forEach((x) => headers.append(k, x))
+    else if (v != null) headers.set(k, String(v))
+  }
+  const status = res.statusCode || 502
+  const empty = method === "HEAD" || NULL_BODY_STATUS.has(status)
+  if (empty) {
+    res.resume()
+    release()
+  } else {
+    // close — и после end, и после destroy (ошибка, idle-таймаут, cancel() веб-потока)
+    res.once("end", release)
+    res.once("error", release)
+    res.once("close", release)
+  }
+  return new Response(empty ? null : (Readable.toWeb(res) as any), {
+    status,
+    statusText: res.statusMessage,
+    headers,
+  })
+}
+
+function send(p: Pool, name: UpstreamName, url: URL, req: Prepared, signal: AbortSignal | null | undefined) {
+  return new Promise<http.IncomingMessage>((resolve, reject) => {
+    const lib = url.protocol === "https:" ? https : http
+    const agent = url.protocol === "https:" ? p.https : p.http
+    let settled = false
+    let reused = false
+
+    const r = lib.request(url, { method: req.method, headers: req.headers, agent })
+
+    const timer = setTimeout(() => {
+      p.stats.timeouts++
+      r.destroy(new UpstreamTimeoutError(name, p.config.timeoutMs))
+    }, p.config.timeoutMs)
+
+    const onAbort = () => r.destroy(signal?.reason instanceof Error ? signal.reason : new Error("Aborted"))
+    signal?.addEventListener("abort", onAbort, { once: true })
+
+    const done = () => {
+      settled = true
+      clearTimeout(timer)
+      signal?.removeEventListener("abort", onAbort)
+    }
+
+    r.on("socket", (socket) => {
+      if (p.sockets.has(socket)) {
+        reused = true
+        p.stats.reused++
+      } else {
+        p.sockets.add(socket)
+        p.stats.connections++
+      }
+    })
+    r.on("response", (res) => {
+      done()
+      // idle — только на чтение тела: до заголовков действует timeoutMs (idleMs у agent/openai короче,
+      // и сокетный таймаут, взведённый раньше, обрывал бы долгий ответ модели до заголовков)
+      res.setTimeout(p.config.idleMs, () => {
+        p.stats.timeouts++
+        res.destroy(new UpstreamTimeoutError(name, p.config.idleMs))
+      })
+      resolve(res)
+    })
+    r.on("error", (e: any) => {
+      if (settled) return
+      done()
+      e.reusedSocket = reused
+      // запрос целиком ушёл в сокет — апстрим мог его получить
+      e.requestSent = r.writableFinished
+      reject(e)
+    })
+
+    if (signal?.aborted) return onAbort()
+    r.end(req.body ?? undefined)
+  })
+}
+
+function staleSocket(e: any) {
+  return Boolean(e?.reusedSocket) && (STALE_SOCKET_CODES.has(e?.code) || e?.message === "socket hang up")
+}
+
+// запрос точно не обработан: соединение не установилось или апстрим закрыл keep-alive сокет,
+// пока он лежал в пуле (тот же приём, что в доках node:http про request.reusedSocket), и запрос
+// в него ещё не записан
+function notDelivered(e: any) {
+  if (e?.code === "ECONNREFUSED") return true
+  return staleSocket(e) && !e?.requestSent
+}
+
+function canRetry(p: Pool, attempt: number, method: string, e: any, status?: number) {
+  if (attempt >= p.config.retries) return false
+  if (e instanceof UpstreamTimeoutError) return false
+  const retryable = status
+    ? IDEMPOTENT.has(method) && RETRYABLE_STATUS.has(status)
+    : notDelivered(e) || (IDEMPOTENT.has(method) && (STALE_SOCKET_CODES.has(e?.code) || staleSocket(e)))
+  if (!retryable) return false
+  if (p.retryTokens < 1) {
+    p.stats.retriesDenied++
+    return false
+  }
+  p.retryTokens -= 1
+  p.stats.retries++
+  return true
+}
+
+function backoff(attempt: number) {
+  const ms = 50 * 2 ** attempt + Math.random() * 50
+  return new Promise((r) => setTimeout(r, ms))
+}
+
+/**
+ * fetch() через пул апстрима name. Тело ответа — поток, как у fetch.
+ */
+export async function upstreamFetch(name: UpstreamName, input: string | URL, init: RequestInit = {}): Promise<Response> {
+  const p = pool(name)
+  if (p.inflight >= p.config.maxSockets + p.config.maxQueued) {
+    p.stats.busy++
+    throw new UpstreamBusyError(name)
+  }
+
+  p.stats.requests++
+  p.retryTokens = Math.min(MAX_RETRY_TOKENS, p.retryTokens + p.config.retryRatio)
+  p.inflight++
+  let released = false
+  const release = () => {
+    if (released) return
+    released = true
+    p.inflight--
+  }
+  try {
+    let req = await prepare(init)
+    let url = new URL(String(input))
+
+    for (let attempt = 0, redirects = 0; ; ) {
+      let res: http.IncomingMessage
+      try {
+        res = await send(p, name, url, req, init.signal)
+      } catch (e: any) {
+        if (canRetry(p, attempt, req.method, e)) {
+          await backoff(attempt++)
+          continue
+        }
+        p.stats.errors++
+        throw e
+      }
+
+      const status = res.statusCode || 0
+      const location = res.headers.location
+      if (location && status >= 301 && status <= 308 && status !== 304 && redirects < MAX_REDIRECTS) {
+        res.resume()
+        redirects++
+        url = new URL(location, url)
+        // 303 и 301/302 после POST — как браузер: дальше GET без тела
+        if (status === 303 || ((status === 301 || status === 302) && req.method === "POST")) {
+          const { "content-length": _len, "content-type": _type, ...rest } = req.headers
+          req = { method: "GET", headers: rest, body: null }
+        }
+        continue
+      }
+
+      if (RETRYABLE_STATUS.has(status) && canRetry(p, attempt, req.method, null, status)) {
+        res.resume()
+        await backoff(attempt++)
+        continue
+      }
+      return toResponse(res, req.method, release)
+    }
+  } catch (e) {
+    release()
+    throw e
+  }
+}
+
+/** HTTP-статус для ошибок пула: 503 — апстрим перегружен, 504 — не ответил; иначе null. */
+export function upstreamErrorStatus(e: unknown): number | null {
+  if (e instanceof UpstreamBusyError) return 503
+  if (e instanceof UpstreamTimeoutError) return 504
+  return null
+}
@@ -0,0 +1,118 @@
+/**
+ * Инкрементальная загрузка записи в /api/stt.
+ *
+ * Пока VAD видит речь, диалог вызывает sync() с текущим списком кусков [header, ...body] —
+ * новые куски уходят на сервер в фоне по порядку. Когда речь закончилась, finish()
+ * досылает хвост с флагом X-STT-Final, и сервер сразу транскрибирует уже собранное аудио.
+ *
+ * finish() возвращает null, если инкрементальный путь не сработал (нечего было досылать,
+ * фоновый кусок упал, сервер ответил 409) — тогда вызывающий шлёт целый blob как раньше.
+ */
+
+function newSessionId() {
+  if (typeof crypto !== "undefined" && "randomUUID" in crypto) return crypto.randomUUID()
+  return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 12)}`
+}
+
+export class SttChunkUploader {
+  private sessionId = ""
+  private sent: Blob[] = []
+  private queue: Promise<boolean> = Promise.resolve(true)
+
+  reset() {
+    this.sessionId = ""
+    this.sent = []
+    this.queue = Promise.resolve(true)
+  }
+
+  private isContinuation(parts: Blob[]) {
+    if (!this.sessionId || this.sent.length > parts.length) return false
+    for (let i = 0; i < this.sent.length; i++) {
+      if (this.sent[i] !== parts[i]) return false
+    }
+    return true
+  }
+
+  private post(sessionId: string, seq: number, part: Blob | null, lang: string, final: boolean, type: string) {
+    return fetch("/api/stt", {
+      method: "POST",
+      headers: {
+        "Content-Type": type || "application/octet-stream",
+        "X-STT-Hint": "auto",
+        "X-STT-Lang": lang,
+        "X-STT-Session": sessionId,
+        "X-STT-Seq": String(seq),
+        ...(final ? { "X-STT-Final": "1" } : {}),
+      },
+      body: part ?? new Blob([]),
+    })
+  }
+
+  /**
+   * Фоновая досылка новых кусков. Если список кусков больше не продолжает
+   * уже отправленный (буфер сбросили, сменилось начало фразы) — начинаем новую сессию.
+   */
+  sync(parts: Blob[], lang: string) {
+    if (!parts.length) return
+    if (!this.isContinuation(parts)) {
+      this.reset()
+      this.sessionId = newSessionId()
+    }
+
+    const sessionId = this.sessionId
+    const type = parts[0]?.type || ""
+
+    for (let seq = this.sent.length; seq < parts.length; seq++) {
+      const part = parts[seq]
+      this.sent.push(part)
+      this.queue = this.queue.then(async (ok) => {
+        if (!ok) return false
+        try {
+          const r = await this.post(sessionId, seq, part, lang, false, type)
+          return r.ok
+        } catch {
+          return false
+        }
+      })
+    }
+  }
+
+  async finish(parts: Blob[], lang: string): Promise<Response | null> {
+    if (!this.sent.length || !this.isContinuation(parts)) {
+      this.reset()
+      return null
+    }
+
+    const sessionId = this.sessionId
+    const type = parts[0]?.type || ""
+    const last = parts.length - 1
+    const tail = this.sent.length <= last ? parts.slice(this.sent.length) : []
+
+    // хвост (кроме последнего куска) — обычным порядком, последний — вместе с финалом
+    for (let seq = this.sent.length; seq < last; seq++) {
+      const part = parts[seq]
+      this.queue = this.queue.then(async (ok) => {
+        if (!ok) return false
+        try {
+          return (await this.post(sessionId, seq, part, lang, false, type)).ok
+        } catch {
+          return false
+        }
+      })
+    }
+
+    const queue = this.queue
+    this.reset()
+
+    if (!(await queue)) return null
+
+    try {
+      const finalPart = tail.length ? parts[last] : null
+      const res = await this.post(sessionId, last, finalPart, lang, true, type)
+      if (res.status === 409) return null
+      return res
+    } catch {
+      return null
+    }
+  }
+}
@@ -1 +0,0 @@
-export { supabaseAdmin, getSupabaseAdmin } from "./supabase/admin"
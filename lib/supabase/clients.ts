@@ -0,0 +1,157 @@
+import { cookies } from "next/headers"
+import { createServerClient } from "@supabase/ssr"
+import { createClient, type SupabaseClient, type User } from "@supabase/supabase-js"
+
+// Серверные Supabase-клиенты в одном месте:
+//   admin (service role) — один на процесс;
+//   cookie-клиент (anon + сессия из cookies) и результат auth.getUser() — один на запрос,
+//   сколько бы хелперов ни спросили пользователя, в Auth уходит одна проверка сессии.
+// Браузерный клиент — lib/supabase/browser.ts (здесь next/headers, в клиентский бандл нельзя).
+
+export type CookieToSet = { name: string; value: string; options: any }
+
+/** та же форма, что у sb.auth.getUser() */
+export type RequestUserResult = {
+  data: { user: User | null }
+  error: { message: string } | null
+}
+
+function env(name: string) {
+  return String(process.env[name] ?? "").trim().replace(/^['"]|['"]$/g, "")
+}
+
+function firstEnv(...names: string[]) {
+  for (const n of names) {
+    const v = env(n)
+    if (v) return v
+  }
+  return ""
+}
+
+function supabaseUrl() {
+  return firstEnv("NEXT_PUBLIC_SUPABASE_URL", "SUPABASE_URL", "SUPABASE_PROJECT_URL")
+}
+
+function serviceKey() {
+  return firstEnv("SUPABASE_SERVICE_ROLE_KEY", "SUPABASE_SERVICE_ROLE", "SUPABASE_SERVICE_KEY")
+}
+
+function anonKey() {
+  return env("NEXT_PUBLIC_SUPABASE_ANON_KEY")
+}
+
+const NO_SESSION = { persistSession: false, autoRefreshToken: false, detectSessionInUrl: false }
+
+// ---------- на процесс ----------
+
+let adminClient: SupabaseClient | null = null
+let serverClient: SupabaseClient | null = null
+
+export function isSupabaseAdminConfigured(): boolean {
+  return Boolean(supabaseUrl() && serviceKey())
+}
+
+export function getSupabaseAdminOrNull(): SupabaseClient | null {
+  if (adminClient) return adminClient
+  const url = supabaseUrl()
+  const key = serviceKey()
+  if (!url || !key) return null
+  adminClient = createClient(url, key, { auth: NO_SESSION })
+  return adminClient
+}
+
+export function getSupabaseAdmin(): SupabaseClient {
+  const sb = getSupabaseAdminOrNull()
+  if (!sb) throw new Error("Missing Supabase admin env: NEXT_PUBLIC_SUPABASE_URL / SUPABASE_SERVICE_ROLE_KEY")
+  return sb
+}
+
+export function isSupabaseServerConfigured(): boolean {
+  return Boolean(supabaseUrl() && (serviceKey() || anonKey()))
+}
+
+/**
+ * Service role, а если его нет — anon без сессии (поведение бывшего lib/supabase-server.ts).
+ */
+export function getSupabaseServerClient(): SupabaseClient {
+  const admin = getSupabaseAdminOrNull()
+  if (admin) return admin
+  if (serverClient) return serverClient
+
+  const url = supabaseUrl()
+  const key = anonKey()
+  if (!url) throw new Error("Missing SUPABASE_URL / NEXT_PUBLIC_SUPABASE_URL")
+  if (!key) throw new Error("Missing SUPABASE_SERVICE_ROLE_KEY / NEXT_PUBLIC_SUPABASE_ANON_KEY")
+
+  serverClient = createClient(url, key, { auth: NO_SESSION })
+  return serverClient
+}
+
+// ---------- на запрос ----------
+
+type RequestScope = {
+  sb: SupabaseClient | null
+  pending: CookieToSet[]
+  user: Promise<RequestUserResult> | null
+}
+
+// ключ — cookie store запроса: cookies() в пределах одного запроса отдаёт один и тот же объект
+const scopes = new WeakMap<object, RequestScope>()
+
+function requestScope(): RequestScope {
+  const jar = cookies()
+  let scope = scopes.get(jar)
+  if (!scope) {
+    const url = supabaseUrl()
+    const anon = anonKey()
+    const pending: CookieToSet[] = []
+    const sb =
+      url && anon
+        ? createServerClient(url, anon, {
+            cookies: {
+              getAll() {
+                return jar.getAll()
+              },
+              setAll(list) {
+                // ответ собирает роут: обновлённые токены он ставит из getPendingAuthCookies()
+                pending.push(...(list as CookieToSet[]))
+              },
+            },
+          })
+        : null
+    scope = { sb, pending, user: null }
+    scopes.set(jar, scope)
+  }
+  return scope
+}
+
+/**
+ * Клиент с сессией пользователя из cookies (anon key, RLS). null — нет публичных env.
+ */
+export function getRequestSupabase(): SupabaseClient | null {
+  return requestScope().sb
+}
+
+/**
+ * Cookies, которые Supabase попросил выставить в этом запросе (refresh сессии).
+ * Массив общий на запрос — роут переносит его в ответ один раз.
+ */
+export function getPendingAuthCookies(): CookieToSet[] {
+  return requestScope().pending
+}
+
+/**
+ * auth.getUser() один раз на запрос; повторные вызовы получают тот же результат.
+ */
+export function getRequestUser(): Promise<RequestUserResult> {
+  const scope = requestScope()
+  if (!scope.user) {
+    scope.user = scope.sb
+      ? (scope.sb.auth.getUser() as Promise<RequestUserResult>)
+      : Promise.resolve({
+          data: { user: null },
+          error: { message: "Missing NEXT_PUBLIC_SUPABASE_URL / NEXT_PUBLIC_SUPABASE_ANON_KEY" },
+        })
+  }
+  return scope.user
+}
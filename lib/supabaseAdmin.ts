@@ -1,22 +0,0 @@
-import { createClient } from "@supabase/supabase-js"
-
-const supabaseUrl =
-  process.env.NEXT_PUBLIC_SUPABASE_URL ||
-  process.env.SUPABASE_URL ||
-  ""
-
-const serviceRoleKey = process.env.SUPABASE_SERVICE_ROLE_KEY || ""
-
-if (!supabaseUrl) {
-  throw new Error("Missing SUPABASE_URL / NEXT_PUBLIC_SUPABASE_URL")
-}
-if (!serviceRoleKey) {
-  throw new Error("Missing SUPABASE_SERVICE_ROLE_KEY")
-}
-
-export const supabaseAdmin = createClient(supabaseUrl, serviceRoleKey, {
-  auth: {
-    persistSession: false,
-    autoRefreshToken: false,
-  },
-})
@@ -2,26 +2,32 @@ import { NextRequest, NextResponse } from "next/server"
 
 const DEVICE_COOKIE = "ta_device_hash"
 
+// Куку ставим документам и fetch/XHR (dest "empty" — это наши /api).
+// Картинки, аудио, шрифты сюда доходят, только если matcher их не отсёк.
+const COOKIE_DESTS = new Set(["", "document", "iframe", "empty"])
+
 export function middleware(req: NextRequest) {
-  const res = NextResponse.next()
+  // быстрый путь: без ответа запрос идёт дальше без лишней аллокации
+  if (req.method === "OPTIONS" || req.method === "HEAD") return
+  if (req.cookies.get(DEVICE_COOKIE)?.value) return
+  if (!COOKIE_DESTS.has(req.headers.get("sec-fetch-dest") || "")) return
 
-  const existing = req.cookies.get(DEVICE_COOKIE)?.value
-  if (!existing) {
-    const v = crypto.randomUUID()
-    res.cookies.set({
-      name: DEVICE_COOKIE,
-      value: v,
-      httpOnly: true,
-      sameSite: "lax",
-      secure: req.nextUrl.protocol === "https:",
-      path: "/",
-      maxAge: 60 * 60 * 24 * 365,
-    })
-  }
+  const res = NextResponse.next()
+  res.cookies.set({
+    name: DEVICE_COOKIE,
+    value: crypto.randomUUID(),
+    httpOnly: true,
+    sameSite: "lax",
+    secure: req.nextUrl.protocol === "https:",
+    path: "/",
+    maxAge: 60 * 60 * 24 * 365,
+  })
 
   return res
 }
 
 export const config = {
-  matcher: ["/((?!_next/static|_next/image|favicon.ico).*)"],
+  // <generated by scripts/middleware_matcher.py — не править руками>
+  matcher: ["/((?!_next/static|_next/image|_next/webpack-hmr|\\.well-known|api/billing/wayforpay/callback|api/billing/wayforpay/webhook|.*\\.(?:avif|gif|ico|jpeg|jpg|json|m4a|map|mp3|mp4|ogg|otf|png|svg|ttf|txt|wav|webm|webp|woff|woff2|xml)$).*)"],
+  // </generated>
 }
@@ -0,0 +1,226 @@
+"""
+Golden-прогон скриптов-патчеров на фикстурах (scripts/script_fixtures.py).
+
+Каждый кейс: фикстуры во временный каталог, рядом — сам скрипт и вспомогательные модули
+(HELPERS), запуск из корня этого каталога, как на живом дереве. Результат — код выхода, вывод и unified diff
+файлов — сравнивается с scripts/golden/<кейс>.golden. Затем второй проход тем же скриптом:
+он не должен менять файлы (идемпотентность), кроме кейсов, помеченных idempotent=False.
+
+Скрипт "в зоне" фикстур, если все пути app/..., components/..., lib/..., которые он упоминает,
+есть среди FIXTURE_FILES. Такой скрипт без кейса — ошибка: новый патчер для шапки, прайсинга,
+видеозвонка, layout или summary должен прийти со своим кейсом и golden-файлом.
+
+Кейсы идут параллельно (по процессу на кейс, --jobs по числу ядер), весь прогон — секунды;
+.mjs без node пропускаются с предупреждением.
+
+    python scripts/check_scripts.py
+    python scripts/check_scripts.py -k header
+    python scripts/check_scripts.py --update          # переписать golden после осознанного изменения
+"""
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import argparse
+import difflib
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from script_fixtures import FIXTURE_FILES, Case, build_cases, write_case
+
+SCRIPTS = Path("scripts")
+GOLDEN = SCRIPTS / "golden"
+HELPERS = ("ts_imports.py", "patch_scheduler.py", "source_reader.py", "symbol_index.py")
+# сами себя, демон и вспомогательные модули не гоняем
+NOT_PATCHERS = {"check_scripts.py", "script_fixtures.py", "watch_patches.py", *HELPERS}
+TIMEOUT_S = 30
+# отчёт patch_scheduler о времени — в golden без цифр
+TIMING_RE = re.compile(r"\b\d+(?:\.\d+)? ms\b")
+
+TARGET_RE = re.compile(r"""["']((?:app|components|lib)/[\w./\[\]-]+\.(?:tsx?|jsx?|mjs|css|json))["']""")
+
+def stem(path: str) -> str:
+    return re.sub(r"\.(tsx?|jsx?)$", "", path)
+
+FIXTURE_STEMS = {stem(p) for p in FIXTURE_FILES}
+
+def script_targets(path: Path) -> set:
+    return set(TARGET_RE.findall(path.read_text("utf-8", errors="replace")))
+
+def in_fixture_scope(path: Path) -> bool:
+    targets = script_targets(path)
+    return bool(targets) and all(stem(t) in FIXTURE_STEMS for t in targets)
+
+def command(script: str) -> list | None:
+    if script.endswith(".py"):
+        return [sys.executable, f"scripts/{script}"]
+    if script.endswith(".mjs"):
+        node = shutil.which("node")
+        return [node, f"scripts/{script}"] if node else None
+    return None
+
+def snapshot(root: Path) -> dict:
+    out = {}
+    for p in sorted(root.rglob("*")):
+        rel = p.relative_to(root).as_posix()
+        if p.is_file() and not rel.startswith("scripts/"):
+            out[rel] = p.read_text("utf-8", errors="replace")
+    return out
+
+def tree_diff(before: dict, after: dict) -> str:
+    chunks = []
+    for rel in sorted(set(before) | set(after)):
+        a, b = before.get(rel), after.get(rel)
+        if a == b:
+            continue
+        chunks.extend(difflib.unified_diff(
+            (a or "").splitlines(keepends=True),
+            (b or "").splitlines(keepends=True),
+            fromfile=f"a/{rel}" if a is not None else "/dev/null",
+            tofile=f"b/{rel}" if b is not None else "/dev/null",
+            n=2,
+        ))
+    text = "".join(c if c.endswith("\n") else c + "\n\\ No newline at end of file\n" for c in chunks)
+    return text or "(no changes)\n"
+
+def run_pass(cmd: list, root: Path) -> tuple:
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1", "PYTHONIOENCODING": "utf-8", "NO_COLOR": "1"}
+    try:
+        r = subprocess.run(cmd, cwd=root, capture_output=True, text=True, encoding="utf-8", errors="replace",
+                           timeout=TIMEOUT_S, env=env)
+        output, code = r.stdout + r.stderr, r.returncode
+    except subprocess.TimeoutExpired:
+        output, code = f"timeout after {TIMEOUT_S}s\n", "timeout"
+    # пути временного каталога в трейсбеках
+    output = output.replace(str(root), "<tmp>").replace(sys.executable, "python")
+    return code, TIMING_RE.sub("<t> ms", output)
+
+class Result:
+    __slots__ = ("case", "report", "second_changed", "skipped", "seconds")
+
+    def __init__(self, case: Case, report: str = "", second_changed: bool = False, skipped: str = "", seconds: float = 0.0):
+        self.case = case
+        self.report = report
+        self.second_changed = second_changed
+        self.skipped = skipped
+        self.seconds = seconds
+
+def run_case(case: Case) -> Result:
+    cmd = command(case.script)
+    if cmd is None:
+        return Result(case, skipped="node not found" if case.script.endswith(".mjs") else "unknown script type")
+
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix=f"golden-{case.name}-") as tmp:
+        root = Path(tmp)
+        write_case(case, root)
+        (root / "scripts").mkdir()
+        for name in (case.script, *HELPERS):
+            shutil.copy(SCRIPTS / name, root / "scripts" / name)
+
+        before = snapshot(root)
+        code1, out1 = run_pass(cmd, root)
+        after1 = snapshot(root)
+        code2, out2 = run_pass(cmd, root)
+        after2 = snapshot(root)
+
+    second = tree_diff(after1, after2)
+    report = (
+        f"# case: {case.name}\n"
+        f"# script: scripts/{case.script}\n"
+        + (f"# not idempotent: {case.note}\n" if not case.idempotent else "")
+        + f"# pass 1: exit {code1}\n{out1}"
+        + f"# pass 1 diff\n{tree_diff(before, after1)}"
+        + f"# pass 2: exit {code2}\n{out2}"
+        + f"# pass 2 diff\n{second}"
+    )
+    return Result(case, report, after1 != after2, seconds=time.perf_counter() - started)
+
+def golden_path(case: Case) -> Path:
+    return GOLDEN / f"{case.name}.golden"
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-k", dest="pattern", help="только кейсы, в имени которых есть подстрока")
+    ap.add_argument("--update", action="store_true", help="переписать golden-файлы")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 4)
+    ap.add_argument("--verbose", "-v", action="store_true")
+    args = ap.parse_args()
+
+    if not SCRIPTS.is_dir():
+        raise SystemExit("❌ run from the repository root (scripts/ not found)")
+
+    cases = build_cases()
+    failures = []
+
+    covered = {c.script for c in cases}
+    for c in cases:
+        if not (SCRIPTS / c.script).exists():
+            failures.append(f"{c.name}: scripts/{c.script} not found")
+    for p in sorted(list(SCRIPTS.glob("*.py")) + list(SCRIPTS.glob("*.mjs"))):
+        if p.name not in NOT_PATCHERS and p.name not in covered and in_fixture_scope(p):
+            failures.append(f"{p.name}: patches {', '.join(sorted(script_targets(p)))} but has no case in script_fixtures.py")
+
+    if args.pattern:
+        cases = [c for c in cases if args.pattern in c.name]
+    cases = [c for c in cases if (SCRIPTS / c.script).exists()]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        results = list(pool.map(run_case, cases))
+    elapsed = time.perf_counter() - started
+
+    if args.update:
+        GOLDEN.mkdir(exist_ok=True)
+    skipped = 0
+    for r in results:
+        name = r.case.name
+        if r.skipped:
+            skipped += 1
+            print(f"⚠️ {name}: skipped ({r.skipped})")
+            continue
+
+        problems = []
+        gp = golden_path(r.case)
+        if args.update:
+            if not gp.exists() or gp.read_text("utf-8") != r.report:
+                gp.write_text(r.report, "utf-8")
+                print(f"✏️ {name}: golden written")
+        elif not gp.exists():
+            problems.append("no golden file (run with --update)")
+        elif gp.read_text("utf-8") != r.report:
+            diff = "".join(difflib.unified_diff(
+                gp.read_text("utf-8").splitlines(keepends=True), r.report.splitlines(keepends=True),
+                fromfile=f"golden/{gp.name}", tofile="actual", n=2,
+            ))
+            problems.append("output differs from golden\n" + diff)
+
+        if r.case.idempotent and r.second_changed:
+            problems.append("second pass changed files (not idempotent)")
+        elif not r.case.idempotent and not r.second_changed:
+            print(f"⚠️ {name}: marked not idempotent, but the second pass changed nothing — drop the mark")
+
+        if problems:
+            failures.extend(f"{name}: {p}" for p in problems)
+        elif args.verbose:
+            print(f"✅ {name} ({r.seconds * 1000:.0f} ms)")
+
+    if args.update and not args.pattern:
+        known = {f"{c.name}.golden" for c in build_cases()}
+        for stale in sorted(GOLDEN.glob("*.golden")):
+            if stale.name not in known:
+                stale.unlink()
+                print(f"🗑 {stale.name}: no such case, removed")
+
+    ran = len(results) - skipped
+    if failures:
+        for f in failures:
+            print(f"❌ {f}")
+        raise SystemExit(f"❌ {len(failures)} problems, {ran} cases in {elapsed:.2f}s")
+    print(f"✅ {ran} cases ({skipped} skipped) in {elapsed:.2f}s, {args.jobs} jobs")
+
+if __name__ == "__main__":
+    main()
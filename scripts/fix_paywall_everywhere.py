@@ -1,11 +1,17 @@
-from pathlib import Path
-import re
+"""
+Paywall везде: прайсинг (компиляция + id кнопки подписки), баннер в шапке и обработка 402
+во всех клиентах /api/turbotaai-agent (чат/голос/видео).
 
-def read(p: Path) -> str:
-    return p.read_text("utf-8")
+Правки идут через patch_scheduler: шаги одного файла — по порядку (шапка сначала получает
+баннер, потом, если дергает агента, — 402), разные файлы — параллельно.
 
-def write(p: Path, s: str):
-    p.write_text(s, "utf-8")
+    python scripts/fix_paywall_everywhere.py --dry-run
+    python scripts/fix_paywall_everywhere.py --jobs 8
+"""
+import argparse
+import re
+
+from patch_scheduler import Plan, add_arguments
 
 def cleanup_import_braces(s: str) -> str:
     # чистим ", ,", "{ ,", ", }" в import
@@ -21,13 +27,7 @@ def ensure_use_client(s: str) -> str:
     # вставим сверху
     return '"use client"\n\n' + s
 
-def fix_pricing_compile():
-    p = Path("app/pricing/page.tsx")
-    if not p.exists():
-        print("⚠️ app/pricing/page.tsx not found, skipping")
-        return
-
-    s = read(p)
+def fix_pricing_compile(path: str, s: str, log) -> str:
 
     # 1) убираем экранирование \" которое у тебя реально в файле (оно не нужно в tsx)
     s = s.replace('\\"', '"')
@@ -56,16 +56,10 @@ def fix_pricing_compile():
         s = re.sub(r"<RainbowButton(?![^>]*\bid=)([^>]*)>", r'<RainbowButton id="turbota-subscribe"\1>', s, count=1)
 
     s = cleanup_import_braces(s)
-    write(p, s)
-    print("✅ pricing page fixed (compile clean) + subscribe id added")
-
-def patch_header_paywall_banner():
-    p = Path("components/header.tsx")
-    if not p.exists():
-        print("⚠️ components/header.tsx not found, skipping")
-        return
+    log("✅ pricing page fixed (compile clean) + subscribe id added")
+    return s
 
-    s = read(p)
+def patch_header_paywall_banner(path: str, s: str, log) -> str:
     s = ensure_use_client(s)
 
     # 1) добавить импорты Banner/RainbowButton/Button если нет
@@ -172,97 +166,82 @@ def patch_header_paywall_banner():
 """
             s = s[:insert_pos] + banner_jsx + s[insert_pos:]
         else:
-            print("⚠️ header root <header> not found, banner not injected")
+            log("⚠️ header root <header> not found, banner not injected")
 
     s = cleanup_import_braces(s)
-    write(p, s)
-    print("✅ header patched: paywall banner + no-store summary fetch")
+    log("✅ header patched: paywall banner + no-store summary fetch")
+    return s
 
-def patch_all_agent_clients():
+def patch_agent_client(path: str, s: str, log) -> str:
     # патчим ВСЕ места где дергается /api/turbotaai-agent (чат/голос/видео)
-    root = Path(".")
-    targets = []
-
-    for p in list(root.rglob("*.tsx")):
-        # пропускаем серверные роуты
-        if "app/api/" in str(p).replace("\\", "/"):
-            continue
-        s = read(p)
-        if "/api/turbotaai-agent" in s:
-            targets.append(p)
-
-    if not targets:
-        print("⚠️ No client files with /api/turbotaai-agent found")
-        return
-
-    for p in targets:
-        s = read(p)
-
-        if "turbota:refresh" in s and "status === 402" in s:
-            continue
-
-        # гарантируем client (раз используем window)
-        s = ensure_use_client(s)
-
-        # ищем переменную ответа: const X = await fetch(...)
-        # 1) сначала ищем fetch("/api/turbotaai-agent"...)
-        fetch_pos = s.find("/api/turbotaai-agent")
-        window_start = max(0, fetch_pos - 2500)
-        window_end = min(len(s), fetch_pos + 2500)
-        chunk = s[window_start:window_end]
-
-        m = re.search(r"(const|let|var)\s+(\w+)\s*=\s*await\s+fetch\s*\(", chunk, flags=re.M)
-        if not m:
-            print(f"⚠️ {p}: can't find 'const r = await fetch(' near endpoint, skipping")
-            continue
-
-        resp_var = m.group(2)
-        # глобальная позиция начала "await fetch("
-        global_m_start = window_start + m.start()
-        # ищем "(" после fetch
-        paren_start = s.find("(", window_start + m.end() - 1)
-        if paren_start == -1:
-            print(f"⚠️ {p}: can't locate fetch '('")
-            continue
-
-        # парсим скобки до закрывающей ) на нулевой глубине
-        depth = 0
-        i = paren_start
-        in_str = None
-        esc = False
-        while i < len(s):
-            ch = s[i]
-            if in_str:
-                if esc:
-                    esc = False
-                elif ch == "\\":
-                    esc = True
-                elif ch == in_str:
-                    in_str = None
-            else:
-                if ch in ("'", '"', "`"):
-                    in_str = ch
-                elif ch == "(":
-                    depth += 1
-                elif ch == ")":
-                    depth -= 1
-                    if depth == 0:
-                        break
-            i += 1
-
-        if depth != 0:
-            print(f"⚠️ {p}: can't match fetch parentheses")
-            continue
-
-        # i = индекс закрывающей ")"
-        insert_at = i + 1
-        # проглотим ; если он есть
-        while insert_at < len(s) and s[insert_at] in " \t\r\n":
-            insert_at += 1
-        if insert_at < len(s) and s[insert_at] == ";":
-            insert_at += 1
-
-        inject = f"""
+    if "/api/turbotaai-agent" not in s:
+        return s
+
+    if "turbota:refresh" in s and "status === 402" in s:
+        return s
+
+    # гарантируем client (раз используем window)
+    s = ensure_use_client(s)
+
+    # ищем переменную ответа: const X = await fetch(...)
+    # 1) сначала ищем fetch("/api/turbotaai-agent"...)
+    fetch_pos = s.find("/api/turbotaai-agent")
+    window_start = max(0, fetch_pos - 2500)
+    window_end = min(len(s), fetch_pos + 2500)
+    chunk = s[window_start:window_end]
+
+    m = re.search(r"(const|let|var)\s+(\w+)\s*=\s*await\s+fetch\s*\(", chunk, flags=re.M)
+    if not m:
+        log(f"⚠️ {path}: can't find 'const r = await fetch(' near endpoint, skipping")
+        return s
+
+    resp_var = m.group(2)
+    # глобальная позиция начала "await fetch("
+    global_m_start = window_start + m.start()
+    # ищем "(" после fetch
+    paren_start = s.find("(", window_start + m.end() - 1)
+    if paren_start == -1:
+        log(f"⚠️ {path}: can't locate fetch '('")
+        return s
+
+    # парсим скобки до закрывающей ) на нулевой глубине
+    depth = 0
+    i = paren_start
+    in_str = None
+    esc = False
+    while i < len(s):
+        ch = s[i]
+        if in_str:
+            if esc:
+                esc = False
+            elif ch == "\\":
+                esc = True
+            elif ch == in_str:
+                in_str = None
+        else:
+            if ch in ("'", '"', "`"):
+                in_str = ch
+            elif ch == "(":
+                depth += 1
+            elif ch == ")":
+                depth -= 1
+                if depth == 0:
+                    break
+        i += 1
+
+    if depth != 0:
+        log(f"⚠️ {path}: can't match fetch parentheses")
+        return s
+
+    # i = индекс закрывающей ")"
+    insert_at = i + 1
+    # проглотим ; если он есть
+    while insert_at < len(s) and s[insert_at] in " \t\r\n":
+        insert_at += 1
+    if insert_at < len(s) and s[insert_at] == ";":
+        insert_at += 1
+
+    inject = f"""
 
     // paywall + realtime counter refresh
     if ({resp_var}.status === 402) {{
@@ -274,14 +253,21 @@ def patch_all_agent_clients():
       window.dispatchEvent(new Event("turbota:refresh"))
     }}
 """
-        s = s[:insert_at] + inject + s[insert_at:]
-        write(p, s)
-        print(f"✅ patched: {p}")
+    s = s[:insert_at] + inject + s[insert_at:]
+    log(f"✅ patched: {path}")
+    return s
 
 def main():
-    fix_pricing_compile()
-    patch_header_paywall_banner()
-    patch_all_agent_clients()
+    ap = argparse.ArgumentParser()
+    add_arguments(ap)
+    args = ap.parse_args()
+
+    plan = Plan()
+    plan.add("app/pricing/page.tsx", fix_pricing_compile)
+    plan.add("components/header.tsx", patch_header_paywall_banner)
+    # серверные роуты не трогаем
+    plan.sweep("*.tsx", patch_agent_client, skip=lambda rel: "app/api/" in rel, needs="/api/turbotaai-agent")
+    plan.run(jobs=args.jobs, dry_run=args.dry_run)
     print("✅ all done")
 
 if __name__ == "__main__":
@@ -0,0 +1,78 @@
+"""
+Компактные таблицы голосов для браузерного TTS.
+
+Источник — scripts/voice_tables.json (читаемые списки, не попадает в бандл):
+  voices[lang][gender] — имена голосов в порядке предпочтения;
+  speech[lang][gender] — [rate, pitch, volume].
+Результат — lib/i18n/voice-tables.generated.ts: по строке на (язык, пол), имена через "|".
+Разбор строк и выбор голоса — lib/i18n/voice-index.ts.
+
+    python scripts/gen_voice_tables.py           # перегенерировать
+    python scripts/gen_voice_tables.py --check   # exit 1, если .generated.ts устарел
+"""
+from pathlib import Path
+import argparse
+import json
+
+SRC = Path("scripts/voice_tables.json")
+OUT = Path("lib/i18n/voice-tables.generated.ts")
+SEP = "|"
+
+def ts_str(s: str) -> str:
+    return json.dumps(s, ensure_ascii=False)
+
+def num(x) -> str:
+    return repr(float(x)).removesuffix(".0") if float(x) == int(float(x)) else repr(float(x))
+
+def render(data: dict) -> str:
+    lines = [
+        "// Сгенерировано scripts/gen_voice_tables.py из scripts/voice_tables.json — не править руками.",
+        "",
+        "/** \"<lang>/<gender>\" -> имена голосов по убыванию предпочтения, через \"|\" */",
+        "export const VOICE_NAMES: Record<string, string> = {",
+    ]
+    for lang, genders in data["voices"].items():
+        for gender, names in genders.items():
+            bad = [n for n in names if SEP in n]
+            if bad:
+                raise SystemExit(f"❌ voice name contains '{SEP}': {bad[0]}")
+            # порядок важен, дубли — нет
+            uniq = list(dict.fromkeys(n.strip() for n in names if n.strip()))
+            lines.append(f"  {ts_str(lang + '/' + gender)}: {ts_str(SEP.join(uniq))},")
+    lines += [
+        "}",
+        "",
+        "/** \"<lang>/<gender>\" -> [rate, pitch, volume] */",
+        "export const SPEECH_PARAMS: Record<string, [number, number, number]> = {",
+    ]
+    for lang, genders in data["speech"].items():
+        for gender, (rate, pitch, volume) in genders.items():
+            lines.append(f"  {ts_str(lang + '/' + gender)}: [{num(rate)}, {num(pitch)}, {num(volume)}],")
+    lines += ["}", ""]
+    return "\n".join(lines)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--check", action="store_true")
+    args = ap.parse_args()
+
+    data = json.loads(SRC.read_text("utf-8"))
+    out = render(data)
+    current = OUT.read_text("utf-8") if OUT.exists() else ""
+
+    if args.check:
+        if out != current:
+            print(f"❌ {OUT} is stale, run: python scripts/gen_voice_tables.py")
+            raise SystemExit(1)
+        print(f"✅ {OUT} up to date")
+        return
+
+    if out == current:
+        print(f"✅ {OUT} already up to date")
+        return
+    OUT.write_text(out, "utf-8")
+    n = sum(len(g) for l in data["voices"].values() for g in l.values())
+    print(f"✅ {OUT}: {n} voice names, {len(out)} bytes")
+
+if __name__ == "__main__":
+    main()
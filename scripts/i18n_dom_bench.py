@@ -0,0 +1,251 @@
+"""
+Синтетический большой DOM + бенчмарк обхода текстовых узлов без jsdom.
+
+Сравнивает две стратегии из lib/i18n:
+  old — translateDocument(): querySelectorAll по ~20 селекторам + translateElement
+        рекурсивно по каждому совпадению + полный обход текстовых узлов;
+        на мутацию — translateElement по каждому добавленному узлу отдельно.
+  new — translation-index.ts: на мутацию — один обход добавленных корней,
+        на смену языка — проход по индексу (узлы с ключами), без сканирования DOM.
+
+Алгоритмы повторены на простых Python-объектах, поэтому цифры — про относительную
+стоимость (сколько узлов трогаем), а не про абсолютное время в браузере.
+
+    python scripts/i18n_dom_bench.py --sections 400 --mutations 200
+    python scripts/i18n_dom_bench.py --out tmp/i18n-dom-fixture.json   # сохранить фикстуру
+"""
+from pathlib import Path
+import argparse
+import json
+import random
+import re
+import time
+
+TEXT_SELECTORS = ["h1", "h2", "h3", "h4", "h5", "h6", "p", "span", "div", "a", "li", "td", "th",
+                  "button", "label", "legend", "option"]
+ATTRS = ["placeholder", "title", "alt", "aria-label"]
+
+class El:
+    __slots__ = ("tag", "attrs", "children", "parent")
+
+    def __init__(self, tag, attrs=None):
+        self.tag = tag
+        self.attrs = attrs or {}
+        self.children = []
+        self.parent = None
+
+    def add(self, child):
+        child.parent = self
+        self.children.append(child)
+        return child
+
+class Text:
+    __slots__ = ("value", "parent")
+
+    def __init__(self, value):
+        self.value = value
+        self.parent = None
+
+def load_keys(path: Path) -> list:
+    keys = []
+    for line in path.read_text("utf-8").splitlines():
+        m = re.match(r'^\s*"([^"]+)"\s*:\s*', line)
+        if m:
+            keys.append(m.group(1))
+    return keys
+
+def make_section(rng: random.Random, keys: list, depth: int = 3) -> El:
+    tag = rng.choice(["section", "div", "ul", "form"])
+    el = El(tag)
+    for _ in range(rng.randint(2, 5)):
+        if depth > 0 and rng.random() < 0.45:
+            el.add(make_section(rng, keys, depth - 1))
+            continue
+        leaf = El(rng.choice(["p", "span", "button", "label", "a", "li", "h3", "input"]))
+        if leaf.tag == "input":
+            leaf.attrs["placeholder"] = rng.choice(keys) if rng.random() < 0.6 else "free text"
+        else:
+            # ~половина текстов — ключи словаря, остальное — пользовательский/динамический текст
+            leaf.add(Text(rng.choice(keys) if rng.random() < 0.5 else f"user text {rng.randint(0, 10**6)}"))
+            if rng.random() < 0.2:
+                leaf.attrs["title"] = rng.choice(keys)
+        el.add(leaf)
+    return el
+
+def build_dom(sections: int, keys: list, seed: int) -> El:
+    rng = random.Random(seed)
+    body = El("body")
+    for _ in range(sections):
+        body.add(make_section(rng, keys))
+    return body
+
+def to_json(node):
+    if isinstance(node, Text):
+        return node.value
+    return {"tag": node.tag, "attrs": node.attrs, "children": [to_json(c) for c in node.children]}
+
+# ---------- обходы ----------
+
+def iter_elements(root: El):
+    stack = [root]
+    while stack:
+        n = stack.pop()
+        if isinstance(n, El):
+            yield n
+            stack.extend(reversed(n.children))
+
+def iter_texts(root):
+    if isinstance(root, Text):
+        yield root
+        return
+    stack = [root]
+    while stack:
+        n = stack.pop()
+        if isinstance(n, Text):
+            if n.value.strip():
+                yield n
+        else:
+            stack.extend(reversed(n.children))
+
+class Counter:
+    visits = 0
+
+def old_translate_element(el: El, tr: dict, c: Counter):
+    c.visits += 1
+    for a in ATTRS:
+        v = el.attrs.get(a)
+        if v and v in tr:
+            el.attrs[a] = tr[v]
+    for ch in el.children:
+        c.visits += 1
+        if isinstance(ch, Text):
+            t = ch.value.strip()
+            if t in tr:
+                ch.value = tr[t]
+        else:
+            old_translate_element(ch, tr, c)
+
+def old_translate_document(body: El, tr: dict, c: Counter):
+    for sel in TEXT_SELECTORS:
+        for el in iter_elements(body):
+            c.visits += 1
+            if el.tag == sel:
+                old_translate_element(el, tr, c)
+    for a in ATTRS:
+        for el in iter_elements(body):
+            c.visits += 1
+            if a in el.attrs:
+                old_translate_element(el, tr, c)
+    for t in iter_texts(body):
+        c.visits += 1
+        v = t.value.strip()
+        if v in tr:
+            t.value = tr[v]
+
+class Index:
+    def __init__(self):
+        self.texts = {}   # Text -> key (в браузере — WeakMap)
+        self.attrs = {}   # (El, attr) -> key
+
+def new_translate_subtree(root, tr: dict, known: dict, idx: Index, c: Counter):
+    for t in iter_texts(root):
+        c.visits += 1
+        key = idx.texts.get(t) or t.value.strip()
+        if key in tr or key in known:
+            t.value = tr.get(key, key)
+            idx.texts[t] = key
+    if isinstance(root, El):
+        for el in iter_elements(root):
+            c.visits += 1
+            for a in ATTRS:
+                v = el.attrs.get(a)
+                if v and (v in tr or v in known):
+                    el.attrs[a] = tr.get(v, v)
+                    idx.attrs[(el, a)] = v
+
+def new_retranslate(idx: Index, tr: dict, c: Counter):
+    for t, key in idx.texts.items():
+        c.visits += 1
+        t.value = tr.get(key, key)
+    for (el, a), key in idx.attrs.items():
+        c.visits += 1
+        el.attrs[a] = tr.get(key, key)
+
+def timed(fn):
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) * 1000
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sections", type=int, default=400)
+    ap.add_argument("--mutations", type=int, default=200)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--out", default="")
+    args = ap.parse_args()
+
+    root = Path("lib/i18n/translations")
+    en_keys = load_keys(root / "en.ts")
+    known = {k: k for k in en_keys}
+    # значения переводов для бенча не важны — важно, что ключи совпадают
+    uk = {k: f"[uk] {k}" for k in en_keys}
+    ru = {k: f"[ru] {k}" for k in en_keys}
+
+    body = build_dom(args.sections, en_keys, args.seed)
+    n_el = sum(1 for _ in iter_elements(body))
+    n_tx = sum(1 for _ in iter_texts(body))
+    print(f"DOM: {n_el} elements, {n_tx} text nodes, {len(en_keys)} keys")
+
+    if args.out:
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(to_json(body), ensure_ascii=False), "utf-8")
+        print(f"✅ fixture written: {out}")
+
+    rng = random.Random(args.seed + 1)
+    additions = [make_section(rng, en_keys, depth=2) for _ in range(args.mutations)]
+
+    # --- old ---
+    c_old = Counter()
+    ms_old_switch = timed(lambda: old_translate_document(body, uk, c_old))
+    switch_old_visits = c_old.visits
+    c_old.visits = 0
+
+    def old_mutations():
+        for sub in additions:
+            body.add(sub)
+            # старый observer: translateElement на каждый добавленный узел
+            old_translate_element(sub, uk, c_old)
+    ms_old_mut = timed(old_mutations)
+    mut_old_visits = c_old.visits
+
+    # --- new ---
+    body = build_dom(args.sections, en_keys, args.seed)
+    rng = random.Random(args.seed + 1)
+    additions = [make_section(rng, en_keys, depth=2) for _ in range(args.mutations)]
+    idx = Index()
+    c_new = Counter()
+    ms_new_build = timed(lambda: new_translate_subtree(body, uk, known, idx, c_new))
+    build_visits = c_new.visits
+    c_new.visits = 0
+
+    def new_mutations():
+        for sub in additions:
+            body.add(sub)
+            new_translate_subtree(sub, uk, known, idx, c_new)
+    ms_new_mut = timed(new_mutations)
+    mut_new_visits = c_new.visits
+    c_new.visits = 0
+
+    ms_new_switch = timed(lambda: new_retranslate(idx, ru, c_new))
+    switch_new_visits = c_new.visits
+
+    m = max(1, args.mutations)
+    print(f"old: language switch {ms_old_switch:.1f}ms ({switch_old_visits} visits), "
+          f"per mutation {ms_old_mut / m * 1000:.0f}µs ({mut_old_visits // m} visits)")
+    print(f"new: index build {ms_new_build:.1f}ms ({build_visits} visits, once), "
+          f"language switch {ms_new_switch:.1f}ms ({switch_new_visits} visits), "
+          f"per mutation {ms_new_mut / m * 1000:.0f}µs ({mut_new_visits // m} visits)")
+
+if __name__ == "__main__":
+    main()
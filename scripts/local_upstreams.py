@@ -0,0 +1,1517 @@
+"""
+Локальные заглушки внешних API (OpenAI и т.п.) + простые бенчмарки роутов.
+
+Запуск заглушки:
+    python scripts/local_upstreams.py serve --port 8787
+
+и в .env.local:
+    OPENAI_BASE_URL=http://127.0.0.1:8787/v1
+    NEXT_PUBLIC_SUPABASE_URL=http://127.0.0.1:8787
+    SUPABASE_URL=http://127.0.0.1:8787
+    WAYFORPAY_API_URL=http://127.0.0.1:8787/wfp/api
+    TURBOTA_AGENT_WEBHOOK_URL=http://127.0.0.1:8787/webhook/turbotaai-agent
+
+Supabase здесь — маленький PostgREST в памяти (eq/in/is/gt/lt фильтры, upsert,
+order/limit), его хватает нашим роутам. Счётчики запросов: GET /__stats,
+сброс: POST /__reset.
+
+Бенчмарк /api/tts (next dev/start должен быть запущен):
+    python scripts/local_upstreams.py bench-tts --app http://127.0.0.1:3000
+    python scripts/local_upstreams.py bench-tts --binary --format mp3
+
+Бенчмарк /api/stt: целый blob против инкрементальной загрузки кусков:
+    python scripts/local_upstreams.py bench-stt --seconds 6 --kbps 32
+
+Сколько запросов в Supabase стоит сохранение истории (по одной реплике и пачками):
+    python scripts/local_upstreams.py bench-history --conversations 5 --turns 10
+
+История на больших данных: 10k бесед и --threads бесед по 500 сообщений (фикстура генерируется
+здесь же); размер ответа и время до первой отрисовки — целиком против keyset-страниц и дельты since:
+    python scripts/local_upstreams.py bench-history-pages --conversations 10000 --messages 500
+
+Беседа по окну в /api/chat (history-store): --devices устройств, у каждого --burst реплик
+одновременно и ещё --turns по очереди; на устройство должна быть одна беседа, а поиск беседы —
+не больше одного запроса на реплику (без функции в БД: serve --disable-rpc touch_conversation):
+    python scripts/local_upstreams.py race-conversation --devices 20 --burst 5 --turns 10
+
+Сверка 1000 заказов через /api/billing/wayforpay/sync (по одному GET и одним POST):
+    python scripts/local_upstreams.py bench-wfp-sync --orders 1000 --sync-key $BILLING_SYNC_KEY
+
+Сколько обращений к Supabase стоит один вызов /api/turbotaai-agent (проверка доступа):
+    python scripts/local_upstreams.py bench-access --calls 50
+
+Гонка за пробными вопросами: 100 параллельных вызовов с одного устройства,
+разрешено должно быть ровно --trial (без функции в БД: serve --disable-rpc consume_trial_device):
+    python scripts/local_upstreams.py race-trial --calls 100 --trial 40
+
+Время до первого звука у звонков: ответ агента целиком (JSON) против потока по предложениям
+(stream: true); вебхук-заглушка печатает ответ по словам (serve --token-ms 60):
+    python scripts/local_upstreams.py bench-agent-stream --rounds 5
+
+Пул исходящих соединений (lib/server/upstream.ts): 200 пользователей одновременно гоняют
+/api/turbotaai-agent, /api/chat, /api/stt и /api/webhook-proxy; считаем новые TCP-соединения
+к заглушке на запрос и хвост задержек (serve --keepalive-s 5 — заглушка, как nginx, закрывает
+простаивающие keep-alive сокеты, пул должен это переживать):
+    python scripts/local_upstreams.py bench-upstream-pool --users 200 --requests 5
+
+Шторм ретраев WayForPay на /api/billing/wayforpay/webhook (или callback) с проверкой,
+что paid_until в access_grants продлён ровно один раз на заказ
+(--secret = WAYFORPAY_SECRET_KEY приложения):
+    python scripts/local_upstreams.py storm-wfp-webhook --orders 200 --copies 5 --concurrency 32
+
+Страница результата оплаты при одновременных чекаутах: сколько CHECK_STATUS в WayForPay
+стоит один чекаут — старый опрос orders/status (каждые 2.5 с, до 10 раз) против long-poll
+/api/billing/orders/watch с одной проверкой в WayForPay после таймаута; у --lost-webhook-share
+заказов вебхук не приходит вовсе (--secret = WAYFORPAY_SECRET_KEY приложения):
+    python scripts/local_upstreams.py sim-checkout --checkouts 50 --lost-webhook-share 0.1
+
+Одновременные проверки одного заказа через orders/status, wayforpay/check и wayforpay/sync
+(GET): на заказ должен уйти один CHECK_STATUS, вторая волна по оплаченным — ни одного,
+доступ продлён ровно один раз (serve --latency-ms 300, чтобы запросы успели склеиться):
+    python scripts/local_upstreams.py race-wfp-check --orders 40 --copies 12
+
+Только stdlib — ничего ставить не нужно.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import HTTPError
+from urllib.parse import parse_qsl, quote, unquote, urlsplit
+from urllib.request import Request, urlopen
+import argparse
+import datetime
+import hashlib
+import hmac
+import json
+import random
+import statistics
+import struct
+import threading
+import time
+import uuid
+
+STATS = {}
+STATS_LOCK = threading.Lock()
+
+def bump(name: str, n: int = 1):
+    with STATS_LOCK:
+        STATS[name] = STATS.get(name, 0) + n
+
+def fake_wav(text: str, ms_per_char: int = 25) -> bytes:
+    # тишина 16kHz mono, длина пропорциональна тексту — достаточно для проверки размеров
+    samples = max(1600, len(text) * ms_per_char * 16)
+    data = b"\x00\x00" * samples
+    header = b"RIFF" + struct.pack("<I", 36 + len(data)) + b"WAVE"
+    header += b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, 16000, 32000, 2, 16)
+    header += b"data" + struct.pack("<I", len(data))
+    return header + data
+
+# ---------------- Supabase (PostgREST-lite) ----------------
+
+TABLES = {}
+DB_LOCK = threading.Lock()
+
+def now_iso() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+def coerce(v: str):
+    if v == "null":
+        return None
+    if v in ("true", "false"):
+        return v == "true"
+    return v
+
+def cmp_key(v):
+    # числа сравниваем как числа, остальное (в т.ч. ISO даты) — как строки
+    if isinstance(v, (int, float)) and not isinstance(v, bool):
+        return (0, v, "")
+    try:
+        return (0, float(v), "")
+    except (TypeError, ValueError):
+        return (1, 0, str(v))
+
+def match(row: dict, col: str, expr: str) -> bool:
+    op, _, val = expr.partition(".")
+    if len(val) > 1 and val[0] == val[-1] == '"':
+        val = val[1:-1]
+    cur = row.get(col)
+    if op == "eq":
+        if isinstance(cur, bool):
+            return str(cur).lower() == val
+        return cur is not None and str(cur) == val
+    if op == "neq":
+        return str(cur) != val
+    if op == "is":
+        return cur is None if val == "null" else cur == coerce(val)
+    if op == "in":
+        items = [x.strip().strip('"') for x in val.strip("()").split(",") if x.strip()]
+        return cur is not None and str(cur) in items
+    if op in ("gt", "gte", "lt", "lte"):
+        if cur is None:
+            return False
+        a, b = cmp_key(cur), cmp_key(val)
+        return {"gt": a > b, "gte": a >= b, "lt": a < b, "lte": a <= b}[op]
+    if op == "not":
+        return not match(row, col, val)
+    return True
+
+def split_top(expr: str) -> list:
+    # "a.eq.1,and(b.eq.2,c.gt.3)" -> ["a.eq.1", "and(b.eq.2,c.gt.3)"]; запятые в кавычках не делят
+    parts, depth, quoted, cur = [], 0, False, ""
+    for ch in expr:
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        elif not quoted and ch == "," and depth == 0:
+            parts.append(cur)
+            cur = ""
+            continue
+        cur += ch
+    return parts + [cur] if cur else parts
+
+def match_part(row: dict, part: str) -> bool:
+    if part.startswith(("and(", "or(")):
+        kind, _, inner = part.partition("(")
+        items = [match_part(row, p) for p in split_top(inner[:-1])]
+        return all(items) if kind == "and" else any(items)
+    col, _, rest = part.partition(".")
+    return match(row, col, rest)
+
+def match_or(row: dict, expr: str) -> bool:
+    # or=(a.eq.1,b.is.null), в т.ч. вложенные and(...) — keyset-курсоры истории
+    return any(match_part(row, p) for p in split_top(expr[1:-1] if expr.startswith("(") else expr))
+
+class Query:
+    def __init__(self, query: str):
+        self.filters = []
+        self.select = None
+        self.order = []
+        self.limit = None
+        self.offset = 0
+        self.on_conflict = None
+        for k, v in parse_qsl(query, keep_blank_values=True):
+            if k == "select":
+                self.select = [c.strip() for c in v.split(",") if c.strip() and c.strip() != "*"] or None
+            elif k == "order":
+                for part in v.split(","):
+                    bits = part.split(".")
+                    self.order.append((bits[0], "desc" in bits[1:]))
+            elif k == "limit":
+                self.limit = int(v)
+            elif k == "offset":
+                self.offset = int(v)
+            elif k == "on_conflict":
+                self.on_conflict = [c.strip() for c in v.split(",")]
+            elif k == "columns":
+                pass
+            else:
+                self.filters.append((k, v))
+
+    def rows(self, table: list) -> list:
+        out = []
+        for r in table:
+            ok = True
+            for col, expr in self.filters:
+                if col == "or":
+                    ok = match_or(r, expr)
+                else:
+                    ok = match(r, col, expr)
+                if not ok:
+                    break
+            if ok:
+                out.append(r)
+        for col, desc in reversed(self.order):
+            out.sort(key=lambda r: (r.get(col) is None, cmp_key(r.get(col))), reverse=desc)
+        out = out[self.offset:]
+        if self.limit is not None:
+            out = out[: self.limit]
+        return out
+
+    def project(self, rows: list) -> list:
+        if not self.select:
+            return [dict(r) for r in rows]
+        return [{c: r.get(c) for c in self.select} for r in rows]
+
+def with_defaults(row: dict) -> dict:
+    row = dict(row)
+    row.setdefault("id", str(uuid.uuid4()))
+    row.setdefault("created_at", now_iso())
+    return row
+
+# RPC-функции: имя -> fn(args: dict) -> json; роуты, которым нужны RPC, регистрируют их здесь
+RPC = {}
+
+def rpc_consume_trial_device(args: dict):
+    # как в БД: один UPDATE ... SET trial_questions_left = trial_questions_left - 1 WHERE ... > 0
+    key = str(args.get("p_device_hash") or "")
+    rows = [r for r in TABLES.get("access_grants", []) if r.get("device_hash") == key]
+    rows.sort(key=lambda r: (str(r.get("updated_at") or ""), str(r.get("created_at") or "")), reverse=True)
+    row = rows[0] if rows else None
+    left = int((row or {}).get("trial_questions_left") or 0)
+    if not row or left <= 0:
+        return [{"allowed": False, "trial_left": 0}]
+    row["trial_questions_left"] = left - 1
+    row["updated_at"] = now_iso()
+    return [{"allowed": True, "trial_left": left - 1}]
+
+RPC["consume_trial_device"] = rpc_consume_trial_device
+
+def rpc_touch_conversation(args: dict):
+    # как в БД (lib/history/history-store.ts): под блокировкой — touch свежей беседы в окне или insert
+    table = TABLES.setdefault("conversations", [])
+    cutoff = time.time() - float(args.get("p_window_seconds") or 0)
+    rows = [r for r in table if r.get("device_hash") == args.get("p_device_hash") and r.get("mode") == args.get("p_mode")
+            and r.get("updated_at") and parse_ts(r["updated_at"]) > cutoff]
+    if rows:
+        row = max(rows, key=lambda r: parse_ts(r["updated_at"]))
+        row["updated_at"] = now_iso()
+        return row["id"]
+    row = with_defaults({"device_hash": args.get("p_device_hash"), "mode": args.get("p_mode"), "user_id": None,
+                         "title": args.get("p_title"), "user_email": args.get("p_user_email"), "updated_at": now_iso()})
+    table.append(row)
+    return row["id"]
+
+RPC["touch_conversation"] = rpc_touch_conversation
+
+# ---------------- WayForPay ----------------
+
+WFP = {"merchant": "test_merch_n1", "secret": "flk3409refn54t54t*FNJRET"}
+WFP_ORDERS = {}  # orderReference -> transactionStatus (если не задан — по имени заказа)
+
+def wfp_sign(fields: list) -> str:
+    line = ";".join(str(f) for f in fields)
+    return hmac.new(WFP["secret"].encode("utf-8"), line.encode("utf-8"), hashlib.md5).hexdigest()
+
+def wfp_status_for(ref: str) -> str:
+    if ref in WFP_ORDERS:
+        return WFP_ORDERS[ref]
+    low = ref.lower()
+    if "declin" in low or "fail" in low:
+        return "Declined"
+    if "pending" in low:
+        return "InProcessing"
+    return "Approved"
+
+AGENT_ANSWER = (
+    "Я поруч і уважно вас слухаю. "
+    "Те, що ви відчуваєте зараз, — зрозуміла реакція на напругу останніх днів. "
+    "Спробуймо разом розібратися, що саме забирає найбільше сил. "
+    "Розкажіть, будь ласка, коли ви востаннє відчували спокій? "
+    "І що тоді було інакше, ніж зараз?"
+)
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency_ms = 0
+    token_ms = 0
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        # одно TCP-соединение — один Handler; запросы внутри keep-alive считает "requests"
+        bump("tcp.connections")
+
+    def read_body(self) -> bytes:
+        n = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(n) if n else b""
+
+    def send(self, status: int, body: bytes, content_type: str = "application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, status: int, obj):
+        self.send(status, json.dumps(obj, ensure_ascii=False).encode("utf-8"))
+
+    def do_GET(self):
+        if self.path.startswith("/__stats"):
+            with STATS_LOCK:
+                self.send_json(200, dict(STATS))
+            return
+        bump("requests")
+        if self.path.startswith("/rest/v1/"):
+            return self.rest("GET")
+        if self.path.startswith("/auth/v1/user"):
+            return self.auth_user()
+        self.send_json(404, {"error": "not found"})
+
+    def do_HEAD(self):
+        bump("requests")
+        if self.path.startswith("/rest/v1/"):
+            return self.rest("HEAD")
+        self.send_json(404, {"error": "not found"})
+
+    def do_PATCH(self):
+        bump("requests")
+        if self.path.startswith("/rest/v1/"):
+            return self.rest("PATCH")
+        self.send_json(404, {"error": "not found"})
+
+    def do_DELETE(self):
+        bump("requests")
+        if self.path.startswith("/rest/v1/"):
+            return self.rest("DELETE")
+        self.send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path.startswith("/__reset"):
+            with STATS_LOCK:
+                STATS.clear()
+            with DB_LOCK:
+                TABLES.clear()
+            return self.send_json(200, {"ok": True})
+        bump("requests")
+        if self.path.startswith("/rest/v1/"):
+            return self.rest("POST")
+        if self.path.startswith("/__wfp/orders"):
+            WFP_ORDERS.update(json.loads(self.read_body() or b"{}"))
+            return self.send_json(200, {"ok": True, "orders": len(WFP_ORDERS)})
+        if self.path.startswith("/wfp/api"):
+            return self.wfp_api()
+        if self.path.startswith("/webhook/turbotaai-agent"):
+            return self.agent_webhook()
+        if self.path.startswith("/v1/audio/speech"):
+            return self.audio_speech()
+        if self.path.startswith("/v1/audio/transcriptions"):
+            return self.audio_transcriptions()
+        self.send_json(404, {"error": "not found"})
+
+    def agent_webhook(self):
+        """
+        Вебхук агента. Модель "печатает" по слову раз в token_ms после latency_ms размышлений:
+        без stream — отдаём JSON, когда напечатано всё; со stream — поток как у n8n
+        ({"type":"item","content":...} построчно, chunked).
+        """
+        bump("agent.webhook")
+        try:
+            payload = json.loads(self.read_body() or b"{}")
+        except Exception:
+            payload = {}
+        time.sleep(self.latency_ms / 1000)
+        tokens = [w + " " for w in AGENT_ANSWER.split(" ")]
+        tokens[-1] = tokens[-1].rstrip()
+
+        if not payload.get("stream"):
+            time.sleep(len(tokens) * self.token_ms / 1000)
+            return self.send_json(200, {"output": AGENT_ANSWER})
+
+        bump("agent.webhook.stream")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def chunk(obj):
+            data = (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        try:
+            chunk({"type": "begin"})
+            for tok in tokens:
+                time.sleep(self.token_ms / 1000)
+                chunk({"type": "item", "content": tok})
+            chunk({"type": "end"})
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # роут отменил чтение (клиент закрыл диалог)
+            bump("agent.webhook.cancelled")
+            self.close_connection = True
+
+    def wfp_api(self):
+        try:
+            payload = json.loads(self.read_body() or b"{}")
+        except Exception:
+            return self.send_json(400, {"reason": "bad json", "reasonCode": 1113})
+        kind = str(payload.get("transactionType") or "")
+        bump(f"wfp.{kind or 'unknown'}")
+        time.sleep(self.latency_ms / 1000)
+
+        if kind != "CHECK_STATUS":
+            return self.send_json(200, {"reason": "Ok", "reasonCode": 1100})
+
+        ref = str(payload.get("orderReference") or "")
+        expected = wfp_sign([payload.get("merchantAccount", ""), ref])
+        if payload.get("merchantSignature") != expected:
+            return self.send_json(200, {"reason": "Invalid signature", "reasonCode": 1113, "orderReference": ref})
+
+        status = wfp_status_for(ref)
+        body = {
+            "merchantAccount": WFP["merchant"],
+            "orderReference": ref,
+            "amount": 1,
+            "currency": "UAH",
+            "authCode": "541963" if status == "Approved" else "",
+            "cardPan": "41****8217",
+            "transactionStatus": status,
+            "reasonCode": 1100 if status == "Approved" else 1101,
+            "reason": "Ok" if status == "Approved" else "Declined",
+        }
+        body["merchantSignature"] = wfp_sign([body["merchantAccount"], ref, body["amount"], body["currency"],
+                                              body["authCode"], body["cardPan"], status, body["reasonCode"]])
+        self.send_json(200, body)
+
+    def auth_user(self):
+        bump("supabase.auth.getUser")
+        token = (self.headers.get("Authorization") or "").removeprefix("Bearer ").strip()
+        if not token or token.count(".") != 2 and not token.startswith("user-"):
+            return self.send_json(401, {"msg": "invalid token"})
+        # токен вида user-<id> — удобно для бенчей
+        uid = token if token.startswith("user-") else "user-" + str(abs(hash(token)) % 10**8)
+        self.send_json(200, {"id": uid, "email": f"{uid}@local.test", "aud": "authenticated"})
+
+    def rest(self, method: str):
+        parts = urlsplit(self.path)
+        name = unquote(parts.path[len("/rest/v1/"):]).strip("/")
+        prefer = self.headers.get("Prefer") or ""
+        want_object = "vnd.pgrst.object" in (self.headers.get("Accept") or "")
+        q = Query(parts.query)
+
+        if name.startswith("rpc/"):
+            fn = RPC.get(name[4:])
+            bump(f"supabase.rpc.{name[4:]}")
+            # тело читаем и при 404 — иначе оно останется в keep-alive сокете перед следующим запросом
+            body = self.read_body()
+            if not fn:
+                return self.send_json(404, {"code": "PGRST202", "message": f"function {name[4:]} not found"})
+            args = json.loads(body) if body else dict(parse_qsl(parts.query))
+            with DB_LOCK:
+                out = fn(args)
+            return self.send_json(200, out)
+
+        bump(f"supabase.{method} {name}")
+        body = self.read_body() if method in ("POST", "PATCH") else b""
+        payload = json.loads(body) if body else None
+
+        with DB_LOCK:
+            table = TABLES.setdefault(name, [])
+            if method in ("GET", "HEAD"):
+                found = q.rows(table)
+                result = q.project(found)
+            elif method == "POST":
+                items = payload if isinstance(payload, list) else [payload or {}]
+                upsert = "merge-duplicates" in prefer
+                ignore = "ignore-duplicates" in prefer
+                keys = q.on_conflict or ["id"]
+                result = []
+                for item in items:
+                    existing = None
+                    if upsert or ignore:
+                        existing = next((r for r in table if all(k in item and r.get(k) == item.get(k) for k in keys)), None)
+                    if existing is not None:
+                        if upsert:
+                            existing.update(item)
+                            result.append(dict(existing))
+                        continue
+                    row = with_defaults(item)
+                    table.append(row)
+                    result.append(dict(row))
+                result = q.project(result)
+            elif method == "PATCH":
+                found = q.rows(table)
+                for r in found:
+                    r.update(payload or {})
+                result = q.project(found)
+            else:
+                found = q.rows(table)
+                ids = {id(r) for r in found}
+                TABLES[name] = [r for r in table if id(r) not in ids]
+                result = q.project(found)
+
+        if method == "HEAD":
+            self.send_response(200)
+            self.send_header("Content-Range", f"0-{max(0, len(result) - 1)}/{len(result)}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if method != "GET" and "return=representation" not in prefer:
+            self.send_response(201 if method == "POST" else 204)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if want_object:
+            if len(result) != 1:
+                return self.send_json(406, {"code": "PGRST116", "message": "JSON object requested, multiple (or no) rows returned", "details": f"Results contain {len(result)} rows"})
+            return self.send_json(200, result[0])
+        self.send_json(200 if method == "GET" else 201, result)
+
+    def audio_speech(self):
+        bump("openai.audio.speech")
+        try:
+            payload = json.loads(self.read_body() or b"{}")
+        except Exception:
+            return self.send_json(400, {"error": "bad json"})
+        time.sleep(self.latency_ms / 1000)
+        self.send(200, fake_wav(str(payload.get("input") or "")), "audio/wav")
+
+    def audio_transcriptions(self):
+        bump("openai.audio.transcriptions")
+        body = self.read_body()
+        bump("openai.audio.transcriptions.bytes", len(body))
+        # Whisper тратит время пропорционально длине аудио — имитируем грубо
+        time.sleep(self.latency_ms / 1000 + len(body) / 1_000_000)
+        self.send_json(200, {
+            "text": f"тестова фраза ({len(body)} bytes)",
+            "segments": [{"start": 0, "end": 1.5, "no_speech_prob": 0.01}],
+        })
+
+class Server(ThreadingHTTPServer):
+    # бенчи открывают по сотне соединений разом — дефолтный backlog (5) их сбрасывает
+    request_queue_size = 256
+    daemon_threads = True
+
+def serve(args):
+    Handler.latency_ms = args.latency_ms
+    Handler.token_ms = args.token_ms
+    # простаивающий keep-alive сокет закрываем через N секунд (None — держим, пока клиент не уйдёт)
+    Handler.timeout = args.keepalive_s or None
+    WFP["merchant"] = args.wfp_merchant
+    WFP["secret"] = args.wfp_secret
+    for name in args.disable_rpc:
+        RPC.pop(name, None)
+    srv = Server((args.host, args.port), Handler)
+    print(f"✅ local upstreams on http://{args.host}:{args.port} (latency {args.latency_ms}ms, agent {args.token_ms}ms/word)")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+def post_json(url: str, obj, headers=None) -> tuple:
+    req = Request(url, data=json.dumps(obj).encode("utf-8"), headers={"Content-Type": "application/json", **(headers or {})})
+    t0 = time.perf_counter()
+    with urlopen(req, timeout=60) as r:
+        body = r.read()
+        status = r.status
+    return status, body, (time.perf_counter() - t0) * 1000
+
+def pct(xs, p):
+    if not xs:
+        return 0.0
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(round(p / 100 * (len(xs) - 1))))]
+
+def report(name: str, xs):
+    if not xs:
+        print(f"⚠️ {name}: no samples")
+        return
+    print(f"{name}: n={len(xs)} p50={pct(xs, 50):.1f}ms p99={pct(xs, 99):.1f}ms mean={statistics.mean(xs):.1f}ms")
+
+def bench_tts(args):
+    phrases = [
+        "Привіт! Я тут, щоб вислухати вас.",
+        "Hello! I'm here to listen.",
+        "Здравствуйте! Я вас слушаю.",
+        "Tell me more about that.",
+    ]
+    payload = {"language": "uk", "gender": "female"}
+    headers = {}
+    if args.binary:
+        payload.update({"binary": True, "format": args.format})
+        headers["Accept"] = "audio/*"
+
+    first, repeat, sizes = [], [], []
+    for i in range(args.rounds):
+        for text in phrases:
+            status, body, ms = post_json(args.app.rstrip("/") + "/api/tts", {**payload, "text": text}, headers)
+            if status != 200:
+                print(f"⚠️ status {status} for {text!r}")
+            (first if i == 0 else repeat).append(ms)
+            sizes.append(len(body))
+    report("cold", first)
+    report("warm", repeat)
+    print(f"payload: mean={statistics.mean(sizes):.0f} bytes ({'binary ' + args.format if args.binary else 'json/base64 wav'})")
+
+def post_bytes(url: str, body: bytes, headers: dict) -> tuple:
+    req = Request(url, data=body, headers=headers)
+    t0 = time.perf_counter()
+    with urlopen(req, timeout=60) as r:
+        out = r.read()
+        status = r.status
+    return status, out, (time.perf_counter() - t0) * 1000
+
+def bench_stt(args):
+    """
+    Имитирует фразу длиной --seconds: MediaRecorder отдаёт кусок раз в --slice-ms.
+    whole   — после конца речи шлём один blob (как раньше);
+    chunked — куски уходят по мере записи, после конца речи — только финальный запрос.
+    Меряем время от конца речи до ответа с текстом.
+    """
+    url = args.app.rstrip("/") + "/api/stt"
+    chunk_bytes = int(args.kbps * 1000 / 8 * args.slice_ms / 1000)
+    n_chunks = max(2, int(args.seconds * 1000 / args.slice_ms))
+    chunks = [b"\x1a\x45\xdf\xa3" + b"\x00" * 200] + [bytes([i % 251]) * chunk_bytes for i in range(n_chunks)]
+    base = {"Content-Type": "audio/webm", "X-STT-Lang": "uk", "X-STT-Hint": "auto"}
+
+    whole, chunked = [], []
+    for _ in range(args.rounds):
+        _, _, ms = post_bytes(url, b"".join(chunks), base)
+        whole.append(ms)
+
+        sid = uuid.uuid4().hex
+        for seq, c in enumerate(chunks[:-1]):
+            post_bytes(url, c, {**base, "X-STT-Session": sid, "X-STT-Seq": str(seq)})
+            if args.realtime:
+                time.sleep(args.slice_ms / 1000)
+        status, body, ms = post_bytes(url, chunks[-1], {**base, "X-STT-Session": sid, "X-STT-Seq": str(len(chunks) - 1), "X-STT-Final": "1"})
+        if status != 200:
+            print(f"⚠️ chunked final: {status} {body[:200]!r}")
+        chunked.append(ms)
+
+    print(f"utterance: {args.seconds}s, {n_chunks} chunks x {chunk_bytes} bytes")
+    report("whole   end-of-speech→text", whole)
+    report("chunked end-of-speech→text", chunked)
+
+def upstream_stats(upstream: str, reset: bool = False) -> dict:
+    base = upstream.rstrip("/")
+    if reset:
+        urlopen(Request(base + "/__reset", data=b"{}", method="POST"), timeout=10).read()
+        return {}
+    with urlopen(base + "/__stats", timeout=10) as r:
+        return json.loads(r.read())
+
+def supabase_calls(stats: dict) -> int:
+    return sum(v for k, v in stats.items() if k.startswith("supabase.") and not k.endswith(".bytes"))
+
+def bench_history(args):
+    """
+    --conversations бесед по --turns реплик.
+    single — POST /api/history/save на каждую реплику (как было);
+    batch  — те же реплики пачками по --batch-size сообщений.
+    Считаем запросы к Supabase-заглушке.
+    """
+    url = args.app.rstrip("/") + "/api/history/save"
+    convs = [str(uuid.uuid4()) for _ in range(args.conversations)]
+
+    upstream_stats(args.upstream, reset=True)
+    for t in range(args.turns):
+        for cid in convs:
+            post_json(url, {"conversationId": cid, "userText": f"q{t}", "assistantText": f"a{t}"})
+    single = supabase_calls(upstream_stats(args.upstream))
+
+    convs = [str(uuid.uuid4()) for _ in range(args.conversations)]
+    upstream_stats(args.upstream, reset=True)
+    batch, count = {}, 0
+    for t in range(args.turns):
+        for cid in convs:
+            batch.setdefault(cid, []).extend([{"role": "user", "content": f"q{t}"}, {"role": "assistant", "content": f"a{t}"}])
+            count += 2
+            if count >= args.batch_size:
+                post_json(url, {"batch": [{"conversationId": k, "messages": v} for k, v in batch.items()]})
+                batch, count = {}, 0
+    if batch:
+        post_json(url, {"batch": [{"conversationId": k, "messages": v} for k, v in batch.items()]})
+    batched = supabase_calls(upstream_stats(args.upstream))
+
+    total = args.conversations * args.turns
+    print(f"{args.conversations} conversations x {args.turns} turns")
+    print(f"single: {single} supabase calls ({single / total:.2f}/turn)")
+    print(f"batch:  {batched} supabase calls ({batched / total:.2f}/turn)")
+
+HISTORY_WORDS = ("сьогодні", "тривога", "сон", "робота", "розмова", "дихання", "спокій", "думки", "вечір", "друзі")
+
+def seed_history(upstream: str, device: str, conversations: int, threads: int, messages: int, rng) -> list:
+    """Беседы устройства device (updated_at — по минуте назад на каждую) и первые threads из них
+    с messages сообщениями. Возвращает id бесед с сообщениями."""
+    base = time.time() - conversations * 60
+    ts = lambda t: datetime.datetime.fromtimestamp(t, datetime.timezone.utc).isoformat()
+    convs = [{"id": str(uuid.uuid4()), "device_hash": device, "user_id": None, "mode": rng.choice(["chat", "voice", "video"]),
+              "title": " ".join(rng.choice(HISTORY_WORDS) for _ in range(4)),
+              "created_at": ts(base + i * 60), "updated_at": ts(base + i * 60 + 30)} for i in range(conversations)]
+    # с сообщениями — самые свежие беседы
+    threads_ids = [c["id"] for c in convs[-threads:]] if threads else []
+    rows = []
+    for cid in threads_ids:
+        t0 = time.time() - messages * 20
+        for j in range(messages):
+            text = " ".join(rng.choice(HISTORY_WORDS) for _ in range(rng.randint(8, 60)))
+            rows.append({"id": str(uuid.uuid4()), "conversation_id": cid, "user_id": None,
+                         "role": "user" if j % 2 == 0 else "assistant", "text": text, "created_at": ts(t0 + j * 20)})
+    for table, items in (("conversations", convs), ("messages", rows)):
+        for i in range(0, len(items), 1000):
+            post_json(upstream.rstrip("/") + f"/rest/v1/{table}", items[i:i + 1000])
+    return threads_ids
+
+def get_timed(url: str, headers: dict) -> tuple:
+    """(json, байт, мс)"""
+    t0 = time.perf_counter()
+    with urlopen(Request(url, headers=headers), timeout=60) as r:
+        body = r.read()
+    return json.loads(body or b"{}"), len(body), (time.perf_counter() - t0) * 1000
+
+def bench_history_pages(args):
+    """
+    list   — первая страница, обход всех страниц курсором, дельта since после правки 3 бесед;
+    thread — вся беседа одним ответом (limit=500, как было) против первой страницы (первая
+             отрисовка) и дозагрузки; затем дельта since+after после 2 новых сообщений.
+    """
+    rng = random.Random(args.seed)
+    app = args.app.rstrip("/")
+    device = f"bench-device-{uuid.uuid4().hex[:8]}"
+    # list читает cookie device_hash, [id] — ta_device_hash
+    headers = {"Cookie": f"device_hash={device}; ta_device_hash={device}"}
+
+    upstream_stats(args.upstream, reset=True)
+    t0 = time.perf_counter()
+    threads = seed_history(args.upstream, device, args.conversations, args.threads, args.messages, rng)
+    print(f"fixture: {args.conversations} conversations, {len(threads)} x {args.messages} messages "
+          f"({time.perf_counter() - t0:.1f}s)")
+
+    # ---- list ----
+    first, size, ms = get_timed(f"{app}/api/history/list?limit={args.list_limit}", headers)
+    print(f"list first page: {len(first.get('conversations', []))} rows, {size / 1024:.1f} KB, {ms:.0f}ms")
+    pages, total, total_bytes, cursor = 1, len(first.get("conversations", [])), size, first.get("nextCursor")
+    t0 = time.perf_counter()
+    while cursor and pages < args.max_pages:
+        page, size, _ = get_timed(f"{app}/api/history/list?limit={args.list_limit}&cursor={cursor}", headers)
+        pages, total, total_bytes = pages + 1, total + len(page.get("conversations", [])), total_bytes + size
+        cursor = page.get("nextCursor")
+    print(f"list walk: {pages} pages, {total} rows, {total_bytes / 1024:.0f} KB, {(time.perf_counter() - t0) * 1000:.0f}ms"
+          + (" (stopped at --max-pages)" if cursor else ""))
+
+    newest = max(c["updated_at"] for c in first.get("conversations", [])) if first.get("conversations") else now_iso()
+    for cid in threads[:3]:
+        req = Request(args.upstream.rstrip("/") + f"/rest/v1/conversations?id=eq.{cid}",
+                      data=json.dumps({"updated_at": now_iso()}).encode("utf-8"), method="PATCH",
+                      headers={"Content-Type": "application/json"})
+        urlopen(req, timeout=10).read()
+    delta, size, ms = get_timed(f"{app}/api/history/list?since={quote(newest)}", headers)
+    print(f"list since: {len(delta.get('conversations', []))} rows, {size} B, {ms:.0f}ms")
+
+    # ---- thread ----
+    full, first_page, tails, deltas = [], [], [], []
+    for cid in threads:
+        data, size, ms = get_timed(f"{app}/api/history/{cid}?limit=500", headers)
+        full.append((size, ms))
+
+        data, size, ms = get_timed(f"{app}/api/history/{cid}?limit={args.page_size}", headers)
+        first_page.append((size, ms))
+        cursor, t0, got = data.get("nextCursor"), time.perf_counter(), len(data.get("messages", []))
+        last = data.get("lastCursor")
+        while cursor:
+            data, _, _ = get_timed(f"{app}/api/history/{cid}?limit={args.page_size}&after={cursor}", headers)
+            got += len(data.get("messages", []))
+            cursor, last = data.get("nextCursor"), data.get("lastCursor") or last
+        tails.append((time.perf_counter() - t0) * 1000)
+        if got != args.messages:
+            print(f"⚠️ {cid}: paged {got} of {args.messages} messages")
+
+        seen = data.get("conversation", {}).get("updated_at")
+        data, size, ms = get_timed(f"{app}/api/history/{cid}?since={quote(seen)}&after={last}", headers)
+        unchanged = (size, ms, data.get("unchanged"))
+        post_json(args.upstream.rstrip("/") + "/rest/v1/messages",
+                  [{"conversation_id": cid, "role": r, "text": "нове повідомлення", "created_at": now_iso()} for r in ("user", "assistant")])
+        req = Request(args.upstream.rstrip("/") + f"/rest/v1/conversations?id=eq.{cid}",
+                      data=json.dumps({"updated_at": now_iso()}).encode("utf-8"), method="PATCH",
+                      headers={"Content-Type": "application/json"})
+        urlopen(req, timeout=10).read()
+        data, size, ms = get_timed(f"{app}/api/history/{cid}?since={quote(seen)}&after={last}", headers)
+        deltas.append((unchanged, (size, ms, len(data.get("messages", [])))))
+
+    kb = lambda xs: statistics.mean(s for s, _ in xs) / 1024
+    print(f"thread whole:      {kb(full):.1f} KB, first render after {statistics.mean(m for _, m in full):.0f}ms")
+    print(f"thread first page: {kb(first_page):.1f} KB, first render after {statistics.mean(m for _, m in first_page):.0f}ms "
+          f"(rest in {statistics.mean(tails):.0f}ms, in the background)")
+    (us, ums, flag), (ds, dms, n) = deltas[-1]
+    print(f"thread since (no changes): {us} B, {ums:.0f}ms, unchanged={flag}")
+    print(f"thread since (+2 messages): {ds} B, {dms:.0f}ms, {n} messages")
+
+def stats_delta(before: dict, after: dict) -> dict:
+    return {k: v - before.get(k, 0) for k, v in after.items()}
+
+def seed_orders(upstream: str, refs: list):
+    rows = [{"order_reference": r, "status": "invoice_created", "plan_id": "monthly", "amount": 1, "currency": "UAH",
+             "device_hash": f"device-{i}", "user_id": None, "updated_at": now_iso()} for i, r in enumerate(refs)]
+    for i in range(0, len(rows), 500):
+        post_json(upstream.rstrip("/") + "/rest/v1/billing_orders", rows[i:i + 500])
+
+def bench_wfp_sync(args):
+    """
+    before — GET /api/billing/wayforpay/sync?orderReference=... на каждый заказ по очереди;
+    after  — один POST со списком (ограниченная параллельность и bulk upsert внутри роута).
+    """
+    url = args.app.rstrip("/") + "/api/billing/wayforpay/sync"
+    results = {}
+
+    if not args.skip_before:
+        upstream_stats(args.upstream, reset=True)
+        refs = [f"bench-before-{i}" for i in range(args.orders)]
+        seed_orders(args.upstream, refs)
+        base = upstream_stats(args.upstream)
+        t0 = time.perf_counter()
+        for r in refs:
+            with urlopen(f"{url}?orderReference={r}", timeout=60) as resp:
+                resp.read()
+        results["before"] = (time.perf_counter() - t0, stats_delta(base, upstream_stats(args.upstream)))
+
+    upstream_stats(args.upstream, reset=True)
+    refs = [f"bench-after-{i}" for i in range(args.orders)]
+    seed_orders(args.upstream, refs)
+    base = upstream_stats(args.upstream)
+    t0 = time.perf_counter()
+    status, body, _ = post_json(url, {"orderReferences": refs}, {"x-sync-key": args.sync_key})
+    results["after"] = (time.perf_counter() - t0, stats_delta(base, upstream_stats(args.upstream)))
+    if status != 200:
+        print(f"⚠️ POST sync: {status} {body[:300]!r}")
+
+    for name, (secs, stats) in results.items():
+        print(f"{name:6}: {secs:.2f}s for {args.orders} orders, "
+              f"wfp={stats.get('wfp.CHECK_STATUS', 0)} supabase={supabase_calls(stats)}")
+
+def bench_access(args):
+    """
+    Три сценария по --calls вызовов /api/turbotaai-agent:
+      new   — каждый раз новое устройство (грант создаётся);
+      trial — одно устройство, списываем пробные вопросы;
+      paid  — устройство с оплаченным paid_until.
+    Считаем запросы к Supabase (REST + auth) на один вызов.
+    """
+    url = args.app.rstrip("/") + "/api/turbotaai-agent"
+    upstream_stats(args.upstream, reset=True)
+    paid_until = (datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=30)).isoformat()
+    post_json(args.upstream.rstrip("/") + "/rest/v1/access_grants",
+              {"device_hash": "bench-paid", "trial_questions_left": 0, "paid_until": paid_until,
+               "promo_until": None, "updated_at": now_iso()})
+
+    def call(device: str):
+        req = Request(url, data=json.dumps({"query": "привіт", "language": "uk"}).encode("utf-8"),
+                      headers={"Content-Type": "application/json", "Cookie": f"ta_device_hash={device}"})
+        t0 = time.perf_counter()
+        try:
+            with urlopen(req, timeout=60) as r:
+                r.read()
+                status = r.status
+        except HTTPError as e:
+            e.read()
+            status = e.code
+        return status, (time.perf_counter() - t0) * 1000
+
+    scenarios = {
+        "new": lambda i: f"bench-new-{i}",
+        "trial": lambda i: "bench-trial",
+        "paid": lambda i: "bench-paid",
+    }
+    for name, device_for in scenarios.items():
+        base = upstream_stats(args.upstream)
+        codes, times = {}, []
+        for i in range(args.calls):
+            status, ms = call(device_for(i))
+            codes[status] = codes.get(status, 0) + 1
+            times.append(ms)
+        stats = stats_delta(base, upstream_stats(args.upstream))
+        per_call = supabase_calls(stats) / max(1, args.calls)
+        tables = ", ".join(f"{k.removeprefix('supabase.')}={v}" for k, v in sorted(stats.items())
+                           if k.startswith("supabase.") and v and not k.endswith(".bytes"))
+        print(f"{name:5}: {per_call:.2f} supabase round-trips/call, http {codes}")
+        print(f"       {tables}")
+        report(f"{name:5} latency", times)
+
+def race_trial(args):
+    url = args.app.rstrip("/") + "/api/turbotaai-agent"
+    device = f"race-{uuid.uuid4().hex[:8]}"
+    upstream_stats(args.upstream, reset=True)
+    post_json(args.upstream.rstrip("/") + "/rest/v1/access_grants",
+              {"device_hash": device, "trial_questions_left": args.trial, "paid_until": None,
+               "promo_until": None, "updated_at": now_iso()})
+
+    def call(_):
+        req = Request(url, data=json.dumps({"query": "привіт", "language": "uk"}).encode("utf-8"),
+                      headers={"Content-Type": "application/json", "Cookie": f"ta_device_hash={device}"})
+        t0 = time.perf_counter()
+        try:
+            with urlopen(req, timeout=60) as r:
+                r.read()
+                status = r.status
+        except HTTPError as e:
+            e.read()
+            status = e.code
+        return status, (time.perf_counter() - t0) * 1000
+
+    base = upstream_stats(args.upstream)
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(call, range(args.calls)))
+    stats = stats_delta(base, upstream_stats(args.upstream))
+
+    with urlopen(args.upstream.rstrip("/") + f"/rest/v1/access_grants?device_hash=eq.{device}&select=trial_questions_left",
+                 timeout=10) as r:
+        left = json.loads(r.read())[0]["trial_questions_left"]
+
+    allowed = sum(1 for status, _ in results if status == 200)
+    denied = sum(1 for status, _ in results if status == 402)
+    other = len(results) - allowed - denied
+    expected = min(args.trial, args.calls)
+    print(f"{args.calls} calls x concurrency {args.concurrency}, trial {args.trial}: "
+          f"allowed {allowed}, denied {denied}, other {other}, left in db {left}")
+    print(f"supabase round-trips/call: {supabase_calls(stats) / max(1, args.calls):.2f} "
+          f"(rpc {stats.get('supabase.rpc.consume_trial_device', 0)}, "
+          f"patch {stats.get('supabase.PATCH access_grants', 0)})")
+    report("latency", [ms for _, ms in results])
+    if allowed != expected or left != args.trial - allowed or other:
+        print(f"⚠️ expected {expected} allowed and {args.trial - expected} left")
+        raise SystemExit(1)
+    print("✅ counts match")
+
+def race_conversation(args):
+    url = args.app.rstrip("/") + "/api/chat"
+    run = uuid.uuid4().hex[:6]
+    devices = [f"conv-{run}-{i}" for i in range(args.devices)]
+    paid = (datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=30)).isoformat()
+
+    upstream_stats(args.upstream, reset=True)
+    post_json(args.upstream.rstrip("/") + "/rest/v1/access_grants",
+              [{"device_hash": d, "trial_questions_left": 0, "paid_until": paid, "promo_until": None,
+                "updated_at": now_iso()} for d in devices])
+
+    def turn(job):
+        device, n = job
+        req = Request(url, data=json.dumps({"query": f"репліка {n}", "language": "uk"}).encode("utf-8"),
+                      headers={"Content-Type": "application/json", "Cookie": f"ta_device_hash={device}"})
+        t0 = time.perf_counter()
+        try:
+            with urlopen(req, timeout=60) as r:
+                r.read()
+                status = r.status
+        except HTTPError as e:
+            e.read()
+            status = e.code
+        return status, (time.perf_counter() - t0) * 1000
+
+    base = upstream_stats(args.upstream)
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(turn, [(d, n) for d in devices for n in range(args.burst)]))
+        # дальше — по очереди у каждого устройства, устройства параллельно
+        for n in range(args.burst, args.burst + args.turns):
+            results += list(pool.map(turn, [(d, n) for d in devices]))
+    stats = stats_delta(base, upstream_stats(args.upstream))
+
+    with urlopen(args.upstream.rstrip("/") + "/rest/v1/conversations?select=device_hash", timeout=10) as r:
+        per_device = {}
+        for row in json.loads(r.read()):
+            if row.get("device_hash") in devices:
+                per_device[row["device_hash"]] = per_device.get(row["device_hash"], 0) + 1
+
+    turns = len(results)
+    conv_calls = {k.removeprefix("supabase."): v for k, v in stats.items()
+                  if v and ("conversations" in k or "touch_conversation" in k)}
+    dupes = sum(1 for d in devices if per_device.get(d, 0) > 1)
+    print(f"{args.devices} devices x ({args.burst} concurrent + {args.turns} sequential) turns, "
+          f"http {dict((s, sum(1 for x, _ in results if x == s)) for s in {x for x, _ in results})}")
+    print(f"conversation round-trips/turn: {sum(conv_calls.values()) / max(1, turns):.2f} {conv_calls}")
+    print(f"messages inserts/turn: {stats.get('supabase.POST messages', 0) / max(1, turns):.2f}")
+    report("latency", [ms for _, ms in results])
+    print(f"conversations per device: max {max(per_device.values(), default=0)}, devices with duplicates {dupes}")
+    if dupes or len(per_device) != len(devices):
+        raise SystemExit(1)
+    print("✅ one conversation per device")
+
+def bench_agent_stream(args):
+    """
+    Время до первого звука: ответ агента (первое предложение или весь JSON) + /api/tts на этот текст.
+      json   — как раньше: TTS стартует, когда пришёл весь ответ;
+      stream — stream: true, TTS стартует на первом законченном предложении.
+    """
+    url = args.app.rstrip("/") + "/api/turbotaai-agent"
+    tts_url = args.app.rstrip("/") + "/api/tts"
+    upstream_stats(args.upstream, reset=True)
+    paid_until = (datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=30)).isoformat()
+    post_json(args.upstream.rstrip("/") + "/rest/v1/access_grants",
+              {"device_hash": "bench-stream", "trial_questions_left": 0, "paid_until": paid_until,
+               "promo_until": None, "updated_at": now_iso()})
+
+    def ask(stream: bool):
+        body = {"query": "мені тривожно", "language": "uk", "mode": "voice", **({"stream": True} if stream else {})}
+        req = Request(url, data=json.dumps(body).encode("utf-8"),
+                      headers={"Content-Type": "application/json", "Cookie": "ta_device_hash=bench-stream"})
+        t0 = time.perf_counter()
+        first, first_ms, text = None, 0.0, ""
+        with urlopen(req, timeout=120) as r:
+            if "ndjson" not in (r.headers.get("Content-Type") or ""):
+                data = json.loads(r.read() or b"{}")
+                text = str(data.get("output") or data.get("response") or data)
+                first, first_ms = text, (time.perf_counter() - t0) * 1000
+            else:
+                for line in r:
+                    event = json.loads(line) if line.strip() else {}
+                    if event.get("delta"):
+                        text += event["delta"]
+                        if first is None:
+                            first, first_ms = event["delta"].strip(), (time.perf_counter() - t0) * 1000
+        total_ms = (time.perf_counter() - t0) * 1000
+        _, _, tts_ms = post_json(tts_url, {"text": first or "", "language": "uk", "gender": "female"})
+        return first_ms, first_ms + tts_ms, total_ms, len(first or ""), len(text)
+
+    for name, stream in (("json", False), ("stream", True)):
+        rows = [ask(stream) for _ in range(args.rounds)]
+        report(f"{name:6} first text ", [r[0] for r in rows])
+        report(f"{name:6} first audio", [r[1] for r in rows])
+        report(f"{name:6} full reply ", [r[2] for r in rows])
+        print(f"       first TTS chunk {statistics.mean(r[3] for r in rows):.0f} of {statistics.mean(r[4] for r in rows):.0f} chars")
+
+def bench_upstream_pool(args):
+    """
+    --users параллельных пользователей по --requests запросов, маршруты по кругу.
+    Из счётчиков заглушки: сколько запросов к апстримам пришлось на одно TCP-соединение.
+    """
+    app = args.app.rstrip("/")
+    upstream = args.upstream.rstrip("/")
+    upstream_stats(upstream, reset=True)
+    paid_until = (datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=30)).isoformat()
+    post_json(upstream + "/rest/v1/access_grants",
+              {"device_hash": "bench-pool", "trial_questions_left": 0, "paid_until": paid_until,
+               "promo_until": None, "updated_at": now_iso()})
+
+    cookie = {"Cookie": "ta_device_hash=bench-pool"}
+    audio = b"\x1a\x45\xdf\xa3" + bytes(4000)
+    routes = {
+        "agent": lambda: Request(app + "/api/turbotaai-agent", headers={"Content-Type": "application/json", **cookie},
+                                 data=json.dumps({"query": "привіт", "language": "uk"}).encode("utf-8")),
+        "chat": lambda: Request(app + "/api/chat", headers={"Content-Type": "application/json", **cookie},
+                                data=json.dumps({"query": "привіт", "language": "uk"}).encode("utf-8")),
+        "stt": lambda: Request(app + "/api/stt", data=audio, headers={"Content-Type": "audio/webm", "X-STT-Lang": "uk"}),
+        "proxy": lambda: Request(app + "/api/webhook-proxy", headers={"Content-Type": "application/json"},
+                                 data=json.dumps({"webhookUrl": upstream + "/webhook/turbotaai-agent",
+                                                  "payload": {"query": "привіт"}, "method": "POST"}).encode("utf-8")),
+    }
+    names = list(routes)
+
+    def user(i):
+        out = []
+        for j in range(args.requests):
+            name = names[(i + j) % len(names)]
+            t0 = time.perf_counter()
+            try:
+                with urlopen(routes[name](), timeout=120) as r:
+                    r.read()
+                    status = r.status
+            except HTTPError as e:
+                e.read()
+                status = e.code
+            except Exception:
+                status = 0
+            out.append((name, status, (time.perf_counter() - t0) * 1000))
+        return out
+
+    base = upstream_stats(upstream)
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.users) as pool:
+        results = [r for rows in pool.map(user, range(args.users)) for r in rows]
+    secs = time.perf_counter() - t0
+    stats = stats_delta(base, upstream_stats(upstream))
+
+    for name in names:
+        rows = [r for r in results if r[0] == name]
+        codes = {}
+        for _, status, _ in rows:
+            codes[status] = codes.get(status, 0) + 1
+        report(f"{name:5}", [ms for _, _, ms in rows])
+        print(f"       http {codes}")
+    # в заглушку ходят и пулы апстримов, и supabase-js — соединения общие на порт, считаем всё вместе
+    calls = stats.get("requests", 0)
+    conns = stats.get("tcp.connections", 0)
+    print(f"{len(results)} requests in {secs:.1f}s; stand-in got {calls} requests "
+          f"(agent {stats.get('agent.webhook', 0)}, stt {stats.get('openai.audio.transcriptions', 0)}) "
+          f"over {conns} new tcp connections = {calls / max(1, conns):.1f} requests/connection")
+    try:
+        with urlopen(app + "/api/dev/upstreams", timeout=10) as r:
+            print("app pools:", json.dumps(json.loads(r.read()).get("upstreams"), ensure_ascii=False))
+    except Exception:
+        pass
+
+WEBHOOK_SIGN_FIELDS = ["merchantAccount", "orderReference", "amount", "currency",
+                       "authCode", "cardPan", "transactionStatus", "reasonCode"]
+
+def wfp_webhook_payload(ref: str, status: str = "Approved") -> dict:
+    """Тело вебхука WayForPay; подпись — как в lib/wayforpay.ts (makeServiceWebhookSignature)."""
+    body = {
+        "merchantAccount": WFP["merchant"],
+        "orderReference": ref,
+        "amount": 1,
+        "currency": "UAH",
+        "authCode": "541963" if status == "Approved" else "",
+        "cardPan": "41****8217",
+        "transactionStatus": status,
+        "reasonCode": 1100 if status == "Approved" else 1101,
+        "email": "storm@local.test",
+        "createdDate": int(time.time()),
+    }
+    body["merchantSignature"] = wfp_sign([str(body[f]).strip() for f in WEBHOOK_SIGN_FIELDS])
+    return body
+
+def parse_ts(v) -> float:
+    if not v:
+        return 0.0
+    return datetime.datetime.fromisoformat(str(v).replace("Z", "+00:00")).timestamp()
+
+def storm_wfp_webhook(args):
+    """
+    --orders заказов (device-ключ у каждого свой, у --user-share ещё и аккаунт), по каждому
+    --copies одинаковых вебхуков вперемешку (плюс --declined-share отказов), --concurrency потоков.
+    После шторма: paid_until каждого ключа должен быть now + 30 дней, а не больше.
+    """
+    WFP["merchant"], WFP["secret"] = args.merchant, args.secret
+    url = args.app.rstrip("/") + "/api/billing/wayforpay/" + args.path
+    rng = random.Random(args.seed)
+
+    upstream_stats(args.upstream, reset=True)
+    refs = [f"storm-{i}" for i in range(args.orders)]
+    seed_orders(args.upstream, refs)
+    users = {}
+    for i, ref in enumerate(refs):
+        if rng.random() < args.user_share:
+            users[ref] = f"user-storm-{i}"
+    if users:
+        for ref, uid in users.items():
+            req = Request(args.upstream.rstrip("/") + f"/rest/v1/billing_orders?order_reference=eq.{ref}",
+                          data=json.dumps({"user_id": uid}).encode("utf-8"), method="PATCH",
+                          headers={"Content-Type": "application/json"})
+            urlopen(req, timeout=10).read()
+        post_json(args.upstream.rstrip("/") + "/rest/v1/profiles", [{"id": uid} for uid in users.values()])
+
+    jobs = []
+    for ref in refs:
+        copies = args.copies if args.copies > 0 else 1
+        jobs += [wfp_webhook_payload(ref)] * copies
+        if rng.random() < args.declined_share:
+            jobs.append(wfp_webhook_payload(ref, "Declined"))
+    rng.shuffle(jobs)
+
+    def fire(payload):
+        req = Request(url, data=json.dumps(payload).encode("utf-8"), headers={"Content-Type": "application/json"})
+        t0 = time.perf_counter()
+        try:
+            with urlopen(req, timeout=60) as r:
+                body, status = r.read(), r.status
+        except HTTPError as e:
+            body, status = e.read(), e.code
+        ms = (time.perf_counter() - t0) * 1000
+        sig_ok = False
+        try:
+            out = json.loads(body)
+            sig_ok = out.get("signature") == wfp_sign([out.get("orderReference"), out.get("status"), out.get("time")])
+        except Exception:
+            pass
+        return status, ms, sig_ok
+
+    base = upstream_stats(args.upstream)
+    started = time.time()
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(fire, jobs))
+    wall = time.perf_counter() - t0
+    stats = stats_delta(base, upstream_stats(args.upstream))
+
+    codes = {}
+    for status, _, _ in results:
+        codes[status] = codes.get(status, 0) + 1
+    bad_sig = sum(1 for status, _, ok in results if status == 200 and not ok)
+
+    with urlopen(args.upstream.rstrip("/") + "/rest/v1/access_grants?select=device_hash,paid_until", timeout=10) as r:
+        grants = {g["device_hash"]: g for g in json.loads(r.read())}
+
+    # продление на 30 дней от момента шторма; всё, что заметно дальше, — двойное продление
+    month = 30 * 86400
+    slack = wall + 120
+    expected = {f"device-{i}" for i in range(len(refs))} | {f"account:{u}" for u in users.values()}
+    missing = sorted(k for k in expected if k not in grants)
+    doubled = sorted(k for k, g in grants.items() if k in expected and parse_ts(g.get("paid_until")) > started + month + slack)
+
+    print(f"{args.path}: {len(jobs)} webhooks for {len(refs)} orders ({len(users)} with account), "
+          f"concurrency {args.concurrency}")
+    print(f"throughput: {len(jobs) / wall:.0f} req/s, wall {wall:.2f}s, http {codes}, bad response signatures: {bad_sig}")
+    report("latency", [ms for _, ms, _ in results])
+    print(f"supabase calls: {supabase_calls(stats)} ({supabase_calls(stats) / max(1, len(jobs)):.1f}/webhook)")
+    print(f"grants: {len(expected) - len(missing)}/{len(expected)} present, "
+          f"{len(doubled)} extended more than once, {len(missing)} missing")
+    for k in doubled[:5]:
+        print(f"  ⚠️ {k}: paid_until {grants[k]['paid_until']}")
+    for k in missing[:5]:
+        print(f"  ⚠️ {k}: no grant")
+    if doubled or missing:
+        raise SystemExit(1)
+    print("✅ idempotent")
+
+def get_json(url: str, timeout: float = 60) -> dict:
+    try:
+        with urlopen(url, timeout=timeout) as r:
+            return json.loads(r.read() or b"{}")
+    except HTTPError as e:
+        return {"ok": False, "httpStatus": e.code}
+
+def sim_checkout(args):
+    """
+    --checkouts покупателей одновременно возвращаются на /payment/result. Каждый платит через
+    случайные 1..--pay-max-s секунд: WayForPay-заглушка с этого момента отвечает Approved,
+    вебхук приходит в приложение ещё через --webhook-delay-s (у --lost-webhook-share — никогда).
+    poll  — как было: GET orders/status раз в --retry-ms, до 10 попыток;
+    watch — как теперь: long-poll orders/watch, после первого таймаута один GET orders/status.
+    """
+    WFP["merchant"], WFP["secret"] = args.merchant, args.secret
+    app = args.app.rstrip("/")
+    rng = random.Random(args.seed)
+
+    def run(mode: str):
+        upstream_stats(args.upstream, reset=True)
+        refs = [f"checkout-{mode}-{i}-{uuid.uuid4().hex[:6]}" for i in range(args.checkouts)]
+        seed_orders(args.upstream, refs)
+        post_json(args.upstream.rstrip("/") + "/__wfp/orders", {r: "InProcessing" for r in refs})
+        plan = {r: (rng.uniform(1, args.pay_max_s), rng.random() < args.lost_webhook_share) for r in refs}
+        base = upstream_stats(args.upstream)
+        t0 = time.perf_counter()
+
+        def pay(ref):
+            pay_s, lost = plan[ref]
+            time.sleep(pay_s)
+            post_json(args.upstream.rstrip("/") + "/__wfp/orders", {ref: "Approved"})
+            if lost:
+                return
+            time.sleep(args.webhook_delay_s)
+            try:
+                post_json(app + "/api/billing/wayforpay/webhook", wfp_webhook_payload(ref))
+            except HTTPError as e:
+                print(f"⚠️ webhook {ref}: {e.code}")
+
+        def poll(ref):
+            for _ in range(10):
+                j = get_json(f"{app}/api/billing/orders/status?orderReference={ref}")
+                if j.get("status") == "paid":
+                    return time.perf_counter() - t0
+                time.sleep(args.retry_ms / 1000)
+            return None
+
+        def watch(ref):
+            checked = False
+            for _ in range(4):
+                j = get_json(f"{app}/api/billing/orders/watch?orderReference={ref}&wait={args.watch_s}",
+                             timeout=args.watch_s + 30)
+                if j.get("timedOut") and not checked:
+                    checked = True
+                    j = get_json(f"{app}/api/billing/orders/status?orderReference={ref}")
+                if j.get("status") == "paid":
+                    return time.perf_counter() - t0
+                if not j.get("ok", True):
+                    time.sleep(args.retry_ms / 1000)
+            return None
+
+        client = poll if mode == "poll" else watch
+        with ThreadPoolExecutor(max_workers=2 * len(refs)) as pool:
+            payers = [pool.submit(pay, r) for r in refs]
+            seen = list(pool.map(client, refs))
+            for f in payers:
+                f.result()
+        stats = stats_delta(base, upstream_stats(args.upstream))
+
+        # сколько ждал покупатель после того, как деньги реально списались
+        waits = [(s - plan[r][0]) * 1000 for r, s in zip(refs, seen) if s is not None]
+        unresolved = sum(1 for s in seen if s is None)
+        checks = stats.get("wfp.CHECK_STATUS", 0)
+        print(f"{mode:5}: wfp CHECK_STATUS {checks} ({checks / len(refs):.2f}/checkout), "
+              f"supabase {supabase_calls(stats)} ({supabase_calls(stats) / len(refs):.1f}/checkout), "
+              f"unresolved {unresolved}/{len(refs)}")
+        report(f"{mode:5} paid -> page", waits)
+
+    print(f"{args.checkouts} checkouts, pay in 1..{args.pay_max_s}s, webhook +{args.webhook_delay_s}s, "
+          f"lost webhooks {args.lost_webhook_share:.0%}")
+    for mode in args.modes.split(","):
+        run(mode.strip())
+
+def race_wfp_check(args):
+    """
+    --orders заказов (каждый --declined-every-й — отказ), по --copies запросов на заказ вперемешку
+    на три роута сразу, --concurrency потоков; затем та же волна ещё раз (заказы уже конечные).
+    """
+    app = args.app.rstrip("/")
+    routes = ["/api/billing/orders/status", "/api/billing/wayforpay/check", "/api/billing/wayforpay/sync"]
+    rng = random.Random(args.seed)
+
+    upstream_stats(args.upstream, reset=True)
+    refs = [f"race-{'declined-' if args.declined_every and i % args.declined_every == 0 else ''}{i}"
+            for i in range(args.orders)]
+    seed_orders(args.upstream, refs)
+
+    def fire(job):
+        route, ref = job
+        t0 = time.perf_counter()
+        j = get_json(f"{app}{route}?orderReference={ref}")
+        return route, ref, j, (time.perf_counter() - t0) * 1000
+
+    def wave(name: str):
+        jobs = [(rng.choice(routes), ref) for ref in refs for _ in range(args.copies)]
+        rng.shuffle(jobs)
+        base = upstream_stats(args.upstream)
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(fire, jobs))
+        wall = time.perf_counter() - t0
+        stats = stats_delta(base, upstream_stats(args.upstream))
+        checks = stats.get("wfp.CHECK_STATUS", 0)
+        errors = sum(1 for _, _, j, _ in results if j.get("ok") is False)
+        print(f"{name}: {len(jobs)} checks for {len(refs)} orders in {wall:.2f}s, "
+              f"wfp CHECK_STATUS {checks} ({checks / len(refs):.2f}/order), errors {errors}")
+        report(f"{name} latency", [ms for _, _, _, ms in results])
+        return checks
+
+    started = time.time()
+    first = wave("wave 1")
+    second = wave("wave 2")
+
+    with urlopen(args.upstream.rstrip("/") + "/rest/v1/access_grants?select=device_hash,paid_until", timeout=10) as r:
+        grants = {g["device_hash"]: g for g in json.loads(r.read())}
+    month = 30 * 86400
+    paid = {f"device-{i}" for i, ref in enumerate(refs) if "declined" not in ref}
+    doubled = sorted(k for k in paid if parse_ts(grants.get(k, {}).get("paid_until")) > started + month + 300)
+    missing = sorted(k for k in paid if k not in grants)
+    print(f"grants: {len(paid) - len(missing)}/{len(paid)} present, {len(doubled)} extended more than once")
+    for k in doubled[:5]:
+        print(f"  ⚠️ {k}: paid_until {grants[k]['paid_until']}")
+
+    if first > len(refs) or second or doubled or missing:
+        raise SystemExit(1)
+    print("✅ one CHECK_STATUS per order, none for settled orders")
+
+def main():
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    s = sub.add_parser("serve")
+    s.add_argument("--host", default="127.0.0.1")
+    s.add_argument("--port", type=int, default=8787)
+    s.add_argument("--latency-ms", type=int, default=400)
+    s.add_argument("--wfp-merchant", default=WFP["merchant"], help="= WAYFORPAY_MERCHANT_ACCOUNT")
+    s.add_argument("--wfp-secret", default=WFP["secret"], help="= WAYFORPAY_SECRET_KEY")
+    s.add_argument("--token-ms", type=int, default=0, help="вебхук агента печатает по слову раз в N мс")
+    s.add_argument("--keepalive-s", type=float, default=0, help="закрывать простаивающие keep-alive сокеты")
+    s.add_argument("--disable-rpc", action="append", default=[], help="имитировать схему без этой функции")
+    s.set_defaults(fn=serve)
+
+    b = sub.add_parser("bench-tts")
+    b.add_argument("--app", default="http://127.0.0.1:3000")
+    b.add_argument("--rounds", type=int, default=10)
+    b.add_argument("--binary", action="store_true")
+    b.add_argument("--format", default="mp3")
+    b.set_defaults(fn=bench_tts)
+
+    t = sub.add_parser("bench-stt")
+    t.add_argument("--app", default="http://127.0.0.1:3000")
+    t.add_argument("--rounds", type=int, default=10)
+    t.add_argument("--seconds", type=float, default=6)
+    t.add_argument("--kbps", type=int, default=32)
+    t.add_argument("--slice-ms", type=int, default=1000)
+    t.add_argument("--realtime", action="store_true")
+    t.set_defaults(fn=bench_stt)
+
+    h = sub.add_parser("bench-history")
+    h.add_argument("--app", default="http://127.0.0.1:3000")
+    h.add_argument("--upstream", default="http://127.0.0.1:8787")
+    h.add_argument("--conversations", type=int, default=5)
+    h.add_argument("--turns", type=int, default=10)
+    h.add_argument("--batch-size", type=int, default=12)
+    h.set_defaults(fn=bench_history)
+
+    w = sub.add_parser("bench-wfp-sync")
+    w.add_argument("--app", default="http://127.0.0.1:3000")
+    w.add_argument("--upstream", default="http://127.0.0.1:8787")
+    w.add_argument("--orders", type=int, default=1000)
+    w.add_argument("--sync-key", default="")
+    w.add_argument("--skip-before", action="store_true")
+    w.set_defaults(fn=bench_wfp_sync)
+
+    a = sub.add_parser("bench-access")
+    a.add_argument("--app", default="http://127.0.0.1:3000")
+    a.add_argument("--upstream", default="http://127.0.0.1:8787")
+    a.add_argument("--calls", type=int, default=50)
+    a.set_defaults(fn=bench_access)
+
+    r = sub.add_parser("race-trial")
+    r.add_argument("--app", default="http://127.0.0.1:3000")
+    r.add_argument("--upstream", default="http://127.0.0.1:8787")
+    r.add_argument("--calls", type=int, default=100)
+    r.add_argument("--concurrency", type=int, default=100)
+    r.add_argument("--trial", type=int, default=40)
+    r.set_defaults(fn=race_trial)
+
+    rc = sub.add_parser("race-conversation")
+    rc.add_argument("--app", default="http://127.0.0.1:3000")
+    rc.add_argument("--upstream", default="http://127.0.0.1:8787")
+    rc.add_argument("--devices", type=int, default=20)
+    rc.add_argument("--burst", type=int, default=5, help="одновременных первых реплик на устройство")
+    rc.add_argument("--turns", type=int, default=10, help="реплик по очереди после этого")
+    rc.add_argument("--concurrency", type=int, default=100)
+    rc.set_defaults(fn=race_conversation)
+
+    ag = sub.add_parser("bench-agent-stream")
+    ag.add_argument("--app", default="http://127.0.0.1:3000")
+    ag.add_argument("--upstream", default="http://127.0.0.1:8787")
+    ag.add_argument("--rounds", type=int, default=5)
+    ag.set_defaults(fn=bench_agent_stream)
+
+    up = sub.add_parser("bench-upstream-pool")
+    up.add_argument("--app", default="http://127.0.0.1:3000")
+    up.add_argument("--upstream", default="http://127.0.0.1:8787")
+    up.add_argument("--users", type=int, default=200)
+    up.add_argument("--requests", type=int, default=5)
+    up.set_defaults(fn=bench_upstream_pool)
+
+    st = sub.add_parser("storm-wfp-webhook")
+    st.add_argument("--app", default="http://127.0.0.1:3000")
+    st.add_argument("--upstream", default="http://127.0.0.1:8787")
+    st.add_argument("--path", choices=["webhook", "callback"], default="webhook")
+    st.add_argument("--orders", type=int, default=200)
+    st.add_argument("--copies", type=int, default=5, help="одинаковых вебхуков на заказ")
+    st.add_argument("--declined-share", type=float, default=0.0, help="доля заказов с лишним Declined-вебхуком")
+    st.add_argument("--user-share", type=float, default=0.5, help="доля заказов, привязанных к аккаунту")
+    st.add_argument("--concurrency", type=int, default=32)
+    st.add_argument("--merchant", default=WFP["merchant"], help="= WAYFORPAY_MERCHANT_ACCOUNT")
+    st.add_argument("--secret", default=WFP["secret"], help="= WAYFORPAY_SECRET_KEY")
+    st.add_argument("--seed", type=int, default=1)
+    st.set_defaults(fn=storm_wfp_webhook)
+
+    ck = sub.add_parser("sim-checkout")
+    ck.add_argument("--app", default="http://127.0.0.1:3000")
+    ck.add_argument("--upstream", default="http://127.0.0.1:8787")
+    ck.add_argument("--checkouts", type=int, default=50)
+    ck.add_argument("--modes", default="poll,watch")
+    ck.add_argument("--pay-max-s", type=float, default=8, help="оплата через 1..N с после открытия страницы")
+    ck.add_argument("--webhook-delay-s", type=float, default=1, help="вебхук — через N с после оплаты")
+    ck.add_argument("--lost-webhook-share", type=float, default=0.0, help="доля заказов без вебхука")
+    ck.add_argument("--retry-ms", type=int, default=2500, help="шаг старого опроса")
+    ck.add_argument("--watch-s", type=int, default=20, help="= WATCH_S на странице")
+    ck.add_argument("--merchant", default=WFP["merchant"], help="= WAYFORPAY_MERCHANT_ACCOUNT")
+    ck.add_argument("--secret", default=WFP["secret"], help="= WAYFORPAY_SECRET_KEY")
+    ck.add_argument("--seed", type=int, default=1)
+    ck.set_defaults(fn=sim_checkout)
+
+    rw = sub.add_parser("race-wfp-check")
+    rw.add_argument("--app", default="http://127.0.0.1:3000")
+    rw.add_argument("--upstream", default="http://127.0.0.1:8787")
+    rw.add_argument("--orders", type=int, default=40)
+    rw.add_argument("--copies", type=int, default=12, help="проверок на заказ за волну")
+    rw.add_argument("--declined-every", type=int, default=5, help="каждый N-й заказ — отказ (0 — без отказов)")
+    rw.add_argument("--concurrency", type=int, default=64)
+    rw.add_argument("--seed", type=int, default=1)
+    rw.set_defaults(fn=race_wfp_check)
+
+    hp = sub.add_parser("bench-history-pages")
+    hp.add_argument("--app", default="http://127.0.0.1:3000")
+    hp.add_argument("--upstream", default="http://127.0.0.1:8787")
+    hp.add_argument("--conversations", type=int, default=10000)
+    hp.add_argument("--threads", type=int, default=5, help="бесед с сообщениями")
+    hp.add_argument("--messages", type=int, default=500, help="сообщений в беседе")
+    hp.add_argument("--list-limit", type=int, default=50)
+    hp.add_argument("--page-size", type=int, default=100)
+    hp.add_argument("--max-pages", type=int, default=400)
+    hp.add_argument("--seed", type=int, default=1)
+    hp.set_defaults(fn=bench_history_pages)
+
+    args = ap.parse_args()
+    args.fn(args)
+
+if __name__ == "__main__":
+    main()
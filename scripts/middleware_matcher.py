@@ -0,0 +1,237 @@
+"""
+Генератор matcher для middleware.ts + бенчмарк на синтетической смеси запросов.
+
+middleware ставит куку ta_device_hash. Ей нечего делать на статике из public/,
+на чанках _next и на server-to-server вебхуках WayForPay, поэтому matcher
+собирается из того, что реально лежит в public/ и app/:
+  - расширения файлов public/ (+ базовый набор медиа/шрифтов) — исключаются;
+  - каталоги public/ (.well-known и т.п.) — исключаются префиксом;
+  - metadata-файлы app/ (icon, robots, sitemap, manifest...) — исключаются;
+  - SERVER_TO_SERVER роуты — исключаются (кука там никому не нужна).
+Проверка: ни одна страница и ни один /api роут из app/ не должен попасть под исключение.
+
+    python scripts/middleware_matcher.py generate          # переписать matcher в middleware.ts
+    python scripts/middleware_matcher.py generate --check  # exit 1, если matcher устарел
+    python scripts/middleware_matcher.py bench --requests 200000
+
+Бенч гоняет смесь запросов через старую и новую логику (регэксп matcher + тело middleware)
+на Python — цифры про относительную стоимость, а не про edge runtime.
+"""
+from pathlib import Path
+import argparse
+import random
+import re
+import time
+import uuid
+
+MIDDLEWARE = Path("middleware.ts")
+PUBLIC = Path("public")
+APP = Path("app")
+
+BEGIN = "  // <generated by scripts/middleware_matcher.py — не править руками>"
+END = "  // </generated>"
+
+OLD_MATCHER = "/((?!_next/static|_next/image|favicon.ico).*)"
+
+ALWAYS_EXCLUDED = ["_next/static", "_next/image", "_next/webpack-hmr"]
+BASE_EXTENSIONS = {"ico", "png", "jpg", "jpeg", "gif", "webp", "avif", "svg",
+                   "mp3", "wav", "ogg", "webm", "mp4", "m4a",
+                   "woff", "woff2", "ttf", "otf", "txt", "xml", "json", "map"}
+METADATA_NAMES = ["icon", "apple-icon", "opengraph-image", "twitter-image", "robots", "sitemap", "manifest"]
+
+# WayForPay шлёт serviceUrl сервер-сервер: куку там ставить некому
+SERVER_TO_SERVER = ["api/billing/wayforpay/callback", "api/billing/wayforpay/webhook"]
+
+# те же значения, что COOKIE_DESTS в middleware.ts
+COOKIE_DESTS = {"", "document", "iframe", "empty"}
+
+def public_rules():
+    exts, dirs = set(BASE_EXTENSIONS), []
+    for p in sorted(PUBLIC.iterdir()) if PUBLIC.exists() else []:
+        if p.is_dir():
+            dirs.append(p.name)
+        elif p.suffix:
+            exts.add(p.suffix[1:].lower())
+    for p in PUBLIC.rglob("*") if PUBLIC.exists() else []:
+        if p.is_file() and p.suffix:
+            exts.add(p.suffix[1:].lower())
+    return sorted(exts), dirs
+
+def app_metadata():
+    found = []
+    for p in sorted(APP.iterdir()) if APP.exists() else []:
+        if p.is_file() and p.stem in METADATA_NAMES:
+            found.append(p.stem)
+    return found
+
+def app_routes():
+    """URL-пути страниц и роутов из app/ ([id] -> пример сегмента)."""
+    out = []
+    for f in sorted(APP.rglob("*")):
+        if f.name not in ("page.tsx", "page.ts", "page.jsx", "route.ts", "route.js"):
+            continue
+        parts = [p for p in f.parent.relative_to(APP).parts if not (p.startswith("(") and p.endswith(")"))]
+        parts = ["example-id" if p.startswith("[") else p for p in parts]
+        out.append(("page" if f.name.startswith("page") else "route", "/" + "/".join(parts)))
+    return out
+
+def build_matcher() -> str:
+    exts, dirs = public_rules()
+    prefixes = ALWAYS_EXCLUDED + [re.escape(d).replace("\\-", "-") for d in dirs] + SERVER_TO_SERVER
+    prefixes += [re.escape(m) for m in app_metadata()]
+    ext_group = "|".join(exts)
+    body = "|".join(prefixes) + f"|.*\\.(?:{ext_group})$"
+    return f"/((?!{body}).*)"
+
+def to_regex(matcher: str):
+    # path-to-regexp для такого шаблона даёт ^<шаблон>$ (без хвостового слэша)
+    return re.compile("^" + matcher + "/?$")
+
+def ts_string(s: str) -> str:
+    return '"' + s.replace("\\", "\\\\") + '"'
+
+def check_routes(matcher: str) -> list:
+    rx = to_regex(matcher)
+    problems = []
+    for kind, path in app_routes():
+        if any(path.lstrip("/").startswith(s) for s in SERVER_TO_SERVER):
+            continue
+        if not rx.match(path):
+            problems.append(f"{kind} {path} excluded by matcher")
+    return problems
+
+def generate(args):
+    matcher = build_matcher()
+    problems = check_routes(matcher)
+    if problems:
+        for p in problems:
+            print(f"❌ {p}")
+        raise SystemExit(1)
+
+    s = MIDDLEWARE.read_text("utf-8")
+    block = f"{BEGIN}\n  matcher: [{ts_string(matcher)}],\n{END}"
+    if BEGIN in s and END in s:
+        new = s[: s.index(BEGIN)] + block + s[s.index(END) + len(END):]
+    else:
+        m = re.search(r"^\s*matcher:\s*\[[^\]]*\],?\s*$", s, flags=re.M)
+        if not m:
+            raise SystemExit("❌ matcher not found in middleware.ts")
+        new = s[: m.start()] + block + s[m.end():]
+
+    if args.check:
+        if new != s:
+            print("❌ middleware.ts matcher is stale, run: python scripts/middleware_matcher.py generate")
+            raise SystemExit(1)
+        print("✅ matcher up to date")
+        return
+    if new != s:
+        MIDDLEWARE.write_text(new, "utf-8")
+        print(f"✅ middleware.ts matcher updated: {matcher}")
+    else:
+        print("✅ matcher already up to date")
+
+def current_matcher() -> str:
+    s = MIDDLEWARE.read_text("utf-8")
+    m = re.search(r'matcher:\s*\[\s*"((?:[^"\\]|\\.)*)"', s)
+    if not m:
+        raise SystemExit("❌ matcher not found in middleware.ts")
+    return m.group(1).replace("\\\\", "\\")
+
+# ---------------- bench ----------------
+
+def synthetic_mix(n: int, seed: int, cookie_share: float):
+    rng = random.Random(seed)
+    routes = app_routes()
+    pages = [p for k, p in routes if k == "page"]
+    apis = [p for k, p in routes if k == "route" and p.startswith("/api")]
+    files = ["/" + str(p.relative_to(PUBLIC)).replace("\\", "/") for p in PUBLIC.rglob("*") if p.is_file()]
+    files = files or ["/placeholder.svg"]
+
+    kinds = [
+        # (вес, генератор (method, path, sec-fetch-dest))
+        (10, lambda: ("GET", rng.choice(pages), "document")),
+        (8, lambda: ("GET", rng.choice(pages) + "?_rsc=1", "empty")),
+        (14, lambda: ("POST", rng.choice(apis), "empty")),
+        (4, lambda: ("OPTIONS", rng.choice(apis), "empty")),
+        (3, lambda: ("HEAD", rng.choice(pages), "")),
+        (30, lambda: ("GET", f"/_next/static/chunks/{rng.randint(0, 999)}.js", "script")),
+        (16, lambda: ("GET", rng.choice(files), "image")),
+        (4, lambda: ("GET", f"/_next/image?url={rng.choice(files)}&w=640&q=75", "image")),
+        (3, lambda: ("GET", f"/audio/tts-{rng.randint(0, 99)}.mp3", "audio")),
+        (2, lambda: ("POST", "/" + rng.choice(SERVER_TO_SERVER), "")),
+    ]
+    weights = [w for w, _ in kinds]
+    out = []
+    for _ in range(n):
+        gen = rng.choices(kinds, weights)[0][1]
+        method, url, dest = gen()
+        out.append((method, url.split("?")[0], dest, rng.random() < cookie_share))
+    return out
+
+class Cost:
+    def __init__(self):
+        self.invoked = 0
+        self.responses = 0
+        self.uuids = 0
+        self.cookies_set = 0
+
+def old_middleware(method, path, dest, has_cookie, c: Cost):
+    c.invoked += 1
+    c.responses += 1  # NextResponse.next() на каждый запрос
+    if not has_cookie:
+        uuid.uuid4()
+        c.uuids += 1
+        c.cookies_set += 1
+
+def new_middleware(method, path, dest, has_cookie, c: Cost):
+    c.invoked += 1
+    if method in ("OPTIONS", "HEAD"):
+        return
+    if has_cookie:
+        return
+    if dest not in COOKIE_DESTS:
+        return
+    c.responses += 1
+    uuid.uuid4()
+    c.uuids += 1
+    c.cookies_set += 1
+
+def run(mix, matcher: str, fn):
+    rx = to_regex(matcher)
+    c = Cost()
+    t0 = time.perf_counter()
+    for method, path, dest, has_cookie in mix:
+        if rx.match(path):
+            fn(method, path, dest, has_cookie, c)
+    return c, time.perf_counter() - t0
+
+def bench(args):
+    mix = synthetic_mix(args.requests, args.seed, args.cookie_share)
+    new_matcher = current_matcher() if not args.fresh else build_matcher()
+    n = len(mix)
+    for name, matcher, fn in (("old", OLD_MATCHER, old_middleware), ("new", new_matcher, new_middleware)):
+        c, secs = run(mix, matcher, fn)
+        print(f"{name}: middleware on {c.invoked / n:.1%} of requests, "
+              f"NextResponse {c.responses}, randomUUID {c.uuids}, Set-Cookie {c.cookies_set}, "
+              f"{secs / n * 1e6:.2f}µs/request (python)")
+
+def main():
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    g = sub.add_parser("generate")
+    g.add_argument("--check", action="store_true")
+    g.set_defaults(fn=generate)
+
+    b = sub.add_parser("bench")
+    b.add_argument("--requests", type=int, default=200000)
+    b.add_argument("--seed", type=int, default=1)
+    b.add_argument("--cookie-share", type=float, default=0.7, help="доля запросов, у которых кука уже есть")
+    b.add_argument("--fresh", action="store_true", help="мерить свежесгенерированный matcher, а не тот, что в middleware.ts")
+    b.set_defaults(fn=bench)
+
+    args = ap.parse_args()
+    args.fn(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Кодмод: шапка и страница подписки читают аккаунт из одного /api/account/snapshot.
+
+Было на загрузке /subscription три запроса — /api/account/summary (шапка),
+/api/subscription/summary и /api/billing/subscription/status (страница), и каждый роут заново
+проверял сессию и читал гранты. Теперь оба компонента зовут loadAccountSnapshot() из
+lib/account-snapshot.ts: один запрос на двоих, один проход по сессии и грантам на сервере.
+
+  components/header.tsx:
+    1) loadSummary -> loadAccountSnapshot() (ответ уже JSON — r.json() убирается);
+    2) на turbota:refresh кэш снимка сбрасывается (invalidateAccountSnapshot) — счётчик
+       вопросов после ответа агента должен прийти свежим.
+  app/subscription/subscription-client.tsx:
+    1) loadSummary + loadSubStatus -> один loadSnapshot() (summary — сам снимок,
+       subStatus — snapshot.subscription);
+    2) после действий (промокод, автосписание) — invalidateAccountSnapshot() + loadSnapshot().
+
+Старые роуты остаются (профиль, прайсинг и внешние клиенты). Троттлинг шапки, события
+turbota:refresh и window.location.reload() не трогаем — кодмод сверяет, что их число не изменилось.
+
+    python scripts/migrate_account_snapshot.py --dry-run
+    python scripts/migrate_account_snapshot.py
+"""
+from pathlib import Path
+import argparse
+import re
+
+from ts_imports import ensure_named_import
+
+SNAPSHOT = "@/lib/account-snapshot"
+HEADER = "components/header.tsx"
+SUBSCRIPTION = "app/subscription/subscription-client.tsx"
+PRESERVED = ("turbota:refresh", "window.location.reload()", "now - lastRunRef.current")
+
+# ---------------- header ----------------
+
+HEADER_LOAD = re.compile(
+    r"const loadSummary = \(\) =>\s*\n\s*fetch\(\"/api/account/summary\",\s*\{[^}]*\}\)\n"
+)
+HEADER_READ = re.compile(
+    r"(?P<indent>[ \t]*)const r = await loadSummary\(\)\n"
+    r"\s*const d = await r\.json\(\)\.catch\(\(\) => \(\{\}\)\)\n"
+)
+HEADER_REFRESH = re.compile(r"(?P<indent>[ \t]*)if \(!alive\) return\n(?P<call>\s*runSummary\(false\)\n)")
+
+def migrate_header(code: str, log) -> str:
+    if "loadAccountSnapshot" in code:
+        log("already on snapshot")
+        return code
+
+    code, n = HEADER_LOAD.subn("const loadSummary = () => loadAccountSnapshot()\n", code, count=1)
+    if not n:
+        raise ValueError('loadSummary = () => fetch("/api/account/summary", ...) not found')
+
+    code, n = HEADER_READ.subn(lambda m: f"{m.group('indent')}const d: any = await loadSummary()\n", code, count=1)
+    if not n:
+        raise ValueError("runSummary: `const r = await loadSummary()` + r.json() not found")
+
+    code, n = HEADER_REFRESH.subn(
+        lambda m: (
+            f"{m.group('indent')}if (!alive) return\n"
+            f"{m.group('indent')}// что-то поменялось (ответ агента, оплата) — снимок из памяти уже не годится\n"
+            f"{m.group('indent')}invalidateAccountSnapshot()\n"
+            f"{m.group('call')}"
+        ),
+        code,
+        count=1,
+    )
+    if not n:
+        raise ValueError("turbota:refresh handler (`if (!alive) return` + runSummary(false)) not found")
+
+    code = ensure_named_import(code, SNAPSHOT, "loadAccountSnapshot")
+    code = ensure_named_import(code, SNAPSHOT, "invalidateAccountSnapshot")
+    log("loadSummary -> loadAccountSnapshot; refresh -> invalidateAccountSnapshot")
+    return code
+
+# ---------------- subscription page ----------------
+
+def load_fn(name: str, url: str, setter: str) -> re.Pattern:
+    return re.compile(
+        rf"(?P<indent>[ \t]*)async function {name}\(\) \{{\n"
+        rf"\s*const r = await fetch\(\"{re.escape(url)}\", \{{[^}}]*\}}\)\n"
+        rf"\s*const data = await r\.json\(\)\.catch\(\(\) => \(\{{\}} as any\)\)\n"
+        rf"\s*{setter}\(data \|\| \{{\}}\)\n"
+        rf"[ \t]*\}}\n\n?"
+    )
+
+SUB_LOAD_SUMMARY = load_fn("loadSummary", "/api/subscription/summary", "setSummary")
+SUB_LOAD_STATUS = load_fn("loadSubStatus", "/api/billing/subscription/status", "setSubStatus")
+SUB_EFFECT = re.compile(
+    r"(?P<indent>[ \t]*)loadSummary\(\)\.catch\(\(\) => setSummary\((?P<s>\{[^}]*\})\)\)\n"
+    r"\s*loadSubStatus\(\)\.catch\(\(\) => setSubStatus\((?P<t>\{[^}]*\})\)\)\n"
+)
+# после действия: `await loadSummary()` и, если есть, `await loadSubStatus()` следом
+SUB_RELOAD = re.compile(r"(?P<indent>[ \t]*)await loadSummary\(\)\n(?:\s*await loadSubStatus\(\)\n)?")
+
+def migrate_subscription(code: str, log) -> str:
+    if "loadAccountSnapshot" in code:
+        log("already on snapshot")
+        return code
+
+    m = SUB_LOAD_SUMMARY.search(code)
+    if not m:
+        raise ValueError("async function loadSummary() (fetch /api/subscription/summary) not found")
+    ind = m.group("indent")
+    snapshot_fn = (
+        f"{ind}// доступ, подписка и промокод — одним снимком, общим с шапкой\n"
+        f"{ind}async function loadSnapshot() {{\n"
+        f"{ind}  const data = await loadAccountSnapshot()\n"
+        f"{ind}  setSummary(data || {{}})\n"
+        f"{ind}  // поля как у /api/billing/subscription/status: normalizeAuto их не разбирает, autoState остаётся\n"
+        f"{ind}  // \"unknown\", и кнопки отмены/возобновления автосписания скрыты — как было до снимка\n"
+        f"{ind}  setSubStatus(data?.subscription || {{}})\n"
+        f"{ind}}}\n\n"
+    )
+    code = code[:m.start()] + snapshot_fn + code[m.end():]
+
+    code, n = SUB_LOAD_STATUS.subn("", code, count=1)
+    if not n:
+        raise ValueError("async function loadSubStatus() (fetch /api/billing/subscription/status) not found")
+
+    m = SUB_EFFECT.search(code)
+    if not m:
+        raise ValueError("useEffect with loadSummary()/loadSubStatus() not found")
+    ind = m.group("indent")
+    effect = (
+        f"{ind}loadSnapshot().catch(() => {{\n"
+        f"{ind}  setSummary({m.group('s')})\n"
+        f"{ind}  setSubStatus({m.group('t')})\n"
+        f"{ind}}})\n"
+    )
+    code = code[:m.start()] + effect + code[m.end():]
+
+    code, n = SUB_RELOAD.subn(
+        lambda m: f"{m.group('indent')}invalidateAccountSnapshot()\n{m.group('indent')}await loadSnapshot()\n", code
+    )
+    if re.search(r"\bloadSummary\(|\bloadSubStatus\(", code):
+        raise ValueError("loadSummary/loadSubStatus calls left after rewrite")
+
+    code = ensure_named_import(code, SNAPSHOT, "loadAccountSnapshot")
+    code = ensure_named_import(code, SNAPSHOT, "invalidateAccountSnapshot")
+    log(f"loadSummary + loadSubStatus -> loadSnapshot; {n} reloads after actions")
+    return code
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--dry-run", action="store_true")
+    args = ap.parse_args()
+
+    for need in ("lib/account-snapshot.ts", "app/api/account/snapshot/route.ts"):
+        if not Path(need).exists():
+            raise SystemExit(f"❌ {need} not found")
+
+    changed = {}
+    for path, fn in ((HEADER, migrate_header), (SUBSCRIPTION, migrate_subscription)):
+        if not Path(path).exists():
+            print(f"⚠️ {path} not found, skipped")
+            continue
+        code = Path(path).read_text("utf-8")
+        notes = []
+        try:
+            new = fn(code, notes.append)
+        except ValueError as e:
+            raise SystemExit(f"❌ {path}: {e}")
+        for marker in PRESERVED:
+            if code.count(marker) != new.count(marker):
+                raise SystemExit(f"❌ {path}: {marker!r} handling changed, refusing to write")
+        print(f"{path}: {'; '.join(notes)}")
+        if new != code:
+            changed[path] = new
+
+    print(f"✅ {len(changed)} files rewritten")
+    if args.dry_run:
+        print("(dry run, nothing written)")
+        return
+    for path, code in changed.items():
+        Path(path).write_text(code, "utf-8")
+
+if __name__ == "__main__":
+    main()
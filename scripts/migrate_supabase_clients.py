@@ -0,0 +1,248 @@
+"""
+Кодмод: все серверные Supabase-клиенты -> lib/supabase/clients.ts.
+
+Что переписывается:
+  1) импорты из старых модулей (lib/supabase-admin, lib/supabaseAdmin, lib/supabase/admin,
+     lib/supabase-server, lib/supabase/server) -> "@/lib/supabase/clients";
+     `supabaseAdmin` (объект) -> `getSupabaseAdmin()`;
+  2) локальные сборщики admin-клиента (makeAdmin, sbAdmin, getSupabaseAdmin, ...: env + createClient
+     с service key) удаляются, вызовы -> getSupabaseAdmin() / getSupabaseAdminOrNull()
+     (второе — если сборщик возвращал null без env);
+  3) оставшиеся createClient(..., service key, ...) -> getSupabaseAdmin();
+  4) `const x = createServerClient(...)` -> getRequestSupabase()!, массив, в который setAll
+     складывал cookies, -> getPendingAuthCookies() (общий на запрос);
+  5) `await <client>.auth.getUser()` -> `await getRequestUser()` (та же форма результата,
+     один запрос в Auth на весь HTTP-запрос);
+  6) неиспользуемые импорты createClient / createServerClient / cookies и опустевшие
+     локальные переменные убираются, старые модули без импортёров удаляются.
+
+    python scripts/migrate_supabase_clients.py --dry-run
+    python scripts/migrate_supabase_clients.py
+
+Браузерный клиент (lib/supabase/browser.ts, lib/supabase-client.ts) не трогаем.
+"""
+from pathlib import Path
+import argparse
+import re
+
+from ts_imports import drop_unused_named, ensure_named_import, matching_close, parse_named_imports, resolve_import
+
+CLIENTS = "lib/supabase/clients.ts"
+CLIENTS_IMPORT = "@/lib/supabase/clients"
+SOURCE_DIRS = ["app", "components", "hooks", "lib"]
+SOURCE_EXT = {".ts", ".tsx"}
+SKIP_DIRS = ("lib/supabase/",)
+
+# старый модуль -> {старое имя: (новое имя, было объектом -> теперь вызов)}
+OLD_MODULES = {
+    "lib/supabase-admin.ts": {"supabaseAdmin": ("getSupabaseAdmin", True), "getSupabaseAdmin": ("getSupabaseAdmin", False)},
+    "lib/supabaseAdmin.ts": {"supabaseAdmin": ("getSupabaseAdmin", True)},
+    "lib/supabase/admin.ts": {"supabaseAdmin": ("getSupabaseAdmin", True), "getSupabaseAdmin": ("getSupabaseAdmin", False)},
+    "lib/supabase-server.ts": {
+        "getSupabaseServerClient": ("getSupabaseServerClient", False),
+        "isSupabaseServerConfigured": ("isSupabaseServerConfigured", False),
+    },
+    "lib/supabase/server.ts": {
+        "createSupabaseServerClient": ("getRequestSupabase", False),
+        "getSupabaseServerClient": ("getRequestSupabase", False),
+    },
+}
+
+FACTORY_NAMES = [
+    "getSupabaseAdmin", "getSupabaseAdminOrNull", "getSupabaseServerClient", "isSupabaseServerConfigured",
+    "getRequestSupabase", "getRequestUser", "getPendingAuthCookies",
+]
+MAYBE_UNUSED = {
+    "@supabase/supabase-js": {"createClient", "SupabaseClient"},
+    "@supabase/ssr": {"createServerClient"},
+    "next/headers": {"cookies"},
+}
+
+TOP_FUNCTION = re.compile(r"^(?:async\s+)?function\s+(\w+)\s*\(\s*\)\s*(?::[^{\n]*)?\{", re.M)
+SERVICE = re.compile(r"service", re.I)
+
+def call_at(code: str, name: str):
+    """[(start, end)] вызовов name(...) (не методов и не объявлений)."""
+    out = []
+    for m in re.finditer(rf"(?<![\w.]){name}\s*\(", code):
+        if re.search(r"function\s+$", code[max(0, m.start() - 20):m.start()]):
+            continue
+        end = matching_close(code, m.end() - 1)
+        out.append((m.start(), end + 1))
+    return out
+
+def is_service_call(code: str, start: int, end: int) -> bool:
+    args = code[start:end]
+    first_two = ",".join(args.split(",")[:2])
+    return bool(SERVICE.search(first_two))
+
+# ---------------- шаги ----------------
+
+def rewrite_imports(path: str, code: str, exists, log) -> str:
+    for m, module, specs in reversed(parse_named_imports(code)):
+        target = resolve_import(module, path, exists)
+        if target not in OLD_MODULES:
+            continue
+        table = OLD_MODULES[target]
+        end = m.end() + 1 if code[m.end():m.end() + 1] == "\n" else m.end()
+        code = code[:m.start()] + code[end:]
+        for s in specs:
+            new, was_object = table.get(s.name, (s.name, False))
+            if was_object:
+                code = re.sub(rf"(?<![\w.]){re.escape(s.local)}\b(?!\s*\()", f"{new}()", code)
+            elif s.local != new:
+                code = re.sub(rf"(?<![\w.]){re.escape(s.local)}\b", new, code)
+        log(f"import {module} -> {CLIENTS_IMPORT}")
+    return code
+
+def remove_admin_builders(code: str, log) -> str:
+    while True:
+        for m in TOP_FUNCTION.finditer(code):
+            name = m.group(1)
+            body_start = m.end() - 1
+            body_end = matching_close(code, body_start)
+            body = code[body_start:body_end + 1]
+            if "createServerClient" in body or not call_at(body, "createClient") or not SERVICE.search(body):
+                continue
+            returns = re.findall(r"\breturn\s+([^\n;]*)", body)
+            if not all(r.startswith("createClient(") or r in ("null", "sb", "client", "admin") for r in returns):
+                continue
+            nullable = "null" in returns
+            target = "getSupabaseAdminOrNull()" if nullable else "getSupabaseAdmin()"
+            code = code[:m.start()] + code[body_end + 1:]
+            code = re.sub(rf"(?<![\w.]){name}\(\)", target, code)
+            log(f"admin builder {name}() -> {target}")
+            break
+        else:
+            return code
+
+def replace_inline_admin(code: str, log) -> str:
+    for start, end in reversed(call_at(code, "createClient")):
+        if is_service_call(code, start, end):
+            code = code[:start] + "getSupabaseAdmin()" + code[end:]
+            log("inline createClient(service) -> getSupabaseAdmin()")
+    return code
+
+def replace_cookie_clients(code: str, path: str, log) -> tuple[str, bool]:
+    changed = False
+    for start, end in reversed(call_at(code, "createServerClient")):
+        args = code[start:end]
+        pending = set(re.findall(r"(\w+)\.push\(\s*\.\.\.", args))
+        if re.search(r"\.cookies\.set\(|\bcookieStore\.set\(", args):
+            log(f"⚠️ {path}: cookie client wrote to the response directly — apply getPendingAuthCookies() by hand")
+        code = code[:start] + "getRequestSupabase()!" + code[end:]
+        for var in pending:
+            code = re.sub(rf"(const\s+{var}\s*(?::[^=\n]+)?=\s*)\[\]", r"\1getPendingAuthCookies()", code)
+        changed = True
+        log("createServerClient(...) -> getRequestSupabase()")
+    return code, changed
+
+def replace_get_user(code: str, log) -> str:
+    code, n = re.subn(r"await\s+\w+\.auth\.getUser\(\s*\)", "await getRequestUser()", code)
+    if n:
+        log(f"{n}× auth.getUser() -> getRequestUser()")
+    return code
+
+def block_rest(code: str, i: int) -> str:
+    """Текст от i до конца охватывающего блока {...}, без строковых литералов."""
+    depth, j = 0, i
+    while j < len(code):
+        c = code[j]
+        if c in "\"'`":
+            j += 1
+            while j < len(code) and code[j] != c:
+                j += 2 if code[j] == "\\" else 1
+        elif c in "({[":
+            depth += 1
+        elif c in ")}]":
+            if depth == 0:
+                break
+            depth -= 1
+        j += 1
+    return re.sub(r"\"[^\"\n]*\"|'[^'\n]*'", '""', code[i:j])
+
+def drop_dead_locals(code: str) -> str:
+    for pattern in (r"getRequestSupabase\(\)!", r"cookies\(\)"):
+        for m in reversed(list(re.finditer(rf"^[ \t]*const\s+(\w+)\s*=\s*{pattern};?[ \t]*\n", code, re.M))):
+            if not re.search(rf"\b{m.group(1)}\b", block_rest(code, m.end())):
+                code = code[:m.start()] + code[m.end():]
+    code = re.sub(r"\{\n(?:[ \t]*\n)+", "{\n", code)
+    return re.sub(r"\n{3,}", "\n\n", code)
+
+def fix_imports(code: str) -> str:
+    for module, names in MAYBE_UNUSED.items():
+        code = drop_unused_named(code, module, names)
+    for name in FACTORY_NAMES:
+        defined = re.search(rf"function\s+{name}\b", code)
+        if not defined and re.search(rf"(?<![\w.]){name}\(", code):
+            code = ensure_named_import(code, CLIENTS_IMPORT, name)
+    return code
+
+def migrate(path: str, code: str, exists, log) -> str:
+    new = rewrite_imports(path, code, exists, log)
+    new = remove_admin_builders(new, log)
+    new = replace_inline_admin(new, log)
+    new, cookie_client = replace_cookie_clients(new, path, log)
+    if cookie_client or "getRequestSupabase" in new:
+        new = replace_get_user(new, log)
+    if new == code:
+        return code
+    return fix_imports(drop_dead_locals(new))
+
+def source_files():
+    for d in SOURCE_DIRS:
+        for p in sorted(Path(d).rglob("*")):
+            rel = p.as_posix()
+            if p.suffix in SOURCE_EXT and p.is_file() and not rel.startswith(SKIP_DIRS) and rel not in OLD_MODULES:
+                yield rel
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--dry-run", action="store_true")
+    args = ap.parse_args()
+
+    if not Path(CLIENTS).exists():
+        raise SystemExit(f"❌ {CLIENTS} not found")
+
+    exists = lambda p: Path(p).is_file()
+    changed = {}
+    for path in source_files():
+        code = Path(path).read_text("utf-8")
+        notes = []
+        new = migrate(path, code, exists, notes.append)
+        if new != code:
+            changed[path] = new
+            print(f"{path}:")
+            for n in dict.fromkeys(notes):
+                print(f"  {n}")
+
+    # кто ещё импортирует старые модули (после переписывания)
+    still = {m: [] for m in OLD_MODULES}
+    for path in source_files():
+        code = changed.get(path) or Path(path).read_text("utf-8")
+        for _, module, _ in parse_named_imports(code):
+            target = resolve_import(module, path, exists)
+            if target in still:
+                still[target].append(path)
+    for m in OLD_MODULES:
+        for other in OLD_MODULES:
+            if other != m and Path(other).exists() and re.search(r"from\s+[\"'][^\"']*" + re.escape(Path(m).stem), Path(other).read_text("utf-8")):
+                still[m].append(other)
+    removable = [m for m, users in still.items() if Path(m).exists() and all(u in OLD_MODULES for u in users)]
+
+    print(f"✅ {len(changed)} files rewritten; old modules to delete: {', '.join(removable) or '-'}")
+    for m, users in still.items():
+        left = [u for u in users if u not in OLD_MODULES]
+        if left:
+            print(f"⚠️ {m} still imported by {', '.join(left)}")
+
+    if args.dry_run:
+        print("(dry run, nothing written)")
+        return
+    for path, code in changed.items():
+        Path(path).write_text(code, "utf-8")
+    for m in removable:
+        Path(m).unlink()
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 from pathlib import Path
 import re
 
+from symbol_index import default_export_of, top_level_return
+
 p = Path("components/header.tsx")
 if not p.exists():
     raise SystemExit("❌ components/header.tsx not found")
@@ -49,10 +51,11 @@ inject = """
   }, [])
 """
 
-# вставим перед первым "return (" внутри компонента
-pos = s.find("return (")
-if pos == -1:
-    raise SystemExit("❌ Could not find 'return (' in header.tsx")
+# вставим перед "return (" самого компонента (не хелпера выше и не колбэка внутри)
+header = default_export_of(s)
+pos = top_level_return(s, header) if header else None
+if pos is None or not s.startswith("return (", pos):
+    raise SystemExit("❌ Could not find 'return (' of the Header component in header.tsx")
 
 # чтобы вставить ровно внутри компонента, найдём ближайший перенос строки перед return
 line_start = s.rfind("\n", 0, pos) + 1
@@ -1,13 +1,20 @@
-from pathlib import Path
+"""
+Логин и регистрация: залогиненного пользователя сразу уводим на /profile.
+
+Страницы независимы — patch_scheduler гонит их параллельно.
+
+    python scripts/patch_login_register_redirect_profile.py --dry-run
+"""
+import argparse
 import re
 
-def patch_page(path: str):
-    p = Path(path)
-    s = p.read_text("utf-8")
+from patch_scheduler import Plan, add_arguments
+from symbol_index import default_export_of
 
+def patch_page(path: str, s: str, log) -> str:
     if "router.replace(\"/profile\")" in s or "router.replace('/profile')" in s:
-        print(f"✅ {path}: already redirects to /profile")
-        return
+        log(f"✅ {path}: already redirects to /profile")
+        return s
 
     # добавим useEffect импорт если надо
     if "useEffect" not in s:
@@ -20,9 +27,13 @@ def patch_page(path: str):
             s = 'import { useEffect } from "react"\n' + s
 
     # вставим редирект после router
-    m = re.search(r"const\s+router\s*=\s*useRouter\(\)\s*;?", s)
+    # router — в самой странице (default export), а не в первом попавшемся компоненте файла
+    page = default_export_of(s)
+    if not page:
+        raise ValueError("default export component not found")
+    m = re.compile(r"const\s+router\s*=\s*useRouter\(\)\s*;?").search(s, page.body_start, page.body_end)
     if not m:
-        raise SystemExit(f"❌ {path}: could not find useRouter()")
+        raise ValueError("could not find useRouter() in the page component")
 
     insert_at = m.end()
 
@@ -47,8 +58,18 @@ def patch_page(path: str):
 """
 
     s = s[:insert_at] + inject + s[insert_at:]
-    p.write_text(s, "utf-8")
-    print(f"✅ {path}: patched redirect to /profile when logged-in")
+    log(f"✅ {path}: patched redirect to /profile when logged-in")
+    return s
+
+def main():
+    ap = argparse.ArgumentParser()
+    add_arguments(ap)
+    args = ap.parse_args()
+
+    plan = Plan()
+    plan.add("app/login/page.tsx", patch_page)
+    plan.add("app/register/page.tsx", patch_page)
+    plan.run(jobs=args.jobs, dry_run=args.dry_run)
 
-patch_page("app/login/page.tsx")
-patch_page("app/register/page.tsx")
+if __name__ == "__main__":
+    main()
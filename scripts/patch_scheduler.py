@@ -0,0 +1,157 @@
+"""
+Планировщик правок для скриптов-патчеров, которые трогают несколько файлов.
+
+Скрипт объявляет шаги (файл, функция) в нужном порядке — планировщик группирует их по файлу.
+Шаги одного файла идут строго в объявленном порядке, каждый получает текст после предыдущего;
+разные файлы независимы и идут по пулу процессов (--jobs, по умолчанию по числу ядер).
+Файл читается один раз и пишется один раз — после последнего шага и только если текст изменился.
+
+Шаг — функция верхнего уровня модуля (её передают в процесс по имени). needs — литералы-префильтр:
+шаг идёт, только если в файле есть хотя бы один; файл, где ни одному шагу нечего делать,
+проверяется по байтам через mmap (source_reader) и даже не декодируется:
+
+    def patch_header(path: str, code: str, log) -> str:
+        log("✅ header patched")
+        return code
+
+    plan = Plan()
+    plan.add("components/header.tsx", patch_header)
+    plan.sweep("*.tsx", add_402_handling, skip=lambda rel: rel.startswith("app/api/"), needs="fetch(")
+    plan.run(jobs=args.jobs, dry_run=args.dry_run)
+
+ValueError из шага — файл не пишется (остальные файлы идут дальше), в конце SystemExit.
+Отчёт: сообщения шагов по файлам в порядке объявления, время каждого файла с изменениями
+или сообщениями, итог — сколько файлов, сколько изменено и общее время.
+Маленькие планы (меньше MIN_PARALLEL_FILES файлов) идут в этом же процессе — запуск пула дороже.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import fnmatch
+import os
+import time
+
+from source_reader import Source
+
+MIN_PARALLEL_FILES = 16
+SKIP_DIRS = ("node_modules", ".next", ".git")
+
+class Step:
+    __slots__ = ("fn", "name", "needs")
+
+    def __init__(self, fn, name: str | None = None, needs=None):
+        self.fn = fn
+        self.name = name or fn.__name__
+        self.needs = (needs,) if isinstance(needs, str) else tuple(needs or ())
+
+    def wanted(self, code: str) -> bool:
+        return not self.needs or any(n in code for n in self.needs)
+
+class FileResult:
+    __slots__ = ("path", "notes", "changed", "missing", "error", "seconds")
+
+    def __init__(self, path: str, notes: list | None = None, changed: bool = False, missing: bool = False,
+                 error: str = "", seconds: float = 0.0):
+        self.path = path
+        self.notes = notes or []
+        self.changed = changed
+        self.missing = missing
+        self.error = error
+        self.seconds = seconds
+
+def apply_steps(task: tuple) -> FileResult:
+    path, steps, dry_run = task
+    started = time.perf_counter()
+    try:
+        src = Source.open(path)
+    except FileNotFoundError:
+        return FileResult(path, missing=True)
+
+    data = None
+    with src:
+        if all(s.needs for s in steps) and not any(src.contains_any(s.needs) for s in steps):
+            return FileResult(path, seconds=time.perf_counter() - started)
+
+        code = original = src.text
+        notes = []
+        for step in steps:
+            # префильтр — по текущему тексту: предыдущий шаг мог вписать нужное
+            if not step.wanted(code):
+                continue
+            try:
+                code = step.fn(path, code, notes.append)
+            except ValueError as e:
+                return FileResult(path, notes, error=f"{step.name}: {e}", seconds=time.perf_counter() - started)
+
+        changed = code != original
+        if changed and not dry_run:
+            data = src.encode(code)
+    # пишем после munmap
+    if data is not None:
+        Path(path).write_bytes(data)
+    return FileResult(path, notes, changed, seconds=time.perf_counter() - started)
+
+class Plan:
+    def __init__(self):
+        # dict сохраняет порядок первого объявления файла — в нём же и отчёт
+        self.files: dict = {}
+
+    def add(self, path: str, fn, name: str | None = None, needs=None) -> "Plan":
+        self.files.setdefault(Path(path).as_posix(), []).append(Step(fn, name, needs))
+        return self
+
+    def sweep(self, pattern: str, fn, skip=None, needs=None) -> int:
+        """
+        Шаг fn для каждого файла, чей путь от корня подходит под fnmatch-шаблон ("*" ловит и "/":
+        "*.tsx" — все .tsx, "components/*.tsx" — всё под components/). node_modules, .next, .git
+        не обходятся. fn сам решает, трогать ли файл. Возвращает число файлов.
+        """
+        n = 0
+        for dirpath, dirnames, filenames in os.walk("."):
+            dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+            for name in sorted(filenames):
+                rel = os.path.relpath(os.path.join(dirpath, name)).replace(os.sep, "/")
+                if not fnmatch.fnmatchcase(rel, pattern) or (skip and skip(rel)):
+                    continue
+                self.add(rel, fn, needs=needs)
+                n += 1
+        return n
+
+    def execute(self, jobs: int | None = None, dry_run: bool = False) -> list:
+        tasks = [(path, steps, dry_run) for path, steps in self.files.items()]
+        jobs = max(1, jobs or os.cpu_count() or 1)
+        if jobs == 1 or len(tasks) < MIN_PARALLEL_FILES:
+            return [apply_steps(t) for t in tasks]
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            # map сохраняет порядок задач; кусками — меньше пересылок между процессами
+            return list(pool.map(apply_steps, tasks, chunksize=max(1, len(tasks) // (jobs * 4))))
+
+    def run(self, jobs: int | None = None, dry_run: bool = False) -> list:
+        started = time.perf_counter()
+        results = self.execute(jobs, dry_run)
+        elapsed = time.perf_counter() - started
+
+        errors = []
+        for r in results:
+            if r.missing:
+                print(f"⚠️ {r.path} not found, skipping")
+                continue
+            for note in r.notes:
+                print(note)
+            if r.error:
+                errors.append(r)
+                print(f"❌ {r.path}: {r.error} (not written)")
+            if r.notes or r.changed or r.error:
+                print(f"⏱ {r.path}: {r.seconds * 1000:.1f} ms{', changed' if r.changed else ''}")
+
+        changed = sum(r.changed for r in results)
+        print(
+            f"⏱ {len(results)} files, {changed} changed"
+            f"{' (dry run, nothing written)' if dry_run else ''} in {elapsed * 1000:.1f} ms"
+        )
+        if errors:
+            raise SystemExit(f"❌ {len(errors)} files failed, left untouched")
+        return results
+
+def add_arguments(ap):
+    ap.add_argument("--dry-run", action="store_true")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="процессов для независимых файлов")
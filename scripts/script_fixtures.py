@@ -0,0 +1,618 @@
+"""
+Минимальные фикстуры для скриптов-патчеров (check_scripts.py).
+
+Каждый патчер в scripts/ писался под конкретное состояние одного-двух файлов: шапки, прайсинга,
+видеозвонка, layout и старого /api/account/summary. Здесь эти состояния собираются из
+фрагментов — ровно те конструкции, которые скрипт ищет регэкспами, и ничего лишнего.
+Сборка детерминирована (без времени, случайности и чтения дерева), поэтому результат прогона
+можно сравнивать с golden-файлом.
+
+Кейс = скрипт + файлы до прогона. Если второй прогон по замыслу что-то меняет (скрипт не
+идемпотентен и это известно) — idempotent=False с причиной; check_scripts.py тогда
+сравнивает и второй проход с golden, но не падает на нём.
+
+    python scripts/script_fixtures.py --list
+    python scripts/script_fixtures.py --write /tmp/fx patch_header_refresh
+"""
+from pathlib import Path
+import argparse
+import re
+
+HEADER = "components/header.tsx"
+PRICING = "app/pricing/page.tsx"
+VIDEO = "components/video-call-dialog.tsx"
+LAYOUT = "app/layout.tsx"
+SUMMARY = "app/api/account/summary/route.ts"
+
+FIXTURE_FILES = (HEADER, PRICING, VIDEO, LAYOUT, SUMMARY)
+
+def render(template: str, **parts) -> str:
+    """@@NAME@@ -> parts[name]; пустая часть вместе со своей строкой пропадает."""
+    def part(name: str) -> str:
+        return parts.get(name.lower(), "")
+    # маркер на отдельной строке: пустая часть — строки нет вовсе, двойных пустых строк не остаётся
+    out = re.sub(r"^@@(\w+)@@\n", lambda m: part(m.group(1)) + "\n" if part(m.group(1)) else "", template, flags=re.M)
+    out = re.sub(r"\n{3,}", "\n\n", out)
+    return re.sub(r"@@(\w+)@@", lambda m: part(m.group(1)), out)
+
+# ---------------- components/header.tsx ----------------
+
+HEADER_TEMPLATE = '''"use client"
+
+import Link from "next/link"
+import { useEffect, useState } from "react"
+@@NAV_IMPORT@@
+import { useAuth } from "@/lib/auth/auth-context"
+
+export default function Header() {
+  const { user } = useAuth()
+  const [trialLeft, setTrialLeft] = useState<number | null>(null)
+@@STATE@@
+  const [hasAccess, setHasAccess] = useState<boolean | null>(null)
+@@PAYWALL@@
+
+@@EFFECT@@
+
+  const scrollToSection = (href: string) => {
+    document.querySelector(href)?.scrollIntoView({ behavior: "smooth" })
+  }
+
+@@INTERCEPTOR@@
+
+  return (
+    <header className="sticky top-0 z-40 border-b bg-background/80">@@BANNER@@
+      <nav className="flex items-center gap-4">
+        <span className="badge">@@BADGE@@</span>
+        {user ? (
+          <Link href="/profile">Profile</Link>
+        ) : (
+          <Link href="/login">Sign in</Link>
+        )}
+      </nav>
+    </header>
+  )
+}
+'''
+
+NAV_PATHNAME = 'import { usePathname } from "next/navigation"'
+TRIALTEXT_STATE = "  const [trialText, setTrialText] = useState<string | null>(null)"
+
+# до patch_header_refresh: загрузка summary прямо в эффекте
+EFFECT_INLINE = '''  useEffect(() => {
+    fetch("/api/account/summary")
+      .then((r) => r.json())
+      .then((d) => {
+        setTrialLeft(typeof d?.trialLeft === "number" ? d.trialLeft : null)
+        setHasAccess(Boolean(d?.hasAccess))
+      })
+      .catch(() => {})
+  }, [])'''
+
+# после patch_header_refresh + no-store: loadSummary и эффект на user?.email
+EFFECT_LOAD_EMAIL = '''  const loadSummary = () =>
+    fetch("/api/account/summary", { cache: "no-store", credentials: "include" })
+
+  useEffect(() => {
+    loadSummary()
+      .then((r) => r.json())
+      .then((d) => {
+        setTrialLeft(typeof d?.trialLeft === "number" ? d.trialLeft : null)
+        setTrialText(typeof d?.trialText === "string" ? d.trialText : null)
+        setHasAccess(Boolean(d?.hasAccess))
+      })
+      .catch(() => {})
+  }, [user?.email])'''
+
+# после fix_header_syntax_and_logic_v7: alive + подписка на turbota:refresh
+EFFECT_ALIVE = '''  const loadSummary = () =>
+    fetch("/api/account/summary", { cache: "no-store", credentials: "include" })
+
+  useEffect(() => {
+    let alive = true
+
+    const run = () => {
+      loadSummary()
+        .then((r) => r.json())
+        .then((d) => {
+          if (!alive) return
+          setTrialLeft(typeof d?.trialLeft === "number" ? d.trialLeft : null)
+          setTrialText(typeof d?.trialText === "string" ? d.trialText : null)
+          setHasAccess(Boolean(d?.hasAccess))
+        })
+        .catch(() => {})
+    }
+
+    run()
+    const onRefresh = () => run()
+    window.addEventListener("turbota:refresh", onRefresh)
+
+    return () => {
+      alive = false
+      window.removeEventListener("turbota:refresh", onRefresh)
+    }
+  }, [user?.email])'''
+
+INTERCEPTOR_HEAD = '''  // turbota_global_fetch_interceptor
+  useEffect(() => {
+    if (typeof window === "undefined") return
+
+    const originalFetch = window.fetch.bind(window)
+
+    window.fetch = (async (input: any, init?: any) => {
+      const res = await originalFetch(input, init)
+
+      try {
+'''
+INTERCEPTOR_URL = '''        const url =
+          typeof input === "string"
+            ? input
+            : input?.url
+            ? String(input.url)
+            : ""
+'''
+INTERCEPTOR_TAIL = '''      } catch {}
+
+      return res
+    }) as any
+
+    return () => {
+      window.fetch = originalFetch as any
+    }
+  }, [])'''
+
+# то, что вставляет patch_header_global_fetch.py
+INTERCEPTOR_SIMPLE = INTERCEPTOR_HEAD + INTERCEPTOR_URL + '''
+        if (url.includes("/api/turbotaai-agent")) {
+          if (res.status === 402) {
+            window.dispatchEvent(new Event("turbota:refresh"))
+            window.location.assign("/pricing?paywall=trial")
+          } else if (res.ok) {
+            window.dispatchEvent(new Event("turbota:refresh"))
+          }
+        }
+''' + INTERCEPTOR_TAIL
+
+# после fix_header_fetch_hooks_v6: хуки попали внутрь `const url = ...`, общий if на agent+promo
+INTERCEPTOR_MANGLED = INTERCEPTOR_HEAD + '''        const url =
+        if (url.includes("/api/auth/clear")) {
+          if (res.ok) {
+            window.dispatchEvent(new Event("turbota:refresh"))
+          }
+        }
+
+        if (url.includes("/api/billing/promo/redeem")) {
+          if (res.ok) {
+            window.dispatchEvent(new Event("turbota:refresh"))
+          }
+        }
+          typeof input === "string"
+            ? input
+            : input?.url
+            ? String(input.url)
+            : ""
+
+        if (url.includes("/api/turbotaai-agent") || url.includes("/api/billing/promo/redeem")) {
+          if (res.status === 402) {
+            try { sessionStorage.setItem("turbota_paywall","trial") } catch {}
+            window.dispatchEvent(new Event("turbota:refresh"))
+            window.location.assign("/pricing?paywall=trial")
+          } else if (res.ok) {
+            window.dispatchEvent(new Event("turbota:refresh"))
+          }
+        }
+''' + INTERCEPTOR_TAIL
+
+# после fix_header_interceptor_clean_v1: питоновский плейсхолдер посреди TS
+INTERCEPTOR_PLACEHOLDER = INTERCEPTOR_HEAD + INTERCEPTOR_URL + '''
+        const isAgent = url.includes("/api/turbotaai-agent")
+        const isPromo = url.includes("/api/billing/promo/redeem")
+        const isClear = url.includes("/api/auth/clear")
+
+        // Paywall redirect only for agent endpoint
+        if (isAgent && res.status === 402) {
+          try {
+            sessionStorage.setItem("turbota_paywall", "trial")
+          } catch {}
+          window.dispatchEvent(new Event("turbota:refresh"))
+          window.location.assign("/pricing?paywall=trial")
+          return res
+        }
+
+        // refresh summary after successful calls
+        if ((isAgent || isPromo || isClear) && res.ok):  # placeholder to be replaced below
+          pass
+''' + INTERCEPTOR_TAIL
+
+# рабочий перехватчик с reload после logout (до fix_header_interceptor_no_reload_v1)
+INTERCEPTOR_RELOAD = INTERCEPTOR_HEAD + INTERCEPTOR_URL + '''
+        const isAgent = url.includes("/api/turbotaai-agent")
+        const isClear = url.includes("/api/auth/clear")
+
+        if (isAgent && res.status === 402) {
+          window.location.assign("/pricing?paywall=trial")
+          return res
+        }
+
+        if ((isAgent || isClear) && res.ok) {
+          window.dispatchEvent(new Event("turbota:refresh"))
+          if (isClear) setTimeout(() => window.location.reload(), 50)
+        }
+''' + INTERCEPTOR_TAIL
+
+BADGE_PLAIN = '{hasAccess ? "Access: Active" : `Trial left: ${trialLeft}`}'
+BADGE_TRIALTEXT = '{trialText ? `Access: ${trialText}` : hasAccess ? "Access: Active" : `Trial left: ${trialLeft}`}'
+BADGE_DUP = (
+    '{trialText ? `Access: ${trialText}` : hasAccess ? "Access: Active" : '
+    'trialText ? `Access: ${trialText}` : `Trial left: ${trialLeft}`}'
+)
+
+# после fix_paywall_everywhere: вычисляемый showPaywall — и старый useState-дубль рядом
+PAYWALL_DUP = '''  const pathname = usePathname()
+  const searchParams = useSearchParams()
+  const paywall = searchParams?.get("paywall")
+  const [paywallDismissed, setPaywallDismissed] = useState(false)
+  const showPaywall = pathname === "/pricing" && paywall === "trial" && !paywallDismissed
+  const [showPaywall, setShowPaywall] = useState(false)
+
+  useEffect(() => {
+    setShowPaywall(paywall === "trial")
+  }, [paywall])'''
+
+BANNER_SHOWPAYWALL = '''
+      {showPaywall ? (
+        <Banner show={true} variant="warning" onHide={() => setShowPaywall(false)} title="Free trial is over" />
+      ) : null}'''
+
+def header(effect=EFFECT_INLINE, interceptor="", badge=BADGE_PLAIN, trial_text=False, nav=NAV_PATHNAME,
+           paywall="", banner="") -> str:
+    return render(
+        HEADER_TEMPLATE,
+        nav_import=nav,
+        state=TRIALTEXT_STATE if trial_text else "",
+        paywall=paywall,
+        effect=effect,
+        interceptor=interceptor,
+        badge=badge,
+        banner=banner,
+    )
+
+# ---------------- app/pricing/page.tsx ----------------
+
+PRICING_TEMPLATE = '''"use client"
+
+@@REACT_IMPORT@@
+@@NAV_IMPORT@@
+import { Button } from "@/components/ui/button"
+@@IMPORTS@@
+
+export default function PricingPage() {
+  const router = useRouter()
+@@STATE@@
+  const [trialLeft, setTrialLeft] = useState<number | null>(null)
+  const [loadingSummary, setLoadingSummary] = useState(true)
+
+  useEffect(() => {
+    let alive = true
+    fetch("/api/account/summary", { cache: "no-store", credentials: "include" })
+      .then((r) => r.json())
+      .then((d) => {
+        if (!alive) return
+        setTrialLeft(typeof d?.trialLeft === "number" ? d.trialLeft : null)
+      })
+      .finally(() => setLoadingSummary(false))
+@@CLEANUP@@
+  }, [])
+
+  return (
+@@OPEN@@    <main className="container mx-auto px-4 py-16">
+      <h1 className="text-4xl font-semibold">Тарифы</h1>
+      <div className="flex justify-between">
+        <span>@@LABEL@@</span>
+        <span>@@VALUE@@</span>
+      </div>
+      @@SUBSCRIBE@@
+      <Button variant="outline" onClick={() => router.push("/")}>Back</Button>
+    </main>
+@@CLOSE@@
+}
+'''
+
+REACT_IMPORT = 'import { useEffect, useState } from "react"'
+NAV_ROUTER = 'import { useRouter } from "next/navigation"'
+CLEANUP = '''    return () => {
+      alive = false
+    }'''
+LABEL_TRIAL = "Trial left"
+LABEL_TRIALTEXT = '{trialText ? "Access" : "Trial left"}'
+VALUE_LOADING = '{loadingSummary ? "…" : trialLeft}'
+SUBSCRIBE_BUTTON = '<Button onClick={() => router.push("/subscription")}>Subscribe</Button>'
+
+# patch_pricing_paywall_banner вставил баннер в первый `return (` — это оказался cleanup эффекта
+CLEANUP_BROKEN = '''    return (
+      {paywall === "trial" ? (
+        <div className="fixed right-4 top-4 z-[9999] w-[360px]">
+          <Banner show={true} variant="warning" title="Free trial is over" />
+        </div>
+      ) : null}
+) => {
+      alive = false
+    }'''
+PAYWALL_STATE_ESCAPED = '''  const searchParams = useSearchParams()
+  const paywall = searchParams?.get(\\"paywall\\")'''
+
+def pricing(react=REACT_IMPORT, nav=NAV_ROUTER, imports="", state="", cleanup=CLEANUP, open_="", close="  )",
+            label=LABEL_TRIAL, value=VALUE_LOADING, subscribe=SUBSCRIBE_BUTTON) -> str:
+    return render(
+        PRICING_TEMPLATE,
+        react_import=react,
+        nav_import=nav,
+        imports=imports,
+        state=state,
+        cleanup=cleanup,
+        open=open_,
+        close=close,
+        label=label,
+        value=value,
+        subscribe=subscribe,
+    )
+
+# ---------------- components/video-call-dialog.tsx ----------------
+
+VIDEO_TEMPLATE = '''"use client"
+
+import { useState } from "react"
+import { Dialog, DialogContent } from "@/components/ui/dialog"
+@@IMPORTS@@
+
+type Props = { isOpen: boolean; onClose: () => void }
+
+@@CONSTS@@
+
+export default function VideoCallDialog(props: Props) {
+  const { isOpen, onClose } = props
+  const [messages, setMessages] = useState<string[]>([])
+
+  async function sendToAgent(text: string) {
+@@FETCH@@
+    const data = await res.json().catch(() => ({}))
+    setMessages((prev) => [...prev, String(data?.text || "")])
+  }
+
+  return (
+    <Dialog open={isOpen} onOpenChange={(o) => !o && onClose()}>
+      <DialogContent @@CLASS@@>
+        <button onClick={() => sendToAgent("hi")}>Send</button>
+      </DialogContent>
+    </Dialog>
+  )
+}
+'''
+
+AGENT_URL_CONST = 'const TURBOTA_AGENT_URL = "/api/turbotaai-agent"'
+FETCH_LITERAL_SEMI = '''    const res = await fetch("/api/turbotaai-agent", {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ query: text, mode: "video" }),
+    });'''
+FETCH_CONST_SEMI = FETCH_LITERAL_SEMI.replace('"/api/turbotaai-agent"', "TURBOTA_AGENT_URL")
+FETCH_CONST = FETCH_CONST_SEMI.rstrip(";")
+FETCH_LITERAL = FETCH_LITERAL_SEMI.rstrip(";")
+CLASS_PLAIN = 'className="sm:max-w-lg"'
+CLASS_CN = 'className={cn("sm:max-w-lg", isOpen && "open")}'
+
+def video(fetch=FETCH_LITERAL, consts="", imports="", cls=CLASS_PLAIN) -> str:
+    return render(VIDEO_TEMPLATE, fetch=fetch, consts=consts, imports=imports, **{"class": cls})
+
+# ---------------- app/layout.tsx ----------------
+
+LAYOUT_TEMPLATE = '''import type { ReactNode } from "react"
+import "./globals.css"
+import { AuthProvider } from "@/lib/auth/auth-context"
+@@IMPORTS@@
+import Header from "@/components/header"
+import Footer from "@/components/footer"
+
+export default function RootLayout({ children }: { children: ReactNode }) {
+  return (
+    <html lang="uk" suppressHydrationWarning>
+      <body className="min-h-screen antialiased">
+        <AuthProvider>
+          <div className="flex min-h-screen flex-col">
+@@TOAST@@
+            <Header />
+            <main className="flex-1">{children}</main>
+            <Footer />
+          </div>
+        </AuthProvider>
+      </body>
+    </html>
+  )
+}
+'''
+
+def layout(toast=False) -> str:
+    return render(
+        LAYOUT_TEMPLATE,
+        imports='import { PaywallToast } from "@/components/paywall-toast"' if toast else "",
+        toast="            <PaywallToast />" if toast else "",
+    )
+
+# ---------------- app/api/account/summary/route.ts (до access-summary.ts) ----------------
+
+SUMMARY_LEGACY = '''import { NextRequest, NextResponse } from "next/server"
+import { getSupabaseAdmin, getRequestUser } from "@/lib/supabase/clients"
+
+export const runtime = "nodejs"
+export const dynamic = "force-dynamic"
+
+function isActiveDate(v: any) {
+  if (!v) return false
+  const d = new Date(String(v))
+  return !Number.isNaN(d.getTime()) && d.getTime() > Date.now()
+}
+
+export async function GET(req: NextRequest) {
+  const deviceHash = req.cookies.get("ta_device_hash")?.value || null
+  const { data } = await getRequestUser()
+  const user = data?.user ?? null
+
+  const { data: grant } = await getSupabaseAdmin()
+    .from("access_grants")
+    .select("trial_questions_left,paid_until,promo_until")
+    .eq("device_hash", user ? `account:${user.id}` : deviceHash)
+    .maybeSingle()
+
+  const trialLeft = Number(grant?.trial_questions_left ?? 5)
+  const paidUntil = grant?.paid_until ?? null
+  const promoUntil = grant?.promo_until ?? null
+
+  const paidActive = isActiveDate(paidUntil)
+  const promoActive = isActiveDate(promoUntil)
+  const unlimited = paidActive || promoActive
+
+  return NextResponse.json({
+    ok: true,
+    isLoggedIn: Boolean(user),
+    trialLeft,
+    access: paidActive ? "Paid" : promoActive ? "Promo" : "Limited",
+    unlimited,
+    trialText: promoActive ? "Doctor access" : paidActive ? "Unlimited" : String(trialLeft),
+  })
+}
+'''
+
+# ---------------- кейсы ----------------
+
+class Case:
+    """Прогон одного скрипта на одном наборе файлов."""
+    __slots__ = ("name", "script", "files", "idempotent", "note")
+
+    def __init__(self, script: str, files: dict, name: str | None = None, idempotent: bool = True, note: str = ""):
+        self.script = script
+        self.name = name or Path(script).stem
+        self.files = files
+        self.idempotent = idempotent
+        self.note = note
+
+def build_cases() -> list[Case]:
+    return [
+        # --- header ---
+        Case("patch_header_refresh.py", {HEADER: header()}),
+        Case("patch_header_trialtext.py", {HEADER: header()}),
+        Case("patch-header-trial-left.mjs", {HEADER: header(badge=BADGE_TRIALTEXT, trial_text=True)}),
+        Case("patch_header_global_fetch.py", {HEADER: header()}),
+        Case("patch_header_clear_refresh.py", {HEADER: header(interceptor=INTERCEPTOR_SIMPLE)}),
+        Case("patch_header_promo_refresh.py", {HEADER: header(interceptor=INTERCEPTOR_SIMPLE)}),
+        Case("fix_header_fetch_hooks_v6.py", {HEADER: header(interceptor=INTERCEPTOR_SIMPLE)}),
+        Case(
+            "fix_header_syntax_and_logic_v7.py",
+            {HEADER: header(effect=EFFECT_LOAD_EMAIL, interceptor=INTERCEPTOR_MANGLED, badge=BADGE_DUP, trial_text=True)},
+        ),
+        Case(
+            "fix_header_interceptor_clean_v1.py",
+            {HEADER: header(effect=EFFECT_ALIVE, interceptor=INTERCEPTOR_MANGLED, badge=BADGE_TRIALTEXT, trial_text=True)
+                .replace("}, [user?.email])\n\n  const scrollToSection", "}, [user?.email])const scrollToSection", 1)},
+        ),
+        Case(
+            "fix_header_placeholder_pass_v1.py",
+            {HEADER: header(effect=EFFECT_ALIVE, interceptor=INTERCEPTOR_PLACEHOLDER, badge=BADGE_TRIALTEXT, trial_text=True)},
+        ),
+        Case(
+            "fix_header_interceptor_no_reload_v1.py",
+            {HEADER: header(effect=EFFECT_ALIVE, interceptor=INTERCEPTOR_RELOAD, badge=BADGE_TRIALTEXT, trial_text=True)},
+        ),
+        Case(
+            "fix_header_final_v1.py",
+            {HEADER: header(effect=EFFECT_ALIVE, interceptor=INTERCEPTOR_RELOAD, badge=BADGE_DUP, trial_text=True)},
+            idempotent=False,
+            note="перехватчик вставляется с ведущим переводом строки — каждый проход добавляет пустую строку перед ним",
+        ),
+        Case(
+            "fix_header_showpaywall_dup.py",
+            {HEADER: header(
+                effect=EFFECT_ALIVE, badge=BADGE_TRIALTEXT, trial_text=True, paywall=PAYWALL_DUP,
+                nav='import { usePathname, useSearchParams } from "next/navigation"\nimport { Banner } from "@/components/ui/banner"',
+                banner=BANNER_SHOWPAYWALL,
+            )},
+        ),
+        Case(
+            "fix_paywall_everywhere.py",
+            {
+                HEADER: header(),
+                PRICING: pricing(
+                    nav='import { useRouter, useSearchParams } from "next/navigation"',
+                    imports='import { RainbowButton } from "@/components/ui/rainbow-button"',
+                    state=PAYWALL_STATE_ESCAPED,
+                    open_="    <>\n",
+                    close="    </>\n  );",
+                    subscribe='<RainbowButton onClick={() => router.push("/subscription")}>Subscribe</RainbowButton>',
+                ),
+                VIDEO: video(),
+            },
+        ),
+
+        # --- pricing ---
+        Case(
+            "fix_pricing_compile.py",
+            {PRICING: pricing(
+                nav='import { useRouter, useSearchParams } from "next/navigation"',
+                imports='import { Banner } from "@/components/ui/banner"',
+                state=PAYWALL_STATE_ESCAPED,
+                cleanup=CLEANUP_BROKEN,
+            )},
+        ),
+        Case("fix_pricing_profile_card_access_v1.py", {PRICING: pricing(value="{trialLeft}")}),
+        Case(
+            "fix_pricing_trialtext_scope_v2.py",
+            {PRICING: pricing(react='import { useState, useEffect } from "react"', label=LABEL_TRIALTEXT)},
+        ),
+        Case("fix_pricing_trialtext_state_v1.py", {PRICING: pricing(label=LABEL_TRIALTEXT)}),
+        Case("patch_pricing_paywall_banner.py", {PRICING: pricing(cleanup="", close="  );")}),
+        Case("patch_pricing_rainbow.py", {PRICING: pricing()}),
+        Case("patch-pricing-i18n.mjs", {PRICING: pricing(label=LABEL_TRIALTEXT)}),
+
+        # --- video-call-dialog ---
+        Case("patch_video_call_paywall.py", {VIDEO: video(fetch=FETCH_LITERAL_SEMI)}),
+        Case("patch_video_call_paywall_v2.py", {VIDEO: video(fetch=FETCH_CONST_SEMI, consts=AGENT_URL_CONST)}),
+        Case("patch_video_call_paywall_v3.py", {VIDEO: video(fetch=FETCH_CONST, consts=AGENT_URL_CONST)}),
+        Case("fix-video-dialog-class.mjs", {VIDEO: video()}),
+        Case(
+            "patch-video-dialog-class.mjs",
+            {VIDEO: video(cls=CLASS_CN, imports='import { cn } from "@/lib/utils"')},
+        ),
+
+        # --- layout ---
+        Case("patch_layout_add_paywall_toast.py", {LAYOUT: layout()}),
+        Case("patch_layout_suspense.py", {LAYOUT: layout(toast=True)}),
+
+        # --- account/summary ---
+        Case("fix_account_summary_guest_access_v1.py", {SUMMARY: SUMMARY_LEGACY}),
+        Case("patch_summary_trialtext.py", {SUMMARY: SUMMARY_LEGACY}),
+    ]
+
+def write_case(case: Case, root: Path):
+    for rel, code in case.files.items():
+        p = root / rel
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(code, "utf-8")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--list", action="store_true")
+    ap.add_argument("--write", metavar="DIR", help="выложить фикстуры кейса в DIR")
+    ap.add_argument("case", nargs="?")
+    args = ap.parse_args()
+
+    cases = {c.name: c for c in build_cases()}
+    if args.list or not args.write:
+        for c in cases.values():
+            mark = "" if c.idempotent else "  (not idempotent)"
+            print(f"{c.name:<42} {', '.join(c.files)}{mark}")
+        return
+    if args.case not in cases:
+        raise SystemExit(f"❌ unknown case {args.case!r} (--list)")
+    write_case(cases[args.case], Path(args.write))
+    print(f"✅ {args.case} -> {args.write}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Чтение исходников для скриптов-патчеров: mmap, проверки по байтам, декодирование по требованию.
+
+Path.read_text("utf-8") декодирует весь файл, даже когда дальше идёт только
+`"turbota_global_fetch_interceptor" in s`. Source отображает файл в память (mmap) и отвечает
+на такие проверки прямо по байтам: при обходе дерева память уходит на совпадения, а не на
+размер дерева. Текст декодируется при первом обращении к .text — когда правилу и правда надо
+править файл.
+
+Для правок — карта смещений символ <-> байт (строится по не-ASCII символам, для чистого ASCII
+её нет вовсе) и splice(): замены по символьным позициям вклеиваются в исходные байты,
+кодируются только новые куски.
+
+    from source_reader import Source
+
+    with Source.open("components/header.tsx") as src:
+        if not src.contains("/api/turbotaai-agent"):
+            return
+        i = src.text.find("return (")
+        data = src.splice([(i, i, "// hi\\n")])
+
+Как и read_text, текст — UTF-8 с универсальными переводами строк; BOM пропускается.
+В файлах с \\r символьные позиции уже не совпадают с байтовыми — splice() для них
+недоступен (ValueError), правка пишется целиком.
+"""
+from bisect import bisect_left
+from pathlib import Path
+import mmap
+import re
+
+BOM = b"\xef\xbb\xbf"
+NON_ASCII = re.compile(r"[^\x00-\x7f]")
+
+def _bytes(literal) -> bytes:
+    return literal.encode("utf-8") if isinstance(literal, str) else literal
+
+class Source:
+    __slots__ = ("path", "_file", "_buf", "_start", "_text", "_chars", "_extra")
+
+    def __init__(self, path: str, buf, file=None):
+        self.path = path
+        self._file = file
+        self._buf = buf  # mmap или bytes (пустой файл mmap не отображает)
+        self._start = len(BOM) if buf[:len(BOM)] == BOM else 0
+        self._text = None
+        self._chars = None  # позиции не-ASCII символов в тексте
+        self._extra = None  # лишние байты до каждого из них (накопительно)
+
+    @classmethod
+    def open(cls, path) -> "Source":
+        f = open(path, "rb")
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # пустой файл
+            f.close()
+            return cls(str(path), b"")
+        return cls(str(path), buf, f)
+
+    def close(self):
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------------- байты ----------------
+
+    def __len__(self) -> int:
+        return len(self._buf) - self._start
+
+    def contains(self, literal) -> bool:
+        return self._buf.find(_bytes(literal), self._start) != -1
+
+    def contains_any(self, literals) -> bool:
+        return any(self.contains(x) for x in literals)
+
+    def count(self, literal) -> int:
+        needle, n, i = _bytes(literal), 0, self._start
+        while True:
+            i = self._buf.find(needle, i)
+            if i == -1:
+                return n
+            n += 1
+            i += len(needle) or 1
+
+    @property
+    def data(self) -> bytes:
+        """Байты без BOM (копия — только когда они правда нужны)."""
+        return bytes(self._buf[self._start:])
+
+    # ---------------- текст ----------------
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            raw = self._buf[self._start:].decode("utf-8")
+            if "\r" in raw:
+                raw = raw.replace("\r\n", "\n").replace("\r", "\n")
+            self._text = raw
+        return self._text
+
+    def _offset_map(self):
+        if self._chars is None:
+            if self._buf.find(b"\r", self._start) != -1:
+                raise ValueError(f"{self.path}: \\r in file, char offsets don't map to bytes")
+            chars, extra, total = [], [0], 0
+            for m in NON_ASCII.finditer(self.text):
+                chars.append(m.start())
+                total += len(m.group(0).encode("utf-8")) - 1
+                extra.append(total)
+            self._chars, self._extra = chars, extra
+        return self._chars, self._extra
+
+    def byte_offset(self, char: int) -> int:
+        """Позиция символа в тексте -> смещение в файле."""
+        chars, extra = self._offset_map()
+        return self._start + char + extra[bisect_left(chars, char)]
+
+    def char_offset(self, byte: int) -> int:
+        """Смещение в файле (на границе символа) -> позиция в тексте."""
+        chars, extra = self._offset_map()
+        b = byte - self._start
+        # сколько не-ASCII символов целиком до b: их байтовые позиции chars[k] + extra[k]
+        lo, hi = 0, len(chars)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if chars[mid] + extra[mid] < b:
+                lo = mid + 1
+            else:
+                hi = mid
+        return b - extra[lo]
+
+    def encode(self, text: str) -> bytes:
+        """Новый текст целиком -> байты файла (BOM, если был, сохраняется)."""
+        return self._buf[:self._start] + text.encode("utf-8")
+
+    def splice(self, edits) -> bytes:
+        """
+        Новое содержимое файла: edits — (начало, конец, замена) в символьных позициях текста,
+        не пересекаются. Нетронутые участки копируются из исходных байтов как есть.
+        """
+        parts, pos = [self._buf[:self._start]], self._start
+        for start, end, repl in sorted(edits, key=lambda e: e[0]):
+            b0, b1 = self.byte_offset(start), self.byte_offset(end)
+            if b0 < pos:
+                raise ValueError(f"{self.path}: overlapping edits at {start}")
+            parts.append(self._buf[pos:b0])
+            parts.append(repl.encode("utf-8"))
+            pos = b1
+        parts.append(self._buf[pos:])
+        return b"".join(parts)
+
+def read_text(path) -> str:
+    """Как Path(path).read_text("utf-8"), но через mmap и без BOM."""
+    with Source.open(path) as src:
+        return src.text
+
+def contains(path, literal) -> bool:
+    """Проверка по байтам без декодирования; нет файла — False."""
+    if not Path(path).exists():
+        return False
+    with Source.open(path) as src:
+        return src.contains(literal)
@@ -0,0 +1,370 @@
+"""
+Кодмод: lib/i18n/translation-utils.ts -> модули по назначению + отчёт по байтам на роут.
+
+translation-utils.ts смешивал DOM-перевод, речь, чистку текста и тулинг шаблонов,
+и любой импорт тянул всё сразу. Кодмод:
+  1) режет файл по объявлениям (функция/интерфейс + её JSDoc) в модули из MODULES,
+     межмодульные зависимости и внешние импорты (voice-index) расставляет сам;
+  2) переписывает именованные импорты всех импортёров на новые модули
+     (алиасы `a as b` сохраняются, стиль пути "@/..." / "./..." тоже);
+  3) удаляет translation-utils.ts; если остались импорты, которые не переписать
+     (`import * as`, `export * from`, голый импорт), — оставляет на его месте barrel
+     (export * ..., с "use client") и пишет в нём, кто его держит;
+  4) печатает отчёт: сколько байт исходников достижимо из каждой страницы app/
+     (page + цепочка layout) до и после.
+
+    python scripts/split_translation_utils.py split --dry-run   # только отчёт
+    python scripts/split_translation_utils.py split
+    python scripts/split_translation_utils.py report --rev HEAD~1   # ревизия против рабочего дерева
+
+Байты — сумма исходников репозитория в графе импортов (без node_modules), не размер
+минифицированного чанка: для сравнения до/после этого достаточно.
+"""
+from pathlib import Path
+import argparse
+import re
+import subprocess
+
+from ts_imports import (
+    import_specifiers,
+    module_path_like,
+    parse_named_imports,
+    render_named_import,
+    resolve_import,
+)
+
+TARGET = "lib/i18n/translation-utils.ts"
+I18N = "lib/i18n"
+SOURCE_DIRS = ["app", "components", "hooks", "lib"]
+SOURCE_EXT = {".ts", ".tsx", ".js", ".jsx", ".mjs"}
+
+# модуль -> ("use client"?, шапка, объявления)
+MODULES = {
+    "dom-translation": (
+        True,
+        "DOM translation: walks the live document and swaps text/attributes in place.",
+        ["extractTextNodes", "translateElement", "translateDocument", "translateAllTextNodes",
+         "forceCompleteRetranslation"],
+    ),
+    "speech-utils": (
+        True,
+        "Locale and voice parameters for speech recognition/synthesis.",
+        ["getLocaleForLanguage", "getNativeVoicePreferences", "getNativeSpeechParameters"],
+    ),
+    "text-utils": (
+        False,
+        "Plain-text helpers for agent responses and TTS input. No DOM, safe on the server.",
+        ["extractPlainText", "detectLanguage", "cleanResponseText", "formatTextForSpeech"],
+    ),
+    "language-utils": (
+        False,
+        "Language codes, text direction and key lookup with params/fallback. No DOM, safe on the server.",
+        ["translateWithParams", "translateWithFallback", "isRTLLanguage", "getTextDirection",
+         "isValidLanguageCode", "getNativeLanguageName"],
+    ),
+    "translation-tooling": (
+        False,
+        "Dev tooling: string extraction, key templates and dictionary validation.",
+        ["TranslationValidationResult", "extractTranslatableStrings", "generateTranslationTemplate",
+         "validateTranslations", "isNonTranslatable", "getAllKeys"],
+    ),
+}
+
+NAME_TO_MODULE = {name: mod for mod, (_, _, names) in MODULES.items() for name in names}
+
+DECL = re.compile(r"^(export\s+)?(?:async\s+)?(?:function\*?|interface|type|const|let|class|enum)\s+(\w+)")
+
+def read(p) -> str:
+    return Path(p).read_text("utf-8")
+
+# ---------------- разбор translation-utils.ts ----------------
+
+class Decl:
+    def __init__(self, name, exported, text):
+        self.name = name
+        self.exported = exported
+        self.text = text
+        self.deps = set()
+
+def strip_comments(code: str) -> str:
+    code = re.sub(r"/\*.*?\*/", "", code, flags=re.S)
+    return re.sub(r"(^|\s)//[^\n]*", r"\1", code)
+
+def parse_decls(src: str):
+    lines = src.split("\n")
+    starts = []
+    for i, line in enumerate(lines):
+        m = DECL.match(line)
+        if not m:
+            continue
+        start = i
+        # JSDoc/блочный комментарий прямо над объявлением едет вместе с ним
+        if start > 0 and lines[start - 1].strip().endswith("*/"):
+            j = start - 1
+            while j > 0 and not lines[j].lstrip().startswith("/*"):
+                j -= 1
+            start = j
+        starts.append((start, m.group(2), bool(m.group(1))))
+
+    if not starts:
+        return src, []
+
+    header = "\n".join(lines[: starts[0][0]])
+    decls = []
+    for k, (start, name, exported) in enumerate(starts):
+        end = starts[k + 1][0] if k + 1 < len(starts) else len(lines)
+        decls.append(Decl(name, exported, "\n".join(lines[start:end]).rstrip() + "\n"))
+    return header, decls
+
+def plan_split(src: str) -> dict:
+    header, decls = parse_decls(src)
+    if not decls:
+        raise SystemExit(f"❌ {TARGET}: no declarations found (already split? use `report`)")
+
+    by_name = {d.name: d for d in decls}
+    unknown = [d.name for d in decls if d.name not in NAME_TO_MODULE]
+    if unknown:
+        raise SystemExit(f"❌ not assigned to a module in MODULES: {', '.join(unknown)}")
+
+    # внешние импорты шапки: локальное имя -> (module, Spec)
+    external = {}
+    for _, module, specs in parse_named_imports(header):
+        for s in specs:
+            external[s.local] = (module, s)
+
+    for d in decls:
+        tokens = set(re.findall(r"\b\w+\b", strip_comments(d.text)))
+        d.deps = (tokens & (set(by_name) | set(external))) - {d.name}
+
+    problems = []
+    for d in decls:
+        for dep in d.deps:
+            if dep in by_name and NAME_TO_MODULE[dep] != NAME_TO_MODULE[d.name] and not by_name[dep].exported:
+                problems.append(f"{d.name} ({NAME_TO_MODULE[d.name]}) uses private {dep} ({NAME_TO_MODULE[dep]})")
+    if problems:
+        raise SystemExit("❌ " + "\n❌ ".join(problems))
+
+    files = {}
+    for mod, (use_client, about, names) in MODULES.items():
+        own = [d for d in decls if NAME_TO_MODULE[d.name] == mod]
+        if not own:
+            continue
+        imports = {}  # module path -> [Spec]
+        for d in own:
+            for dep in sorted(d.deps):
+                if dep in external:
+                    path, spec = external[dep]
+                elif NAME_TO_MODULE[dep] != mod:
+                    path, spec = f"./{NAME_TO_MODULE[dep]}", dep
+                else:
+                    continue
+                bucket = imports.setdefault(path, [])
+                if str(spec) not in map(str, bucket):
+                    bucket.append(spec)
+
+        out = ["// @ts-nocheck"]
+        if use_client:
+            out.append('"use client"')
+        out += ["", f"// {about}", ""]
+        for path in sorted(imports):
+            out.append(render_named_import(path, imports[path]))
+        if imports:
+            out.append("")
+        out.append("\n".join(d.text for d in own).rstrip() + "\n")
+        files[f"{I18N}/{mod}.ts"] = "\n".join(out)
+
+    return files
+
+def render_barrel(files: dict, holders: list) -> str:
+    """Barrel для импортов, которые не переписать на модули; export * тянет все модули сразу."""
+    mods = [mod for mod in MODULES if f"{I18N}/{mod}.ts" in files]
+    out = ['"use client"'] if any(MODULES[mod][0] for mod in mods) else []
+    out += [
+        "",
+        "// Compatibility barrel for imports scripts/split_translation_utils.py could not rewrite:",
+        *(f"//   {h}" for h in holders),
+        "// Import from the per-concern modules instead, then delete this file.",
+        "",
+    ]
+    out += [f'export * from "./{mod}"' for mod in mods]
+    return "\n".join(out).lstrip("\n") + "\n"
+
+# ---------------- импортёры ----------------
+
+def source_files():
+    for d in SOURCE_DIRS:
+        for p in sorted(Path(d).rglob("*")):
+            if p.suffix in SOURCE_EXT and p.is_file() and "node_modules" not in p.parts:
+                yield p.as_posix()
+
+def rewrite_importer(path: str, code: str, exists) -> tuple[str, list]:
+    """Возвращает (новый код, [(старый модуль, новые модули)])."""
+    changes = []
+    out, pos = [], 0
+    for m, module, specs in parse_named_imports(code):
+        if resolve_import(module, path, exists) != TARGET:
+            continue
+        groups = {}
+        for s in specs:
+            mod = NAME_TO_MODULE.get(s.name)
+            if not mod:
+                raise SystemExit(f"❌ {path}: {s.name} is not exported by any split module")
+            groups.setdefault(mod, []).append(s)
+        lines = [render_named_import(module_path_like(module, mod), g, m.group("indent")) for mod, g in groups.items()]
+        out.append(code[pos:m.start()])
+        out.append("\n".join(lines))
+        pos = m.end()
+        changes.append((module, list(groups)))
+    out.append(code[pos:])
+    new = "".join(out)
+
+    return new, changes
+
+def still_imports_target(path: str, code: str, exists) -> list:
+    return [spec for spec in import_specifiers(code) if resolve_import(spec, path, exists) == TARGET]
+
+# ---------------- дерево файлов + граф ----------------
+
+class Tree:
+    """Рабочее дерево, git-ревизия или рабочее дерево с подменёнными файлами."""
+
+    def __init__(self, rev: str | None = None, overrides: dict | None = None):
+        self.rev = rev
+        self.overrides = overrides or {}
+        self.cache = {}
+        self.files = None
+        if rev:
+            ls = subprocess.run(["git", "ls-tree", "-r", "--name-only", rev], capture_output=True, text=True, check=True)
+            self.files = set(ls.stdout.splitlines())
+
+    def exists(self, p: str) -> bool:
+        if p in self.overrides:
+            return True
+        return p in self.files if self.files is not None else Path(p).is_file()
+
+    def read(self, p: str) -> str:
+        if p in self.overrides:
+            return self.overrides[p]
+        if p not in self.cache:
+            if self.rev:
+                r = subprocess.run(["git", "show", f"{self.rev}:{p}"], capture_output=True, check=True)
+                self.cache[p] = r.stdout.decode("utf-8", "replace")
+            else:
+                self.cache[p] = read(p)
+        return self.cache[p]
+
+    def size(self, p: str) -> int:
+        return len(self.read(p).encode("utf-8"))
+
+def reachable(tree: Tree, entries: list) -> set:
+    seen, stack = set(), [e for e in entries if tree.exists(e)]
+    while stack:
+        f = stack.pop()
+        if f in seen:
+            continue
+        seen.add(f)
+        for spec in import_specifiers(tree.read(f)):
+            dep = resolve_import(spec, f, tree.exists)
+            if dep and dep not in seen:
+                stack.append(dep)
+    return seen
+
+def page_routes():
+    """(url, [page, layout...]) для каждой страницы app/."""
+    out = []
+    for page in sorted(Path("app").rglob("page.*")):
+        if page.suffix not in SOURCE_EXT:
+            continue
+        rel = page.parent.relative_to("app")
+        layouts = []
+        d = page.parent
+        while True:
+            for ext in (".tsx", ".ts", ".jsx", ".js"):
+                lp = d / f"layout{ext}"
+                if lp.is_file():
+                    layouts.append(lp.as_posix())
+            if d == Path("app"):
+                break
+            d = d.parent
+        parts = [p for p in rel.parts if not (p.startswith("(") and p.endswith(")"))]
+        out.append(("/" + "/".join(parts), [page.as_posix()] + layouts))
+    return out
+
+def kb(n: int) -> str:
+    return f"{n / 1024:.1f}KB"
+
+def print_report(before: Tree, after: Tree):
+    i18n = {TARGET} | {f"{I18N}/{m}.ts" for m in MODULES}
+    rows = []
+    for url, entries in page_routes():
+        b = reachable(before, entries)
+        a = reachable(after, entries)
+        b_bytes = sum(before.size(f) for f in b)
+        a_bytes = sum(after.size(f) for f in a)
+        used = sorted(Path(f).stem for f in a & i18n)
+        rows.append((url, b_bytes, a_bytes, used))
+
+    w = max(len(r[0]) for r in rows) if rows else 10
+    print(f"{'route':<{w}}  {'before':>9}  {'after':>9}  {'saved':>9}  i18n modules")
+    total = 0
+    for url, b, a, used in sorted(rows, key=lambda r: r[2] - r[1]):
+        total += b - a
+        print(f"{url:<{w}}  {kb(b):>9}  {kb(a):>9}  {kb(b - a):>9}  {', '.join(used) or '-'}")
+    print(f"✅ {len(rows)} routes, {kb(total)} of source no longer reachable in total")
+
+# ---------------- команды ----------------
+
+def split(args):
+    src = read(TARGET)
+    files = plan_split(src)
+    probe = Tree(overrides=files)
+
+    changed = dict(files)
+    holders = []
+    for path in source_files():
+        if path in files or path == TARGET:
+            continue
+        code = read(path)
+        new, changes = rewrite_importer(path, code, probe.exists)
+        if new != code:
+            changed[path] = new
+            for module, mods in changes:
+                print(f"  {path}: {module} -> {', '.join(mods)}")
+        for spec in still_imports_target(path, new, probe.exists):
+            print(f"⚠️ {path}: non-named import of {spec} left as is (keeps a barrel)")
+            holders.append(path)
+
+    if holders:
+        changed[TARGET] = render_barrel(files, sorted(set(holders)))
+    # без barrel TARGET остаётся на диске до записи, но в графе «после» до него уже никто не доходит
+    print_report(Tree(), Tree(overrides=changed))
+
+    if args.dry_run:
+        print("(dry run, nothing written)")
+        return
+    for path, code in changed.items():
+        Path(path).write_text(code, "utf-8")
+    if not holders:
+        Path(TARGET).unlink()
+    print(f"✅ {len(changed)} files written{'' if holders else f', {TARGET} removed'}")
+
+def report(args):
+    print_report(Tree(rev=args.rev), Tree())
+
+def main():
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    s = sub.add_parser("split")
+    s.add_argument("--dry-run", action="store_true")
+    s.set_defaults(fn=split)
+
+    r = sub.add_parser("report")
+    r.add_argument("--rev", default="HEAD", help="ревизия «до» (рабочее дерево — «после»)")
+    r.set_defaults(fn=report)
+
+    args = ap.parse_args()
+    args.fn(args)
+
+if __name__ == "__main__":
+    main()
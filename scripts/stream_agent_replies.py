@@ -0,0 +1,204 @@
+"""
+Кодмод: потоковые ответы агента в диалогах (чат, голосовой и видеозвонок).
+
+На каждом fetch к агенту (те же места, что находят patch_video_call_paywall*.py / fix_paywall_everywhere.py):
+  1) в тело запроса добавляется `stream: true` — роут отдаёт ответ NDJSON по предложениям;
+  2) блок `const raw = await res.text(); let data = raw; try { data = JSON.parse(raw) } catch {}`
+     -> `const data: any = await readAgentReply(res, <на каждое предложение>)`
+     (для не-потокового ответа readAgentReply возвращает то же, что этот блок);
+  3) звонки: первое предложение сразу уходит в TTS (createSentenceSpeaker), полный ответ
+     повторно не озвучивается; чат: ответ растёт в ленте по предложениям;
+  4) перехватчик fetch в шапке (history write-behind) склеивает текст из потока.
+
+Проверки 402 и события turbota:refresh не трогаем — кодмод сверяет, что они остались как были,
+и отказывается работать, если проверки 402 у fetch нет (сначала fix_paywall_everywhere.py).
+
+    python scripts/stream_agent_replies.py --dry-run
+    python scripts/stream_agent_replies.py
+"""
+from pathlib import Path
+import argparse
+import re
+
+from ts_imports import ensure_named_import, matching_close
+
+AGENT_STREAM = "@/lib/agent-stream"
+AGENT_PATH = "/api/turbotaai-agent"
+PRESERVED = ("status === 402", "turbota:refresh", "/pricing")
+
+RAW_BLOCK = re.compile(
+    r"(?P<indent>[ \t]*)const raw = await (?P<res>\w+)\.text\(\)\n"
+    r"\s*let data: any = raw\n"
+    r"\s*try \{\s*data = JSON\.parse\(raw\)\s*\} catch \{[^}]*\}\n"
+)
+
+def agent_url_names(code: str) -> set:
+    """Константы, в которые (напрямую или через другую константу) попадает URL агента."""
+    names = {"TURBOTA_AGENT_WEBHOOK_URL"}
+    decls = [(m.group(1), m) for m in re.finditer(r"\bconst\s+(\w+)\s*=", code)]
+    while True:
+        before = len(names)
+        for name, m in decls:
+            init = code[m.end():m.end() + 300].split("\n\n")[0]
+            if AGENT_PATH in init or any(re.search(rf"\b{n}\b", init) for n in names):
+                names.add(name)
+        if len(names) == before:
+            return names
+
+def find_agent_fetch(code: str):
+    """(start, end, res_var) вызова `const res = await fetch(<агент>, {...})`."""
+    names = agent_url_names(code)
+    for m in re.finditer(r"const\s+(\w+)\s*=\s*await\s+fetch\s*\(\s*([\w.]+|[\"'][^\"']+[\"'])\s*,", code):
+        arg = m.group(2).strip("\"'")
+        if arg == AGENT_PATH or arg in names:
+            end = matching_close(code, code.index("(", m.start()))
+            return m.start(), end + 1, m.group(1)
+    return None
+
+def add_stream_flag(code: str, start: int, end: int) -> str:
+    call = code[start:end]
+    if re.search(r"\bstream\s*:", call):
+        return code
+    m = re.search(r"JSON\.stringify\(\{\n([ \t]*)", call)
+    if not m:
+        raise ValueError("fetch body is not JSON.stringify({...})")
+    at = start + m.end()
+    return code[:at] + "stream: true,\n" + m.group(1) + code[at:]
+
+# ---------------- сайты ----------------
+
+def chat_site(code: str, res: str, indent: str) -> tuple:
+    prelude = (
+        f"{indent}const draftId = `${{Date.now()}}-assistant`\n"
+        f"{indent}let draft = \"\"\n"
+        f"{indent}const data: any = await readAgentReply({res}, (sentence) => {{\n"
+        f"{indent}  // поток: ответ растёт в ленте по предложениям, ниже его заменит готовое сообщение\n"
+        f"{indent}  draft = draft ? `${{draft}} ${{sentence}}` : sentence\n"
+        f"{indent}  const text = draft\n"
+        f"{indent}  setMessages((prev) => [...prev.filter((m) => m.id !== draftId), {{ id: draftId, role: \"assistant\", text }}])\n"
+        f"{indent}}})\n"
+    )
+    edits = [
+        (r"(const assistantMessage: ChatMessage = \{\n\s*)id: `\$\{Date\.now\(\)\}-assistant`,", r"\1id: draftId,"),
+        (r"setMessages\(\(prev\) => \[\.\.\.prev, assistantMessage\]\)",
+         "setMessages((prev) => [...prev.filter((m) => m.id !== draftId), assistantMessage])"),
+    ]
+    return prelude, edits, ["readAgentReply"]
+
+def voice_site(code: str, res: str, indent: str) -> tuple:
+    prelude = (
+        f"{indent}// первое предложение озвучиваем сразу; звонок закончен или между кусками"
+        f" заговорила новая реплика — хвост молчит\n"
+        f"{indent}let lastSeq = ttsSeqRef.current\n"
+        f"{indent}const speaker = createSentenceSpeaker(async (sentence) => {{\n"
+        f"{indent}  if (!isCallActiveRef.current || ttsSeqRef.current !== lastSeq) return\n"
+        f"{indent}  const spoken = speakText(sentence, voiceLangCode)\n"
+        f"{indent}  lastSeq = ttsSeqRef.current\n"
+        f"{indent}  await spoken\n"
+        f"{indent}}})\n"
+        f"{indent}const data: any = await readAgentReply({res}, (sentence) => speaker.push(sentence))\n"
+    )
+    edits = [
+        (r"\n([ \t]*)speakText\(answer, voiceLangCode\)", r"\n\1if (!speaker.started) speakText(answer, voiceLangCode)"),
+    ]
+    return prelude, edits, ["createSentenceSpeaker", "readAgentReply"]
+
+def video_site(code: str, res: str, indent: str) -> tuple:
+    prelude = (
+        f"{indent}// первое предложение озвучиваем сразу, остальное — следом, пока идёт поток\n"
+        f"{indent}const speaker = createSentenceSpeaker((sentence) => speakText(sentence))\n"
+        f"{indent}const data: any = await readAgentReply({res}, (sentence) => speaker.push(sentence))\n"
+    )
+    edits = [
+        (r"\n([ \t]*)await speakText\(aiRaw\)",
+         r"\n\1if (speaker.started) await speaker.drain()\n\1else await speakText(aiRaw)"),
+    ]
+    return prelude, edits, ["createSentenceSpeaker", "readAgentReply"]
+
+SITES = {
+    "components/ai-chat-dialog.tsx": chat_site,
+    "components/voice-call-dialog.tsx": voice_site,
+    "components/video-call-dialog.tsx": video_site,
+}
+
+HEADER = "components/header.tsx"
+HEADER_CLONE = 'const raw = await cloned.text().catch(() => "")'
+HEADER_NEW = 'const raw = agentReplyText(await cloned.text().catch(() => ""), res.headers.get("content-type"))'
+
+def migrate_site(path: str, code: str, site, log) -> str:
+    if "readAgentReply" in code:
+        log("already streaming")
+        return code
+    found = find_agent_fetch(code)
+    if not found:
+        raise ValueError(f"agent fetch not found (expected {AGENT_PATH} or TURBOTA_AGENT_WEBHOOK_URL)")
+    start, end, res = found
+    if not re.search(rf"if \({res}\.status === 402\)", code[end:end + 400]):
+        raise ValueError("no 402 check after the agent fetch — run scripts/fix_paywall_everywhere.py first")
+
+    code = add_stream_flag(code, start, end)
+    m = RAW_BLOCK.search(code, start)
+    if not m or m.group("res") != res:
+        raise ValueError("response parsing block (res.text() + JSON.parse) not found")
+
+    prelude, edits, names = site(code, res, m.group("indent"))
+    # правки — только ниже fetch: выше в файле бывают другие speakText(...) (приветствие и т.п.)
+    head, tail = code[:m.start()], prelude + code[m.end():]
+    for pattern, repl in edits:
+        tail, n = re.subn(pattern, repl, tail, count=1)
+        if not n:
+            raise ValueError(f"pattern not found: {pattern}")
+    code = head + tail
+    for name in names:
+        code = ensure_named_import(code, AGENT_STREAM, name)
+    log(f"fetch({res}) -> stream: true + readAgentReply")
+    return code
+
+def migrate_header(code: str, log) -> str:
+    if "agentReplyText" in code:
+        log("already streaming")
+        return code
+    if HEADER_CLONE not in code:
+        raise ValueError("history clone read not found in the fetch interceptor")
+    code = code.replace(HEADER_CLONE, HEADER_NEW, 1)
+    log("history clone: agentReplyText(...)")
+    return ensure_named_import(code, AGENT_STREAM, "agentReplyText")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--dry-run", action="store_true")
+    args = ap.parse_args()
+
+    if not Path("lib/agent-stream.ts").exists():
+        raise SystemExit("❌ lib/agent-stream.ts not found")
+
+    jobs = [(p, lambda c, log, site=site, p=p: migrate_site(p, c, site, log)) for p, site in SITES.items()]
+    jobs.append((HEADER, migrate_header))
+
+    changed = {}
+    for path, fn in jobs:
+        if not Path(path).exists():
+            print(f"⚠️ {path} not found, skipped")
+            continue
+        code = Path(path).read_text("utf-8")
+        notes = []
+        try:
+            new = fn(code, notes.append)
+        except ValueError as e:
+            raise SystemExit(f"❌ {path}: {e}")
+        for marker in PRESERVED:
+            if code.count(marker) != new.count(marker):
+                raise SystemExit(f"❌ {path}: {marker!r} handling changed, refusing to write")
+        print(f"{path}: {'; '.join(notes)}")
+        if new != code:
+            changed[path] = new
+
+    print(f"✅ {len(changed)} files rewritten")
+    if args.dry_run:
+        print("(dry run, nothing written)")
+        return
+    for path, code in changed.items():
+        Path(path).write_text(code, "utf-8")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+"""
+Индекс символов app/, components/, hooks/, lib/ для кодмодов.
+
+Скрипты ищут место правки догадками — "function Header[^{]*\\{", "export default function[^{]*{",
+первый "return (", первый `const router = useRouter()` — и каждая догадка заново сканирует файл,
+а в файле с несколькими компонентами попадает не туда. Индекс хранит для каждого файла символы
+верхнего уровня: компоненты, хуки и функции (function, const = () => ..., forwardRef/memo),
+экспорт (именованный / default), диапазон объявления и тела и какие хуки вызываются в теле.
+
+Индекс лежит в .symbol-index.json и обновляется по файлам: не совпали mtime/размер — считаем
+sha1, не совпал хеш — разбираем файл заново. Позиции — символьные, в тексте, как его отдаёт
+source_reader (и read_text для файлов без BOM).
+
+    from symbol_index import SymbolIndex
+
+    idx = SymbolIndex.load()                          # обновит изменившиеся файлы
+    page = idx.default_export("app/pricing/page.tsx")
+    body = code[page.body_start:page.body_end]        # "{ ... }" целиком
+    idx.callers("useRouter")                          # [(путь, символ), ...]
+
+Внутри шага, когда файл уже правили в памяти, — symbols_of(code): разбор текущего текста.
+
+    python scripts/symbol_index.py                    # обновить, статистика
+    python scripts/symbol_index.py --file app/pricing/page.tsx
+    python scripts/symbol_index.py --hook useRouter
+    python scripts/symbol_index.py --rebuild
+"""
+from pathlib import Path
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+
+from source_reader import Source
+from ts_imports import matching_close
+
+ROOTS = ("app", "components", "hooks", "lib")
+EXTENSIONS = (".ts", ".tsx", ".js", ".jsx")
+INDEX_PATH = Path(".symbol-index.json")
+VERSION = 1
+
+IDENT = r"[A-Za-z_$][\w$]*"
+FUNC_DECL = re.compile(
+    rf"^(?P<export>export\s+)?(?P<default>default\s+)?(?P<async>async\s+)?function\s*\*?\s*(?P<name>{IDENT})?\s*(?:<[^>(]*>)?\s*\(",
+    re.M,
+)
+CONST_DECL = re.compile(rf"^(?P<export>export\s+)?(?:const|let|var)\s+(?P<name>{IDENT})\s*(?::[^=\n]+)?=\s*", re.M)
+# const X = React.forwardRef<...>(  /  memo(
+WRAPPER = re.compile(r"(?:React\.)?(?P<wrapper>forwardRef|memo)\s*(?:<[\s\S]*?>)?\s*\(")
+ARROW_HEAD = re.compile(rf"(?P<async>async\s+)?(?:\(|{IDENT}\s*=>)")
+FUNCTION_EXPR = re.compile(rf"(?P<async>async\s+)?function\s*\*?\s*(?:{IDENT})?\s*(?:<[^>(]*>)?\s*\(")
+EXPORT_DEFAULT_NAME = re.compile(rf"^export\s+default\s+(?P<name>{IDENT})\s*;?\s*$", re.M)
+EXPORT_LIST = re.compile(r"^export\s*\{(?P<names>[^}]*)\}\s*;?\s*$", re.M)
+HOOK_CALL = re.compile(r"\b(use[A-Z][\w$]*)\s*(?:<[^()]*?>)?\s*\(")
+
+class Symbol:
+    __slots__ = ("name", "kind", "exported", "default", "is_async", "wrapper",
+                 "start", "end", "body_start", "body_end", "line", "hooks")
+
+    def __init__(self, name: str, kind: str, start: int, end: int, body_start: int, body_end: int, line: int,
+                 exported: bool = False, default: bool = False, is_async: bool = False, wrapper: str = "",
+                 hooks: list | None = None):
+        self.name = name
+        self.kind = kind  # component | hook | function
+        self.exported = exported
+        self.default = default
+        self.is_async = is_async
+        self.wrapper = wrapper  # forwardRef / memo
+        self.start = start  # начало объявления
+        self.end = end  # конец объявления (после тела)
+        self.body_start = body_start  # "{" тела или "(" выражения у стрелки
+        self.body_end = body_end  # после закрывающей скобки
+        self.line = line
+        self.hooks = hooks or []
+
+    def to_json(self) -> dict:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    @classmethod
+    def from_json(cls, d: dict) -> "Symbol":
+        s = cls.__new__(cls)
+        for k in cls.__slots__:
+            setattr(s, k, d[k])
+        return s
+
+    def __repr__(self) -> str:
+        flags = "default " if self.default else "export " if self.exported else ""
+        return f"<{flags}{self.kind} {self.name} L{self.line} body {self.body_start}:{self.body_end}>"
+
+def kind_of(name: str) -> str:
+    if re.match(r"use[A-Z0-9]", name):
+        return "hook"
+    if name[:1].isupper():
+        return "component"
+    return "function"
+
+def _skip_ws(code: str, i: int) -> int:
+    while i < len(code) and code[i].isspace():
+        i += 1
+    return i
+
+def _function_body(code: str, paren: int, jsx: bool) -> tuple | None:
+    """От "(" параметров function до её тела: (начало, конец) тела или None."""
+    i = matching_close(code, paren, jsx) + 1
+    angle = 0
+    # возвращаемый тип (": Promise<Foo>") — до первой "{" вне угловых скобок
+    while i < len(code):
+        c = code[i]
+        if c == "<":
+            angle += 1
+        elif c == ">" and code[i - 1] != "=":
+            angle -= 1
+        elif c == "{" and angle <= 0:
+            return i, matching_close(code, i, jsx) + 1
+        elif c == ";" and angle <= 0:
+            return None  # перегрузка без тела: function f(a: string): void;
+        i += 1
+    return None
+
+def _arrow_body(code: str, i: int, jsx: bool) -> tuple | None:
+    """С начала стрелки (async? (params) или ident =>): (начало, конец, async) тела или None."""
+    m = ARROW_HEAD.match(code, i)
+    if not m:
+        return None
+    is_async = bool(m.group("async"))
+    j = m.end() - 1
+    if code[j] == "(":
+        j = matching_close(code, j, jsx) + 1
+    else:
+        j = m.end()
+    # ": ReturnType" до "=>"
+    arrow = code.find("=>", j) if code[j - 2:j] != "=>" else j - 2
+    if arrow < 0 or code[j:arrow].strip() and not code[j:arrow].strip().startswith(":"):
+        return None
+    k = _skip_ws(code, arrow + 2)
+    if k >= len(code):
+        return None
+    if code[k] in "{(":
+        return k, matching_close(code, k, jsx) + 1, is_async
+    # выражение в одну строку
+    end = code.find("\n", k)
+    return k, len(code) if end < 0 else end, is_async
+
+def symbols_of(code: str, jsx: bool = True) -> list:
+    """Символы верхнего уровня в тексте (по порядку). Ошибка разбора одного объявления его пропускает."""
+    found = []
+    candidates = sorted(
+        [("func", m) for m in FUNC_DECL.finditer(code)] + [("const", m) for m in CONST_DECL.finditer(code)],
+        key=lambda x: x[1].start(),
+    )
+    pos = 0
+    for what, m in candidates:
+        if m.start() < pos:
+            continue  # внутри предыдущего тела
+        try:
+            if what == "func":
+                span = _function_body(code, m.end() - 1, jsx)
+                if not span:
+                    continue
+                name = m.group("name") or "default"
+                sym = Symbol(name, kind_of(name) if m.group("name") else "component", m.start(), span[1],
+                             span[0], span[1], code.count("\n", 0, m.start()) + 1,
+                             exported=bool(m.group("export")), default=bool(m.group("default")),
+                             is_async=bool(m.group("async")))
+            else:
+                i = m.end()
+                wrapper = ""
+                w = WRAPPER.match(code, i)
+                if w:
+                    wrapper = w.group("wrapper")
+                    i = _skip_ws(code, w.end())
+                f = FUNCTION_EXPR.match(code, i)
+                if f:
+                    span = _function_body(code, f.end() - 1, jsx)
+                    body = (span[0], span[1], bool(f.group("async"))) if span else None
+                else:
+                    body = _arrow_body(code, i, jsx)
+                if not body:
+                    continue
+                end = body[1]
+                if wrapper:
+                    # закрывающая ")" обёртки
+                    end = matching_close(code, w.end() - 1, jsx) + 1
+                name = m.group("name")
+                sym = Symbol(name, kind_of(name), m.start(), end, body[0], body[1],
+                             code.count("\n", 0, m.start()) + 1,
+                             exported=bool(m.group("export")), is_async=body[2], wrapper=wrapper)
+        except (ValueError, IndexError):
+            continue
+        sym.hooks = list(dict.fromkeys(HOOK_CALL.findall(code, sym.body_start, sym.body_end)))
+        found.append(sym)
+        pos = sym.end
+
+    by_name = {s.name: s for s in found}
+    for m in EXPORT_DEFAULT_NAME.finditer(code):
+        if m.group("name") in by_name:
+            by_name[m.group("name")].exported = by_name[m.group("name")].default = True
+    for m in EXPORT_LIST.finditer(code):
+        for raw in m.group("names").split(","):
+            local, _, alias = " ".join(raw.split()).partition(" as ")
+            s = by_name.get(local.strip())
+            if s:
+                s.exported = True
+                s.default = s.default or alias.strip() == "default"
+    return found
+
+def default_export_of(code: str) -> Symbol | None:
+    return next((s for s in symbols_of(code) if s.default), None)
+
+def top_level_return(code: str, sym: Symbol, jsx: bool = True) -> int | None:
+    """Позиция `return` прямо в теле sym (не во вложенных колбэках и функциях) или None."""
+    if code[sym.body_start] != "{":
+        return None
+    j = sym.body_start + 1
+    while j < sym.body_end - 1:
+        c = code[j]
+        if c in "({[":
+            j = matching_close(code, j, jsx) + 1
+            continue
+        if c in "\"'`":
+            j = code.find(c, j + 1) + 1 or sym.body_end
+            continue
+        if code.startswith("//", j):
+            j = code.find("\n", j) + 1 or sym.body_end
+            continue
+        if code.startswith("/*", j):
+            j = code.find("*/", j) + 2 or sym.body_end
+            continue
+        if code.startswith("return", j) and not (code[j - 1].isalnum() or code[j - 1] in "_$") \
+                and not (code[j + 6:j + 7].isalnum() or code[j + 6:j + 7] in ("_", "$")):
+            return j
+        j += 1
+    return None
+
+# ---------------- индекс по дереву ----------------
+
+def _walk(roots):
+    for root in roots:
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if d not in ("node_modules", ".next"))
+            for name in sorted(filenames):
+                if name.endswith(EXTENSIONS) and not name.endswith(".d.ts"):
+                    yield os.path.join(dirpath, name).replace(os.sep, "/")
+
+class SymbolIndex:
+    def __init__(self, files: dict | None = None):
+        # путь -> {"mtime", "size", "sha1", "symbols": [Symbol]}
+        self.files: dict = files or {}
+        self.stats = {"unchanged": 0, "rehashed": 0, "parsed": 0, "removed": 0}
+
+    @classmethod
+    def load(cls, path: Path = INDEX_PATH, roots=ROOTS, update: bool = True) -> "SymbolIndex":
+        idx = cls()
+        if path.exists():
+            try:
+                raw = json.loads(path.read_text("utf-8"))
+                if raw.get("version") == VERSION:
+                    for rel, f in raw["files"].items():
+                        f["symbols"] = [Symbol.from_json(s) for s in f["symbols"]]
+                        idx.files[rel] = f
+            except (ValueError, KeyError):
+                print(f"⚠️ {path}: unreadable, rebuilding")
+        if update and idx.update(roots):
+            idx.save(path)
+        return idx
+
+    def save(self, path: Path = INDEX_PATH):
+        files = {rel: {**f, "symbols": [s.to_json() for s in f["symbols"]]} for rel, f in self.files.items()}
+        path.write_text(json.dumps({"version": VERSION, "files": files}, ensure_ascii=False), "utf-8")
+
+    def update(self, roots=ROOTS) -> bool:
+        """Досчитать изменившиеся файлы; True, если индекс поменялся."""
+        seen = set()
+        dirty = False
+        for rel in _walk(roots):
+            seen.add(rel)
+            st = os.stat(rel)
+            old = self.files.get(rel)
+            if old and old["mtime"] == st.st_mtime_ns and old["size"] == st.st_size:
+                self.stats["unchanged"] += 1
+                continue
+            with Source.open(rel) as src:
+                sha1 = hashlib.sha1(src.data).hexdigest()
+                if old and old["sha1"] == sha1:
+                    self.stats["rehashed"] += 1
+                    symbols = old["symbols"]
+                else:
+                    self.stats["parsed"] += 1
+                    symbols = symbols_of(src.text, jsx=not rel.endswith(".ts"))
+            self.files[rel] = {"mtime": st.st_mtime_ns, "size": st.st_size, "sha1": sha1, "symbols": symbols}
+            dirty = True
+        for rel in [r for r in self.files if r not in seen]:
+            del self.files[rel]
+            self.stats["removed"] += 1
+            dirty = True
+        return dirty
+
+    # ---------------- запросы ----------------
+
+    def symbols(self, path: str, code: str | None = None) -> list:
+        """Символы файла. code — текущий текст (например, после предыдущих шагов в памяти)."""
+        f = self.files.get(path)
+        if code is not None:
+            if f and f["sha1"] == hashlib.sha1(code.encode("utf-8")).hexdigest():
+                return f["symbols"]
+            return symbols_of(code, jsx=not path.endswith(".ts"))
+        return f["symbols"] if f else []
+
+    def default_export(self, path: str, code: str | None = None) -> Symbol | None:
+        return next((s for s in self.symbols(path, code) if s.default), None)
+
+    def symbol(self, path: str, name: str, code: str | None = None) -> Symbol | None:
+        return next((s for s in self.symbols(path, code) if s.name == name), None)
+
+    def find(self, name: str, kind: str | None = None) -> list:
+        return [(rel, s) for rel, f in self.files.items() for s in f["symbols"]
+                if s.name == name and (kind is None or s.kind == kind)]
+
+    def callers(self, hook: str) -> list:
+        return [(rel, s) for rel, f in self.files.items() for s in f["symbols"] if hook in s.hooks]
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--file", help="символы одного файла")
+    ap.add_argument("--hook", help="кто вызывает хук")
+    ap.add_argument("--name", help="где объявлен символ")
+    ap.add_argument("--rebuild", action="store_true")
+    args = ap.parse_args()
+
+    if not Path("app").is_dir():
+        raise SystemExit("❌ run from the repository root (app/ not found)")
+    if args.rebuild and INDEX_PATH.exists():
+        INDEX_PATH.unlink()
+
+    started = time.perf_counter()
+    idx = SymbolIndex.load()
+    elapsed = time.perf_counter() - started
+    total = sum(len(f["symbols"]) for f in idx.files.values())
+    st = idx.stats
+    print(
+        f"✅ {len(idx.files)} files, {total} symbols in {elapsed * 1000:.0f} ms "
+        f"(parsed {st['parsed']}, rehashed {st['rehashed']}, unchanged {st['unchanged']}, removed {st['removed']})"
+    )
+
+    if args.file:
+        for s in idx.symbols(args.file):
+            hooks = f" hooks: {', '.join(s.hooks)}" if s.hooks else ""
+            print(f"  {s!r}{hooks}")
+    if args.hook:
+        for rel, s in idx.callers(args.hook):
+            print(f"  {rel}:{s.line} {s.name}")
+    if args.name:
+        for rel, s in idx.find(args.name):
+            print(f"  {rel}:{s.line} {s!r}")
+
+if __name__ == "__main__":
+    main()
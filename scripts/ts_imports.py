@@ -0,0 +1,219 @@
+"""
+Таблица импортов TS/TSX для скриптов-патчеров.
+
+То, что fix_*.py раньше писали каждый у себя (ensure_named_import, ensure_import_line,
+cleanup_import_braces), плюс разбор именованных импортов и резолв путей "@/..." / "./..."
+в файлы репозитория — для кодмодов и обхода графа импортов.
+
+    from ts_imports import parse_named_imports, render_named_import, resolve_import
+"""
+from pathlib import Path
+import re
+
+EXTENSIONS = (".ts", ".tsx", ".js", ".jsx", ".mjs")
+
+NAMED_IMPORT = re.compile(
+    r'^(?P<indent>[ \t]*)import\s*(?P<type>type\s+)?\{(?P<names>[^}]*)\}\s*from\s*["\'](?P<module>[^"\']+)["\'][ \t]*;?',
+    re.M,
+)
+# import X from / import * as X from / import "x" / export ... from / import("x")
+ANY_IMPORT = re.compile(
+    r'(?:^|[;\n])\s*(?:import|export)\s+(?:type\s+)?(?:[^"\';]*?\s+from\s+)?["\']([^"\']+)["\']'
+    r'|\bimport\(\s*["\']([^"\']+)["\']\s*\)',
+)
+
+class Spec:
+    """Один спецификатор: `name`, `name as alias`, `type Name`."""
+    __slots__ = ("name", "alias", "is_type")
+
+    def __init__(self, name: str, alias: str | None = None, is_type: bool = False):
+        self.name = name
+        self.alias = alias
+        self.is_type = is_type
+
+    @classmethod
+    def parse(cls, raw: str) -> "Spec":
+        raw = " ".join(raw.split())
+        is_type = raw.startswith("type ")
+        if is_type:
+            raw = raw[5:]
+        name, _, alias = raw.partition(" as ")
+        return cls(name.strip(), alias.strip() or None, is_type)
+
+    def __str__(self):
+        s = ("type " if self.is_type else "") + self.name
+        return f"{s} as {self.alias}" if self.alias else s
+
+    @property
+    def local(self) -> str:
+        return self.alias or self.name
+
+def split_names(names: str) -> list[Spec]:
+    # комментарии внутри фигурных скобок не сохраняем — в кодмодах их не бывает
+    names = re.sub(r"//[^\n]*|/\*.*?\*/", "", names, flags=re.S)
+    return [Spec.parse(x) for x in names.split(",") if x.strip()]
+
+def parse_named_imports(code: str):
+    """[(match, module, [Spec])] для всех `import { ... } from "module"`."""
+    out = []
+    for m in NAMED_IMPORT.finditer(code):
+        specs = split_names(m.group("names"))
+        if m.group("type"):
+            for s in specs:
+                s.is_type = True
+        out.append((m, m.group("module"), specs))
+    return out
+
+def render_named_import(module: str, specs: list, indent: str = "", width: int = 120) -> str:
+    one = f'{indent}import {{ {", ".join(map(str, specs))} }} from "{module}"'
+    if len(one) <= width:
+        return one
+    body = "".join(f"{indent}  {s},\n" for s in specs)
+    return f'{indent}import {{\n{body}{indent}}} from "{module}"'
+
+def cleanup_import_braces(s: str) -> str:
+    # чистим ", ,", "{ ,", ", }" в import
+    s = re.sub(r"\{\s*,", "{", s)
+    s = re.sub(r",\s*,", ", ", s)
+    s = re.sub(r",\s*}", " }", s)
+    s = re.sub(r"\{\s*\}", "{}", s)
+    return s
+
+def _insert_after_use_client(code: str, text: str) -> str:
+    if code.lstrip().startswith('"use client"') or code.lstrip().startswith("'use client'"):
+        i = code.find("\n")
+        return code[:i + 1] + "\n" + text + code[i + 1:]
+    return text + code
+
+def ensure_named_import(code: str, module: str, name: str) -> str:
+    found = parse_named_imports(code)
+    for m, mod, specs in found:
+        if mod != module:
+            continue
+        if any(s.local == name for s in specs):
+            return code
+        specs.append(Spec.parse(name))
+        semi = ";" if m.group(0).rstrip().endswith(";") else ""
+        return code[:m.start()] + render_named_import(module, specs, m.group("indent")) + semi + code[m.end():]
+    line = f'import {{ {name} }} from "{module}"'
+    last = last_import_end(code)
+    if last is not None:
+        # стиль с ";" или без — как у соседних импортов
+        semi = ";" if code[:last].rstrip().endswith(";") else ""
+        return code[:last] + "\n" + line + semi + code[last:]
+    return _insert_after_use_client(code, line + "\n")
+
+def last_import_end(code: str) -> int | None:
+    """Конец последнего import-выражения верхнего уровня (позиция перед переводом строки)."""
+    end = None
+    for m in re.finditer(r'^import\b[^;]*?(?:from\s*)?["\'][^"\']+["\'][ \t]*;?', code, re.M):
+        end = m.end()
+    return end
+
+def ensure_import_line(code: str, line: str) -> str:
+    if line in code:
+        return code
+    return _insert_after_use_client(code, line + "\n")
+
+# после этих слов кавычка — начало строки, после прочих слов (текст JSX: Don't, you're) — нет
+_QUOTE_AFTER_WORD = {"return", "case", "typeof", "in", "of", "await", "yield", "else", "default", "void"}
+
+def _quote_opens_string(code: str, j: int) -> bool:
+    k = j - 1
+    while k >= 0 and code[k] in " \t":
+        k -= 1
+    if k < 0 or not (code[k].isalnum() or code[k] in "_$"):
+        return True
+    w = k
+    while w >= 0 and (code[w].isalnum() or code[w] in "_$"):
+        w -= 1
+    return code[w + 1:k + 1] in _QUOTE_AFTER_WORD
+
+def matching_close(code: str, i: int, jsx: bool = False) -> int:
+    """
+    Индекс скобки, закрывающей code[i] ("(", "{" или "["); строки и комментарии пропускаются.
+    jsx=True — для .tsx: апостроф/кавычка сразу после слова (текст JSX) строку не открывает.
+    """
+    pairs = {"(": ")", "{": "}", "[": "]"}
+    stack = [pairs[code[i]]]
+    j = i + 1
+    while j < len(code):
+        c = code[j]
+        if c in "\"'`" and (not jsx or c == "`" or _quote_opens_string(code, j)):
+            j += 1
+            while j < len(code) and code[j] != c:
+                j += 2 if code[j] == "\\" else 1
+        elif code.startswith("//", j):
+            j = code.find("\n", j)
+            if j < 0:
+                break
+        elif code.startswith("/*", j):
+            j = code.find("*/", j) + 1
+        elif c in pairs:
+            stack.append(pairs[c])
+        elif c in ")}]":
+            if c != stack.pop():
+                raise ValueError(f"unbalanced {c!r} at {j}")
+            if not stack:
+                return j
+        j += 1
+    raise ValueError(f"no match for {code[i]!r} at {i}")
+
+def drop_unused_named(code: str, module: str, names: set) -> str:
+    """Убирает из `import { ... } from module` имена из names, которых больше нет в коде."""
+    for m, mod, specs in reversed(parse_named_imports(code)):
+        if mod != module:
+            continue
+        rest = code[:m.start()] + code[m.end():]
+        keep = [s for s in specs if s.local not in names or re.search(rf"\b{re.escape(s.local)}\b", rest)]
+        if len(keep) == len(specs):
+            continue
+        if keep:
+            semi = ";" if m.group(0).rstrip().endswith(";") else ""
+            code = code[:m.start()] + render_named_import(module, keep, m.group("indent")) + semi + code[m.end():]
+        else:
+            end = m.end() + 1 if code[m.end():m.end() + 1] == "\n" else m.end()
+            code = code[:m.start()] + code[end:]
+    return code
+
+# ---------------- резолв путей ----------------
+
+def import_specifiers(code: str) -> list[str]:
+    """Все строки-источники импортов файла (статические, re-export, dynamic import())."""
+    code = re.sub(r"/\*.*?\*/", "", code, flags=re.S)
+    code = re.sub(r"(^|\s)//[^\n]*", r"\1", code)
+    return [a or b for a, b in ANY_IMPORT.findall(code)]
+
+def resolve_import(spec: str, importer: str, exists) -> str | None:
+    """
+    "@/lib/x" или "./x" -> путь файла в репозитории (posix, от корня) либо None для пакетов.
+    exists(path) -> bool: проверка по диску или по дереву git-ревизии.
+    """
+    if spec.startswith("@/"):
+        base = spec[2:]
+    elif spec.startswith("."):
+        base = str(Path(importer).parent / spec)
+    else:
+        return None
+    base = _normpath(base)
+    candidates = [base] + [base + e for e in EXTENSIONS] + [f"{base}/index{e}" for e in EXTENSIONS]
+    for c in candidates:
+        if Path(c).suffix in EXTENSIONS and exists(c):
+            return c
+    return None
+
+def _normpath(p: str) -> str:
+    parts = []
+    for seg in p.replace("\\", "/").split("/"):
+        if seg in ("", "."):
+            continue
+        if seg == ".." and parts:
+            parts.pop()
+        else:
+            parts.append(seg)
+    return "/".join(parts)
+
+def module_path_like(original: str, new_basename: str) -> str:
+    """"@/lib/i18n/translation-utils" + "text-utils" -> "@/lib/i18n/text-utils" (стиль пути сохраняется)."""
+    head, sep, _ = original.rpartition("/")
+    return f"{head}{sep}{new_basename}"
@@ -0,0 +1,309 @@
+"""
+Демон: следит за пропатченными файлами и сам доводит их правила после сохранения.
+
+components/header.tsx перегенерируют и правят руками — после этого раньше вручную гоняли
+цепочку fix_header_*/patch_header_*. Здесь у каждого правила (скрипта) есть якоря:
+needs — без них скрипту нечего делать, done — правка уже на месте. На изменение файла демон
+перечитывает только его, заново считает якоря его правил и запускает лишь те правила, у которых
+якоря поменялись с прошлого прохода и которые "ждут" (все needs есть, done нет).
+
+Скрипты исполняются в этом же процессе (скомпилированы один раз, перекомпилируются, если
+скрипт поменялся) — без запуска интерпретатора на каждый, правка после сохранения — миллисекунды.
+Пачка событий от редактора (запись, переименование, ещё запись) склеивается --debounce-ms
+в один проход. Собственные записи демона новых проходов не вызывают (сверяется содержимое).
+
+Слежка — inotify (Linux, через libc); где его нет или с --poll — опрос mtime.
+Тяжёлые переписывания перехватчика (fix_header_final_v1, *_clean_v1, *_v6, *_v7) сюда не входят:
+у них нет надёжного якоря "уже сделано", их по-прежнему запускают руками.
+
+    python scripts/watch_patches.py                 # начальный проход и слежка
+    python scripts/watch_patches.py --once          # один проход и выход
+    python scripts/watch_patches.py --list
+"""
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+import argparse
+import ctypes
+import ctypes.util
+import io
+import os
+import re
+import select
+import struct
+import sys
+import time
+import traceback
+
+SCRIPTS = Path("scripts")
+HEADER = "components/header.tsx"
+DEBOUNCE_MS = 50
+POLL_S = 0.25
+
+AGENT_HOOK = r'if \(url\.includes\("/api/turbotaai-agent"\)\) \{'
+
+class Rule:
+    __slots__ = ("script", "path", "needs", "done")
+
+    def __init__(self, script: str, path: str, needs=(), done=()):
+        self.script = script
+        self.path = path
+        self.needs = tuple(re.compile(a, re.M) for a in needs)
+        self.done = tuple(re.compile(a, re.M) for a in done)
+
+    @property
+    def anchors(self) -> tuple:
+        return self.needs + self.done
+
+# порядок — как их запускали руками
+RULES = (
+    Rule("fix_header_placeholder_pass_v1.py", HEADER,
+         needs=[r"if\s*\(\(isAgent\s*\|\|\s*isPromo\s*\|\|\s*isClear\)\s*&&\s*res\.ok\)\s*:\s*#"]),
+    Rule("fix_header_showpaywall_dup.py", HEADER,
+         needs=[r"const\s+\[\s*showPaywall\s*,\s*setShowPaywall\s*\]|^\s*setShowPaywall\("]),
+    Rule("patch_header_refresh.py", HEADER,
+         needs=[r'fetch\("/api/account/summary"\)'], done=[r"turbota:refresh"]),
+    Rule("patch_header_trialtext.py", HEADER,
+         needs=[r"const \[trialLeft, setTrialLeft\] = useState<number \| null>\(null\)"], done=[r"\btrialText\b"]),
+    Rule("patch_header_global_fetch.py", HEADER,
+         needs=[r"return \("], done=[r"turbota_global_fetch_interceptor"]),
+    Rule("patch_header_clear_refresh.py", HEADER,
+         needs=[AGENT_HOOK], done=[r'url\.includes\("/api/auth/clear"\)']),
+    Rule("patch_header_promo_refresh.py", HEADER,
+         needs=[AGENT_HOOK], done=[r"/api/billing/promo/redeem"]),
+)
+
+# ---------------- якоря ----------------
+
+def lex(path: str, code: str) -> dict:
+    """Состояние якорей всех правил файла: текст совпадения или None."""
+    state = {}
+    for rule in RULES:
+        if rule.path != path:
+            continue
+        for a in rule.anchors:
+            if a.pattern not in state:
+                m = a.search(code)
+                state[a.pattern] = m.group(0) if m else None
+    return state
+
+def waiting(rule: Rule, state: dict) -> bool:
+    return all(state[a.pattern] is not None for a in rule.needs) and all(state[a.pattern] is None for a in rule.done)
+
+def affected(rule: Rule, state: dict, prev: dict | None) -> bool:
+    return prev is None or any(state[a.pattern] != prev.get(a.pattern) for a in rule.anchors)
+
+# ---------------- запуск скриптов ----------------
+
+_compiled: dict = {}
+
+def compiled(script: str):
+    p = SCRIPTS / script
+    key = (script, p.stat().st_mtime_ns)
+    code = _compiled.get(key)
+    if code is None:
+        code = compile(p.read_text("utf-8"), str(p), "exec")
+        _compiled[key] = code
+    return code
+
+def run_script(script: str) -> tuple:
+    """Скрипт как `python scripts/<script>`, но в этом процессе. (ok, вывод)."""
+    out = io.StringIO()
+    ok = True
+    try:
+        code = compiled(script)
+        with redirect_stdout(out), redirect_stderr(out):
+            exec(code, {"__name__": "__main__", "__file__": str(SCRIPTS / script)})
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            ok = False
+            if isinstance(e.code, str):
+                out.write(e.code + "\n")
+    except Exception:
+        ok = False
+        out.write(traceback.format_exc(limit=-1))
+    return ok, out.getvalue().strip()
+
+# ---------------- проход ----------------
+
+class State:
+    def __init__(self):
+        self.anchors: dict = {}  # путь -> якоря после последнего прохода
+        self.content: dict = {}  # путь -> текст после последнего прохода (свои записи не считаем правкой)
+
+def read(path: str) -> str | None:
+    try:
+        return Path(path).read_text("utf-8")
+    except FileNotFoundError:
+        return None
+
+def patch_file(path: str, st: State, force: bool = False) -> int:
+    """
+    Довести один файл. Правило — кандидат, если его якоря отличаются от прошлого прохода
+    (с force — все правила файла); запускается, если ждёт. После каждой правки файла якоря
+    пересчитываются — правка одного правила может разбудить следующее. Каждое правило — не больше
+    раза за проход, так что зациклиться проход не может. Возвращает число запущенных правил.
+    """
+    code = read(path)
+    if code is None:
+        print(f"⚠️ {path} not found, waiting")
+        return 0
+    if not force and code == st.content.get(path):
+        return 0
+
+    started = time.perf_counter()
+    base = None if force else st.anchors.get(path)
+    rules = [r for r in RULES if r.path == path]
+    tried = set()
+    state = lex(path, code)
+    while True:
+        rule = next((r for r in rules if r.script not in tried and affected(r, state, base) and waiting(r, state)), None)
+        if rule is None:
+            break
+        tried.add(rule.script)
+        t0 = time.perf_counter()
+        ok, output = run_script(rule.script)
+        print(f"{'✅' if ok else '❌'} {path}: {rule.script} ({(time.perf_counter() - t0) * 1000:.1f} ms)")
+        for line in output.splitlines():
+            print(f"   {line}")
+        new = read(path)
+        if new is not None and new != code:
+            code = new
+            state = lex(path, code)
+
+    st.anchors[path] = state
+    st.content[path] = code
+    if tried:
+        print(f"⏱ {path}: {len(tried)} rules in {(time.perf_counter() - started) * 1000:.1f} ms")
+    return len(tried)
+
+# ---------------- слежка ----------------
+
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+EVENT = struct.Struct("iIII")
+
+class InotifyWatcher:
+    """Следим за каталогами, а не за файлами: редакторы сохраняют через rename, и watch на сам файл теряется."""
+
+    def __init__(self, paths):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs = {}  # wd -> (каталог, {имя: путь})
+        by_dir = {}
+        for path in paths:
+            d, name = os.path.split(path)
+            by_dir.setdefault(d or ".", {})[name] = path
+        for d, names in by_dir.items():
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(d), IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_MODIFY)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch {d} failed")
+            self.dirs[wd] = (d, names)
+
+    def wait(self, timeout: float | None) -> set:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed = set()
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        i = 0
+        while i + EVENT.size <= len(buf):
+            wd, _mask, _cookie, length = EVENT.unpack_from(buf, i)
+            name = buf[i + EVENT.size:i + EVENT.size + length].rstrip(b"\0").decode("utf-8", "replace")
+            i += EVENT.size + length
+            names = self.dirs.get(wd, (None, {}))[1]
+            if name in names:
+                changed.add(names[name])
+        return changed
+
+class PollWatcher:
+    def __init__(self, paths):
+        self.paths = list(paths)
+        self.seen = {p: self.stat(p) for p in self.paths}
+
+    @staticmethod
+    def stat(path: str):
+        try:
+            s = os.stat(path)
+            return s.st_mtime_ns, s.st_size
+        except FileNotFoundError:
+            return None
+
+    def wait(self, timeout: float | None) -> set:
+        time.sleep(POLL_S if timeout is None else min(timeout, POLL_S))
+        changed = set()
+        for p in self.paths:
+            now = self.stat(p)
+            if now != self.seen[p]:
+                self.seen[p] = now
+                changed.add(p)
+        return changed
+
+def watcher(paths, poll: bool):
+    if not poll:
+        try:
+            return InotifyWatcher(paths)
+        except (OSError, AttributeError) as e:
+            # не Linux или нет inotify в libc
+            print(f"⚠️ inotify unavailable ({e}), polling every {POLL_S}s")
+    return PollWatcher(paths)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--once", action="store_true", help="один проход по всем файлам и выход")
+    ap.add_argument("--list", action="store_true", help="правила и их якоря")
+    ap.add_argument("--poll", action="store_true", help="опрос mtime вместо inotify")
+    ap.add_argument("--debounce-ms", type=int, default=DEBOUNCE_MS)
+    args = ap.parse_args()
+
+    if not SCRIPTS.is_dir():
+        raise SystemExit("❌ run from the repository root (scripts/ not found)")
+    # скрипты импортируют соседей (ts_imports и т.п.), как при запуске `python scripts/x.py`
+    sys.path.insert(0, str(SCRIPTS.resolve()))
+
+    if args.list:
+        for r in RULES:
+            print(f"{r.path}: {r.script}")
+            for a in r.needs:
+                print(f"   needs /{a.pattern}/")
+            for a in r.done:
+                print(f"   done  /{a.pattern}/")
+        return
+
+    missing = [r.script for r in RULES if not (SCRIPTS / r.script).exists()]
+    if missing:
+        raise SystemExit(f"❌ scripts not found: {', '.join(missing)}")
+
+    paths = list(dict.fromkeys(r.path for r in RULES))
+    st = State()
+    for path in paths:
+        patch_file(path, st, force=True)
+    if args.once:
+        return
+
+    w = watcher(paths, args.poll)
+    print(f"👀 watching {', '.join(paths)} ({type(w).__name__}, debounce {args.debounce_ms} ms)")
+    pending = set()
+    deadline = 0.0
+    try:
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if pending else None
+            changed = w.wait(timeout)
+            if changed:
+                pending |= changed
+                deadline = time.monotonic() + args.debounce_ms / 1000
+            elif pending and time.monotonic() >= deadline:
+                for path in sorted(pending):
+                    patch_file(path, st)
+                pending.clear()
+    except KeyboardInterrupt:
+        print("👋 stopped")
+
+if __name__ == "__main__":
+    main()